@@ -8,40 +8,156 @@ e SOLID, com uma clara separação de responsabilidades entre as camadas.
 Feito por André Carbonieri Silva T839FC9
 """
 
+from typing import Any, Dict, Optional
 from flask import Flask
+from domain.repositories.emergy_repository import EmergyRepository
 from infrastructure.repositories.memory_emergy_repository import MemoryEmergyRepository
+from infrastructure.repositories.sqlite_emergy_repository import SqliteEmergyRepository
+from infrastructure.repositories.columnar_file_emergy_repository import ColumnarFileEmergyRepository
+from infrastructure.parsers.parallel_parser import ParallelMeterParser
+from domain.services.emergy_engine import EmergyEngine, load_transformity_table
+from domain.services.emergy_sensitivity import MonteCarloSensitivity
 from domain.services.emergy_service import EmergyService
 from application.services.emergy_application_service import EmergyApplicationService
+from application.services.batch_ingestion_service import BatchIngestionService
+from application.services.ingestion_job_service import IngestionJobService
 from presentation.controllers.main_controller import MainController
-from presentation.controllers.emergy_controller import EmergyController
+from presentation.controllers.emergy_controller import DEFAULT_MAX_AGE, DEFAULT_MAX_BATCH_FILES, EmergyController
+from presentation.controllers.job_controller import JobController
+from presentation.compression import DEFAULT_MIN_SIZE, ResponseCompressor
+from presentation.response_cache import DEFAULT_MAX_BYTES, EncodedResponseCache
 
 
-def create_app():
+def create_repository(config: Dict[str, Any]) -> EmergyRepository:
+    """
+    Cria o repositório de cálculos escolhido na configuração.
+    
+    Args:
+        config: Configuração da aplicação; REPOSITORY pode ser 'memory' (com
+            orçamento MEMORY_MAX_BYTES e transbordo em arquivos colunares no
+            diretório MEMORY_SPILL_PATH, ambos opcionais), 'sqlite' (usa o arquivo
+            DATABASE_PATH) ou 'columnar' (arquivos colunares mapeados em memória
+            no diretório COLUMNAR_PATH)
+    
+    Returns:
+        A implementação de EmergyRepository configurada
+    """
+    kind = config.get('REPOSITORY', 'memory')
+    if kind == 'memory':
+        spill_path = config.get('MEMORY_SPILL_PATH')
+        spill = ColumnarFileEmergyRepository(spill_path) if spill_path else None
+        return MemoryEmergyRepository(config.get('MEMORY_MAX_BYTES'), spill)
+    if kind == 'sqlite':
+        return SqliteEmergyRepository(config['DATABASE_PATH'])
+    if kind == 'columnar':
+        return ColumnarFileEmergyRepository(config['COLUMNAR_PATH'])
+    raise ValueError(f"Repositório desconhecido: {kind}")
+
+
+def create_emergy_service(config: Dict[str, Any], repository: Optional[EmergyRepository] = None) -> EmergyService:
+    """
+    Cria o serviço de domínio de cálculos, com o repositório e o motor de emergia configurados.
+    
+    Args:
+        config: Configuração da aplicação (veja create_repository e TRANSFORMITY_TABLE em create_app)
+        repository: Repositório a usar no lugar do configurado
+    
+    Returns:
+        O EmergyService configurado
+    """
+    return EmergyService(
+        repository if repository is not None else create_repository(config),
+        EmergyEngine(load_transformity_table(config.get('TRANSFORMITY_TABLE')))
+    )
+
+
+def create_app(config: Optional[Dict[str, Any]] = None):
     """
     Cria e configura a aplicação Flask.
     
+    Args:
+        config: Configurações que substituem os valores padrão, por exemplo
+            REPOSITORY ('memory', 'sqlite' ou 'columnar'), MEMORY_MAX_BYTES
+            (orçamento do repositório em memória; None não limita),
+            MEMORY_SPILL_PATH (diretório de transbordo do repositório em memória), DATABASE_PATH
+            (arquivo SQLite), COLUMNAR_PATH (diretório dos arquivos colunares),
+            INGEST_MAX_WORKERS (tarefas de ingestão em paralelo),
+            INGEST_MAX_QUEUE (tarefas aguardando na fila), PARSE_WORKERS
+            (processos da análise paralela; None usa todas as CPUs),
+            PARALLEL_PARSE_MIN_BYTES (tamanho mínimo de um TXT para análise paralela),
+            COMPRESS_MIN_SIZE (tamanho mínimo de uma resposta da API para ser comprimida),
+            RESPONSE_CACHE_BYTES (orçamento do cache de respostas codificadas),
+            RESPONSE_MAX_AGE (max-age, em segundos, das respostas de um cálculo sem leituras de medidor),
+            TRANSFORMITY_TABLE (arquivo JSON com as transformidades; None usa a tabela padrão),
+            SENSITIVITY_WORKERS (processos da análise de Monte Carlo; None usa todas as CPUs),
+            BATCH_WORKERS (arquivos de um lote analisados em paralelo), BATCH_ROOT
+            (diretório dos arquivos do servidor aceitos em lote; None aceita apenas uploads) e
+            BATCH_MAX_FILES (número máximo de arquivos por lote)
+    
     Returns:
         A aplicação Flask configurada
     """
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your-secret-key'
+    app.config['REPOSITORY'] = 'memory'
+    app.config['MEMORY_MAX_BYTES'] = None
+    app.config['MEMORY_SPILL_PATH'] = None
+    app.config['DATABASE_PATH'] = 'emergy.db'
+    app.config['COLUMNAR_PATH'] = 'calculations'
+    app.config['INGEST_MAX_WORKERS'] = 2
+    app.config['INGEST_MAX_QUEUE'] = 8
+    app.config['PARSE_WORKERS'] = None
+    app.config['PARALLEL_PARSE_MIN_BYTES'] = EmergyApplicationService.PARALLEL_MIN_BYTES
+    app.config['COMPRESS_MIN_SIZE'] = DEFAULT_MIN_SIZE
+    app.config['RESPONSE_CACHE_BYTES'] = DEFAULT_MAX_BYTES
+    app.config['RESPONSE_MAX_AGE'] = DEFAULT_MAX_AGE
+    app.config['TRANSFORMITY_TABLE'] = None
+    app.config['SENSITIVITY_WORKERS'] = None
+    app.config['BATCH_WORKERS'] = 4
+    app.config['BATCH_ROOT'] = None
+    app.config['BATCH_MAX_FILES'] = DEFAULT_MAX_BATCH_FILES
+    app.config.update(config or {})
     
-    # Set up repositories
-    emergy_repository = MemoryEmergyRepository()
-    
-    # Set up domain services
-    emergy_service = EmergyService(emergy_repository)
+    # Set up repositories and domain services
+    emergy_service = create_emergy_service(app.config)
     
     # Set up application services
-    emergy_app_service = EmergyApplicationService(emergy_service)
+    emergy_app_service = EmergyApplicationService(
+        emergy_service,
+        parallel_parser=ParallelMeterParser(workers=app.config['PARSE_WORKERS']),
+        parallel_min_bytes=app.config['PARALLEL_PARSE_MIN_BYTES'],
+        sensitivity=MonteCarloSensitivity(workers=app.config['SENSITIVITY_WORKERS'])
+    )
+    ingestion_job_service = IngestionJobService(
+        emergy_app_service,
+        max_workers=app.config['INGEST_MAX_WORKERS'],
+        max_queue=app.config['INGEST_MAX_QUEUE']
+    )
+    batch_ingestion_service = BatchIngestionService(
+        emergy_app_service,
+        max_workers=app.config['BATCH_WORKERS'],
+        allowed_root=app.config['BATCH_ROOT']
+    )
     
     # Set up controllers
     main_controller = MainController()
-    emergy_controller = EmergyController(emergy_app_service)
+    emergy_controller = EmergyController(
+        emergy_app_service,
+        ingestion_job_service,
+        response_cache=EncodedResponseCache(app.config['RESPONSE_CACHE_BYTES']),
+        max_age=app.config['RESPONSE_MAX_AGE'],
+        batch_service=batch_ingestion_service,
+        max_batch_files=app.config['BATCH_MAX_FILES']
+    )
+    job_controller = JobController(ingestion_job_service)
     
     # Register blueprints
     app.register_blueprint(main_controller.get_blueprint())
     app.register_blueprint(emergy_controller.get_blueprint())
+    app.register_blueprint(job_controller.get_blueprint())
+    
+    # Compress API responses (gzip, or brotli when available)
+    app.after_request(ResponseCompressor(min_size=app.config['COMPRESS_MIN_SIZE']))
     
     return app
 
@@ -0,0 +1,248 @@
+"""
+Serviço de aplicação para o processamento de vários arquivos em uma requisição.
+Este arquivo implementa o BatchIngestionService, que recebe um lote de arquivos TXT
+(uploads já gravados em disco ou caminhos de arquivos no servidor, restritos a um
+diretório configurado), analisa os arquivos em paralelo em um pool limitado de
+threads e salva os cálculos novos de uma só vez no repositório (save_many). Cada
+arquivo tem seu próprio resultado, com o ID do cálculo, as linhas e o tempo de
+processamento; a falha de um arquivo não interrompe os demais.
+"""
+
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from application.services.emergy_application_service import EmergyApplicationService
+from domain.models.emergy_model import EmergyCalculation
+
+
+class PathNotAllowedError(ValueError):
+    """
+    Erro lançado quando um caminho do servidor está fora do diretório permitido.
+    """
+
+
+@dataclass
+class BatchFile:
+    """
+    Um arquivo do lote: um upload gravado em um arquivo temporário ou um arquivo do servidor.
+
+    O caminho de um arquivo do servidor é o informado pelo cliente e só é resolvido
+    (e verificado) durante o processamento, para que um caminho inválido falhe
+    apenas o próprio arquivo.
+    """
+    name: str
+    path: str
+    content_hash: Optional[str] = None
+    # Uploads temporários pertencem ao serviço e são removidos ao fim do processamento
+    temporary: bool = False
+
+
+@dataclass
+class BatchFileResult:
+    """
+    Resultado do processamento de um arquivo do lote.
+    """
+    name: str
+    calculation_id: Optional[str] = None
+    rows: int = 0
+    bytes: int = 0
+    deduplicated: bool = False
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converte o resultado para um dicionário serializável.
+        """
+        return {
+            'name': self.name,
+            'success': self.succeeded,
+            'calculation_id': self.calculation_id,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'deduplicated': self.deduplicated,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'rows_per_second': round(self.rows / self.elapsed_seconds, 1) if self.elapsed_seconds > 0 else 0.0,
+            'error': self.error
+        }
+
+
+@dataclass
+class BatchResult:
+    """
+    Resultado de um lote: um BatchFileResult por arquivo, na ordem recebida, e os tempos totais.
+    """
+    id: str
+    files: List[BatchFileResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    save_seconds: float = 0.0
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for result in self.files if not result.succeeded)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converte o resultado para um dicionário serializável.
+        """
+        return {
+            'batch_id': self.id,
+            'succeeded': len(self.files) - self.failed,
+            'failed': self.failed,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'save_seconds': round(self.save_seconds, 3),
+            'files': [result.to_dict() for result in self.files]
+        }
+
+
+class BatchIngestionService:
+    """
+    Serviço de aplicação para processar lotes de arquivos TXT.
+
+    O pool de threads é compartilhado por todos os lotes, de modo que `max_workers`
+    limita o total de arquivos analisados ao mesmo tempo.
+    """
+
+    def __init__(self, app_service: EmergyApplicationService, max_workers: int = 4,
+                 allowed_root: Optional[str] = None):
+        """
+        Inicializa o serviço com o serviço de aplicação de cálculos.
+
+        Args:
+            app_service: Uma instância de EmergyApplicationService
+            max_workers: Número de arquivos analisados em paralelo
+            allowed_root: Diretório dos arquivos do servidor que podem ser processados;
+                se omitido, apenas uploads são aceitos
+        """
+        self._app_service = app_service
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch')
+        self._allowed_root = os.path.realpath(allowed_root) if allowed_root else None
+
+    def resolve_path(self, path: str) -> str:
+        """
+        Resolve um caminho do servidor, relativo ao diretório permitido.
+
+        Links simbólicos e '..' são resolvidos antes da verificação, de modo que não
+        é possível sair do diretório permitido.
+
+        Args:
+            path: Caminho relativo ao diretório permitido (ou absoluto, dentro dele)
+
+        Returns:
+            O caminho absoluto do arquivo
+
+        Raises:
+            PathNotAllowedError: Se não houver diretório permitido ou o caminho estiver fora dele
+        """
+        if self._allowed_root is None:
+            raise PathNotAllowedError('O processamento de arquivos do servidor não está habilitado')
+        resolved = os.path.realpath(os.path.join(self._allowed_root, path))
+        if os.path.commonpath([self._allowed_root, resolved]) != self._allowed_root:
+            raise PathNotAllowedError(f'Caminho fora do diretório permitido: {path}')
+        return resolved
+
+    def process(self, files: Sequence[BatchFile], metadata: Dict[str, Any]) -> BatchResult:
+        """
+        Processa os arquivos do lote em paralelo e salva os cálculos novos de uma vez.
+
+        Arquivos com o mesmo conteúdo de um cálculo existente, ou de outro arquivo do
+        mesmo lote, reutilizam esse cálculo e são marcados como deduplicados.
+
+        Args:
+            files: Os arquivos do lote
+            metadata: Metadados adicionais para todos os cálculos
+
+        Returns:
+            O BatchResult, com um resultado por arquivo na ordem recebida
+        """
+        batch = BatchResult(id=str(uuid.uuid4()))
+        started = time.perf_counter()
+        futures = [self._executor.submit(self._run, batch.id, item, metadata) for item in files]
+        outcomes = [future.result() for future in futures]
+        batch.files = [result for result, _ in outcomes]
+
+        pending: List[EmergyCalculation] = []
+        pending_results: List[BatchFileResult] = []
+        first_by_hash: Dict[str, str] = {}
+        for result, calculation in outcomes:
+            if calculation is None or result.deduplicated:
+                continue
+            content_hash = calculation.content_hash
+            if content_hash is not None and content_hash in first_by_hash:
+                result.calculation_id = first_by_hash[content_hash]
+                result.deduplicated = True
+                continue
+            if content_hash is not None:
+                first_by_hash[content_hash] = calculation.id
+            pending.append(calculation)
+            pending_results.append(result)
+
+        save_started = time.perf_counter()
+        try:
+            self._app_service.save_calculations(pending)
+        except Exception as e:
+            for result in pending_results:
+                result.calculation_id = None
+                result.error = f'Erro ao salvar o cálculo: {str(e)}'
+        batch.save_seconds = time.perf_counter() - save_started
+        batch.elapsed_seconds = time.perf_counter() - started
+        return batch
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Encerra o pool de threads.
+
+        Args:
+            wait: Se True, aguarda os arquivos em andamento terminarem
+        """
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, batch_id: str, item: BatchFile, metadata: Dict[str, Any]):
+        """
+        Analisa um arquivo do lote no pool, sem salvar o cálculo.
+
+        Returns:
+            (BatchFileResult, EmergyCalculation ou None se o arquivo falhou)
+        """
+        result = BatchFileResult(name=item.name)
+        started = time.perf_counter()
+        calculation = None
+        try:
+            path = item.path if item.temporary else self.resolve_path(item.path)
+            result.bytes = os.path.getsize(path)
+            calculation = self._app_service.process_txt_file(
+                path,
+                {**metadata, 'filename': item.name, 'batch_id': batch_id},
+                filename=os.path.basename(item.name),
+                content_hash=item.content_hash,
+                save=False
+            )
+            result.calculation_id = calculation.id
+            # Um cálculo de outro lote indica um arquivo já processado
+            result.deduplicated = calculation.metadata.get('batch_id') != batch_id
+            result.rows = len(calculation.series) if calculation.series is not None else len(calculation.inputs)
+        except Exception as e:
+            result.error = str(e)
+        finally:
+            result.elapsed_seconds = time.perf_counter() - started
+            if item.temporary:
+                _remove_quietly(item.path)
+        return result, calculation
+
+
+def _remove_quietly(path: str) -> None:
+    """
+    Remove um arquivo temporário, ignorando se ele já não existir.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
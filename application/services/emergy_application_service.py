@@ -4,14 +4,30 @@ Este arquivo implementa o serviço de aplicação para cálculos de Emergy,
 que atua como uma fachada para a camada de aplicação, coordenando o uso
 de serviços de domínio e fornecendo uma interface simplificada para a
 camada de apresentação. Este serviço é responsável por processar dados
-TXT e convertê-los em cálculos de Emergy.
+TXT e convertê-los em cálculos de Emergy, mantendo as leituras em formato colunar,
+e por anexar novas leituras a cálculos existentes.
 
 Feito por André Carbonieri Silva T839FC9
 """
 
-from typing import List, Dict, Any, Optional
-from domain.services.emergy_service import EmergyService
-from domain.models.emergy_model import EmergyCalculation
+import os
+import tempfile
+import threading
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Dict, Any, Optional, Sequence, Union
+from domain.services.emergy_service import AppendResult, EmergyService
+from domain.models.emergy_model import CalculationSummary, EmergyCalculation
+from domain.models.meter_series import MeterSeries
+from domain.models.rollup import Rollup, RollupPyramid
+from domain.repositories.emergy_repository import AppendConflictError, PageCursor
+from domain.services.emergy_engine import DEFAULT_PERIOD, EmergyReport
+from domain.services.emergy_sensitivity import DEFAULT_PERCENTILES, MonteCarloSensitivity, SensitivityResult, UevDistribution
+from domain.services.series_downsampling import LTTB, DownsampledSeries, SeriesDownsampler
+from domain.services.series_statistics import ChannelStatistics, CorrelationMatrix, ScatterDensity, SeriesStatistics
+from application.services.result_cache import CalculationResultCache
+from infrastructure.parsers.compressed_stream import PLAIN, detect_compression, open_upload
+from infrastructure.parsers.content_hash import content_key, hash_bytes, hash_file, spool
+from infrastructure.parsers.parallel_parser import ParallelMeterParser
+from infrastructure.parsers.meter_txt_parser import DEFAULT_CHUNK_SIZE, MeterTxtParser, ParseResult, ParseSummary
 
 
 class EmergyApplicationService:
@@ -23,14 +39,39 @@ class EmergyApplicationService:
     a camada de apresentação.
     """
     
-    def __init__(self, emergy_service: EmergyService):
+    # Arquivos TXT a partir deste tamanho são analisados em paralelo
+    PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+    
+    # Tentativas de um append quando outro processo anexa leituras ao mesmo cálculo
+    APPEND_ATTEMPTS = 3
+    
+    def __init__(self, emergy_service: EmergyService, parser: Optional[MeterTxtParser] = None,
+                 parallel_parser: Optional[ParallelMeterParser] = None,
+                 parallel_min_bytes: int = PARALLEL_MIN_BYTES,
+                 result_cache: Optional[CalculationResultCache] = None,
+                 sensitivity: Optional[MonteCarloSensitivity] = None):
         """
         Inicializa o serviço com um serviço de domínio.
         
         Args:
             emergy_service: Uma instância de EmergyService
+            parser: Analisador de arquivos TXT; usa MeterTxtParser se omitido
+            parallel_parser: Analisador paralelo para arquivos grandes; se omitido,
+                todos os arquivos são analisados em fluxo em um único processo
+            parallel_min_bytes: Tamanho mínimo do arquivo para usar o analisador paralelo
+            result_cache: Cache de estatísticas e correlações; cria um se omitido
+            sensitivity: Análise de Monte Carlo das transformidades; cria uma se omitida
         """
         self._emergy_service = emergy_service
+        self._parser = parser or MeterTxtParser()
+        self._parallel_parser = parallel_parser
+        self._parallel_min_bytes = parallel_min_bytes
+        self._downsampler = SeriesDownsampler()
+        self._statistics = SeriesStatistics()
+        self._results = result_cache if result_cache is not None else CalculationResultCache()
+        self._sensitivity = sensitivity if sensitivity is not None else MonteCarloSensitivity()
+        # Serializa os appends, que leem e regravam o cálculo
+        self._append_lock = threading.Lock()
     
     def process_csv_data(self, csv_data: str, metadata: Dict[str, Any]) -> EmergyCalculation:
         """
@@ -49,22 +90,216 @@ class EmergyApplicationService:
         # Cria cálculo usando serviço de domínio
         return self._emergy_service.create_calculation(inputs, metadata)
     
-    def process_txt_data(self, txt_data: str, metadata: Dict[str, Any]) -> EmergyCalculation:
+    def process_txt_data(self, txt_data: Union[str, bytes], metadata: Dict[str, Any]) -> EmergyCalculation:
         """
         Processa dados TXT para criar um cálculo de emergy.
         
+        Se já houver um cálculo criado a partir do mesmo conteúdo, ele é devolvido
+        sem analisar os dados de novo; texto é comparado pelos seus bytes em UTF-8.
+        
         Args:
-            txt_data: Dados TXT como uma string
+            txt_data: Dados TXT como uma string ou bytes
             metadata: Metadados adicionais para o cálculo
             
         Returns:
-            Uma nova instância de EmergyCalculation
+            O EmergyCalculation criado, ou o já existente com o mesmo conteúdo
         """
+        if isinstance(txt_data, str):
+            txt_data = txt_data.encode('utf-8')
+        key = content_key(hash_bytes(txt_data), PLAIN)
+        existing = self._emergy_service.find_calculation_by_content_hash(key)
+        if existing is not None:
+            return existing
+        
         # Analisa dados TXT
-        inputs = self._parse_txt(txt_data)
+        result = self._parse_txt(txt_data)
         
         # Cria cálculo usando serviço de domínio
-        return self._emergy_service.create_calculation(inputs, metadata)
+        return self._emergy_service.create_calculation_from_series(
+            result.series,
+            {**metadata, 'content_hash': key, 'parse': result.to_metadata()},
+            statistics=result.statistics
+        )
+    
+    def process_txt_stream(self, stream: BinaryIO, metadata: Dict[str, Any],
+                           chunk_size: int = DEFAULT_CHUNK_SIZE,
+                           progress: Optional[Callable[[int], None]] = None,
+                           save: bool = True) -> EmergyCalculation:
+        """
+        Processa um fluxo TXT em blocos para criar um cálculo de emergy.
+        
+        O arquivo nunca é lido inteiro para a memória: cada bloco é analisado
+        e anexado ao cálculo assim que é lido.
+        
+        Args:
+            stream: Fluxo binário com o conteúdo do arquivo
+            metadata: Metadados adicionais para o cálculo
+            chunk_size: Quantidade de bytes lida por vez
+            progress: Função chamada após cada bloco com o total de linhas aceitas até então
+            save: Se False, o cálculo não é salvo; veja save_calculations
+            
+        Returns:
+            Uma nova instância de EmergyCalculation
+        """
+        metadata = dict(metadata)
+        results = self._parser.parse_stream(stream, chunk_size)
+        summary = ParseSummary()
+        
+        return self._emergy_service.create_calculation_from_batches(
+            self._track_batches(results, summary, metadata, progress),
+            metadata,
+            save,
+            summary.statistics
+        )
+    
+    def process_txt_upload(self, filename: str, stream: BinaryIO, metadata: Dict[str, Any],
+                           progress: Optional[Callable[[int], None]] = None,
+                           save: bool = True) -> EmergyCalculation:
+        """
+        Processa um upload TXT, possivelmente compactado (.txt.gz, .zip ou .bz2).
+        
+        O conteúdo é copiado para um arquivo temporário enquanto o hash BLAKE2b dos
+        bytes enviados é calculado, e então processado por process_txt_file: um
+        upload repetido devolve o cálculo já existente sem ser analisado.
+        
+        Args:
+            filename: O nome do arquivo enviado, usado para identificar a compressão
+            stream: Fluxo binário com o conteúdo enviado
+            metadata: Metadados adicionais para o cálculo
+            progress: Função chamada após cada bloco com o total de linhas aceitas até então
+            save: Se False, um cálculo novo não é salvo; veja save_calculations
+            
+        Returns:
+            O EmergyCalculation criado, ou o já existente com o mesmo conteúdo
+            
+        Raises:
+            UnsupportedUploadError: Se o formato do arquivo não for aceito
+        """
+        descriptor, path = tempfile.mkstemp(prefix='emergy-upload-')
+        try:
+            with os.fdopen(descriptor, 'wb') as spooled:
+                content_hash = spool(stream, spooled)
+            return self.process_txt_file(path, metadata, filename, progress, content_hash, save)
+        finally:
+            os.remove(path)
+    
+    def process_txt_file(self, path: str, metadata: Dict[str, Any], filename: Optional[str] = None,
+                         progress: Optional[Callable[[int], None]] = None,
+                         content_hash: Optional[str] = None, save: bool = True,
+                         bytes_progress: Optional[Callable[[int], None]] = None) -> EmergyCalculation:
+        """
+        Processa um arquivo TXT gravado em disco, como um upload já copiado para um arquivo temporário.
+        
+        Se já houver um cálculo criado a partir do mesmo conteúdo (mesmo hash BLAKE2b
+        e mesma compressão), ele é devolvido sem analisar o arquivo de novo. Arquivos
+        não compactados maiores que `parallel_min_bytes` são divididos em faixas de
+        bytes e analisados em paralelo; os demais são lidos em fluxo.
+        
+        Args:
+            path: Caminho do arquivo
+            metadata: Metadados adicionais para o cálculo
+            filename: Nome original do arquivo, usado para identificar a compressão
+            progress: Função chamada com o total de linhas aceitas até então
+            content_hash: Resumo BLAKE2b do conteúdo, se já calculado ao gravar o
+                arquivo; calculado aqui se omitido
+            save: Se False, um cálculo novo não é salvo; veja save_calculations
+            bytes_progress: Função chamada junto com `progress` com o total de bytes
+                do arquivo já lidos
+            
+        Returns:
+            O EmergyCalculation criado, ou o já existente com o mesmo conteúdo
+        """
+        filename = filename or os.path.basename(path)
+        compression = detect_compression(filename)
+        if compression is not None:
+            key = content_key(content_hash or hash_file(path), compression)
+            existing = self._emergy_service.find_calculation_by_content_hash(key)
+            if existing is not None:
+                return existing
+            metadata = {**metadata, 'content_hash': key}
+        
+        if self._should_parse_in_parallel(filename, path):
+            result = self._parallel_parser.parse_file(path, progress=progress, bytes_progress=bytes_progress)
+            return self._emergy_service.create_calculation_from_series(
+                result.series,
+                {
+                    **metadata,
+                    'compression': PLAIN,
+                    'parse': {**result.to_metadata(), 'workers': self._parallel_parser.workers}
+                },
+                save,
+                result.statistics
+            )
+        
+        with open(path, 'rb') as data_file:
+            if bytes_progress is not None:
+                rows_progress = progress
+                
+                def progress(rows: int) -> None:
+                    # A posição no arquivo conta os bytes enviados, mesmo compactados
+                    if rows_progress is not None:
+                        rows_progress(rows)
+                    bytes_progress(data_file.tell())
+            
+            return self._process_upload(filename, data_file, metadata, progress, save)
+    
+    def save_calculations(self, calculations: List[EmergyCalculation]) -> None:
+        """
+        Salva de uma vez, no repositório, cálculos processados com save=False.
+        
+        Args:
+            calculations: Os cálculos a salvar
+        """
+        self._emergy_service.save_calculations(calculations)
+    
+    def append_readings(self, calculation_id: str, batch: MeterSeries) -> Optional[AppendResult]:
+        """
+        Anexa um lote de leituras a um cálculo, descartando os resultados guardados em cache.
+        
+        Apenas a parte final do cálculo gravado é lida (ver EmergyService.append_to_calculation).
+        Se outro processo anexar leituras ao cálculo entre a leitura e a gravação, o
+        cálculo é lido de novo e o lote reaplicado, até APPEND_ATTEMPTS vezes; as
+        leituras que o outro processo já gravou passam a contar como duplicadas.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            batch: As leituras a anexar
+            
+        Returns:
+            O AppendResult, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou os canais forem diferentes
+            AppendConflictError: Se todas as tentativas encontrarem leituras de outro processo
+        """
+        with self._append_lock:
+            for attempt in range(self.APPEND_ATTEMPTS):
+                try:
+                    result = self._emergy_service.append_to_calculation(calculation_id, batch)
+                except AppendConflictError:
+                    self._results.invalidate(calculation_id)
+                    if attempt == self.APPEND_ATTEMPTS - 1:
+                        raise
+                    continue
+                if result is not None and result.accepted:
+                    self._results.invalidate(calculation_id)
+                return result
+    
+    def append_txt_readings(self, calculation_id: str, txt_data: Union[str, bytes]) -> Optional[AppendResult]:
+        """
+        Anexa a um cálculo as leituras de um trecho de arquivo TXT.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            txt_data: Linhas TXT, com ou sem o cabeçalho, como uma string ou bytes
+            
+        Returns:
+            O AppendResult, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se os dados forem inválidos ou o cálculo não tiver leituras de medidor
+        """
+        return self.append_readings(calculation_id, self._parse_txt(txt_data).series)
     
     def get_calculation(self, calculation_id: str) -> Optional[EmergyCalculation]:
         """
@@ -87,9 +322,262 @@ class EmergyApplicationService:
         """
         return self._emergy_service.get_all_calculations()
     
+    def get_calculations_page(self, limit: int, after: Optional[PageCursor] = None) -> List[EmergyCalculation]:
+        """
+        Recupera uma página de cálculos em ordem de criação.
+        
+        Args:
+            limit: Número máximo de cálculos na página
+            after: Cursor do último cálculo da página anterior
+            
+        Returns:
+            Os cálculos da página
+        """
+        return self._emergy_service.get_calculations_page(limit, after)
+    
+    def get_calculation_summary(self, calculation_id: str) -> Optional[CalculationSummary]:
+        """
+        Recupera o resumo de um cálculo, sem as entradas.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            O CalculationSummary se encontrado, None caso contrário
+        """
+        return self._emergy_service.get_calculation_summary(calculation_id)
+    
+    def get_calculation_summaries(self, limit: int, after: Optional[PageCursor] = None) -> List[CalculationSummary]:
+        """
+        Recupera uma página de resumos de cálculos, sem as entradas.
+        
+        Args:
+            limit: Número máximo de resumos na página
+            after: Cursor do último cálculo da página anterior
+            
+        Returns:
+            Os resumos da página
+        """
+        return self._emergy_service.get_calculation_summaries(limit, after)
+    
+    def get_calculation_series(self, calculation_id: str, channels: Optional[Sequence[str]] = None,
+                               points: int = 1000, start: Optional[int] = None, end: Optional[int] = None,
+                               method: str = LTTB) -> Optional[DownsampledSeries]:
+        """
+        Recupera as leituras de um cálculo reduzidas para exibição em gráficos.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            channels: Chaves dos canais a incluir; todos se omitido
+            points: Número máximo de leituras no resultado
+            start: Primeiro timestamp incluído (segundos desde a época)
+            end: Último timestamp incluído (segundos desde a época)
+            method: Algoritmo de redução ('lttb' ou 'minmax')
+            
+        Returns:
+            O DownsampledSeries, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou os parâmetros forem inválidos
+        """
+        calculation = self._emergy_service.get_calculation(calculation_id)
+        if calculation is None:
+            return None
+        if calculation.series is None:
+            raise ValueError(f"O cálculo {calculation_id} não tem leituras de medidor")
+        
+        series = calculation.series
+        if channels is None:
+            channels = [channel.key for channel in series.channels]
+        return self._downsampler.downsample(series, channels, points, start, end, method)
+    
+    def get_calculation_rollup(self, calculation_id: str, channels: Optional[Sequence[str]] = None,
+                               points: int = 1000, start: Optional[int] = None, end: Optional[int] = None,
+                               level: Optional[str] = None) -> Optional[Rollup]:
+        """
+        Recupera as agregações (soma, média, mínimo, máximo e contagem) de um cálculo.
+        
+        Sem `level`, usa o nível mais grosso que ainda mostra `points` baldes no intervalo.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            channels: Chaves dos canais a incluir; todos se omitido
+            points: Número de pontos desejado, usado para escolher o nível
+            start: Início do intervalo (segundos desde a época)
+            end: Fim do intervalo (segundos desde a época)
+            level: Nome do nível ('1min', '15min', '1h', '1d' ou '1month')
+            
+        Returns:
+            O Rollup do intervalo, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou os parâmetros forem inválidos
+        """
+        calculation = self._emergy_service.get_calculation(calculation_id)
+        if calculation is None:
+            return None
+        if calculation.series is None:
+            raise ValueError(f"O cálculo {calculation_id} não tem leituras de medidor")
+        
+        if calculation.rollups is None:
+            # Cálculos gravados antes das agregações: calcula e mantém no objeto carregado
+            calculation.rollups = RollupPyramid.build(calculation.series)
+        
+        keys = [channel.key for channel in calculation.series.channels]
+        unknown = [key for key in channels or () if key not in keys]
+        if unknown:
+            raise ValueError(f"Canais desconhecidos: {', '.join(unknown)}")
+        
+        rollup = calculation.rollups.query(calculation.series, start, end, points, level)
+        return rollup.select(channels) if channels else rollup
+    
+    def get_calculation_statistics(self, calculation_id: str, channels: Optional[Sequence[str]] = None,
+                                   exact: bool = False) -> Optional[Dict[str, ChannelStatistics]]:
+        """
+        Recupera as estatísticas descritivas de cada canal sobre todas as leituras de um cálculo.
+        
+        Por padrão as estatísticas vêm dos resumos acumulados na ingestão e
+        atualizados a cada append (percentis estimados pelo t-digest), sem
+        percorrer a série. Com `exact`, elas são calculadas sobre todas as
+        leituras. Em ambos os casos o resultado de todos os canais é guardado em
+        cache até o cálculo ser alterado ou excluído.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            channels: Chaves dos canais a incluir; todos se omitido
+            exact: Se True, percorre todas as leituras e calcula os percentis exatos
+            
+        Returns:
+            As ChannelStatistics por canal, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou algum canal não existir
+        """
+        if exact:
+            statistics = self._results.get_or_compute(
+                calculation_id, 'stats-exact',
+                lambda: self._with_series(calculation_id, self._statistics.describe)
+            )
+        else:
+            statistics = self._results.get_or_compute(calculation_id, 'stats', lambda: self._summarize(calculation_id))
+        if statistics is None or channels is None:
+            return statistics
+        
+        unknown = [key for key in channels if key not in statistics]
+        if unknown:
+            raise ValueError(f"Canais desconhecidos: {', '.join(unknown)}")
+        return {key: statistics[key] for key in channels}
+    
+    def get_calculation_correlation(self, calculation_id: str,
+                                    channels: Optional[Sequence[str]] = None) -> Optional[CorrelationMatrix]:
+        """
+        Recupera a matriz de correlação entre os canais de um cálculo.
+        
+        A matriz de todos os canais é calculada na primeira consulta e guardada em
+        cache até o cálculo ser excluído.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            channels: Chaves dos canais a incluir; todos se omitido
+            
+        Returns:
+            O CorrelationMatrix, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou algum canal não existir
+        """
+        correlation = self._results.get_or_compute(
+            calculation_id, 'correlation',
+            lambda: self._with_series(calculation_id, self._statistics.correlation)
+        )
+        if correlation is None or channels is None:
+            return correlation
+        return correlation.select(channels)
+    
+    def get_calculation_scatter(self, calculation_id: str, x: str, y: str, bins: int) -> Optional[ScatterDensity]:
+        """
+        Recupera o histograma 2-D de dois canais de um cálculo e o ajuste linear entre eles.
+        
+        O resultado é guardado em cache até o cálculo ser excluído.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            x: Chave do canal do eixo x
+            y: Chave do canal do eixo y
+            bins: Número de faixas em cada eixo
+            
+        Returns:
+            O ScatterDensity, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou os parâmetros forem inválidos
+        """
+        return self._results.get_or_compute(
+            calculation_id, ('scatter', x, y, bins),
+            lambda: self._with_series(calculation_id, lambda series: self._statistics.scatter(series, x, y, bins))
+        )
+    
+    def get_calculation_emergy(self, calculation_id: str, period: str = DEFAULT_PERIOD) -> Optional[EmergyReport]:
+        """
+        Recupera a emergia de um cálculo por canal, categoria e período.
+        
+        O resultado é guardado em cache até o cálculo ser excluído.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            period: Nome do nível da divisão por período ('1min', '15min', '1h', '1d' ou '1month')
+            
+        Returns:
+            O EmergyReport, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou o período for desconhecido
+        """
+        def compute():
+            calculation = self._emergy_service.get_calculation(calculation_id)
+            if calculation is None:
+                return None
+            return self._emergy_service.emergy_report(calculation, period)
+        
+        return self._results.get_or_compute(calculation_id, ('emergy', period), compute)
+    
+    def analyze_emergy_sensitivity(self, calculation_id: str, distributions: Dict[str, UevDistribution],
+                                   scenarios: int, seed: Optional[int] = None,
+                                   percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Optional[SensitivityResult]:
+        """
+        Analisa a sensibilidade da emergia de um cálculo às transformidades, por Monte Carlo.
+        
+        A energia por canal do cálculo é guardada em cache, de modo que análises
+        repetidas do mesmo cálculo só sorteiam os cenários.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            distributions: Distribuição do UEV por categoria; as demais categorias mantêm o UEV do cálculo
+            scenarios: Número de cenários
+            seed: Semente, para reproduzir uma análise
+            percentiles: Percentis a calcular, entre 0 e 100
+            
+        Returns:
+            O SensitivityResult, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver emergia, alguma categoria for desconhecida
+                ou os parâmetros forem inválidos
+        """
+        def compute():
+            calculation = self._emergy_service.get_calculation(calculation_id)
+            if calculation is None:
+                return None
+            return self._emergy_service.emergy_accounting(calculation)
+        
+        accounting = self._results.get_or_compute(calculation_id, 'emergy-accounting', compute)
+        if accounting is None:
+            return None
+        return self._sensitivity.run(accounting, distributions, scenarios, seed, percentiles)
+    
     def delete_calculation(self, calculation_id: str) -> bool:
         """
-        Exclui um cálculo pelo seu ID.
+        Exclui um cálculo pelo seu ID, descartando os resultados guardados em cache.
         
         Args:
             calculation_id: O ID do cálculo a ser excluído
@@ -97,7 +585,33 @@ class EmergyApplicationService:
         Returns:
             True se o cálculo foi excluído, False caso contrário
         """
-        return self._emergy_service.delete_calculation(calculation_id)
+        deleted = self._emergy_service.delete_calculation(calculation_id)
+        self._results.invalidate(calculation_id)
+        return deleted
+    
+    def _summarize(self, calculation_id: str) -> Optional[Dict[str, ChannelStatistics]]:
+        """
+        Monta as estatísticas de todos os canais a partir dos resumos acumulados de um cálculo.
+        """
+        accumulator = self._emergy_service.get_calculation_statistics(calculation_id)
+        return self._statistics.summarize(accumulator) if accumulator is not None else None
+    
+    def _with_series(self, calculation_id: str, compute: Callable[[MeterSeries], Any]) -> Optional[Any]:
+        """
+        Aplica uma função às leituras de um cálculo.
+        
+        Returns:
+            O resultado da função, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor
+        """
+        calculation = self._emergy_service.get_calculation(calculation_id)
+        if calculation is None:
+            return None
+        if calculation.series is None:
+            raise ValueError(f"O cálculo {calculation_id} não tem leituras de medidor")
+        return compute(calculation.series)
     
     def _parse_csv(self, csv_data: str) -> List[Dict[str, Any]]:
         """
@@ -130,102 +644,54 @@ class EmergyApplicationService:
             }
         ]
     
-    def _parse_txt(self, txt_data: str) -> List[Dict[str, Any]]:
+    def _should_parse_in_parallel(self, filename: str, path: str) -> bool:
+        """
+        Decide se um arquivo em disco deve ser analisado em paralelo.
+        """
+        return (
+            self._parallel_parser is not None
+            and detect_compression(filename) == PLAIN
+            and os.path.getsize(path) >= self._parallel_min_bytes
+        )
+    
+    def _process_upload(self, filename: str, stream: BinaryIO, metadata: Dict[str, Any],
+                        progress: Optional[Callable[[int], None]], save: bool) -> EmergyCalculation:
+        """
+        Descompacta um upload em fluxo e cria o cálculo, sem verificar o hash do conteúdo.
+        """
+        metadata = {**metadata, 'compression': detect_compression(filename)}
+        with open_upload(filename, stream) as text_stream:
+            return self.process_txt_stream(text_stream, metadata, progress=progress, save=save)
+    
+    def _track_batches(self, results: Iterable[ParseResult], summary: ParseSummary, metadata: Dict[str, Any],
+                       progress: Optional[Callable[[int], None]] = None) -> Iterator[MeterSeries]:
         """
-        Analisa dados TXT em uma lista de dicionários.
+        Repassa as séries dos blocos analisados, acumulando em `summary` as
+        contagens da análise e os resumos dos canais.
         
         Args:
-            txt_data: Dados TXT como uma string
+            results: Resultados dos blocos
+            summary: O ParseSummary que acumula os blocos
+            metadata: Metadados que recebem o resumo da análise ao final
+            progress: Função chamada com o total de linhas aceitas após cada bloco
             
-        Returns:
-            Uma lista de dicionários representando as linhas TXT
+        Yields:
+            A MeterSeries de cada bloco
         """
-        # Dividir linhas
-        lines = txt_data.strip().split('\n')
-        
-        # Obter cabeçalhos
-        headers = lines[0].split(';')
-        
-        # Processar linhas de dados
-        inputs = []
-        for i, line in enumerate(lines[1:]):  # Processa todas as linhas de dados
-            values = line.split(';')
-            if len(values) != len(headers):
-                continue  # Pula linhas com número incorreto de valores
-                
-            # Criar um dicionário com os valores
-            row_data = dict(zip(headers, values))
-            
-            try:
-                # Converter valores numéricos
-                global_active_power = float(row_data.get('Global_active_power', 0))
-                global_reactive_power = float(row_data.get('Global_reactive_power', 0))
-                voltage = float(row_data.get('Voltage', 0))
-                global_intensity = float(row_data.get('Global_intensity', 0))
-                sub_metering_1 = float(row_data.get('Sub_metering_1', 0))
-                sub_metering_2 = float(row_data.get('Sub_metering_2', 0))
-                sub_metering_3 = float(row_data.get('Sub_metering_3', 0))
-                
-                # Criar entradas para cada tipo de medição
-                inputs.append({
-                    'name': f"Active Power {row_data.get('Date', '')} {row_data.get('Time', '')}",
-                    'value': global_active_power,
-                    'unit': 'kW',
-                    'category': 'Active Power',
-                    'description': f"Date: {row_data.get('Date', '')}, Time: {row_data.get('Time', '')}"
-                })
-                
-                inputs.append({
-                    'name': f"Reactive Power {row_data.get('Date', '')} {row_data.get('Time', '')}",
-                    'value': global_reactive_power,
-                    'unit': 'kVAR',
-                    'category': 'Reactive Power',
-                    'description': f"Date: {row_data.get('Date', '')}, Time: {row_data.get('Time', '')}"
-                })
-                
-                inputs.append({
-                    'name': f"Voltage {row_data.get('Date', '')} {row_data.get('Time', '')}",
-                    'value': voltage,
-                    'unit': 'V',
-                    'category': 'Voltage',
-                    'description': f"Date: {row_data.get('Date', '')}, Time: {row_data.get('Time', '')}"
-                })
-                
-                inputs.append({
-                    'name': f"Intensity {row_data.get('Date', '')} {row_data.get('Time', '')}",
-                    'value': global_intensity,
-                    'unit': 'A',
-                    'category': 'Intensity',
-                    'description': f"Date: {row_data.get('Date', '')}, Time: {row_data.get('Time', '')}"
-                })
-                
-                # Adicionar sub-medições
-                inputs.append({
-                    'name': f"Sub Metering 1 {row_data.get('Date', '')} {row_data.get('Time', '')}",
-                    'value': sub_metering_1,
-                    'unit': 'Wh',
-                    'category': 'Sub Metering',
-                    'description': f"Kitchen - Date: {row_data.get('Date', '')}, Time: {row_data.get('Time', '')}"
-                })
-                
-                inputs.append({
-                    'name': f"Sub Metering 2 {row_data.get('Date', '')} {row_data.get('Time', '')}",
-                    'value': sub_metering_2,
-                    'unit': 'Wh',
-                    'category': 'Sub Metering',
-                    'description': f"Laundry Room - Date: {row_data.get('Date', '')}, Time: {row_data.get('Time', '')}"
-                })
-                
-                inputs.append({
-                    'name': f"Sub Metering 3 {row_data.get('Date', '')} {row_data.get('Time', '')}",
-                    'value': sub_metering_3,
-                    'unit': 'Wh',
-                    'category': 'Sub Metering',
-                    'description': f"Water Heater & AC - Date: {row_data.get('Date', '')}, Time: {row_data.get('Time', '')}"
-                })
-                
-            except (ValueError, TypeError) as e:
-                # Pula linhas com valores inválidos
-                continue
+        for result in results:
+            yield summary.add(result)
+            if progress is not None:
+                progress(summary.rows)
+        metadata['parse'] = summary.to_metadata()
+    
+    def _parse_txt(self, txt_data: Union[str, bytes]) -> ParseResult:
+        """
+        Analisa dados TXT em uma série colunar de leituras.
         
-        return inputs
+        Args:
+            txt_data: Dados TXT como uma string ou bytes
+            
+        Returns:
+            Um ParseResult com a MeterSeries e as contagens de linhas rejeitadas
+        """
+        return self._parser.parse(txt_data)
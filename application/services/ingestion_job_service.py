@@ -0,0 +1,246 @@
+"""
+Serviço de aplicação para tarefas assíncronas de ingestão de arquivos.
+Este arquivo implementa o IngestionJobService, que recebe uploads já gravados em
+disco, devolve imediatamente um identificador de tarefa e executa a análise e o
+cálculo em um pool limitado de threads. Cada tarefa (IngestionJob) registra seu
+estado, as linhas e os bytes processados, a vazão e o ID do cálculo resultante,
+para que a camada de apresentação possa consultá-la enquanto ela é executada.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from application.services.emergy_application_service import EmergyApplicationService
+
+
+class JobState:
+    """
+    Estados possíveis de uma tarefa de ingestão.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobQueueFullError(RuntimeError):
+    """
+    Erro lançado quando o pool de ingestão já tem o máximo de tarefas pendentes.
+    """
+
+
+@dataclass
+class IngestionJob:
+    """
+    Representa uma tarefa de ingestão de um arquivo enviado.
+    """
+    id: str
+    filename: str
+    state: str = JobState.QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    rows_processed: int = 0
+    bytes_processed: int = 0
+    bytes_total: int = 0
+    calculation_id: Optional[str] = None
+    deduplicated: bool = False
+    error: Optional[str] = None
+    _started_clock: Optional[float] = field(default=None, repr=False)
+    _finished_clock: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """
+        Tempo de execução da tarefa até agora (ou até o término), em segundos.
+        """
+        if self._started_clock is None:
+            return 0.0
+        end = self._finished_clock if self._finished_clock is not None else time.perf_counter()
+        return end - self._started_clock
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Vazão média em linhas por segundo.
+        """
+        elapsed = self.elapsed_seconds
+        return self.rows_processed / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converte a tarefa para um dicionário serializável.
+
+        Returns:
+            Uma representação em dicionário da tarefa
+        """
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'state': self.state,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'rows_processed': self.rows_processed,
+            'bytes_processed': self.bytes_processed,
+            'bytes_total': self.bytes_total,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'calculation_id': self.calculation_id,
+            'deduplicated': self.deduplicated,
+            'error': self.error
+        }
+
+
+class IngestionJobService:
+    """
+    Serviço de aplicação para executar ingestões em segundo plano.
+
+    O número de tarefas em execução é limitado por `max_workers` e o de tarefas
+    aguardando na fila por `max_queue`; acima disso novas tarefas são recusadas.
+    """
+
+    def __init__(self, app_service: EmergyApplicationService, max_workers: int = 2,
+                 max_queue: int = 8, history_size: int = 1000):
+        """
+        Inicializa o serviço com o serviço de aplicação de cálculos.
+
+        Args:
+            app_service: Uma instância de EmergyApplicationService
+            max_workers: Número de tarefas executadas em paralelo
+            max_queue: Número de tarefas que podem aguardar na fila
+            history_size: Número de tarefas concluídas mantidas para consulta
+        """
+        self._app_service = app_service
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingest')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._history_size = history_size
+        self._jobs: 'OrderedDict[str, IngestionJob]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit_upload(self, filename: str, path: str, metadata: Dict[str, Any],
+                      content_hash: Optional[str] = None) -> IngestionJob:
+        """
+        Agenda a ingestão de um upload gravado em disco.
+
+        O arquivo em `path` passa a pertencer ao serviço e é removido ao fim da tarefa.
+
+        Args:
+            filename: O nome original do arquivo enviado
+            path: Caminho do arquivo temporário com o conteúdo enviado
+            metadata: Metadados adicionais para o cálculo
+            content_hash: Resumo BLAKE2b do conteúdo, calculado ao gravar o arquivo
+
+        Returns:
+            A IngestionJob criada, no estado 'queued'
+
+        Raises:
+            JobQueueFullError: Se não houver espaço na fila
+        """
+        if not self._slots.acquire(blocking=False):
+            _remove_quietly(path)
+            raise JobQueueFullError('A fila de processamento está cheia')
+
+        job = IngestionJob(id=str(uuid.uuid4()), filename=filename)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_history()
+
+        try:
+            self._executor.submit(self._run, job, path, metadata, content_hash)
+        except RuntimeError:
+            self._slots.release()
+            _remove_quietly(path)
+            raise
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Recupera uma tarefa pelo seu ID.
+
+        Args:
+            job_id: O ID da tarefa
+
+        Returns:
+            A IngestionJob se encontrada, None caso contrário
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Encerra o pool de threads.
+
+        Args:
+            wait: Se True, aguarda as tarefas em andamento terminarem
+        """
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: IngestionJob, path: str, metadata: Dict[str, Any],
+             content_hash: Optional[str] = None) -> None:
+        """
+        Executa uma tarefa de ingestão no pool.
+        """
+        job.state = JobState.RUNNING
+        job.started_at = datetime.now()
+        job._started_clock = time.perf_counter()
+
+        def report(rows: int) -> None:
+            job.rows_processed = rows
+
+        def report_bytes(position: int) -> None:
+            job.bytes_processed = position
+
+        try:
+            job.bytes_total = os.path.getsize(path)
+            calculation = self._app_service.process_txt_file(
+                path,
+                {**metadata, 'job_id': job.id},
+                filename=job.filename,
+                progress=report,
+                content_hash=content_hash,
+                bytes_progress=report_bytes
+            )
+            job.bytes_processed = job.bytes_total
+            job.calculation_id = calculation.id
+            # Um cálculo criado por outra tarefa indica um upload repetido
+            job.deduplicated = calculation.metadata.get('job_id') != job.id
+            job.rows_processed = len(calculation.series) if calculation.series is not None else job.rows_processed
+            job.state = JobState.SUCCEEDED
+        except Exception as e:
+            job.error = str(e)
+            job.state = JobState.FAILED
+        finally:
+            job._finished_clock = time.perf_counter()
+            job.finished_at = datetime.now()
+            _remove_quietly(path)
+            self._slots.release()
+
+    def _trim_history(self) -> None:
+        """
+        Descarta as tarefas concluídas mais antigas além do limite do histórico.
+        """
+        excess = len(self._jobs) - self._history_size
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.state in JobState.FINISHED][:excess]:
+            del self._jobs[job_id]
+
+
+def _remove_quietly(path: str) -> None:
+    """
+    Remove um arquivo temporário, ignorando se ele já não existir.
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,86 @@
+"""
+Cache de resultados derivados de cálculos de Emergy.
+Este arquivo implementa o CalculationResultCache, que guarda em memória resultados
+caros de obter a partir das leituras de um cálculo, como estatísticas e matrizes
+de correlação. Como um cálculo gravado não muda, cada resultado é calculado uma
+única vez e permanece válido até o cálculo ser excluído, quando todas as suas
+entradas são descartadas. O número de entradas é limitado e as usadas há mais
+tempo são removidas primeiro.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class CalculationResultCache:
+    """
+    Cache LRU de resultados por cálculo, seguro para uso entre threads.
+
+    As entradas são identificadas pelo ID do cálculo e por uma chave que descreve
+    o resultado (por exemplo, 'stats').
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries: Número máximo de resultados guardados
+        """
+        self._max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, Hashable], Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrementado a cada invalidação, para descartar resultados calculados antes dela
+        self._generation = 0
+
+    def get_or_compute(self, calculation_id: str, key: Hashable,
+                       compute: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        Devolve o resultado guardado ou o calcula e o guarda.
+
+        O cálculo é feito fora do bloqueio; um resultado None (cálculo não encontrado)
+        não é guardado, nem um resultado cujo cálculo foi invalidado nesse meio tempo.
+
+        Args:
+            calculation_id: O ID do cálculo
+            key: Identifica o resultado dentro do cálculo
+            compute: Função que calcula o resultado
+
+        Returns:
+            O resultado, ou None se `compute` devolver None
+        """
+        entry_key = (calculation_id, key)
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                return self._entries[entry_key]
+            generation = self._generation
+
+        result = compute()
+        if result is None:
+            return None
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[entry_key] = result
+                self._entries.move_to_end(entry_key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, calculation_id: str) -> None:
+        """
+        Descarta todos os resultados de um cálculo.
+
+        Args:
+            calculation_id: O ID do cálculo
+        """
+        with self._lock:
+            self._generation += 1
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == calculation_id]:
+                del self._entries[entry_key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,143 @@
+"""
+Micro-benchmark do analisador de arquivos TXT de medidores.
+Gera um arquivo sintético no formato do conjunto de dados de consumo doméstico
+(com cerca de 1% de linhas com marcadores '?') e compara o MeterTxtParser com a
+análise linha a linha usada anteriormente em _parse_txt.
+
+Com --workers, o mesmo arquivo é gravado em disco e analisado também pelo
+ParallelMeterParser, por faixas de bytes em vários processos.
+
+Uso:
+    python -m benchmarks.bench_parser --rows 2000000 --legacy-rows 200000 --workers 8
+"""
+
+import argparse
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from domain.models.emergy_model import EmergyInput  # noqa: E402
+from domain.models.meter_series import METER_CHANNELS  # noqa: E402
+from infrastructure.parsers.meter_txt_parser import MeterTxtParser  # noqa: E402
+from infrastructure.parsers.parallel_parser import ParallelMeterParser  # noqa: E402
+
+HEADER = 'Date;Time;Global_active_power;Global_reactive_power;Voltage;Global_intensity;Sub_metering_1;Sub_metering_2;Sub_metering_3'
+
+
+def make_file(rows: int, seed: int = 42) -> bytes:
+    """
+    Gera um arquivo sintético com leituras minuto a minuto.
+
+    Args:
+        rows: Número de linhas de dados
+        seed: Semente do gerador aleatório
+
+    Returns:
+        O conteúdo do arquivo em bytes
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2006-12-16T17:24')
+    moments = start + np.arange(rows).astype('timedelta64[m]')
+    days = moments.astype('datetime64[D]')
+    dates = np.datetime_as_string(days)
+    times = np.datetime_as_string(moments, unit='s')
+    values = rng.random((rows, 7)) * np.array([5, 0.5, 240, 20, 40, 40, 20])
+    missing = rng.random(rows) < 0.01
+
+    lines = [HEADER]
+    for index in range(rows):
+        year, month, day = dates[index].split('-')
+        date = f"{int(day)}/{int(month)}/{year}"
+        time_of_day = times[index][11:19]
+        if missing[index]:
+            lines.append(f"{date};{time_of_day};?;?;?;?;?;?;")
+        else:
+            lines.append(f"{date};{time_of_day};" + ';'.join(f"{value:.3f}" for value in values[index]))
+    return ('\n'.join(lines) + '\n').encode('ascii')
+
+
+def legacy_parse(txt_data: str) -> int:
+    """
+    Reproduz o caminho anterior: split por linha, dict(zip(...)), float por campo,
+    sete dicionários com f-strings por linha e um EmergyInput para cada um.
+
+    Args:
+        txt_data: Conteúdo do arquivo
+
+    Returns:
+        Número de entradas criadas
+    """
+    lines = txt_data.strip().split('\n')
+    headers = lines[0].split(';')
+    inputs = []
+    for line in lines[1:]:
+        values = line.split(';')
+        if len(values) != len(headers):
+            continue
+        row_data = dict(zip(headers, values))
+        try:
+            numbers = [float(row_data.get(channel.header, 0)) for channel in METER_CHANNELS]
+        except (ValueError, TypeError):
+            continue
+        date, time_of_day = row_data.get('Date', ''), row_data.get('Time', '')
+        for channel, value in zip(METER_CHANNELS, numbers):
+            inputs.append({
+                'name': f"{channel.label} {date} {time_of_day}",
+                'value': value,
+                'unit': channel.unit,
+                'category': channel.category,
+                'description': f"{channel.description_prefix}Date: {date}, Time: {time_of_day}"
+            })
+    emergy_inputs = [EmergyInput(**input_data) for input_data in inputs]
+    return len(emergy_inputs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--legacy-rows', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, default=0)
+    args = parser.parse_args()
+
+    data = make_file(args.rows)
+    print(f"arquivo sintético: {args.rows} linhas, {len(data) / 1e6:.1f} MB")
+
+    started = time.perf_counter()
+    result = MeterTxtParser().parse(data)
+    elapsed = time.perf_counter() - started
+    print(f"MeterTxtParser: {elapsed:.2f} s ({result.rows / elapsed:,.0f} linhas/s), "
+          f"{result.missing_values} valores ausentes, {result.rejected_rows} linhas rejeitadas")
+
+    if args.workers:
+        descriptor, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(descriptor, 'wb') as data_file:
+            data_file.write(data)
+        parallel = ParallelMeterParser(workers=args.workers)
+        try:
+            parallel.parse_file(path)  # aquece o pool de processos
+            started = time.perf_counter()
+            result = parallel.parse_file(path)
+            parallel_elapsed = time.perf_counter() - started
+        finally:
+            parallel.shutdown()
+            os.remove(path)
+        print(f"ParallelMeterParser ({args.workers} processos): {parallel_elapsed:.2f} s "
+              f"({result.rows / parallel_elapsed:,.0f} linhas/s, {elapsed / parallel_elapsed:.1f}x)")
+
+    if args.legacy_rows:
+        text = make_file(args.legacy_rows).decode('ascii')
+        started = time.perf_counter()
+        created = legacy_parse(text)
+        legacy_elapsed = time.perf_counter() - started
+        print(f"análise linha a linha: {legacy_elapsed:.2f} s para {args.legacy_rows} linhas "
+              f"({args.legacy_rows / legacy_elapsed:,.0f} linhas/s, {created} EmergyInput)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
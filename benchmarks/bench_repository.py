@@ -0,0 +1,94 @@
+"""
+Benchmark de gravação e leitura dos repositórios de cálculos.
+Gera uma série sintética de leituras minuto a minuto e mede o tempo para salvar
+e recuperar um cálculo em cada implementação de EmergyRepository.
+
+Uso:
+    python -m benchmarks.bench_repository --rows 1000000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from domain.models.emergy_model import EmergyCalculation  # noqa: E402
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries  # noqa: E402
+from infrastructure.repositories.memory_emergy_repository import MemoryEmergyRepository  # noqa: E402
+from infrastructure.repositories.sqlite_emergy_repository import SqliteEmergyRepository  # noqa: E402
+from infrastructure.repositories.columnar_file_emergy_repository import ColumnarFileEmergyRepository  # noqa: E402
+
+
+def make_calculation(rows: int) -> EmergyCalculation:
+    """
+    Cria um cálculo com uma série sintética.
+
+    Args:
+        rows: Número de leituras
+
+    Returns:
+        O EmergyCalculation criado
+    """
+    rng = np.random.default_rng(42)
+    timestamps = 1166289840 + 60 * np.arange(rows, dtype=np.int64)
+    columns = {key: rng.random(rows) for key in CHANNEL_KEYS}
+    return EmergyCalculation.create_from_series(MeterSeries(timestamps, columns), {'benchmark': True})
+
+
+def measure(name: str, repository, calculation: EmergyCalculation) -> None:
+    """
+    Mede gravação e leitura de um cálculo em um repositório e imprime as vazões.
+    """
+    rows = len(calculation.series)
+
+    started = time.perf_counter()
+    repository.save(calculation)
+    save_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    loaded = repository.get_by_id(calculation.id)
+    load_elapsed = time.perf_counter() - started
+    assert len(loaded.series) == rows
+
+    # Uma soma sobre todas as colunas força a leitura efetiva dos dados mapeados
+    started = time.perf_counter()
+    loaded.series.total()
+    scan_elapsed = time.perf_counter() - started
+
+    print(f"{name:<8} gravação: {save_elapsed:.3f} s ({rows / max(save_elapsed, 1e-6):,.0f} linhas/s)  "
+          f"leitura: {load_elapsed:.3f} s ({rows / max(load_elapsed, 1e-6):,.0f} linhas/s)  "
+          f"varredura: {scan_elapsed:.3f} s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    calculation = make_calculation(args.rows)
+    print(f"série sintética: {args.rows} leituras")
+
+    measure('memória', MemoryEmergyRepository(), calculation)
+
+    directory = tempfile.mkdtemp()
+    try:
+        repository = SqliteEmergyRepository(os.path.join(directory, 'bench.db'))
+        measure('sqlite', repository, calculation)
+        repository.close()
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"tamanho do banco: {size / 1e6:.1f} MB ({size / args.rows:.0f} bytes/leitura)")
+
+        measure('colunar', ColumnarFileEmergyRepository(os.path.join(directory, 'columnar')), calculation)
+    finally:
+        shutil.rmtree(directory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,15 +3,26 @@ Modelo de domínio para cálculos de Emergy.
 Este arquivo contém as classes de domínio principais para os cálculos de Emergy.
 A classe EmergyInput representa uma entrada para o cálculo de Emergy, enquanto
 a classe EmergyCalculation representa um cálculo de Emergy completo com suas entradas
-e resultados. Estas classes são o núcleo do domínio da aplicação e encapsulam
-as regras de negócio relacionadas aos cálculos de Emergy.
+e resultados, a classe CalculationSummary o resume para listagens e a classe
+CalculationTail guarda apenas a parte final necessária para anexar leituras. Cálculos
+criados a partir de arquivos de medidores guardam as leituras em uma MeterSeries
+colunar, com as agregações pré-calculadas em uma RollupPyramid e o estado
+combinável das estatísticas em um SeriesAccumulator, e expõem as
+entradas através de uma visão preguiçosa (MeterInputsView), que só monta cada
+EmergyInput quando ele é acessado. Estas classes são o núcleo do domínio da
+aplicação e encapsulam as regras de negócio relacionadas aos cálculos de Emergy.
 
 Feito por André Carbonieri Silva T839FC9
 """
 
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field, replace
+from typing import List, Dict, Any, Iterator, Optional, Sequence, overload
 from datetime import datetime
+import numpy as np
+
+from domain.models.meter_series import MeterChannel, MeterSeries, split_timestamp
+from domain.models.rollup import RollupPyramid
+from domain.models.streaming_statistics import SeriesAccumulator
 
 
 @dataclass
@@ -26,32 +37,107 @@ class EmergyInput:
     description: Optional[str] = None
 
 
+class MeterInputsView(Sequence[EmergyInput]):
+    """
+    Visão somente leitura das leituras de uma MeterSeries como objetos EmergyInput.
+
+    As entradas seguem a ordem original: para cada leitura, um EmergyInput por canal.
+    Nenhum objeto é criado até que a entrada seja acessada.
+    """
+
+    def __init__(self, series: MeterSeries):
+        """
+        Inicializa a visão sobre uma série.
+
+        Args:
+            series: A MeterSeries de origem
+        """
+        self._series = series
+
+    def __len__(self) -> int:
+        return self._series.input_count
+
+    @overload
+    def __getitem__(self, index: int) -> EmergyInput: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[EmergyInput]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._build(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Índice de entrada fora do intervalo')
+        return self._build(index)
+
+    def __iter__(self) -> Iterator[EmergyInput]:
+        channels = self._series.channels
+        columns = [self._series.column(channel.key) for channel in channels]
+        for row, timestamp in enumerate(self._series.timestamps):
+            date, time = split_timestamp(timestamp)
+            for channel, column in zip(channels, columns):
+                yield self._make_input(channel, float(column[row]), date, time)
+
+    def _build(self, index: int) -> EmergyInput:
+        """
+        Monta o EmergyInput de uma posição da visão.
+
+        Args:
+            index: Posição da entrada
+
+        Returns:
+            O EmergyInput correspondente
+        """
+        row, channel_index = divmod(index, len(self._series.channels))
+        channel = self._series.channels[channel_index]
+        date, time = split_timestamp(self._series.timestamps[row])
+        return self._make_input(channel, float(self._series.column(channel.key)[row]), date, time)
+
+    @staticmethod
+    def _make_input(channel: MeterChannel, value: float, date: str, time: str) -> EmergyInput:
+        return EmergyInput(
+            name=f"{channel.label} {date} {time}",
+            value=value,
+            unit=channel.unit,
+            category=channel.category,
+            description=f"{channel.description_prefix}Date: {date}, Time: {time}"
+        )
+
+
 @dataclass
 class EmergyCalculation:
     """
     Representa um resultado de cálculo de Emergy.
     """
     id: str
-    inputs: List[EmergyInput]
+    inputs: Sequence[EmergyInput]
     total_emergy: float
     created_at: datetime
     metadata: Dict[str, Any]
+    series: Optional[MeterSeries] = None
+    rollups: Optional[RollupPyramid] = None
+    statistics: Optional[SeriesAccumulator] = None
 
     @classmethod
-    def create(cls, inputs: List[EmergyInput], metadata: Dict[str, Any]) -> 'EmergyCalculation':
+    def create(cls, inputs: List[EmergyInput], metadata: Dict[str, Any],
+               total_emergy: Optional[float] = None) -> 'EmergyCalculation':
         """
         Método de fábrica para criar um novo EmergyCalculation.
         
         Args:
             inputs: Lista de objetos EmergyInput
             metadata: Metadados adicionais para o cálculo
+            total_emergy: Emergia total (sej) já calculada pelo EmergyEngine; é
+                calculada com a tabela padrão se omitida
             
         Returns:
             Uma nova instância de EmergyCalculation
         """
-        # Em uma implementação real, isso realizaria o cálculo real
-        # Por enquanto, vamos apenas somar os valores de entrada como um placeholder
-        total_emergy = sum(input_item.value for input_item in inputs)
+        if total_emergy is None:
+            from domain.services.emergy_engine import EmergyEngine
+            total_emergy = EmergyEngine().evaluate_inputs(inputs)
         
         # Gerar um ID único (em um aplicativo real, isso pode vir de um banco de dados)
         import uuid
@@ -64,3 +150,168 @@ class EmergyCalculation:
             created_at=datetime.now(),
             metadata=metadata
         )
+    
+    @classmethod
+    def create_from_series(cls, series: MeterSeries, metadata: Dict[str, Any],
+                           total_emergy: Optional[float] = None) -> 'EmergyCalculation':
+        """
+        Método de fábrica para criar um EmergyCalculation a partir de uma série colunar.
+        
+        Args:
+            series: A MeterSeries com as leituras do medidor
+            metadata: Metadados adicionais para o cálculo
+            total_emergy: Emergia total (sej) já calculada pelo EmergyEngine; é
+                calculada com a tabela padrão se omitida
+            
+        Returns:
+            Uma nova instância de EmergyCalculation
+        """
+        if total_emergy is None:
+            from domain.services.emergy_engine import EmergyEngine
+            total_emergy = EmergyEngine().evaluate(series).total
+        
+        import uuid
+        calculation_id = str(uuid.uuid4())
+        
+        return cls(
+            id=calculation_id,
+            inputs=MeterInputsView(series),
+            total_emergy=total_emergy,
+            created_at=datetime.now(),
+            metadata=metadata,
+            series=series
+        )
+    
+    @property
+    def content_hash(self) -> Optional[str]:
+        """
+        Chave do conteúdo do arquivo de origem ('content_hash' nos metadados), se conhecida.
+        """
+        return self.metadata.get('content_hash')
+    
+    def time_range(self, start: Optional[int] = None, end: Optional[int] = None) -> 'EmergyCalculation':
+        """
+        Obtém uma visão do cálculo restrita às leituras entre dois timestamps (inclusive).
+        
+        As leituras são localizadas por busca binária e compartilham a memória da série.
+        
+        Args:
+            start: Primeiro timestamp incluído, ou None
+            end: Último timestamp incluído, ou None
+            
+        Returns:
+            Um EmergyCalculation com as mesmas informações e apenas as leituras do intervalo
+            
+        Raises:
+            ValueError: Se o cálculo não tiver uma série ordenada de leituras
+        """
+        if start is None and end is None:
+            return self
+        if self.series is None:
+            raise ValueError(f"O cálculo {self.id} não tem leituras de medidor")
+        series = self.series.time_range(start, end)
+        return replace(self, inputs=MeterInputsView(series), series=series)
+
+
+@dataclass
+class CalculationSummary:
+    """
+    Resumo de um EmergyCalculation sem as entradas, usado em listagens.
+    """
+    id: str
+    total_emergy: float
+    created_at: datetime
+    metadata: Dict[str, Any]
+    input_count: int
+
+    @classmethod
+    def from_calculation(cls, calculation: EmergyCalculation) -> 'CalculationSummary':
+        """
+        Cria o resumo de um cálculo.
+        
+        Args:
+            calculation: O EmergyCalculation a ser resumido
+            
+        Returns:
+            Uma nova instância de CalculationSummary
+        """
+        return cls(
+            id=calculation.id,
+            total_emergy=calculation.total_emergy,
+            created_at=calculation.created_at,
+            metadata=calculation.metadata,
+            input_count=len(calculation.inputs)
+        )
+
+
+@dataclass
+class CalculationTail:
+    """
+    Parte final de um EmergyCalculation com leituras de medidor, usada para anexar
+    leituras sem carregar a série inteira.
+    
+    `readings` contém as leituras gravadas a partir de um timestamp, mais a última
+    anterior a ele, e `rows` o número de leituras do cálculo inteiro. As agregações
+    contêm apenas os baldes a partir do último de cada nível, que está na posição
+    `rollup_offsets[nível]` dos arrays gravados.
+    """
+    id: str
+    total_emergy: float
+    created_at: datetime
+    metadata: Dict[str, Any]
+    rows: int
+    readings: MeterSeries
+    rollups: Optional[RollupPyramid] = None
+    rollup_offsets: Dict[str, int] = field(default_factory=dict)
+    statistics: Optional[SeriesAccumulator] = None
+    
+    @property
+    def input_count(self) -> int:
+        """
+        Número de entradas do cálculo inteiro (uma por canal e por leitura).
+        """
+        return self.rows * len(self.readings.channels)
+    
+    def to_summary(self) -> CalculationSummary:
+        """
+        Cria o resumo do cálculo.
+        
+        Returns:
+            Uma nova instância de CalculationSummary
+        """
+        return CalculationSummary(
+            id=self.id,
+            total_emergy=self.total_emergy,
+            created_at=self.created_at,
+            metadata=self.metadata,
+            input_count=self.input_count
+        )
+    
+    def complete(self, calculation: 'EmergyCalculation', readings: MeterSeries) -> 'EmergyCalculation':
+        """
+        Monta o cálculo inteiro a partir do cálculo gravado antes do lote e desta parte final.
+        
+        Args:
+            calculation: O EmergyCalculation gravado, sem as leituras do lote
+            readings: As leituras anexadas
+            
+        Returns:
+            Um novo EmergyCalculation com a série completa
+        """
+        series = calculation.series.append(readings)
+        rollups = self.rollups
+        if rollups is not None and calculation.rollups is not None:
+            stored = calculation.rollups.to_arrays()
+            rollups = RollupPyramid.from_arrays({
+                name: np.concatenate([stored[name][:self.rollup_offsets[name.split('.', 1)[0]]], array])
+                for name, array in rollups.to_arrays().items()
+            })
+        return replace(
+            calculation,
+            inputs=MeterInputsView(series),
+            total_emergy=self.total_emergy,
+            metadata=self.metadata,
+            series=series,
+            rollups=rollups,
+            statistics=self.statistics
+        )
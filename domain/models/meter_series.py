@@ -0,0 +1,507 @@
+"""
+Representação colunar de séries temporais de medidores de energia.
+Este arquivo contém a classe MeterSeries, que armazena as leituras de um medidor
+em colunas NumPy (uma por canal) acompanhadas de uma única coluna de timestamps
+int64 (segundos desde a época), e a classe MeterSeriesBuilder, que acumula lotes
+de leituras em arrays com crescimento amortizado; uma MeterSeries também recebe
+novas leituras no fim (append) com o mesmo crescimento. Também define os canais
+conhecidos do conjunto de dados de consumo doméstico, com nome, unidade e
+categoria de cada um, para que nomes e descrições das entradas possam ser gerados
+apenas quando solicitados.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+SECONDS_PER_DAY = 86400
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class MeterChannel:
+    """
+    Descreve um canal (coluna numérica) de um arquivo de medidor.
+    """
+    key: str
+    header: str
+    label: str
+    unit: str
+    category: str
+    description_prefix: str = ''
+
+
+METER_CHANNELS: Tuple[MeterChannel, ...] = (
+    MeterChannel('global_active_power', 'Global_active_power', 'Active Power', 'kW', 'Active Power'),
+    MeterChannel('global_reactive_power', 'Global_reactive_power', 'Reactive Power', 'kVAR', 'Reactive Power'),
+    MeterChannel('voltage', 'Voltage', 'Voltage', 'V', 'Voltage'),
+    MeterChannel('global_intensity', 'Global_intensity', 'Intensity', 'A', 'Intensity'),
+    MeterChannel('sub_metering_1', 'Sub_metering_1', 'Sub Metering 1', 'Wh', 'Sub Metering', 'Kitchen - '),
+    MeterChannel('sub_metering_2', 'Sub_metering_2', 'Sub Metering 2', 'Wh', 'Sub Metering', 'Laundry Room - '),
+    MeterChannel('sub_metering_3', 'Sub_metering_3', 'Sub Metering 3', 'Wh', 'Sub Metering', 'Water Heater & AC - '),
+)
+
+CHANNEL_KEYS: Tuple[str, ...] = tuple(channel.key for channel in METER_CHANNELS)
+
+CHANNELS_BY_KEY: Dict[str, MeterChannel] = {channel.key: channel for channel in METER_CHANNELS}
+
+
+@lru_cache(maxsize=4096)
+def format_date(day: int) -> str:
+    """
+    Formata um número de dias desde a época como DD/MM/AAAA.
+
+    Args:
+        day: Dias desde 01/01/1970
+
+    Returns:
+        A data formatada
+    """
+    return (_EPOCH + timedelta(days=day)).strftime('%d/%m/%Y')
+
+
+def format_time(seconds_of_day: int) -> str:
+    """
+    Formata os segundos decorridos no dia como HH:MM:SS.
+
+    Args:
+        seconds_of_day: Segundos desde a meia-noite
+
+    Returns:
+        O horário formatado
+    """
+    hours, remainder = divmod(seconds_of_day, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def split_timestamp(timestamp: int) -> Tuple[str, str]:
+    """
+    Converte um timestamp em segundos para as strings de data e hora do arquivo original.
+
+    Args:
+        timestamp: Segundos desde a época
+
+    Returns:
+        Uma tupla (data, hora)
+    """
+    day, seconds_of_day = divmod(int(timestamp), SECONDS_PER_DAY)
+    return format_date(day), format_time(seconds_of_day)
+
+
+def to_timestamp(moment: datetime) -> int:
+    """
+    Converte uma data e hora para segundos desde a época, na mesma convenção das séries.
+
+    Datas sem fuso horário são tratadas como horário local do medidor, sem conversão.
+
+    Args:
+        moment: A data e hora
+
+    Returns:
+        Segundos desde a época
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((moment - _EPOCH).total_seconds())
+
+
+class MeterSeries:
+    """
+    Série temporal colunar de leituras de um medidor.
+
+    Cada canal é armazenado como um array float64 e todos compartilham a mesma
+    coluna de timestamps int64. Arrays já no tipo correto (inclusive memmaps)
+    são usados sem cópia.
+    """
+
+    def __init__(self, timestamps: Sequence[int], columns: Mapping[str, Sequence[float]],
+                 channels: Sequence[MeterChannel] = METER_CHANNELS,
+                 sorted_by_time: Optional[bool] = None):
+        """
+        Inicializa a série com a coluna de timestamps e as colunas dos canais.
+
+        Args:
+            timestamps: Timestamps em segundos desde a época
+            columns: Dicionário de chave do canal para os valores
+            channels: Canais presentes na série, na ordem de exibição
+            sorted_by_time: Se já se sabe que os timestamps estão ordenados; verificado
+                sob demanda se omitido
+        """
+        self._timestamps = np.asarray(timestamps, dtype=np.int64)
+        self._channels = tuple(channels)
+        self._sorted = sorted_by_time
+        self._columns: Dict[str, np.ndarray] = {}
+        # Arrays com capacidade excedente cujo início são as colunas desta série; só a
+        # série mais recente de uma sequência de append pode escrever neles
+        self._buffers: Optional[Dict[str, np.ndarray]] = None
+
+        for channel in self._channels:
+            if channel.key not in columns:
+                raise ValueError(f"Coluna ausente para o canal '{channel.key}'")
+            column = np.asarray(columns[channel.key], dtype=np.float64)
+            if column.shape != self._timestamps.shape:
+                raise ValueError(
+                    f"A coluna '{channel.key}' tem {column.shape[0]} valores, "
+                    f"mas existem {self._timestamps.shape[0]} timestamps"
+                )
+            self._columns[channel.key] = column
+
+    @classmethod
+    def empty(cls, channels: Sequence[MeterChannel] = METER_CHANNELS) -> 'MeterSeries':
+        """
+        Cria uma série sem leituras.
+
+        Args:
+            channels: Canais da série
+
+        Returns:
+            Uma MeterSeries vazia
+        """
+        return cls(
+            np.empty(0, dtype=np.int64),
+            {channel.key: np.empty(0, dtype=np.float64) for channel in channels},
+            channels
+        )
+
+    @classmethod
+    def concatenate(cls, parts: Iterable['MeterSeries']) -> 'MeterSeries':
+        """
+        Concatena várias séries com os mesmos canais.
+
+        Args:
+            parts: Séries a serem concatenadas, na ordem
+
+        Returns:
+            Uma nova MeterSeries com todas as leituras
+        """
+        parts = list(parts)
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+
+        channels = parts[0].channels
+        return cls(
+            np.concatenate([part.timestamps for part in parts]),
+            {
+                channel.key: np.concatenate([part.column(channel.key) for part in parts])
+                for channel in channels
+            },
+            channels
+        )
+
+    def __len__(self) -> int:
+        return int(self._timestamps.shape[0])
+
+    def __getstate__(self) -> Dict[str, object]:
+        # A capacidade excedente não é serializada
+        state = dict(self.__dict__)
+        state['_buffers'] = None
+        return state
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        Coluna de timestamps (segundos desde a época).
+        """
+        return self._timestamps
+
+    @property
+    def channels(self) -> Tuple[MeterChannel, ...]:
+        """
+        Canais presentes na série.
+        """
+        return self._channels
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Colunas dos canais indexadas pela chave do canal.
+        """
+        return dict(self._columns)
+
+    def column(self, key: str) -> np.ndarray:
+        """
+        Obtém a coluna de um canal.
+
+        Args:
+            key: A chave do canal
+
+        Returns:
+            O array de valores do canal
+        """
+        return self._columns[key]
+
+    @property
+    def input_count(self) -> int:
+        """
+        Número de entradas equivalentes (uma por canal e por leitura).
+        """
+        return len(self) * len(self._channels)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Tamanho aproximado dos dados da série em bytes.
+        """
+        return int(self._timestamps.nbytes + sum(column.nbytes for column in self._columns.values()))
+
+    def total(self) -> float:
+        """
+        Soma todos os valores de todos os canais, ignorando valores ausentes.
+
+        Returns:
+            A soma dos valores
+        """
+        return float(sum(np.nansum(column) for column in self._columns.values()))
+
+    def is_sorted(self) -> bool:
+        """
+        Verifica se as leituras estão em ordem cronológica (não decrescente).
+
+        O resultado é guardado, já que as colunas não são alteradas.
+
+        Returns:
+            True se os timestamps estiverem ordenados
+        """
+        if self._sorted is None:
+            self._sorted = bool(np.all(self._timestamps[1:] >= self._timestamps[:-1]))
+        return self._sorted
+
+    def sort_by_time(self) -> 'MeterSeries':
+        """
+        Ordena as leituras por timestamp, preservando a ordem de leituras com o mesmo horário.
+
+        Returns:
+            Esta série, se já estiver ordenada, ou uma nova série ordenada
+        """
+        if self.is_sorted():
+            return self
+        order = np.argsort(self._timestamps, kind='stable')
+        return MeterSeries(
+            self._timestamps[order],
+            {key: column[order] for key, column in self._columns.items()},
+            self._channels,
+            sorted_by_time=True
+        )
+
+    def append(self, batch: 'MeterSeries') -> 'MeterSeries':
+        """
+        Cria uma série com as leituras de um lote anexadas ao final desta.
+
+        As colunas da nova série ocupam arrays com capacidade excedente, que dobra
+        quando falta espaço, de modo que anexar n leituras em vários lotes custa
+        O(n) amortizado. A capacidade passa para a nova série: esta continua válida
+        e inalterada, mas um novo append a partir dela copia as colunas.
+
+        Args:
+            batch: O lote de leituras, com os mesmos canais
+
+        Returns:
+            Uma nova MeterSeries com as leituras desta seguidas das do lote
+        """
+        size = len(self)
+        buffers = self._buffers
+        self._buffers = None
+        if buffers is None:
+            buffers = {TIMESTAMPS_KEY: self._timestamps, **self._columns}
+        buffers = {
+            key: grow_buffer(buffer, size, batch.timestamps if key == TIMESTAMPS_KEY else batch.column(key))
+            for key, buffer in buffers.items()
+        }
+        end = size + len(batch)
+        in_order = (
+            self.is_sorted() and batch.is_sorted()
+            and (size == 0 or len(batch) == 0 or int(batch.timestamps[0]) >= int(self._timestamps[-1]))
+        )
+        series = MeterSeries(
+            buffers[TIMESTAMPS_KEY][:end],
+            {channel.key: buffers[channel.key][:end] for channel in self._channels},
+            self._channels,
+            sorted_by_time=in_order
+        )
+        series._buffers = buffers
+        return series
+
+    def time_range_bounds(self, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Localiza por busca binária as leituras de um intervalo de tempo.
+
+        Args:
+            start: Primeiro timestamp incluído, ou None para o início da série
+            end: Último timestamp incluído, ou None para o fim da série
+
+        Returns:
+            Uma tupla (índice inicial, índice final exclusivo)
+
+        Raises:
+            ValueError: Se a série não estiver em ordem cronológica
+        """
+        if not self.is_sorted():
+            raise ValueError('A série não está em ordem cronológica')
+        first = 0 if start is None else int(np.searchsorted(self._timestamps, start, side='left'))
+        last = len(self) if end is None else int(np.searchsorted(self._timestamps, end, side='right'))
+        return first, max(first, last)
+
+    def time_range(self, start: Optional[int] = None, end: Optional[int] = None) -> 'MeterSeries':
+        """
+        Obtém, sem copiar os dados, as leituras entre dois timestamps (inclusive).
+
+        Args:
+            start: Primeiro timestamp incluído, ou None para o início da série
+            end: Último timestamp incluído, ou None para o fim da série
+
+        Returns:
+            Uma MeterSeries que compartilha a memória desta série
+
+        Raises:
+            ValueError: Se a série não estiver em ordem cronológica
+        """
+        return self.slice(*self.time_range_bounds(start, end))
+
+    def reading(self, index: int) -> Tuple[int, Dict[str, float]]:
+        """
+        Obtém uma leitura (linha) da série.
+
+        Args:
+            index: Índice da leitura
+
+        Returns:
+            Uma tupla (timestamp, valores por canal)
+        """
+        return (
+            int(self._timestamps[index]),
+            {key: float(column[index]) for key, column in self._columns.items()}
+        )
+
+    def slice(self, start: int, stop: Optional[int] = None) -> 'MeterSeries':
+        """
+        Obtém uma fatia das leituras sem copiar os dados.
+
+        Args:
+            start: Índice inicial
+            stop: Índice final (exclusivo)
+
+        Returns:
+            Uma MeterSeries que compartilha a memória desta série
+        """
+        selector = slice(start, stop)
+        return MeterSeries(
+            self._timestamps[selector],
+            {key: column[selector] for key, column in self._columns.items()},
+            self._channels,
+            # Uma fatia de uma série ordenada também está ordenada
+            sorted_by_time=True if self._sorted else None
+        )
+
+
+# Chave dos timestamps nos buffers de MeterSeries.append (não coincide com nenhum canal)
+TIMESTAMPS_KEY = '#timestamps'
+
+
+def grow_buffer(buffer: np.ndarray, size: int, values: np.ndarray) -> np.ndarray:
+    """
+    Escreve valores após as `size` primeiras posições de um array, aumentando-o se necessário.
+
+    Quando falta espaço (ou o array não pode ser escrito, como um memmap somente
+    leitura), um novo array com o dobro da capacidade recebe as `size` primeiras
+    posições; assim, escritas sucessivas custam O(n) amortizado.
+
+    Args:
+        buffer: Array cujas `size` primeiras posições são mantidas
+        size: Posições já preenchidas
+        values: Valores a escrever a partir de `size`
+
+    Returns:
+        O próprio `buffer` ou o novo array, com os valores nas posições [size, size + len(values))
+    """
+    end = size + len(values)
+    if buffer.shape[0] < end or not buffer.flags.writeable or not buffer.flags.owndata:
+        grown = np.empty(max(end, 2 * size, MeterSeriesBuilder.MIN_CAPACITY), dtype=buffer.dtype)
+        grown[:size] = buffer[:size]
+        buffer = grown
+    buffer[size:end] = values
+    return buffer
+
+
+class MeterSeriesBuilder:
+    """
+    Acumula lotes de leituras em colunas pré-alocadas.
+
+    A capacidade dobra quando necessário, de modo que anexar n leituras em
+    lotes custa O(n) amortizado, sem manter os lotes intermediários vivos.
+    """
+
+    MIN_CAPACITY = 1024
+
+    def __init__(self, channels: Sequence[MeterChannel] = METER_CHANNELS):
+        """
+        Inicializa o acumulador vazio.
+
+        Args:
+            channels: Canais das séries que serão anexadas
+        """
+        self._channels = tuple(channels)
+        self._size = 0
+        self._timestamps = np.empty(0, dtype=np.int64)
+        self._columns = {channel.key: np.empty(0, dtype=np.float64) for channel in self._channels}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, series: MeterSeries) -> None:
+        """
+        Anexa as leituras de uma série ao final do acumulador.
+
+        Args:
+            series: O lote de leituras
+        """
+        count = len(series)
+        if count == 0:
+            return
+        self._reserve(self._size + count)
+        end = self._size + count
+        self._timestamps[self._size:end] = series.timestamps
+        for key, column in self._columns.items():
+            column[self._size:end] = series.column(key)
+        self._size = end
+
+    def build(self) -> MeterSeries:
+        """
+        Entrega as leituras acumuladas como uma MeterSeries e esvazia o acumulador.
+
+        Returns:
+            A MeterSeries com todas as leituras anexadas
+        """
+        # Devolve a capacidade excedente sem copiar os dados
+        self._timestamps.resize(self._size, refcheck=False)
+        for column in self._columns.values():
+            column.resize(self._size, refcheck=False)
+        series = MeterSeries(self._timestamps, self._columns, self._channels)
+
+        self._size = 0
+        self._timestamps = np.empty(0, dtype=np.int64)
+        self._columns = {channel.key: np.empty(0, dtype=np.float64) for channel in self._channels}
+        return series
+
+    def _reserve(self, needed: int) -> None:
+        """
+        Garante capacidade para ao menos `needed` leituras.
+        """
+        capacity = self._timestamps.shape[0]
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, self.MIN_CAPACITY)
+        self._timestamps = self._grow(self._timestamps, capacity)
+        self._columns = {key: self._grow(column, capacity) for key, column in self._columns.items()}
+
+    def _grow(self, array: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.empty(capacity, dtype=array.dtype)
+        grown[:self._size] = array[:self._size]
+        return grown
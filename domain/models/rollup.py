@@ -0,0 +1,456 @@
+"""
+Pirâmide de agregações (rollups) de séries de medidores.
+Este arquivo contém a classe Rollup, que guarda para cada intervalo de tempo de
+largura fixa (balde) e para cada canal a soma, o mínimo, o máximo e o número de
+leituras presentes, e a classe RollupPyramid, que mantém os níveis de 15 minutos,
+1 hora, 1 dia e 1 mês calculados em cascata a partir da série de 1 minuto. As
+consultas escolhem o nível mais grosso que ainda atende à resolução pedida e
+localizam o intervalo por busca binária, de modo que o custo depende do número
+de pontos exibidos e não do tamanho da série. Leituras novas, posteriores às
+existentes, são incorporadas à pirâmide com custo proporcional ao lote (append).
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from domain.models.meter_series import TIMESTAMPS_KEY, MeterSeries, grow_buffer
+
+
+@dataclass(frozen=True)
+class RollupLevel:
+    """
+    Descreve um nível da pirâmide.
+
+    `seconds` é a largura nominal do balde; os meses usam a duração média de um
+    mês apenas para escolher o nível, e seus baldes seguem o calendário.
+    """
+    name: str
+    seconds: int
+    calendar_month: bool = False
+
+    def bucket_starts(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Calcula o início do balde de cada timestamp.
+
+        Args:
+            timestamps: Timestamps em segundos desde a época
+
+        Returns:
+            Os inícios dos baldes, em segundos desde a época
+        """
+        if self.calendar_month:
+            months = timestamps.astype('datetime64[s]').astype('datetime64[M]')
+            return months.astype('datetime64[s]').astype(np.int64)
+        return timestamps - timestamps % self.seconds
+
+
+# Leituras originais, usadas como nível mais fino
+RAW_LEVEL = RollupLevel('1min', 60)
+
+LEVELS: Tuple[RollupLevel, ...] = (
+    RollupLevel('15min', 15 * 60),
+    RollupLevel('1h', 60 * 60),
+    RollupLevel('1d', 24 * 60 * 60),
+    RollupLevel('1month', 2629746, calendar_month=True),
+)
+
+LEVELS_BY_NAME: Dict[str, RollupLevel] = {level.name: level for level in (RAW_LEVEL,) + LEVELS}
+
+AGGREGATES = ('sum', 'min', 'max', 'count')
+
+_COUNT_DTYPE = np.int32
+
+
+@dataclass
+class Rollup:
+    """
+    Agregações de um nível: um balde por linha e, por canal, soma, mínimo, máximo e contagem.
+
+    Baldes sem leituras presentes de um canal têm contagem 0, soma 0 e mínimo/máximo NaN.
+    """
+    level: RollupLevel
+    timestamps: np.ndarray
+    sums: Dict[str, np.ndarray]
+    minimums: Dict[str, np.ndarray]
+    maximums: Dict[str, np.ndarray]
+    counts: Dict[str, np.ndarray]
+    # Arrays com capacidade excedente usados por append (ver MeterSeries.append)
+    _buffers: Optional[Dict[Tuple[str, str], np.ndarray]] = field(default=None, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+    def __getstate__(self) -> Dict[str, object]:
+        # A capacidade excedente não é serializada
+        state = dict(self.__dict__)
+        state['_buffers'] = None
+        return state
+
+    @property
+    def channels(self) -> List[str]:
+        """
+        Chaves dos canais agregados.
+        """
+        return list(self.sums)
+
+    def mean(self, key: str) -> np.ndarray:
+        """
+        Média de um canal em cada balde (NaN nos baldes sem leituras).
+
+        Args:
+            key: A chave do canal
+
+        Returns:
+            As médias por balde
+        """
+        counts = self.counts[key]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, self.sums[key] / counts, np.nan)
+
+    @classmethod
+    def from_series(cls, series: MeterSeries, level: RollupLevel) -> 'Rollup':
+        """
+        Agrega uma série em ordem cronológica em baldes de um nível.
+
+        Args:
+            series: A MeterSeries ordenada por timestamp
+            level: O nível de destino
+
+        Returns:
+            O Rollup do nível
+        """
+        keys = [channel.key for channel in series.channels]
+        if level == RAW_LEVEL:
+            columns = [series.column(key) for key in keys]
+            present = [~np.isnan(column) for column in columns]
+            return cls(
+                level,
+                series.timestamps,
+                {key: np.where(mask, column, 0.0) for key, column, mask in zip(keys, columns, present)},
+                {key: column for key, column in zip(keys, columns)},
+                {key: column for key, column in zip(keys, columns)},
+                {key: mask.astype(_COUNT_DTYPE) for key, mask in zip(keys, present)}
+            )
+
+        starts, boundaries = _buckets(level.bucket_starts(series.timestamps))
+        sums, minimums, maximums, counts = {}, {}, {}, {}
+        for key in keys:
+            column = series.column(key)
+            present = ~np.isnan(column)
+            sums[key] = _reduce(np.add, np.where(present, column, 0.0), boundaries)
+            # fmin/fmax ignoram NaN; baldes sem leituras continuam NaN
+            minimums[key] = _reduce(np.fmin, column, boundaries)
+            maximums[key] = _reduce(np.fmax, column, boundaries)
+            counts[key] = _reduce(np.add, present.astype(_COUNT_DTYPE), boundaries)
+        return cls(level, starts, sums, minimums, maximums, counts)
+
+    def coarsen(self, level: RollupLevel) -> 'Rollup':
+        """
+        Agrega este nível em baldes maiores, combinando as agregações existentes.
+
+        Args:
+            level: O nível de destino, mais grosso que este
+
+        Returns:
+            O Rollup do nível de destino
+        """
+        starts, boundaries = _buckets(level.bucket_starts(self.timestamps))
+        return Rollup(
+            level,
+            starts,
+            {key: _reduce(np.add, values, boundaries) for key, values in self.sums.items()},
+            {key: _reduce(np.fmin, values, boundaries) for key, values in self.minimums.items()},
+            {key: _reduce(np.fmax, values, boundaries) for key, values in self.maximums.items()},
+            {key: _reduce(np.add, values, boundaries) for key, values in self.counts.items()}
+        )
+
+    def append(self, batch: 'Rollup') -> 'Rollup':
+        """
+        Cria um Rollup com os baldes de um lote posterior anexados ao final deste.
+
+        Se o primeiro balde do lote for o mesmo que o último deste, os dois são
+        combinados (somas e contagens somadas, mínimo e máximo combinados). Os
+        arrays crescem como em MeterSeries.append, com custo proporcional ao lote:
+        o balde combinado é escrito no lugar quando o array tem espaço, então este
+        Rollup continua com os mesmos baldes, mas o último pode passar a incluir
+        as leituras do lote. Arrays somente leitura, como os mapeados de um
+        repositório, não são alterados.
+
+        Args:
+            batch: O Rollup do lote, no mesmo nível e com timestamps a partir do último balde deste
+
+        Returns:
+            O novo Rollup
+        """
+        size = len(self)
+        merge = size > 0 and len(batch) > 0 and batch.timestamps[0] == self.timestamps[-1]
+        start = size - 1 if merge else size
+        buffers = self._buffers
+        self._buffers = None
+        if buffers is None:
+            buffers = {(TIMESTAMPS_KEY, ''): self.timestamps}
+            for aggregate, values in zip(AGGREGATES, self._aggregates()):
+                buffers.update({(aggregate, key): column for key, column in values.items()})
+
+        appended: Dict[Tuple[str, str], np.ndarray] = {}
+        batch_values = dict(zip(AGGREGATES, batch._aggregates()))
+        for name, buffer in buffers.items():
+            aggregate, key = name
+            values = batch.timestamps if aggregate == TIMESTAMPS_KEY else batch_values[aggregate][key]
+            if merge and aggregate != TIMESTAMPS_KEY:
+                values = values.copy()
+                values[0] = _MERGE[aggregate](buffer[start], values[0])
+            appended[name] = grow_buffer(buffer, start, values)
+
+        end = start + len(batch)
+        columns = {aggregate: {} for aggregate in AGGREGATES}
+        for (aggregate, key), buffer in appended.items():
+            if aggregate != TIMESTAMPS_KEY:
+                columns[aggregate][key] = buffer[:end]
+        return Rollup(
+            self.level, appended[(TIMESTAMPS_KEY, '')][:end],
+            columns['sum'], columns['min'], columns['max'], columns['count'],
+            appended
+        )
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> 'Rollup':
+        """
+        Seleciona, sem copiar, os baldes que se sobrepõem a um intervalo de tempo.
+
+        Args:
+            start: Primeiro timestamp do intervalo, ou None
+            end: Último timestamp do intervalo, ou None
+
+        Returns:
+            Um Rollup que compartilha a memória deste
+        """
+        first = 0 if start is None else max(int(np.searchsorted(self.timestamps, start, side='right')) - 1, 0)
+        last = len(self) if end is None else int(np.searchsorted(self.timestamps, end, side='right'))
+        selector = slice(first, max(first, last))
+        return Rollup(
+            self.level,
+            self.timestamps[selector],
+            {key: values[selector] for key, values in self.sums.items()},
+            {key: values[selector] for key, values in self.minimums.items()},
+            {key: values[selector] for key, values in self.maximums.items()},
+            {key: values[selector] for key, values in self.counts.items()}
+        )
+
+    def select(self, channels: Iterable[str]) -> 'Rollup':
+        """
+        Restringe o Rollup a alguns canais.
+
+        Args:
+            channels: Chaves dos canais
+
+        Returns:
+            Um Rollup apenas com os canais pedidos
+        """
+        channels = list(channels)
+        return Rollup(
+            self.level,
+            self.timestamps,
+            {key: self.sums[key] for key in channels},
+            {key: self.minimums[key] for key in channels},
+            {key: self.maximums[key] for key in channels},
+            {key: self.counts[key] for key in channels}
+        )
+
+    def _aggregates(self) -> Tuple[Dict[str, np.ndarray], ...]:
+        """
+        As agregações na ordem de AGGREGATES.
+        """
+        return self.sums, self.minimums, self.maximums, self.counts
+
+
+class RollupPyramid:
+    """
+    Conjunto de níveis de agregação de uma série, do mais fino ao mais grosso.
+    """
+
+    def __init__(self, rollups: Iterable[Rollup]):
+        """
+        Inicializa a pirâmide com os níveis já calculados.
+
+        Args:
+            rollups: Os Rollups, um por nível
+        """
+        self._rollups: Dict[str, Rollup] = {rollup.level.name: rollup for rollup in rollups}
+
+    @classmethod
+    def build(cls, series: MeterSeries) -> 'RollupPyramid':
+        """
+        Calcula todos os níveis de uma série, cada um a partir do anterior.
+
+        Args:
+            series: A MeterSeries de 1 minuto
+
+        Returns:
+            A RollupPyramid da série
+        """
+        series = series.sort_by_time()
+        rollups = [Rollup.from_series(series, LEVELS[0])]
+        for level in LEVELS[1:]:
+            rollups.append(rollups[-1].coarsen(level))
+        return cls(rollups)
+
+    def append(self, series: MeterSeries) -> 'RollupPyramid':
+        """
+        Cria a pirâmide com as leituras de um lote posterior às já agregadas.
+
+        Apenas o lote é agregado, em cascata como em build, e seus baldes são
+        anexados a cada nível; o último balde de cada nível é combinado com o
+        primeiro do lote quando coincidem. Esta pirâmide mantém seus baldes, mas
+        o último de cada nível pode passar a incluir as leituras do lote.
+
+        Args:
+            series: O lote, ordenado e com timestamps posteriores às leituras agregadas
+
+        Returns:
+            A nova RollupPyramid
+        """
+        batch = RollupPyramid.build(series)
+        return RollupPyramid(
+            rollup.append(batch.level(name)) if name in batch._rollups else rollup
+            for name, rollup in self._rollups.items()
+        )
+
+    @property
+    def levels(self) -> List[str]:
+        """
+        Nomes dos níveis disponíveis, do mais fino ao mais grosso.
+        """
+        return [level.name for level in LEVELS if level.name in self._rollups]
+
+    def level(self, name: str) -> Rollup:
+        """
+        Obtém um nível pelo nome.
+
+        Args:
+            name: O nome do nível (por exemplo, '1h')
+
+        Returns:
+            O Rollup do nível
+        """
+        return self._rollups[name]
+
+    def choose_level(self, start: int, end: int, points: int) -> RollupLevel:
+        """
+        Escolhe o nível mais grosso cujos baldes ainda mostram `points` pontos no intervalo.
+
+        Args:
+            start: Início do intervalo (segundos desde a época)
+            end: Fim do intervalo (segundos desde a época)
+            points: Número de pontos desejado
+
+        Returns:
+            O nível escolhido; RAW_LEVEL se nenhum nível agregado for fino o bastante
+        """
+        resolution = max(end - start, 0) / max(points, 1)
+        chosen = RAW_LEVEL
+        for level in LEVELS:
+            if level.name in self._rollups and level.seconds <= resolution:
+                chosen = level
+        return chosen
+
+    def query(self, series: MeterSeries, start: Optional[int] = None, end: Optional[int] = None,
+              points: int = 1000, level: Optional[str] = None) -> Rollup:
+        """
+        Consulta as agregações de um intervalo no nível adequado.
+
+        Args:
+            series: A série de origem, usada quando o nível escolhido é o de 1 minuto
+            start: Início do intervalo, ou None para o início da série
+            end: Fim do intervalo, ou None para o fim da série
+            points: Número de pontos desejado, usado para escolher o nível
+            level: Nome do nível a usar; escolhido automaticamente se omitido
+
+        Returns:
+            O Rollup com os baldes do intervalo
+
+        Raises:
+            ValueError: Se o nível pedido não existir
+        """
+        if level is not None and level not in LEVELS_BY_NAME:
+            raise ValueError(f"Nível de agregação desconhecido: {level}")
+        if level is None:
+            first = start if start is not None else (int(series.timestamps[0]) if len(series) else 0)
+            last = end if end is not None else (int(series.timestamps[-1]) if len(series) else 0)
+            chosen = self.choose_level(first, last, points)
+        else:
+            chosen = LEVELS_BY_NAME[level]
+
+        if chosen == RAW_LEVEL:
+            return Rollup.from_series(series.sort_by_time().time_range(start, end), RAW_LEVEL)
+        return self._rollups[chosen.name].range(start, end)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Converte a pirâmide em arrays nomeados, para gravação em repositórios.
+
+        Returns:
+            Um dicionário de '<nível>.<agregação>.<canal>' (e '<nível>.timestamps') para arrays
+        """
+        arrays: Dict[str, np.ndarray] = {}
+        for name, rollup in self._rollups.items():
+            arrays[f'{name}.timestamps'] = rollup.timestamps
+            for aggregate, values in zip(AGGREGATES, (rollup.sums, rollup.minimums, rollup.maximums, rollup.counts)):
+                for key, column in values.items():
+                    arrays[f'{name}.{aggregate}.{key}'] = column
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> Optional['RollupPyramid']:
+        """
+        Reconstrói uma pirâmide gravada com to_arrays.
+
+        Args:
+            arrays: Os arrays nomeados
+
+        Returns:
+            A RollupPyramid, ou None se não houver arrays
+        """
+        if not arrays:
+            return None
+        rollups = []
+        for level in LEVELS:
+            if f'{level.name}.timestamps' not in arrays:
+                continue
+            values: Dict[str, Dict[str, np.ndarray]] = {aggregate: {} for aggregate in AGGREGATES}
+            for name, column in arrays.items():
+                parts = name.split('.', 2)
+                if len(parts) == 3 and parts[0] == level.name:
+                    values[parts[1]][parts[2]] = column
+            rollups.append(Rollup(
+                level, arrays[f'{level.name}.timestamps'],
+                values['sum'], values['min'], values['max'], values['count']
+            ))
+        return cls(rollups)
+
+
+# Como combinar o último balde existente com o primeiro balde de um lote
+_MERGE = {'sum': np.add, 'min': np.fmin, 'max': np.fmax, 'count': np.add}
+
+
+def _buckets(bucket_starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Localiza os baldes de uma sequência ordenada de inícios de balde.
+
+    Returns:
+        Uma tupla (início de cada balde, posição da primeira linha de cada balde)
+    """
+    if len(bucket_starts) == 0:
+        return bucket_starts[:0].copy(), np.empty(0, dtype=np.int64)
+    boundaries = np.concatenate(([0], np.flatnonzero(np.diff(bucket_starts)) + 1))
+    return bucket_starts[boundaries], boundaries
+
+
+def _reduce(ufunc: np.ufunc, values: np.ndarray, boundaries: np.ndarray) -> np.ndarray:
+    """
+    Aplica uma redução a cada balde.
+    """
+    if len(boundaries) == 0:
+        return values[:0].copy()
+    return ufunc.reduceat(values, boundaries)
@@ -0,0 +1,406 @@
+"""
+Estatísticas acumuladas em fluxo para as leituras de medidores.
+Este arquivo implementa acumuladores que resumem os canais de uma MeterSeries em
+uma única passada, bloco a bloco, enquanto as leituras são analisadas: contagem,
+valores ausentes, média e variância (Welford, combinando blocos pela fórmula de
+Chan), mínimo, máximo e um t-digest para percentis aproximados. Todos os
+acumuladores podem ser combinados (merge), de modo que os resumos de faixas
+analisadas em paralelo, ou de cálculos diferentes, produzem o mesmo resultado que
+um resumo calculado sobre todas as leituras juntas. Os metadados do cálculo
+recebem apenas o resumo público de cada canal (to_metadata); o estado combinável,
+com m2 e os centroides, é guardado à parte pelo repositório (to_state), e os
+percentis passam a ser consultados sem reler as leituras.
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from domain.models.meter_series import MeterSeries
+
+
+# Compressão padrão do t-digest: no máximo cerca de compression / 2 centroides
+DEFAULT_COMPRESSION = 200
+
+# Percentis gravados nos metadados
+SUMMARY_PERCENTILES = (50, 95, 99)
+
+
+class TDigest:
+    """
+    Esboço de quantis t-digest (variante com fusão) sobre valores float.
+
+    Os valores são agrupados em centroides (média, peso). Os centroides próximos
+    das caudas representam poucos valores e os do meio muitos, conforme a função
+    de escala k1 (arco seno), o que mantém os percentis extremos precisos com
+    memória limitada. Blocos de valores e outros t-digests são incorporados
+    ordenando todos os centroides e reagrupando-os de forma vetorizada.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION,
+                 means: Optional[np.ndarray] = None, weights: Optional[np.ndarray] = None):
+        """
+        Inicializa o esboço.
+
+        Args:
+            compression: Parâmetro de compressão (δ); maior significa mais precisão e mais centroides
+            means: Médias dos centroides, em ordem crescente
+            weights: Pesos dos centroides
+        """
+        self.compression = compression
+        self.means = np.empty(0) if means is None else np.asarray(means, dtype=np.float64)
+        self.weights = np.empty(0) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        """
+        Número de valores representados.
+        """
+        return float(self.weights.sum())
+
+    def __len__(self) -> int:
+        return len(self.means)
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Incorpora um bloco de valores (sem NaN).
+
+        Args:
+            values: Os valores
+        """
+        if not len(values):
+            return
+        # Com pesos unitários, os limites dos grupos são posições fixas nos valores
+        # ordenados: o grupo b começa onde k(q) atinge b, em q = (1 + sin(2πb / δ)) / 2
+        values = np.sort(values)
+        size = len(values)
+        bounds = np.arange(math.floor(-self.compression / 4) + 1, math.ceil(self.compression / 4))
+        quantiles = (1 + np.sin(2 * math.pi * bounds / self.compression)) / 2
+        starts = np.unique(np.concatenate([[0], np.ceil(quantiles * size - 0.5).astype(np.int64)]))
+        starts = starts[(starts >= 0) & (starts < size)]
+        counts = np.diff(np.append(starts, size)).astype(np.float64)
+        block = TDigest(self.compression, np.add.reduceat(values, starts) / counts, counts)
+        self.merge(block)
+
+    def merge(self, other: 'TDigest') -> None:
+        """
+        Incorpora os centroides de outro t-digest.
+
+        Args:
+            other: O outro esboço
+        """
+        if not len(self):
+            self.means, self.weights = other.means.copy(), other.weights.copy()
+        elif len(other):
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+
+    def quantile(self, q: float, minimum: float, maximum: float) -> float:
+        """
+        Estima um quantil interpolando entre os centros dos centroides.
+
+        Args:
+            q: O quantil, entre 0 e 1
+            minimum: Menor valor visto, usado como extremo da interpolação
+            maximum: Maior valor visto, usado como extremo da interpolação
+
+        Returns:
+            O valor estimado, ou NaN se o esboço estiver vazio
+        """
+        if not len(self):
+            return float('nan')
+        cumulative = np.cumsum(self.weights)
+        centers = cumulative - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [cumulative[-1]]])
+        values = np.concatenate([[minimum], self.means, [maximum]])
+        return float(np.interp(q * cumulative[-1], positions, values))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        """
+        Reagrupa centroides ordenados de modo que cada grupo cubra menos de uma
+        unidade da função de escala k(q) = δ / 2π · asin(2q − 1).
+        """
+        order = np.argsort(means)
+        means = means[order]
+        weights = weights[order]
+        cumulative = np.cumsum(weights)
+        middle = (cumulative - weights / 2) / cumulative[-1]
+        scale = self.compression / (2 * math.pi) * np.arcsin(2 * middle - 1)
+        groups = np.floor(scale).astype(np.int64)
+
+        starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]]))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+
+class ChannelAccumulator:
+    """
+    Resumo de um canal acumulado em uma única passada.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        """
+        Inicializa um resumo vazio.
+
+        Args:
+            compression: Compressão do t-digest
+        """
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.digest = TDigest(compression)
+
+    @property
+    def variance(self) -> float:
+        """
+        Variância amostral, ou NaN com menos de duas leituras.
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Incorpora um bloco de leituras; valores NaN são contados como ausentes.
+
+        Args:
+            values: As leituras do canal no bloco
+        """
+        present = values[~np.isnan(values)]
+        self.missing += len(values) - len(present)
+        if not len(present):
+            return
+
+        block = ChannelAccumulator(self.digest.compression)
+        block.count = len(present)
+        block.mean = float(present.mean())
+        block.m2 = float(((present - block.mean) ** 2).sum())
+        block.minimum = float(present.min())
+        block.maximum = float(present.max())
+        self._combine(block)
+        self.digest.update(present)
+
+    def merge(self, other: 'ChannelAccumulator') -> None:
+        """
+        Incorpora o resumo de outro bloco ou cálculo do mesmo canal.
+
+        Args:
+            other: O outro resumo
+        """
+        self.missing += other.missing
+        if other.count:
+            self._combine(other)
+            self.digest.merge(other.digest)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Estima um percentil pelo t-digest.
+
+        Args:
+            percentile: O percentil, entre 0 e 100
+
+        Returns:
+            O valor estimado, ou NaN se não houver leituras
+        """
+        return self.digest.quantile(percentile / 100, self.minimum, self.maximum)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Converte o resumo para o dicionário público gravado nos metadados.
+
+        Apenas contagens, média, desvio padrão, extremos e percentis; valores
+        indefinidos viram None.
+
+        Returns:
+            O dicionário do resumo
+        """
+        def number(value: float) -> Optional[float]:
+            return value if math.isfinite(value) else None
+
+        empty = self.count == 0
+        return {
+            'count': self.count,
+            'missing': self.missing,
+            'mean': None if empty else self.mean,
+            'std': number(math.sqrt(self.variance)) if self.count > 1 else None,
+            'min': None if empty else self.minimum,
+            'max': None if empty else self.maximum,
+            **{f'p{p}': number(self.percentile(p)) for p in SUMMARY_PERCENTILES}
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converte o resumo para um dicionário serializável em JSON.
+
+        Além do resumo público, inclui os estados necessários para combinar
+        resumos (m2 e os centroides).
+
+        Returns:
+            O dicionário do resumo
+        """
+        return {
+            **self.summary(),
+            'm2': self.m2,
+            'digest': {
+                'compression': self.digest.compression,
+                'means': self.digest.means.tolist(),
+                'weights': self.digest.weights.astype(np.int64).tolist()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ChannelAccumulator':
+        """
+        Reconstrói um resumo a partir de to_dict.
+
+        Args:
+            data: O dicionário do resumo
+
+        Returns:
+            O ChannelAccumulator
+        """
+        digest = data['digest']
+        accumulator = cls(digest['compression'])
+        accumulator.count = data['count']
+        accumulator.missing = data['missing']
+        if accumulator.count:
+            accumulator.mean = data['mean']
+            accumulator.m2 = data['m2']
+            accumulator.minimum = data['min']
+            accumulator.maximum = data['max']
+        accumulator.digest = TDigest(digest['compression'], digest['means'], digest['weights'])
+        return accumulator
+
+    def _combine(self, other: 'ChannelAccumulator') -> None:
+        """
+        Combina contagem, média, m2, mínimo e máximo (fórmula de Chan et al.).
+        """
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+
+class SeriesAccumulator:
+    """
+    Resumos acumulados de todos os canais de uma série.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        """
+        Inicializa sem canais; cada canal é criado ao receber a primeira leitura.
+
+        Args:
+            compression: Compressão dos t-digests
+        """
+        self.compression = compression
+        self.channels: Dict[str, ChannelAccumulator] = {}
+
+    @classmethod
+    def from_series(cls, series: MeterSeries, compression: int = DEFAULT_COMPRESSION) -> 'SeriesAccumulator':
+        """
+        Resume uma série inteira.
+
+        Args:
+            series: A MeterSeries
+            compression: Compressão dos t-digests
+
+        Returns:
+            O SeriesAccumulator da série
+        """
+        accumulator = cls(compression)
+        accumulator.update(series)
+        return accumulator
+
+    @classmethod
+    def combine(cls, accumulators: Iterable['SeriesAccumulator']) -> 'SeriesAccumulator':
+        """
+        Combina os resumos de vários blocos ou cálculos.
+
+        Args:
+            accumulators: Os resumos
+
+        Returns:
+            Um novo SeriesAccumulator com todos eles
+        """
+        combined = cls()
+        for accumulator in accumulators:
+            combined.merge(accumulator)
+        return combined
+
+    def copy(self) -> 'SeriesAccumulator':
+        """
+        Cria uma cópia independente, que pode ser atualizada sem alterar esta.
+
+        Returns:
+            O novo SeriesAccumulator
+        """
+        copied = SeriesAccumulator(self.compression)
+        copied.merge(self)
+        return copied
+
+    def update(self, series: MeterSeries) -> None:
+        """
+        Incorpora um bloco de leituras.
+
+        Args:
+            series: A MeterSeries do bloco
+        """
+        for channel in series.channels:
+            self._channel(channel.key).update(series.column(channel.key))
+
+    def merge(self, other: 'SeriesAccumulator') -> None:
+        """
+        Incorpora os resumos de outro bloco ou cálculo.
+
+        Args:
+            other: O outro resumo
+        """
+        for key, accumulator in other.channels.items():
+            self._channel(key).merge(accumulator)
+
+    def to_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Converte os resumos para serem guardados nos metadados do cálculo.
+
+        Returns:
+            Um dicionário do resumo público de cada canal
+        """
+        return {key: accumulator.summary() for key, accumulator in self.channels.items()}
+
+    def to_state(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Converte os resumos, com o estado necessário para combiná-los, para JSON.
+
+        Returns:
+            Um dicionário do resumo completo de cada canal
+        """
+        return {key: accumulator.to_dict() for key, accumulator in self.channels.items()}
+
+    @classmethod
+    def from_state(cls, data: Dict[str, Dict[str, Any]]) -> 'SeriesAccumulator':
+        """
+        Reconstrói os resumos gravados por to_state.
+
+        Args:
+            data: O dicionário do resumo de cada canal
+
+        Returns:
+            O SeriesAccumulator
+        """
+        accumulator = cls()
+        accumulator.channels = {key: ChannelAccumulator.from_dict(value) for key, value in data.items()}
+        return accumulator
+
+    def _channel(self, key: str) -> ChannelAccumulator:
+        """
+        Devolve o resumo de um canal, criando-o se necessário.
+        """
+        if key not in self.channels:
+            self.channels[key] = ChannelAccumulator(self.compression)
+        return self.channels[key]
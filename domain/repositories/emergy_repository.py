@@ -4,14 +4,89 @@ Este arquivo define a interface do repositório para os cálculos de Emergy,
 seguindo o padrão Repository do Domain-Driven Design. Esta interface
 abstrata define os métodos que qualquer implementação de repositório
 deve fornecer para armazenar, recuperar e gerenciar objetos de domínio
-EmergyCalculation.
+EmergyCalculation. As consultas paginadas usam um cursor (PageCursor) baseado na
+ordem de criação, para que cada página seja obtida sem montar a lista completa.
 
 Feito por André Carbonieri Silva T839FC9
 """
 
+import base64
+import binascii
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from domain.models.emergy_model import EmergyCalculation
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from domain.models.emergy_model import CalculationSummary, CalculationTail, EmergyCalculation
+from domain.models.meter_series import MeterSeries
+
+
+class AppendConflictError(RuntimeError):
+    """
+    Erro lançado quando o cálculo gravado recebeu leituras de outro processo
+    depois de ter sido lido para o append.
+    """
+
+
+@dataclass(frozen=True, order=True)
+class PageCursor:
+    """
+    Posição de um cálculo na ordem de listagem (data de criação e ID).
+    
+    Uma página "depois" de um cursor contém apenas cálculos estritamente
+    posteriores a ele, mesmo que o cálculo do cursor tenha sido excluído.
+    """
+    created_at: datetime
+    id: str
+    
+    @classmethod
+    def of(cls, calculation) -> 'PageCursor':
+        """
+        Cria o cursor que aponta para um cálculo ou resumo de cálculo.
+        
+        Args:
+            calculation: Um EmergyCalculation ou CalculationSummary
+            
+        Returns:
+            O PageCursor do cálculo
+        """
+        return cls(calculation.created_at, calculation.id)
+    
+    def encode(self) -> str:
+        """
+        Codifica o cursor como um token opaco para URLs.
+        
+        Returns:
+            O token do cursor
+        """
+        raw = f"{self.created_at.isoformat()}|{self.id}".encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    @classmethod
+    def decode(cls, token: str) -> 'PageCursor':
+        """
+        Decodifica um token criado por encode.
+        
+        Args:
+            token: O token do cursor
+            
+        Returns:
+            O PageCursor correspondente
+            
+        Raises:
+            ValueError: Se o token for inválido
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+            created_at, calculation_id = raw.split('|', 1)
+            return cls(datetime.fromisoformat(created_at), calculation_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError(f"Cursor inválido: {token}")
+    
+    def key(self) -> Tuple[datetime, str]:
+        """
+        Chave de ordenação do cursor.
+        """
+        return (self.created_at, self.id)
 
 
 class EmergyRepository(ABC):
@@ -32,6 +107,74 @@ class EmergyRepository(ABC):
         """
         pass
     
+    def save_many(self, calculations: Iterable[EmergyCalculation]) -> None:
+        """
+        Salva vários cálculos de emergy de uma vez.
+        
+        A implementação padrão salva um por vez; as implementações concretas
+        podem agrupar a gravação, como em uma única transação.
+        
+        Args:
+            calculations: Os EmergyCalculation para salvar
+        """
+        for calculation in calculations:
+            self.save(calculation)
+    
+    def append(self, calculation: EmergyCalculation, readings: MeterSeries) -> None:
+        """
+        Grava um cálculo já salvo que recebeu novas leituras no fim da série.
+        
+        A implementação padrão salva o cálculo inteiro; as implementações concretas
+        gravam apenas as leituras novas e atualizam o total, os metadados e as agregações.
+        
+        Args:
+            calculation: O EmergyCalculation com a série completa
+            readings: As leituras anexadas, já incluídas na série do cálculo
+            
+        Raises:
+            AppendConflictError: Se as leituras gravadas não forem mais as que
+                precediam o lote (implementações compartilhadas entre processos)
+        """
+        self.save(calculation)
+    
+    def get_tail(self, calculation_id: str, start: Optional[int] = None) -> Optional[CalculationTail]:
+        """
+        Recupera apenas a parte final de um cálculo, para anexar leituras a partir de `start`.
+        
+        As leituras com timestamp a partir de `start` (e a última anterior a ele),
+        o último balde de cada agregação, as estatísticas e os metadados são lidos
+        sem carregar a série inteira. A implementação padrão devolve None, e quem
+        anexa as leituras carrega o cálculo inteiro com get_by_id.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            start: Primeiro timestamp do lote a anexar; None lê apenas a última leitura
+            
+        Returns:
+            O CalculationTail, ou None se o cálculo não for encontrado, não tiver
+            leituras de medidor ou o repositório não oferecer este caminho
+        """
+        return None
+    
+    def append_tail(self, tail: CalculationTail, readings: MeterSeries) -> None:
+        """
+        Grava um cálculo lido com get_tail que recebeu novas leituras no fim da série.
+        
+        A implementação padrão carrega o cálculo inteiro com get_by_id, completa-o
+        com a parte final (CalculationTail.complete) e o grava com append.
+        
+        Args:
+            tail: O CalculationTail atualizado, com as leituras novas no fim de `tail.readings`
+            readings: As leituras anexadas
+            
+        Raises:
+            AppendConflictError: Se as leituras gravadas não forem mais as que precediam o lote
+        """
+        calculation = self.get_by_id(tail.id)
+        if calculation is None or calculation.series is None or len(calculation.series) + len(readings) != tail.rows:
+            raise AppendConflictError(f'O cálculo {tail.id} foi alterado por outro processo')
+        self.append(tail.complete(calculation, readings), readings)
+    
     @abstractmethod
     def get_by_id(self, calculation_id: str) -> Optional[EmergyCalculation]:
         """
@@ -67,3 +210,70 @@ class EmergyRepository(ABC):
             True se o cálculo foi excluído, False caso contrário
         """
         pass
+    
+    def get_page(self, limit: int, after: Optional[PageCursor] = None) -> List[EmergyCalculation]:
+        """
+        Recupera uma página de cálculos em ordem de criação.
+        
+        A implementação padrão usa get_all; repositórios que conseguem consultar
+        apenas a página pedida devem sobrescrevê-la.
+        
+        Args:
+            limit: Número máximo de cálculos na página
+            after: Cursor do último cálculo da página anterior
+            
+        Returns:
+            Os cálculos da página
+        """
+        calculations = sorted(self.get_all(), key=lambda calculation: PageCursor.of(calculation).key())
+        if after is not None:
+            calculations = [calc for calc in calculations if PageCursor.of(calc).key() > after.key()]
+        return calculations[:limit]
+    
+    def get_summary(self, calculation_id: str) -> Optional[CalculationSummary]:
+        """
+        Recupera o resumo de um cálculo, sem as entradas.
+        
+        O número de entradas do resumo muda a cada append, então serve para
+        conferir se uma versão guardada em cache ainda é a gravada. A implementação
+        padrão carrega o cálculo; as implementações concretas leem apenas o resumo.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            O CalculationSummary se encontrado, None caso contrário
+        """
+        calculation = self.get_by_id(calculation_id)
+        return CalculationSummary.from_calculation(calculation) if calculation is not None else None
+    
+    def get_summary_page(self, limit: int, after: Optional[PageCursor] = None) -> List[CalculationSummary]:
+        """
+        Recupera uma página de resumos de cálculos (sem as entradas) em ordem de criação.
+        
+        Args:
+            limit: Número máximo de resumos na página
+            after: Cursor do último cálculo da página anterior
+            
+        Returns:
+            Os resumos da página
+        """
+        return [CalculationSummary.from_calculation(calc) for calc in self.get_page(limit, after)]
+    
+    def get_by_content_hash(self, content_hash: str) -> Optional[EmergyCalculation]:
+        """
+        Recupera o cálculo criado a partir de um conteúdo, pela chave do conteúdo.
+        
+        A implementação padrão percorre todos os cálculos; as implementações
+        concretas mantêm um índice da chave para o ID.
+        
+        Args:
+            content_hash: A chave do conteúdo ('content_hash' nos metadados)
+            
+        Returns:
+            O EmergyCalculation se encontrado, None caso contrário
+        """
+        for calculation in self.get_all():
+            if calculation.content_hash == content_hash:
+                return calculation
+        return None
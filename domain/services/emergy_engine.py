@@ -0,0 +1,437 @@
+"""
+Contabilidade de emergia das leituras de medidores.
+Este arquivo implementa o EmergyEngine, que converte cada canal de uma MeterSeries
+em energia (joules) e a multiplica pelo valor unitário de emergia (UEV, em sej/J)
+da tabela de transformidades, escolhido pela categoria e unidade do canal. Canais
+de potência (kW) são integrados pelo intervalo de amostragem (kW por minuto → kWh
+→ J) e canais de energia (Wh) são convertidos diretamente. As contas são feitas
+sobre as colunas inteiras com NumPy: cada canal contribui com um coeficiente
+(J por unidade × sej/J), e os totais por período usam as somas já agregadas na
+RollupPyramid. A tabela padrão pode ser substituída por um arquivo JSON, lido uma
+única vez e mantido em cache; a contabilidade guarda a versão e um resumo (hash)
+do conteúdo da tabela, para que só sejam combinadas contas feitas com as mesmas
+transformidades.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from domain.models.meter_series import MeterChannel, MeterSeries
+from domain.models.rollup import LEVELS_BY_NAME, RAW_LEVEL, Rollup, RollupPyramid
+
+
+# Unidade -> (joules por unidade, se é potência e precisa ser integrada no tempo)
+ENERGY_UNITS: Dict[str, Tuple[float, bool]] = {
+    'W': (1.0, True),
+    'kW': (1000.0, True),
+    'J': (1.0, False),
+    'Wh': (3600.0, False),
+    'kWh': (3.6e6, False),
+}
+
+# UEV da eletricidade da rede, em sej/J (ordem de grandeza usual na literatura de emergia)
+ELECTRICITY_UEV = 1.6e5
+
+DEFAULT_TRANSFORMITIES: Dict[str, Any] = {
+    'version': 'default-1',
+    'transformities': [
+        {'category': 'Active Power', 'unit': 'kW', 'uev': ELECTRICITY_UEV, 'include_in_total': True},
+        # Os submedidores são parte da potência ativa global: aparecem na divisão
+        # por categoria, mas não entram no total
+        {'category': 'Sub Metering', 'unit': 'Wh', 'uev': ELECTRICITY_UEV, 'include_in_total': False},
+    ]
+}
+
+# Período padrão da divisão da emergia no tempo
+DEFAULT_PERIOD = '1d'
+
+
+@dataclass(frozen=True)
+class Transformity:
+    """
+    Valor unitário de emergia (sej/J) de uma categoria e unidade de canal.
+    """
+    category: str
+    unit: str
+    uev: float
+    include_in_total: bool = True
+
+
+class TransformityTable:
+    """
+    Tabela de transformidades, indexada por (categoria, unidade).
+    """
+
+    def __init__(self, entries: Iterable[Transformity], version: str = 'custom'):
+        """
+        Inicializa a tabela.
+
+        Args:
+            entries: As transformidades
+            version: Identificação da tabela, registrada nos cálculos
+
+        Raises:
+            ValueError: Se alguma unidade não puder ser convertida em energia
+        """
+        self.version = version
+        self._entries: Dict[Tuple[str, str], Transformity] = {}
+        for entry in entries:
+            if entry.unit not in ENERGY_UNITS:
+                raise ValueError(f"Unidade sem conversão para energia: {entry.unit}")
+            self._entries[(entry.category, entry.unit)] = entry
+        content = sorted(
+            (entry.category, entry.unit, entry.uev, entry.include_in_total) for entry in self._entries.values()
+        )
+        self.digest = hashlib.blake2b(json.dumps(content).encode('utf-8'), digest_size=16).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, category: str, unit: str) -> Optional[Transformity]:
+        """
+        Obtém a transformidade de uma categoria e unidade.
+
+        Args:
+            category: A categoria do canal
+            unit: A unidade do canal
+
+        Returns:
+            A Transformity, ou None se o canal não tiver emergia associada
+        """
+        return self._entries.get((category, unit))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TransformityTable':
+        """
+        Cria a tabela a partir de um dicionário no formato do arquivo JSON.
+
+        Args:
+            data: {'version': ..., 'transformities': [{'category', 'unit', 'uev', 'include_in_total'}, ...]}
+
+        Returns:
+            A TransformityTable
+
+        Raises:
+            ValueError: Se alguma entrada for inválida
+        """
+        try:
+            entries = [
+                Transformity(item['category'], item['unit'], float(item['uev']),
+                             bool(item.get('include_in_total', True)))
+                for item in data['transformities']
+            ]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Tabela de transformidades inválida: {e}") from e
+        return cls(entries, str(data.get('version', 'custom')))
+
+
+def load_transformity_table(path: Optional[str] = None) -> TransformityTable:
+    """
+    Carrega a tabela de transformidades de um arquivo JSON, ou a tabela padrão.
+
+    A tabela é lida uma única vez por arquivo e mantida em cache; o arquivo só é
+    lido de novo se for modificado.
+
+    Args:
+        path: Caminho do arquivo JSON; usa DEFAULT_TRANSFORMITIES se omitido
+
+    Returns:
+        A TransformityTable
+    """
+    if path is None:
+        return _default_table()
+    return _read_table(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=1)
+def _default_table() -> TransformityTable:
+    return TransformityTable.from_dict(DEFAULT_TRANSFORMITIES)
+
+
+@lru_cache(maxsize=8)
+def _read_table(path: str, mtime_ns: int) -> TransformityTable:
+    with open(path, encoding='utf-8') as table_file:
+        return TransformityTable.from_dict(json.load(table_file))
+
+
+@dataclass
+class ChannelEmergy:
+    """
+    Energia e emergia de um canal em todas as leituras.
+    """
+    key: str
+    category: str
+    energy_joules: float
+    uev: float
+    emergy: float
+    included: bool
+
+
+@dataclass
+class EmergyAccounting:
+    """
+    Emergia de uma série: total, por canal e por categoria.
+
+    `total` soma apenas os canais incluídos no total; `by_category` soma todos.
+    `table_digest` resume o conteúdo da tabela de transformidades usada; é None
+    em contabilidades guardadas antes de ele existir.
+    """
+    total: float
+    channels: Dict[str, ChannelEmergy]
+    by_category: Dict[str, float]
+    table_version: str
+    table_digest: Optional[str] = None
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """
+        Converte a contabilidade para um dicionário serializável em JSON.
+        """
+        return {
+            'total_sej': self.total,
+            'table_version': self.table_version,
+            'table_digest': self.table_digest,
+            'by_category': dict(self.by_category),
+            'channels': {
+                key: {
+                    'category': channel.category,
+                    'energy_joules': channel.energy_joules,
+                    'uev': channel.uev,
+                    'emergy': channel.emergy,
+                    'included': channel.included
+                }
+                for key, channel in self.channels.items()
+            }
+        }
+
+    @classmethod
+    def from_metadata(cls, data: Dict[str, Any]) -> 'EmergyAccounting':
+        """
+        Recria a contabilidade a partir do dicionário produzido por to_metadata.
+
+        Args:
+            data: O dicionário guardado nos metadados do cálculo
+
+        Returns:
+            A EmergyAccounting
+        """
+        channels = {
+            key: ChannelEmergy(key, item['category'], float(item['energy_joules']), float(item['uev']),
+                               float(item['emergy']), bool(item['included']))
+            for key, item in data['channels'].items()
+        }
+        return cls(float(data['total_sej']), channels, dict(data['by_category']), data['table_version'],
+                   data.get('table_digest'))
+
+    def merge(self, other: 'EmergyAccounting') -> 'EmergyAccounting':
+        """
+        Combina a contabilidade de duas séries disjuntas, como a de leituras anexadas.
+
+        Args:
+            other: A contabilidade das outras leituras, com a mesma tabela de transformidades
+
+        Returns:
+            A EmergyAccounting de todas as leituras
+
+        Raises:
+            ValueError: Se as tabelas de transformidades forem diferentes: outra
+                versão, outro conteúdo ou outra transformidade em algum canal
+        """
+        if other.table_version != self.table_version:
+            raise ValueError(
+                f"Tabelas de transformidades diferentes: {self.table_version} e {other.table_version}"
+            )
+        if self.table_digest is not None and other.table_digest is not None \
+                and self.table_digest != other.table_digest:
+            raise ValueError(
+                f"Tabelas de transformidades {self.table_version} com conteúdos diferentes"
+            )
+        channels = dict(self.channels)
+        for key, channel in other.channels.items():
+            if key in channels:
+                if (channels[key].uev, channels[key].included) != (channel.uev, channel.included):
+                    raise ValueError(f"Transformidades diferentes para o canal {key}")
+                energy = channels[key].energy_joules + channel.energy_joules
+                channel = ChannelEmergy(key, channel.category, energy, channel.uev,
+                                        energy * channel.uev, channel.included)
+            channels[key] = channel
+        by_category: Dict[str, float] = {}
+        for channel in channels.values():
+            by_category[channel.category] = by_category.get(channel.category, 0.0) + channel.emergy
+        total = sum(channel.emergy for channel in channels.values() if channel.included)
+        return EmergyAccounting(total, channels, by_category, self.table_version,
+                                self.table_digest or other.table_digest)
+
+
+@dataclass
+class EmergyTimeline:
+    """
+    Emergia por período: um valor por balde e por categoria, e o total de cada balde.
+    """
+    period: str
+    timestamps: np.ndarray
+    by_category: Dict[str, np.ndarray]
+    total: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+
+@dataclass
+class EmergyReport:
+    """
+    Contabilidade de emergia de um cálculo e sua divisão por período.
+    """
+    accounting: EmergyAccounting
+    timeline: EmergyTimeline
+
+
+class EmergyEngine:
+    """
+    Calcula a emergia das leituras de medidores a partir da tabela de transformidades.
+    """
+
+    def __init__(self, table: Optional[TransformityTable] = None, interval_seconds: int = RAW_LEVEL.seconds):
+        """
+        Inicializa o motor.
+
+        Args:
+            table: Tabela de transformidades; usa a tabela padrão se omitida
+            interval_seconds: Intervalo de amostragem, em segundos, usado para
+                integrar os canais de potência
+        """
+        self._table = table if table is not None else load_transformity_table()
+        self._interval_seconds = interval_seconds
+
+    @property
+    def table(self) -> TransformityTable:
+        return self._table
+
+    def evaluate(self, series: MeterSeries) -> EmergyAccounting:
+        """
+        Calcula a emergia de todas as leituras de uma série.
+
+        Cada canal com transformidade custa uma soma vetorizada da coluna; canais
+        sem transformidade (tensão, corrente, potência reativa) são ignorados.
+
+        Args:
+            series: A MeterSeries
+
+        Returns:
+            A EmergyAccounting da série
+        """
+        channels: Dict[str, ChannelEmergy] = {}
+        by_category: Dict[str, float] = {}
+        total = 0.0
+        for channel, transformity, joules_per_unit in self._coefficients(series.channels):
+            energy = float(np.nansum(series.column(channel.key))) * joules_per_unit
+            emergy = energy * transformity.uev
+            channels[channel.key] = ChannelEmergy(
+                channel.key, channel.category, energy, transformity.uev, emergy, transformity.include_in_total
+            )
+            by_category[channel.category] = by_category.get(channel.category, 0.0) + emergy
+            if transformity.include_in_total:
+                total += emergy
+        return EmergyAccounting(total, channels, by_category, self._table.version, self._table.digest)
+
+    def evaluate_inputs(self, inputs: Iterable[Any]) -> float:
+        """
+        Calcula a emergia total de entradas avulsas (EmergyInput).
+
+        Cada entrada é convertida como uma leitura de um canal da mesma categoria
+        e unidade; entradas sem transformidade, ou fora do total, são ignoradas.
+
+        Args:
+            inputs: As entradas, com value, unit e category
+
+        Returns:
+            A emergia total, em sej
+        """
+        total = 0.0
+        for input_item in inputs:
+            transformity = self._table.lookup(input_item.category, input_item.unit)
+            if transformity is None or not transformity.include_in_total:
+                continue
+            joules, is_power = ENERGY_UNITS[input_item.unit]
+            if is_power:
+                joules *= self._interval_seconds
+            total += input_item.value * joules * transformity.uev
+        return total
+
+    def report(self, series: MeterSeries, rollups: Optional[RollupPyramid] = None,
+               period: str = DEFAULT_PERIOD) -> EmergyReport:
+        """
+        Calcula a contabilidade de emergia e a divisão por período de uma série.
+
+        Args:
+            series: A MeterSeries ordenada por timestamp
+            rollups: As agregações da série, se já calculadas
+            period: Nome do nível da divisão por período
+
+        Returns:
+            O EmergyReport
+
+        Raises:
+            ValueError: Se o período for desconhecido
+        """
+        timeline = self.timeline(series, rollups, period)
+        return EmergyReport(self.evaluate(series), timeline)
+
+    def timeline(self, series: MeterSeries, rollups: Optional[RollupPyramid] = None,
+                 period: str = DEFAULT_PERIOD) -> EmergyTimeline:
+        """
+        Calcula a emergia por período.
+
+        Usa as somas do nível correspondente da RollupPyramid, de modo que o custo
+        depende do número de baldes e não do número de leituras; sem a pirâmide,
+        agrega a série no nível pedido.
+
+        Args:
+            series: A MeterSeries ordenada por timestamp
+            rollups: As agregações da série, se já calculadas
+            period: Nome do nível ('1min', '15min', '1h', '1d' ou '1month')
+
+        Returns:
+            A EmergyTimeline do período
+
+        Raises:
+            ValueError: Se o período for desconhecido
+        """
+        if period not in LEVELS_BY_NAME:
+            raise ValueError(f"Período desconhecido: {period}; use {', '.join(LEVELS_BY_NAME)}")
+        if rollups is not None and period in rollups.levels:
+            rollup = rollups.level(period)
+        else:
+            rollup = Rollup.from_series(series, LEVELS_BY_NAME[period])
+
+        by_category: Dict[str, np.ndarray] = {}
+        total = np.zeros(len(rollup))
+        for channel, transformity, joules_per_unit in self._coefficients(series.channels):
+            emergy = rollup.sums[channel.key] * (joules_per_unit * transformity.uev)
+            if channel.category in by_category:
+                by_category[channel.category] = by_category[channel.category] + emergy
+            else:
+                by_category[channel.category] = emergy
+            if transformity.include_in_total:
+                total += emergy
+        return EmergyTimeline(period, rollup.timestamps, by_category, total)
+
+    def _coefficients(self, channels: Iterable[MeterChannel]) -> List[Tuple[MeterChannel, Transformity, float]]:
+        """
+        Canais com transformidade e os joules correspondentes a uma unidade de cada leitura.
+        """
+        coefficients = []
+        for channel in channels:
+            transformity = self._table.lookup(channel.category, channel.unit)
+            if transformity is None:
+                continue
+            joules, is_power = ENERGY_UNITS[channel.unit]
+            if is_power:
+                joules *= self._interval_seconds
+            coefficients.append((channel, transformity, joules))
+        return coefficients
@@ -0,0 +1,293 @@
+"""
+Análise de sensibilidade da emergia às transformidades, por Monte Carlo.
+Este arquivo implementa o MonteCarloSensitivity, que sorteia milhares de cenários
+de valores unitários de emergia (UEV) a partir de distribuições por categoria e
+calcula a emergia total de cada cenário sobre a energia já agregada por categoria
+(EmergyAccounting), de modo que cada cenário custa O(categorias) e não O(leituras).
+Os cenários são divididos em blocos de tamanho fixo, cada um com um gerador
+derivado de uma única semente por SeedSequence.spawn; assim o resultado é o mesmo
+para a mesma semente, qualquer que seja o número de processos. Execuções grandes
+distribuem os blocos entre processos de um ProcessPoolExecutor, iniciados por
+forkserver (ou spawn): o servidor roda em threads, e um fork copiaria travas
+mantidas por outras threads no momento da criação do pool.
+"""
+
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from domain.services.emergy_engine import EmergyAccounting
+
+
+# Percentis informados por padrão (intervalos de 90% e 95% e a mediana)
+DEFAULT_PERCENTILES = (2.5, 5.0, 50.0, 95.0, 97.5)
+
+# Cenários sorteados por bloco; fixo para que o resultado não dependa do número de processos
+CHUNK_SCENARIOS = 50_000
+
+# Sementes sorteadas têm 53 bits, para que clientes JavaScript as representem sem perda
+SEED_BITS = 53
+
+# Método de início dos processos do pool; fork não é seguro a partir de um servidor com threads
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+@dataclass(frozen=True)
+class UevDistribution:
+    """
+    Distribuição do UEV (sej/J) de uma categoria.
+
+    Tipos aceitos e parâmetros:
+        lognormal: median, gsd (desvio padrão geométrico, maior ou igual a 1)
+        normal: mean, std (valores negativos são truncados em 0)
+        uniform: low, high
+        triangular: low, mode, high
+    """
+    kind: str
+    params: Tuple[float, ...]
+
+    PARAMETERS = {
+        'lognormal': ('median', 'gsd'),
+        'normal': ('mean', 'std'),
+        'uniform': ('low', 'high'),
+        'triangular': ('low', 'mode', 'high'),
+    }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'UevDistribution':
+        """
+        Cria a distribuição a partir de um dicionário, como {'distribution': 'lognormal', 'median': 1.6e5, 'gsd': 1.5}.
+
+        Args:
+            data: O tipo em 'distribution' e os parâmetros do tipo
+
+        Returns:
+            A UevDistribution
+
+        Raises:
+            ValueError: Se o tipo for desconhecido ou os parâmetros forem inválidos
+        """
+        kind = data.get('distribution')
+        if kind not in cls.PARAMETERS:
+            raise ValueError(f"Distribuição desconhecida: {kind}; use {', '.join(cls.PARAMETERS)}")
+        try:
+            params = tuple(float(data[name]) for name in cls.PARAMETERS[kind])
+        except KeyError as e:
+            raise ValueError(f"Parâmetro ausente na distribuição {kind}: {e.args[0]}") from e
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Parâmetro inválido na distribuição {kind}") from e
+        if not all(np.isfinite(params)):
+            raise ValueError(f"Parâmetro inválido na distribuição {kind}")
+        distribution = cls(kind, params)
+        distribution._validate()
+        return distribution
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """
+        Sorteia valores da distribuição.
+
+        Args:
+            rng: O gerador de números aleatórios
+            size: Quantidade de valores
+
+        Returns:
+            Os valores sorteados
+        """
+        if self.kind == 'lognormal':
+            median, gsd = self.params
+            return rng.lognormal(np.log(median), np.log(gsd), size)
+        if self.kind == 'normal':
+            mean, std = self.params
+            return np.maximum(rng.normal(mean, std, size), 0.0)
+        if self.kind == 'uniform':
+            low, high = self.params
+            return rng.uniform(low, high, size)
+        low, mode, high = self.params
+        return rng.triangular(low, mode, high, size)
+
+    def _validate(self) -> None:
+        """
+        Verifica os parâmetros da distribuição.
+        """
+        if self.kind == 'lognormal':
+            median, gsd = self.params
+            valid = median > 0 and gsd >= 1
+        elif self.kind == 'normal':
+            valid = self.params[1] >= 0
+        elif self.kind == 'uniform':
+            low, high = self.params
+            valid = 0 <= low <= high
+        else:
+            low, mode, high = self.params
+            valid = 0 <= low <= mode <= high and low < high
+        if not valid:
+            raise ValueError(f"Parâmetros inválidos para a distribuição {self.kind}: {self.params}")
+
+
+@dataclass
+class SensitivityResult:
+    """
+    Resultado da análise: percentis da emergia total e de cada categoria nos cenários.
+    """
+    scenarios: int
+    seed: int
+    point_estimate: float
+    mean: float
+    std: float
+    percentiles: Dict[float, float]
+    by_category: Dict[str, Dict[float, float]]
+
+
+@dataclass(frozen=True)
+class _Terms:
+    """
+    Energia por categoria incerta e emergia fixa das demais categorias.
+
+    `included[j]` e `energies[j]` são a energia (J) da categoria j que entra no
+    total e a energia de todos os canais dela; `fixed_total` é a emergia das
+    categorias sem distribuição que entra no total.
+    """
+    categories: Tuple[str, ...]
+    distributions: Tuple[UevDistribution, ...]
+    included: np.ndarray
+    energies: np.ndarray
+    fixed_total: float
+
+
+def run_chunk(terms: _Terms, seed: np.random.SeedSequence, size: int) -> np.ndarray:
+    """
+    Sorteia um bloco de cenários e calcula suas emergias.
+
+    Args:
+        terms: As categorias incertas e a parte fixa da emergia
+        seed: A semente do bloco
+        size: Número de cenários do bloco
+
+    Returns:
+        Uma matriz (cenários × (1 + categorias)) com a emergia total na coluna 0
+        e a emergia de cada categoria incerta nas demais
+    """
+    rng = np.random.default_rng(seed)
+    uevs = np.empty((size, len(terms.categories)))
+    for column, distribution in enumerate(terms.distributions):
+        uevs[:, column] = distribution.sample(rng, size)
+    result = np.empty((size, 1 + len(terms.categories)))
+    result[:, 0] = uevs @ terms.included + terms.fixed_total
+    result[:, 1:] = uevs * terms.energies
+    return result
+
+
+class MonteCarloSensitivity:
+    """
+    Executa a análise de Monte Carlo, em paralelo quando há vários blocos de cenários.
+
+    O pool de processos é criado na primeira utilização e reaproveitado.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_scenarios: int = CHUNK_SCENARIOS):
+        """
+        Inicializa a análise.
+
+        Args:
+            workers: Número de processos; usa o número de CPUs se omitido
+            chunk_scenarios: Cenários por bloco
+        """
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_scenarios = chunk_scenarios
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def run(self, accounting: EmergyAccounting, distributions: Mapping[str, UevDistribution],
+            scenarios: int, seed: Optional[int] = None,
+            percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> SensitivityResult:
+        """
+        Sorteia os cenários e calcula os percentis da emergia.
+
+        Categorias sem distribuição mantêm o UEV da contabilidade.
+
+        Args:
+            accounting: A contabilidade de emergia do cálculo
+            distributions: Distribuição do UEV por categoria
+            scenarios: Número de cenários
+            seed: Semente; sorteada (e devolvida no resultado) se omitida
+            percentiles: Percentis a calcular, entre 0 e 100
+
+        Returns:
+            O SensitivityResult
+
+        Raises:
+            ValueError: Se alguma categoria não tiver emergia no cálculo ou os parâmetros forem inválidos
+        """
+        if scenarios < 1:
+            raise ValueError("O número de cenários deve ser pelo menos 1")
+        if any(not 0 <= p <= 100 for p in percentiles):
+            raise ValueError("Os percentis devem estar entre 0 e 100")
+        terms = self._terms(accounting, distributions)
+        if seed is None:
+            seed = secrets.randbits(SEED_BITS)
+
+        sizes = [self._chunk_scenarios] * (scenarios // self._chunk_scenarios)
+        if scenarios % self._chunk_scenarios:
+            sizes.append(scenarios % self._chunk_scenarios)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+        if len(sizes) <= 1 or self._workers <= 1:
+            chunks = [run_chunk(terms, child, size) for child, size in zip(seeds, sizes)]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers, mp_context=multiprocessing.get_context(START_METHOD)
+                )
+            chunks = list(self._executor.map(run_chunk, [terms] * len(sizes), seeds, sizes))
+        results = np.concatenate(chunks)
+
+        levels = list(percentiles)
+        totals = results[:, 0]
+        by_category = {
+            category: dict(zip(levels, np.percentile(results[:, column + 1], levels).tolist()))
+            for column, category in enumerate(terms.categories)
+        }
+        return SensitivityResult(
+            scenarios=scenarios,
+            seed=seed,
+            point_estimate=accounting.total,
+            mean=float(totals.mean()),
+            std=float(totals.std(ddof=1)) if scenarios > 1 else 0.0,
+            percentiles=dict(zip(levels, np.percentile(totals, levels).tolist())),
+            by_category=by_category
+        )
+
+    def shutdown(self) -> None:
+        """
+        Encerra o pool de processos, se tiver sido criado.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @staticmethod
+    def _terms(accounting: EmergyAccounting, distributions: Mapping[str, UevDistribution]) -> _Terms:
+        """
+        Agrupa a energia dos canais por categoria incerta e soma a emergia fixa.
+        """
+        unknown = [category for category in distributions if category not in accounting.by_category]
+        if unknown:
+            raise ValueError(f"Categorias sem emergia no cálculo: {', '.join(unknown)}")
+
+        categories: List[str] = list(distributions)
+        included = np.zeros(len(categories))
+        energies = np.zeros(len(categories))
+        fixed_total = 0.0
+        for channel in accounting.channels.values():
+            if channel.category in distributions:
+                column = categories.index(channel.category)
+                energies[column] += channel.energy_joules
+                if channel.included:
+                    included[column] += channel.energy_joules
+            elif channel.included:
+                fixed_total += channel.emergy
+        return _Terms(tuple(categories), tuple(distributions[c] for c in categories), included, energies, fixed_total)
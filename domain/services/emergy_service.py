@@ -3,14 +3,44 @@ Serviço de domínio para cálculos de Emergy.
 Este arquivo implementa o serviço de domínio para cálculos de Emergy,
 que encapsula a lógica de negócios relacionada aos cálculos de Emergy
 e atua como uma fachada para a camada de domínio. O serviço utiliza
-o repositório para persistir e recuperar os cálculos.
+o repositório para persistir e recuperar os cálculos, e o EmergyEngine para
+calcular a emergia das leituras de medidores. Novas leituras podem ser anexadas
+a um cálculo existente, atualizando série, agregações, estatísticas e emergia
+a partir do lote; com repositórios que oferecem get_tail, apenas a parte final
+do cálculo gravado é lida.
 
 Feito por André Carbonieri Silva T839FC9
 """
 
-from typing import List, Dict, Any, Optional
-from domain.models.emergy_model import EmergyInput, EmergyCalculation
-from domain.repositories.emergy_repository import EmergyRepository
+from dataclasses import dataclass, field, replace
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from domain.models.emergy_model import CalculationSummary, CalculationTail, EmergyInput, EmergyCalculation, MeterInputsView
+from domain.models.meter_series import MeterSeries, MeterSeriesBuilder
+from domain.models.rollup import RollupPyramid
+from domain.models.streaming_statistics import SeriesAccumulator
+from domain.services.emergy_engine import DEFAULT_PERIOD, EmergyAccounting, EmergyEngine, EmergyReport
+from domain.repositories.emergy_repository import EmergyRepository, PageCursor
+
+
+@dataclass
+class AppendResult:
+    """
+    Resultado de anexar um lote de leituras a um cálculo.
+    
+    Leituras com o horário de uma leitura já existente (ou repetido no lote) são
+    duplicadas; leituras anteriores à última leitura do cálculo, em um horário
+    ainda sem leitura, estão fora de ordem. Ambas são descartadas. `calculation`
+    é o cálculo atualizado quando ele foi carregado inteiro; `summary` está
+    sempre presente.
+    """
+    summary: CalculationSummary
+    accepted: int
+    duplicates: int
+    out_of_order: int
+    calculation: Optional[EmergyCalculation] = field(default=None, repr=False)
 
 
 class EmergyService:
@@ -21,14 +51,17 @@ class EmergyService:
     e atua como uma fachada para a camada de domínio.
     """
     
-    def __init__(self, repository: EmergyRepository):
+    def __init__(self, repository: EmergyRepository, engine: Optional[EmergyEngine] = None):
         """
         Inicializa o serviço com um repositório.
         
         Args:
             repository: Uma implementação de EmergyRepository
+            engine: Motor de emergia das séries; usa a tabela de transformidades
+                padrão se omitido
         """
         self._repository = repository
+        self._engine = engine if engine is not None else EmergyEngine()
     
     def create_calculation(self, inputs: List[Dict[str, Any]], metadata: Dict[str, Any]) -> EmergyCalculation:
         """
@@ -54,13 +87,262 @@ class EmergyService:
         ]
         
         # Cria o cálculo
-        calculation = EmergyCalculation.create(emergy_inputs, metadata)
+        calculation = EmergyCalculation.create(emergy_inputs, metadata,
+                                               self._engine.evaluate_inputs(emergy_inputs))
         
         # Salva no repositório
         self._repository.save(calculation)
         
         return calculation
     
+    def create_calculation_from_series(self, series: MeterSeries, metadata: Dict[str, Any],
+                                       save: bool = True,
+                                       statistics: Optional[SeriesAccumulator] = None) -> EmergyCalculation:
+        """
+        Cria um novo cálculo de emergy a partir de uma série colunar de leituras.
+        
+        As leituras são ordenadas por timestamp, para que consultas por intervalo
+        usem busca binária, e as agregações de 15 minutos, 1 hora, 1 dia e 1 mês
+        são calculadas neste momento e salvas com o cálculo. Os resumos dos canais
+        (`statistics`) são calculados a partir da série se não forem informados;
+        o estado combinável fica em calculation.statistics e apenas o resumo
+        público vai para metadata['statistics'].
+        O total de emergia vem do EmergyEngine, e a contabilidade por canal e
+        categoria é guardada em metadata['emergy'].
+        
+        Args:
+            series: A MeterSeries com as leituras do medidor
+            metadata: Metadados adicionais para o cálculo
+            save: Se False, o cálculo não é salvo; o chamador o salva depois,
+                por exemplo em lote com save_calculations
+            statistics: Resumos dos canais já acumulados durante a análise
+            
+        Returns:
+            Uma nova instância de EmergyCalculation
+        """
+        series = series.sort_by_time()
+        if statistics is None:
+            statistics = SeriesAccumulator.from_series(series)
+        accounting = self._engine.evaluate(series)
+        calculation = EmergyCalculation.create_from_series(
+            series,
+            {**metadata, 'statistics': statistics.to_metadata(), 'emergy': accounting.to_metadata()},
+            accounting.total
+        )
+        calculation.rollups = RollupPyramid.build(series)
+        calculation.statistics = statistics
+        
+        # Salva no repositório
+        if save:
+            self._repository.save(calculation)
+        
+        return calculation
+    
+    def create_calculation_from_batches(self, batches: Iterable[MeterSeries],
+                                        metadata: Dict[str, Any], save: bool = True,
+                                        statistics: Optional[SeriesAccumulator] = None) -> EmergyCalculation:
+        """
+        Cria um novo cálculo de emergy a partir de lotes de leituras recebidos em sequência.
+        
+        Os lotes são anexados conforme chegam e descartados em seguida. Todos os
+        lotes são consumidos antes da criação do cálculo, portanto um gerador pode
+        completar `metadata` e `statistics` ao terminar.
+        
+        Args:
+            batches: Lotes de leituras na ordem do arquivo
+            metadata: Metadados adicionais para o cálculo
+            save: Se False, o cálculo não é salvo
+            statistics: Resumos dos canais, acumulados enquanto os lotes são consumidos
+            
+        Returns:
+            Uma nova instância de EmergyCalculation
+        """
+        builder = MeterSeriesBuilder()
+        for batch in batches:
+            builder.append(batch)
+        
+        return self.create_calculation_from_series(builder.build(), metadata, save, statistics)
+    
+    def save_calculations(self, calculations: List[EmergyCalculation]) -> None:
+        """
+        Salva de uma vez cálculos criados com save=False.
+        
+        Args:
+            calculations: Os cálculos a salvar
+        """
+        self._repository.save_many(calculations)
+    
+    def append_readings(self, calculation: EmergyCalculation, batch: MeterSeries) -> AppendResult:
+        """
+        Anexa um lote de leituras ao fim da série de um cálculo.
+        
+        O lote é ordenado por timestamp; de leituras com o mesmo horário no lote
+        fica a primeira. Apenas leituras posteriores à última do cálculo são
+        aceitas: as demais são contadas como duplicadas ou fora de ordem (ver
+        AppendResult), de modo que reenviar um lote não altera o cálculo. A série,
+        as agregações, as estatísticas e a contabilidade de emergia são
+        atualizadas a partir do lote, sem percorrer as leituras anteriores, e o
+        repositório grava apenas as leituras novas. O cálculo deixa de corresponder
+        ao arquivo de origem, por isso 'content_hash' é removido dos metadados.
+        
+        Args:
+            calculation: Um EmergyCalculation com leituras de medidor
+            batch: As leituras a anexar, com os mesmos canais da série
+            
+        Returns:
+            O AppendResult, com o cálculo atualizado (o próprio cálculo se nenhuma leitura for aceita)
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou os canais forem diferentes
+        """
+        if calculation.series is None:
+            raise ValueError(f"O cálculo {calculation.id} não tem leituras de medidor")
+        series = calculation.series.sort_by_time()
+        batch = batch.sort_by_time()
+        readings, duplicates, out_of_order = self._new_readings(series, batch)
+        if not len(readings):
+            return AppendResult(CalculationSummary.from_calculation(calculation), 0, duplicates, out_of_order, calculation)
+        
+        appended = series.append(readings)
+        if calculation.rollups is not None:
+            rollups = calculation.rollups.append(readings)
+        else:
+            rollups = RollupPyramid.build(appended)
+        if calculation.statistics is not None:
+            statistics = calculation.statistics.copy()
+            statistics.update(readings)
+        else:
+            statistics = SeriesAccumulator.from_series(appended)
+        accounting = self._engine.evaluate(readings)
+        try:
+            accounting = EmergyAccounting.from_metadata(calculation.metadata['emergy']).merge(accounting)
+        except (KeyError, ValueError):
+            # Sem contabilidade guardada, ou guardada com outra tabela de transformidades
+            accounting = self._engine.evaluate(appended)
+        
+        updated = replace(
+            calculation,
+            inputs=MeterInputsView(appended),
+            total_emergy=accounting.total,
+            metadata=self._appended_metadata(calculation.metadata, statistics, accounting, len(readings)),
+            series=appended,
+            rollups=rollups,
+            statistics=statistics
+        )
+        self._repository.append(updated, readings)
+        return AppendResult(CalculationSummary.from_calculation(updated), len(readings), duplicates, out_of_order, updated)
+    
+    def append_to_calculation(self, calculation_id: str, batch: MeterSeries) -> Optional[AppendResult]:
+        """
+        Anexa um lote de leituras a um cálculo gravado, lendo do repositório apenas a parte final.
+        
+        Com repositórios que oferecem get_tail, são lidas somente as leituras
+        gravadas a partir do início do lote, o último balde de cada agregação, as
+        estatísticas e os metadados, e o custo não depende do tamanho da série.
+        Com os demais repositórios, ou com cálculos gravados sem agregações,
+        estatísticas ou contabilidade de emergia compatível, o cálculo é carregado
+        inteiro e o lote anexado por append_readings. As regras de aceitação das
+        leituras são as de append_readings; `calculation` do resultado só é
+        preenchido quando o cálculo é carregado inteiro.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            batch: As leituras a anexar, com os mesmos canais da série
+            
+        Returns:
+            O AppendResult, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou os canais forem diferentes
+            AppendConflictError: Se outro processo anexou leituras ao cálculo durante o append
+        """
+        batch = batch.sort_by_time()
+        tail = self._repository.get_tail(calculation_id, int(batch.timestamps[0]) if len(batch) else None)
+        accounting = None
+        if tail is not None and tail.rollups is not None and tail.statistics is not None:
+            try:
+                accounting = EmergyAccounting.from_metadata(tail.metadata['emergy'])
+            except (KeyError, ValueError):
+                accounting = None
+        if accounting is None:
+            calculation = self._repository.get_by_id(calculation_id)
+            return self.append_readings(calculation, batch) if calculation is not None else None
+        
+        readings, duplicates, out_of_order = self._new_readings(tail.readings, batch)
+        if not len(readings):
+            return AppendResult(tail.to_summary(), 0, duplicates, out_of_order)
+        try:
+            accounting = accounting.merge(self._engine.evaluate(readings))
+        except ValueError:
+            # Contabilidade guardada com outra tabela de transformidades: recalcula sobre a série inteira
+            calculation = self._repository.get_by_id(calculation_id)
+            return self.append_readings(calculation, batch) if calculation is not None else None
+        statistics = tail.statistics.copy()
+        statistics.update(readings)
+        
+        updated = replace(
+            tail,
+            total_emergy=accounting.total,
+            metadata=self._appended_metadata(tail.metadata, statistics, accounting, len(readings)),
+            rows=tail.rows + len(readings),
+            readings=tail.readings.append(readings),
+            rollups=tail.rollups.append(readings),
+            statistics=statistics
+        )
+        self._repository.append_tail(updated, readings)
+        return AppendResult(updated.to_summary(), len(readings), duplicates, out_of_order)
+    
+    @staticmethod
+    def _new_readings(series: MeterSeries, batch: MeterSeries) -> Tuple[MeterSeries, int, int]:
+        """
+        Separa as leituras de um lote ordenado que são posteriores às de uma série.
+        
+        Basta que `series` contenha as leituras a partir do início do lote e a
+        última anterior a ele.
+        
+        Returns:
+            Uma tupla (leituras aceitas, duplicadas, fora de ordem)
+            
+        Raises:
+            ValueError: Se os canais forem diferentes
+        """
+        if [channel.key for channel in batch.channels] != [channel.key for channel in series.channels]:
+            raise ValueError('Os canais das leituras não correspondem aos do cálculo')
+        timestamps = batch.timestamps
+        keep = np.ones(len(batch), dtype=bool)
+        keep[1:] = timestamps[1:] != timestamps[:-1]
+        duplicates = int(len(batch) - np.count_nonzero(keep))
+        out_of_order = 0
+        if len(series):
+            stale = keep & (timestamps <= series.timestamps[-1])
+            if stale.any():
+                positions = np.searchsorted(series.timestamps, timestamps[stale])
+                existing = int(np.count_nonzero(series.timestamps[positions] == timestamps[stale]))
+                duplicates += existing
+                out_of_order = int(np.count_nonzero(stale)) - existing
+                keep &= ~stale
+        readings = MeterSeries(
+            timestamps[keep],
+            {channel.key: batch.column(channel.key)[keep] for channel in batch.channels},
+            batch.channels,
+            sorted_by_time=True
+        )
+        return readings, duplicates, out_of_order
+    
+    @staticmethod
+    def _appended_metadata(metadata: Dict[str, Any], statistics: SeriesAccumulator,
+                           accounting: EmergyAccounting, accepted: int) -> Dict[str, Any]:
+        """
+        Metadados de um cálculo que recebeu leituras; 'content_hash' é removido.
+        """
+        metadata = {key: value for key, value in metadata.items() if key != 'content_hash'}
+        metadata.update({
+            'statistics': statistics.to_metadata(),
+            'emergy': accounting.to_metadata(),
+            'appended_readings': metadata.get('appended_readings', 0) + accepted
+        })
+        return metadata
+    
     def get_calculation(self, calculation_id: str) -> Optional[EmergyCalculation]:
         """
         Recupera um cálculo pelo seu ID.
@@ -73,6 +355,88 @@ class EmergyService:
         """
         return self._repository.get_by_id(calculation_id)
     
+    def get_calculation_statistics(self, calculation_id: str) -> Optional[SeriesAccumulator]:
+        """
+        Recupera os resumos combináveis das leituras de um cálculo.
+        
+        Os resumos são lidos com get_tail, sem carregar a série, quando o
+        repositório oferece esse caminho; cálculos gravados antes dos resumos os
+        recebem a partir da série carregada.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            O SeriesAccumulator, ou None se o cálculo não for encontrado
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor
+        """
+        tail = self._repository.get_tail(calculation_id)
+        if tail is not None and tail.statistics is not None:
+            return tail.statistics
+        calculation = self._repository.get_by_id(calculation_id)
+        if calculation is None:
+            return None
+        if calculation.series is None:
+            raise ValueError(f"O cálculo {calculation_id} não tem leituras de medidor")
+        if calculation.statistics is not None:
+            return calculation.statistics
+        return SeriesAccumulator.from_series(calculation.series)
+    
+    def find_calculation_by_content_hash(self, content_hash: str) -> Optional[EmergyCalculation]:
+        """
+        Recupera o cálculo já criado a partir de um conteúdo, se houver.
+        
+        Args:
+            content_hash: A chave do conteúdo de origem
+            
+        Returns:
+            O EmergyCalculation se encontrado, None caso contrário
+        """
+        return self._repository.get_by_content_hash(content_hash)
+    
+    def emergy_report(self, calculation: EmergyCalculation, period: str = DEFAULT_PERIOD) -> EmergyReport:
+        """
+        Calcula a emergia de um cálculo por canal, categoria e período.
+        
+        Args:
+            calculation: Um EmergyCalculation com leituras de medidor
+            period: Nome do nível da divisão por período
+            
+        Returns:
+            O EmergyReport do cálculo
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor ou o período for desconhecido
+        """
+        if calculation.series is None:
+            raise ValueError(f"O cálculo {calculation.id} não tem leituras de medidor")
+        return self._engine.report(calculation.series, calculation.rollups, period)
+    
+    def emergy_accounting(self, calculation: EmergyCalculation) -> EmergyAccounting:
+        """
+        Obtém a emergia por canal e categoria de um cálculo.
+        
+        Usa a contabilidade guardada nos metadados quando o cálculo foi criado com
+        ela, sem percorrer as leituras; caso contrário, calcula a partir da série.
+        
+        Args:
+            calculation: Um EmergyCalculation com leituras de medidor
+            
+        Returns:
+            A EmergyAccounting do cálculo
+            
+        Raises:
+            ValueError: Se o cálculo não tiver leituras de medidor nem contabilidade guardada
+        """
+        stored = calculation.metadata.get('emergy')
+        if stored:
+            return EmergyAccounting.from_metadata(stored)
+        if calculation.series is None:
+            raise ValueError(f"O cálculo {calculation.id} não tem leituras de medidor")
+        return self._engine.evaluate(calculation.series)
+    
     def get_all_calculations(self) -> List[EmergyCalculation]:
         """
         Recupera todos os cálculos.
@@ -82,6 +446,44 @@ class EmergyService:
         """
         return self._repository.get_all()
     
+    def get_calculations_page(self, limit: int, after: Optional[PageCursor] = None) -> List[EmergyCalculation]:
+        """
+        Recupera uma página de cálculos em ordem de criação.
+        
+        Args:
+            limit: Número máximo de cálculos na página
+            after: Cursor do último cálculo da página anterior
+            
+        Returns:
+            Os cálculos da página
+        """
+        return self._repository.get_page(limit, after)
+    
+    def get_calculation_summary(self, calculation_id: str) -> Optional[CalculationSummary]:
+        """
+        Recupera o resumo de um cálculo, sem as entradas.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            O CalculationSummary se encontrado, None caso contrário
+        """
+        return self._repository.get_summary(calculation_id)
+    
+    def get_calculation_summaries(self, limit: int, after: Optional[PageCursor] = None) -> List[CalculationSummary]:
+        """
+        Recupera uma página de resumos de cálculos, sem as entradas.
+        
+        Args:
+            limit: Número máximo de resumos na página
+            after: Cursor do último cálculo da página anterior
+            
+        Returns:
+            Os resumos da página
+        """
+        return self._repository.get_summary_page(limit, after)
+    
     def delete_calculation(self, calculation_id: str) -> bool:
         """
         Exclui um cálculo pelo seu ID.
@@ -0,0 +1,186 @@
+"""
+Redução de séries temporais de medidores para gráficos.
+Este arquivo implementa dois algoritmos que preservam a forma da série ao reduzir
+o número de pontos: Largest-Triangle-Three-Buckets (LTTB), que escolhe em cada
+balde o ponto que forma o maior triângulo com os vizinhos, e mínimo/máximo por
+balde, que mantém os picos e vales de cada intervalo. O SeriesDownsampler aplica
+um deles aos canais de uma MeterSeries dentro de um intervalo de tempo e devolve
+as leituras escolhidas alinhadas em uma única coluna de timestamps, de modo que o
+tamanho da resposta depende do número de pontos pedido e não do tamanho da série.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from domain.models.meter_series import MeterSeries
+
+
+LTTB = 'lttb'
+MIN_MAX = 'minmax'
+
+METHODS = (LTTB, MIN_MAX)
+
+# Menor número de pontos que cada algoritmo consegue produzir
+MIN_POINTS = {LTTB: 3, MIN_MAX: 2}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Escolhe os pontos de uma série com o algoritmo Largest-Triangle-Three-Buckets.
+
+    O primeiro e o último ponto são sempre mantidos; os demais são divididos em
+    `points - 2` baldes com o mesmo número de pontos, e de cada balde é escolhido o
+    ponto que forma o triângulo de maior área com o ponto escolhido no balde
+    anterior e com a média do balde seguinte.
+
+    Args:
+        x: Coordenadas x em ordem crescente (por exemplo, timestamps)
+        y: Valores, sem NaN
+        points: Número de pontos desejado (pelo menos 3)
+
+    Returns:
+        Os índices escolhidos, em ordem crescente
+    """
+    size = len(x)
+    if points >= size or points < 3:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # edges[k] é o início do balde k; o último valor é o índice do último ponto
+    every = (size - 2) / (points - 2)
+    edges = (np.arange(points - 1) * every).astype(np.int64) + 1
+    edges[-1] = size - 1
+
+    # Média de cada balde "seguinte": baldes 1..points-3 e, por fim, o último ponto
+    counts = np.diff(np.append(edges[1:], size))
+    next_x = np.add.reduceat(x, edges[1:]) / counts
+    next_y = np.add.reduceat(y, edges[1:]) / counts
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    anchor = 0
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        bucket_x = x[start:stop]
+        bucket_y = y[start:stop]
+        area = np.abs(
+            (x[anchor] - next_x[bucket]) * (bucket_y - y[anchor])
+            - (x[anchor] - bucket_x) * (next_y[bucket] - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    selected[-1] = size - 1
+    return selected
+
+
+def min_max_indices(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Escolhe o mínimo e o máximo de cada balde de uma série.
+
+    Args:
+        y: Valores, sem NaN
+        points: Número máximo de pontos desejado (dois por balde)
+
+    Returns:
+        Os índices escolhidos, em ordem crescente
+    """
+    size = len(y)
+    buckets = points // 2
+    if points >= size or buckets < 1:
+        return np.arange(size)
+
+    starts = np.unique(np.linspace(0, size, buckets + 1).astype(np.int64)[:-1])
+    counts = np.diff(np.append(starts, size))
+    bucket_of = np.repeat(np.arange(len(starts)), counts)
+
+    chosen = []
+    for reduce in (np.minimum, np.maximum):
+        extremes = reduce.reduceat(y, starts)
+        # Primeira ocorrência do extremo em cada balde
+        hits = np.flatnonzero(y == extremes[bucket_of])
+        _, first = np.unique(bucket_of[hits], return_index=True)
+        chosen.append(hits[first])
+    return np.unique(np.concatenate(chosen))
+
+
+@dataclass
+class DownsampledSeries:
+    """
+    Resultado da redução de uma série: leituras escolhidas alinhadas por timestamp.
+    """
+    timestamps: np.ndarray
+    columns: Dict[str, np.ndarray]
+    method: str
+    source_points: int
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+class SeriesDownsampler:
+    """
+    Reduz os canais de uma MeterSeries a um número limitado de pontos.
+
+    O orçamento de pontos é dividido entre os canais pedidos; cada canal é reduzido
+    separadamente (ignorando valores ausentes) e a resposta contém a união das
+    leituras escolhidas, com o valor de todos os canais em cada uma delas.
+    """
+
+    def downsample(self, series: MeterSeries, channels: Sequence[str], points: int,
+                   start: Optional[int] = None, end: Optional[int] = None,
+                   method: str = LTTB) -> DownsampledSeries:
+        """
+        Reduz uma série dentro de um intervalo de tempo.
+
+        Args:
+            series: A MeterSeries de origem
+            channels: Chaves dos canais a incluir
+            points: Número máximo de leituras no resultado
+            start: Primeiro timestamp incluído (segundos desde a época), ou None
+            end: Último timestamp incluído (segundos desde a época), ou None
+            method: LTTB ou MIN_MAX
+
+        Returns:
+            O DownsampledSeries com as leituras escolhidas em ordem cronológica
+
+        Raises:
+            ValueError: Se o método, os canais ou o número de pontos forem inválidos
+        """
+        if method not in METHODS:
+            raise ValueError(f"Método de redução desconhecido: {method}")
+        if points < MIN_POINTS[method]:
+            raise ValueError(f"O método {method} precisa de pelo menos {MIN_POINTS[method]} pontos")
+        unknown = [key for key in channels if key not in series.columns]
+        if unknown:
+            raise ValueError(f"Canais desconhecidos: {', '.join(unknown)}")
+
+        # Recorte sem cópia, localizado por busca binária
+        selected = series.sort_by_time().time_range(start, end)
+        timestamps = selected.timestamps
+        columns = {key: selected.column(key) for key in channels}
+
+        if len(selected) > points and channels:
+            budget = max(MIN_POINTS[method], points // len(channels))
+            chosen = np.unique(np.concatenate([
+                self._reduce(timestamps, columns[key], budget, method) for key in channels
+            ]))
+            timestamps = timestamps[chosen]
+            columns = {key: column[chosen] for key, column in columns.items()}
+
+        return DownsampledSeries(timestamps, columns, method, len(selected))
+
+    @staticmethod
+    def _reduce(timestamps: np.ndarray, values: np.ndarray, budget: int, method: str) -> np.ndarray:
+        """
+        Reduz um canal, considerando apenas as leituras com valor.
+        """
+        present = np.flatnonzero(~np.isnan(values))
+        if len(present) <= budget:
+            return present
+        if method == LTTB:
+            return present[lttb_indices(timestamps[present], values[present], budget)]
+        return present[min_max_indices(values[present], budget)]
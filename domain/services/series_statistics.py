@@ -0,0 +1,338 @@
+"""
+Estatísticas descritivas e correlação das leituras de medidores.
+Este arquivo implementa o SeriesStatistics, que calcula com operações vetorizadas
+do NumPy, sobre todas as leituras de uma MeterSeries, as estatísticas de cada canal
+(contagem, ausentes, média, desvio padrão, mínimo, máximo e percentis), ou as lê dos
+resumos acumulados na ingestão (SeriesAccumulator), e a matriz
+de correlação de Pearson entre canais. A correlação usa, para cada par de canais,
+as leituras em que os dois têm valor, e é acumulada em blocos de linhas para que a
+memória usada não dependa do tamanho da série. Para gráficos de dispersão, o
+histograma 2-D de dois canais e o ajuste linear por mínimos quadrados resumem
+todas as leituras em um tamanho que depende apenas do número de faixas.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from domain.models.meter_series import MeterSeries
+from domain.models.streaming_statistics import SeriesAccumulator
+
+
+# Percentis informados para cada canal
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass
+class ChannelStatistics:
+    """
+    Estatísticas descritivas de um canal; os valores são NaN se o canal não tiver leituras.
+    """
+    key: str
+    count: int
+    missing: int
+    mean: float
+    std: float
+    minimum: float
+    maximum: float
+    percentiles: Dict[int, float]
+
+
+@dataclass
+class CorrelationMatrix:
+    """
+    Matriz de correlação de Pearson entre canais.
+
+    `counts[i][j]` é o número de leituras em que os canais i e j têm valor; a
+    correlação é NaN quando um dos canais é constante nessas leituras.
+    """
+    channels: List[str]
+    matrix: np.ndarray
+    counts: np.ndarray
+
+    def select(self, channels: Sequence[str]) -> 'CorrelationMatrix':
+        """
+        Restringe a matriz a alguns canais, na ordem pedida.
+
+        Args:
+            channels: Chaves dos canais
+
+        Returns:
+            Um novo CorrelationMatrix
+
+        Raises:
+            ValueError: Se algum canal não estiver na matriz
+        """
+        unknown = [key for key in channels if key not in self.channels]
+        if unknown:
+            raise ValueError(f"Canais desconhecidos: {', '.join(unknown)}")
+        positions = [self.channels.index(key) for key in channels]
+        grid = np.ix_(positions, positions)
+        return CorrelationMatrix(list(channels), self.matrix[grid], self.counts[grid])
+
+
+@dataclass
+class LinearFit:
+    """
+    Reta ajustada por mínimos quadrados (y = slope · x + intercept) e seu R².
+
+    Os valores são NaN se x for constante; o R² também é NaN se y for constante.
+    """
+    slope: float
+    intercept: float
+    r_squared: float
+
+
+@dataclass
+class ScatterDensity:
+    """
+    Histograma 2-D de dois canais e a reta ajustada entre eles.
+
+    `counts[i][j]` é o número de leituras com x na faixa i (entre `x_edges[i]` e
+    `x_edges[i + 1]`) e y na faixa j.
+    """
+    x: str
+    y: str
+    x_edges: np.ndarray
+    y_edges: np.ndarray
+    counts: np.ndarray
+    points: int
+    fit: LinearFit
+
+
+class SeriesStatistics:
+    """
+    Calcula estatísticas e correlações sobre todas as leituras de uma MeterSeries.
+    """
+
+    # Linhas processadas por vez ao acumular a correlação
+    CHUNK_ROWS = 262144
+
+    def describe(self, series: MeterSeries,
+                 channels: Optional[Sequence[str]] = None) -> Dict[str, ChannelStatistics]:
+        """
+        Calcula as estatísticas descritivas de cada canal.
+
+        Args:
+            series: A MeterSeries
+            channels: Chaves dos canais; todos os canais da série se omitido
+
+        Returns:
+            Um dicionário de ChannelStatistics por chave de canal, na ordem dos canais
+
+        Raises:
+            ValueError: Se algum canal não existir na série
+        """
+        channels = self._channels(series, channels)
+        return {key: self._describe_column(key, series.column(key)) for key in channels}
+
+    def summarize(self, accumulator: SeriesAccumulator,
+                  channels: Optional[Sequence[str]] = None) -> Dict[str, ChannelStatistics]:
+        """
+        Monta as estatísticas descritivas de cada canal a partir dos resumos acumulados.
+
+        Contagem, média, desvio padrão, mínimo e máximo são exatos; os percentis
+        são estimados pelo t-digest de cada canal.
+
+        Args:
+            accumulator: O SeriesAccumulator do cálculo
+            channels: Chaves dos canais; todos os canais acumulados se omitido
+
+        Returns:
+            Um dicionário de ChannelStatistics por chave de canal, na ordem dos canais
+
+        Raises:
+            ValueError: Se algum canal não tiver sido acumulado
+        """
+        keys = list(accumulator.channels)
+        unknown = [key for key in channels or () if key not in keys]
+        if unknown:
+            raise ValueError(f"Canais desconhecidos: {', '.join(unknown)}")
+        statistics = {}
+        for key in channels or keys:
+            channel = accumulator.channels[key]
+            if channel.count == 0:
+                nan = float('nan')
+                statistics[key] = ChannelStatistics(key, 0, channel.missing, nan, nan, nan, nan, {p: nan for p in PERCENTILES})
+                continue
+            statistics[key] = ChannelStatistics(
+                key, channel.count, channel.missing, float(channel.mean),
+                float(np.sqrt(channel.variance)) if channel.count > 1 else 0.0,
+                float(channel.minimum), float(channel.maximum),
+                {p: float(channel.percentile(p)) for p in PERCENTILES}
+            )
+        return statistics
+
+    def correlation(self, series: MeterSeries,
+                    channels: Optional[Sequence[str]] = None) -> CorrelationMatrix:
+        """
+        Calcula a correlação de Pearson entre todos os pares de canais.
+
+        Cada par usa apenas as leituras em que os dois canais têm valor. As somas
+        são acumuladas em blocos de `CHUNK_ROWS` linhas como produtos de matrizes
+        (canais × linhas), com os valores deslocados pela média de cada canal para
+        evitar perda de precisão.
+
+        Args:
+            series: A MeterSeries
+            channels: Chaves dos canais; todos os canais da série se omitido
+
+        Returns:
+            O CorrelationMatrix dos canais
+
+        Raises:
+            ValueError: Se algum canal não existir na série
+        """
+        channels = self._channels(series, channels)
+        size = len(channels)
+        shift = np.array([self._mean(series.column(key)) for key in channels]).reshape(size, 1)
+        shift[np.isnan(shift)] = 0.0
+
+        # Somas sobre as leituras em que i e j têm valor:
+        # pairs = Σ 1, sums[i, j] = Σ xi, squares[i, j] = Σ xi², products[i, j] = Σ xi·xj
+        pairs = np.zeros((size, size))
+        sums = np.zeros((size, size))
+        squares = np.zeros((size, size))
+        products = np.zeros((size, size))
+
+        for start in range(0, len(series), self.CHUNK_ROWS):
+            stop = start + self.CHUNK_ROWS
+            block = np.vstack([series.column(key)[start:stop] for key in channels]) - shift
+            present = ~np.isnan(block)
+            block[~present] = 0.0
+            weights = present.astype(np.float64)
+
+            pairs += weights @ weights.T
+            sums += block @ weights.T
+            squares += (block * block) @ weights.T
+            products += block @ block.T
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = products - sums * sums.T / pairs
+            variance = squares - sums * sums / pairs
+            matrix = covariance / np.sqrt(variance * variance.T)
+        matrix[~np.isfinite(matrix)] = np.nan
+        np.clip(matrix, -1.0, 1.0, out=matrix)
+        constant = np.isnan(np.diag(matrix))
+        matrix[np.diag_indices(size)] = np.where(constant, np.nan, 1.0)
+
+        return CorrelationMatrix(list(channels), matrix, pairs.astype(np.int64))
+
+    def scatter(self, series: MeterSeries, x: str, y: str, bins: int) -> ScatterDensity:
+        """
+        Calcula o histograma 2-D de dois canais e o ajuste linear de y em função de x.
+
+        Usa as leituras em que os dois canais têm valor. As faixas têm a mesma
+        largura e cobrem do menor ao maior valor de cada canal.
+
+        Args:
+            series: A MeterSeries
+            x: Chave do canal do eixo x
+            y: Chave do canal do eixo y
+            bins: Número de faixas em cada eixo
+
+        Returns:
+            O ScatterDensity dos dois canais
+
+        Raises:
+            ValueError: Se algum canal não existir na série ou `bins` for menor que 1
+        """
+        self._channels(series, [x, y])
+        if bins < 1:
+            raise ValueError("O número de faixas deve ser pelo menos 1")
+
+        x_values = series.column(x)
+        y_values = series.column(y)
+        present = ~(np.isnan(x_values) | np.isnan(y_values))
+        if not present.all():
+            x_values = x_values[present]
+            y_values = y_values[present]
+
+        x_edges, x_bins = self._bin(x_values, bins)
+        y_edges, y_bins = self._bin(y_values, bins)
+        counts = np.bincount(x_bins * bins + y_bins, minlength=bins * bins).reshape(bins, bins)
+
+        return ScatterDensity(x, y, x_edges, y_edges, counts, len(x_values), self._fit(x_values, y_values))
+
+    @staticmethod
+    def _bin(values: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Divide o intervalo dos valores em faixas iguais e devolve (limites, faixa de cada valor).
+
+        Como em np.histogram, um intervalo vazio é alargado em 0,5 para cada lado.
+        """
+        if not len(values):
+            return np.linspace(0.0, 1.0, bins + 1), np.empty(0, dtype=np.int64)
+        low, high = float(values.min()), float(values.max())
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, bins + 1)
+        indices = ((values - low) * (bins / (high - low))).astype(np.int64)
+        # O maior valor pertence à última faixa, que é fechada à direita
+        np.minimum(indices, bins - 1, out=indices)
+        return edges, indices
+
+    @staticmethod
+    def _fit(x: np.ndarray, y: np.ndarray) -> LinearFit:
+        """
+        Ajusta y = slope · x + intercept por mínimos quadrados, com somas centradas.
+        """
+        nan = float('nan')
+        if len(x) < 2:
+            return LinearFit(nan, nan, nan)
+        x_mean = float(x.mean())
+        y_mean = float(y.mean())
+        dx = x - x_mean
+        dy = y - y_mean
+        sxx = float(dx @ dx)
+        syy = float(dy @ dy)
+        sxy = float(dx @ dy)
+        if sxx == 0:
+            return LinearFit(nan, nan, nan)
+        slope = sxy / sxx
+        r_squared = sxy * sxy / (sxx * syy) if syy > 0 else nan
+        return LinearFit(slope, y_mean - slope * x_mean, r_squared)
+
+    @staticmethod
+    def _channels(series: MeterSeries, channels: Optional[Sequence[str]]) -> List[str]:
+        """
+        Valida os canais pedidos; devolve todos os canais da série se omitidos.
+        """
+        if channels is None:
+            return [channel.key for channel in series.channels]
+        unknown = [key for key in channels if key not in series.columns]
+        if unknown:
+            raise ValueError(f"Canais desconhecidos: {', '.join(unknown)}")
+        return list(channels)
+
+    @staticmethod
+    def _mean(values: np.ndarray) -> float:
+        """
+        Média das leituras com valor, ou NaN se não houver nenhuma.
+        """
+        present = values[~np.isnan(values)]
+        return float(present.mean()) if len(present) else float('nan')
+
+    @staticmethod
+    def _describe_column(key: str, values: np.ndarray) -> ChannelStatistics:
+        """
+        Calcula as estatísticas de uma coluna, ignorando os valores ausentes.
+        """
+        present = values[~np.isnan(values)]
+        count = len(present)
+        missing = len(values) - count
+        if count == 0:
+            nan = float('nan')
+            return ChannelStatistics(key, 0, missing, nan, nan, nan, nan, {p: nan for p in PERCENTILES})
+
+        mean = float(present.mean())
+        std = float(present.std(ddof=1)) if count > 1 else 0.0
+        minimum = float(present.min())
+        maximum = float(present.max())
+        # `present` é uma cópia, então o cálculo dos percentis pode reordená-la
+        percentiles = np.percentile(present, PERCENTILES, overwrite_input=True)
+        return ChannelStatistics(
+            key, count, missing, mean, std, minimum, maximum,
+            {p: float(value) for p, value in zip(PERCENTILES, percentiles)}
+        )
@@ -0,0 +1,145 @@
+"""
+Abertura de uploads compactados como fluxos de texto descompactados.
+Este arquivo reconhece os formatos aceitos no upload (.txt, .txt.gz, .gz, .zip e
+.bz2) pela extensão do nome do arquivo e devolve um fluxo binário que descompacta
+o conteúdo sob demanda, bloco a bloco, sem inflar o arquivo inteiro na memória.
+"""
+
+import bz2
+import gzip
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+
+PLAIN = 'none'
+GZIP = 'gzip'
+BZIP2 = 'bz2'
+ZIP = 'zip'
+
+# Extensões aceitas, da mais específica para a mais genérica
+SUPPORTED_EXTENSIONS = (
+    ('.txt.gz', GZIP),
+    ('.txt.bz2', BZIP2),
+    ('.gz', GZIP),
+    ('.bz2', BZIP2),
+    ('.zip', ZIP),
+    ('.txt', PLAIN),
+)
+
+# Uploads não pesquisáveis são copiados para disco a partir deste tamanho
+_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class UnsupportedUploadError(ValueError):
+    """
+    Erro lançado quando o arquivo enviado não está em um formato aceito.
+    """
+
+
+def detect_compression(filename: str) -> Optional[str]:
+    """
+    Identifica a compressão de um upload pela extensão do nome do arquivo.
+
+    Args:
+        filename: O nome do arquivo enviado
+
+    Returns:
+        O tipo de compressão, ou None se a extensão não for aceita
+    """
+    lowered = (filename or '').lower()
+    for extension, compression in SUPPORTED_EXTENSIONS:
+        if lowered.endswith(extension):
+            return compression
+    return None
+
+
+def is_supported_upload(filename: str) -> bool:
+    """
+    Verifica se o nome do arquivo tem uma extensão aceita.
+
+    Args:
+        filename: O nome do arquivo enviado
+
+    Returns:
+        True se o arquivo pode ser processado, False caso contrário
+    """
+    return detect_compression(filename) is not None
+
+
+@contextmanager
+def open_upload(filename: str, stream: BinaryIO) -> Iterator[BinaryIO]:
+    """
+    Abre um upload como fluxo binário descompactado.
+
+    Args:
+        filename: O nome do arquivo enviado, usado para escolher o formato
+        stream: O fluxo binário com o conteúdo enviado
+
+    Yields:
+        Um fluxo binário com o texto descompactado
+
+    Raises:
+        UnsupportedUploadError: Se a extensão não for aceita ou o zip não tiver um arquivo de texto
+    """
+    compression = detect_compression(filename)
+    if compression is None:
+        raise UnsupportedUploadError(f"Formato de arquivo não suportado: {filename}")
+
+    if compression == PLAIN:
+        yield stream
+    elif compression == GZIP:
+        with gzip.GzipFile(fileobj=stream, mode='rb') as decompressed:
+            yield decompressed
+    elif compression == BZIP2:
+        with bz2.BZ2File(stream, mode='rb') as decompressed:
+            yield decompressed
+    else:
+        with _seekable(stream) as seekable, zipfile.ZipFile(seekable) as archive:
+            with archive.open(_pick_member(archive)) as decompressed:
+                yield decompressed
+
+
+def _pick_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    """
+    Escolhe o arquivo de texto dentro de um zip.
+
+    Dá preferência ao primeiro membro .txt; se não houver, aceita um zip com um único arquivo.
+
+    Args:
+        archive: O zip aberto
+
+    Returns:
+        O membro a ser lido
+    """
+    members = [member for member in archive.infolist() if not member.is_dir()]
+    for member in members:
+        if member.filename.lower().endswith('.txt') and not member.filename.startswith('__MACOSX/'):
+            return member
+    if len(members) == 1:
+        return members[0]
+    raise UnsupportedUploadError('O arquivo zip não contém um arquivo TXT')
+
+
+@contextmanager
+def _seekable(stream: BinaryIO) -> Iterator[BinaryIO]:
+    """
+    Garante um fluxo pesquisável, necessário para ler o diretório central do zip.
+
+    Args:
+        stream: O fluxo original
+
+    Yields:
+        O próprio fluxo, se já for pesquisável, ou uma cópia temporária
+    """
+    seekable = getattr(stream, 'seekable', None)
+    if seekable is not None and seekable():
+        yield stream
+        return
+
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) as spooled:
+        shutil.copyfileobj(stream, spooled)
+        spooled.seek(0)
+        yield spooled
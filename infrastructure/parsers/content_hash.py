@@ -0,0 +1,96 @@
+"""
+Hash do conteúdo de uploads, para reconhecer arquivos repetidos.
+Este arquivo calcula o resumo BLAKE2b do conteúdo enviado enquanto ele é copiado
+para disco, sem uma leitura extra, e monta a chave de deduplicação a partir do
+resumo e da compressão do arquivo. Dois uploads com a mesma chave produzem o
+mesmo cálculo, então o segundo pode reutilizar o cálculo do primeiro.
+"""
+
+import hashlib
+from typing import BinaryIO
+
+ALGORITHM = 'blake2b'
+
+# Bytes lidos por vez ao copiar ou ler um arquivo
+CHUNK_SIZE = 1024 * 1024
+
+
+def new_hasher():
+    """
+    Cria o objeto de hash usado nas chaves de conteúdo.
+    """
+    return hashlib.blake2b(digest_size=32)
+
+
+def spool(source: BinaryIO, target: BinaryIO, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Copia um fluxo para outro calculando o hash do conteúdo copiado.
+
+    Args:
+        source: Fluxo binário de origem, como o upload da requisição
+        target: Fluxo binário de destino, como um arquivo temporário
+        chunk_size: Quantidade de bytes lida por vez
+
+    Returns:
+        O resumo hexadecimal do conteúdo
+    """
+    hasher = new_hasher()
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return hasher.hexdigest()
+        hasher.update(chunk)
+        target.write(chunk)
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Calcula o hash de um conteúdo já carregado na memória.
+
+    Args:
+        data: O conteúdo
+
+    Returns:
+        O resumo hexadecimal do conteúdo
+    """
+    hasher = new_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Calcula o hash do conteúdo de um arquivo em disco.
+
+    Args:
+        path: Caminho do arquivo
+        chunk_size: Quantidade de bytes lida por vez
+
+    Returns:
+        O resumo hexadecimal do conteúdo
+    """
+    hasher = new_hasher()
+    with open(path, 'rb') as data_file:
+        while True:
+            chunk = data_file.read(chunk_size)
+            if not chunk:
+                return hasher.hexdigest()
+            hasher.update(chunk)
+
+
+def content_key(digest: str, compression: str) -> str:
+    """
+    Monta a chave de deduplicação de um upload.
+
+    A compressão faz parte da chave porque os mesmos bytes são lidos de forma
+    diferente conforme a extensão do arquivo. A chave só tem letras, dígitos e
+    hífens, para poder ser usada como nome de arquivo.
+
+    Args:
+        digest: O resumo hexadecimal do conteúdo
+        compression: O tipo de compressão detectado pelo nome do arquivo
+
+    Returns:
+        A chave, no formato '<algoritmo>-<compressão>-<resumo>'
+    """
+    return f'{ALGORITHM}-{compression}-{digest}'
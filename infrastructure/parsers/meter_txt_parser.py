@@ -0,0 +1,435 @@
+"""
+Analisador em lote de arquivos TXT de medidores de energia.
+Este arquivo implementa o MeterTxtParser, que detecta o dialeto do arquivo uma
+única vez (separador e presença de cabeçalho) e decodifica todas as colunas
+numéricas diretamente em arrays NumPy em uma só passada. Data e hora são
+quebradas em campos numéricos (dia, mês, ano, hora, minuto, segundo) pelo mesmo
+separador, de modo que o bloco inteiro é lido por np.loadtxt e os timestamps são
+calculados de forma vetorizada. Marcadores de valor ausente ('?' ou campo vazio)
+viram NaN, e linhas malformadas são descartadas e contadas, sem exceções por linha.
+Arquivos grandes podem ser lidos como fluxo (parse_stream), em blocos de tamanho
+fixo cortados no último fim de linha, para que a memória usada pelo texto não
+dependa do tamanho do arquivo.
+"""
+
+import io
+import re
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from domain.models.meter_series import METER_CHANNELS, SECONDS_PER_DAY, MeterSeries
+from domain.models.streaming_statistics import SeriesAccumulator
+
+
+DATE_HEADER = 'Date'
+TIME_HEADER = 'Time'
+
+DEFAULT_COLUMNS: Tuple[str, ...] = (DATE_HEADER, TIME_HEADER) + tuple(channel.header for channel in METER_CHANNELS)
+
+# Separadores tentados em ordem, como em processFileData (emergy_calculator.js)
+SEPARATORS: Tuple[str, ...] = (';', ',', '\t', ' ')
+
+# Tamanho dos blocos lidos do fluxo de upload
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+_BOM = b'\xef\xbb\xbf'
+_FIELD = b';'
+_NUMBER = rb'(?:[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|nan)'
+_KNOWN_HEADERS = {name.lower() for name in DEFAULT_COLUMNS}
+
+
+@dataclass(frozen=True)
+class MeterDialect:
+    """
+    Dialeto detectado de um arquivo de medidor.
+    """
+    separator: str = ';'
+    has_header: bool = True
+    columns: Tuple[str, ...] = DEFAULT_COLUMNS
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        Converte o dialeto para um dicionário serializável.
+
+        Returns:
+            Um dicionário com o separador e a presença de cabeçalho
+        """
+        return {'separator': self.separator, 'has_header': self.has_header}
+
+
+@dataclass
+class ParseResult:
+    """
+    Resultado da análise de um arquivo ou bloco de linhas.
+
+    `statistics` resume os canais do bloco, calculado na mesma passada da análise.
+    """
+    series: MeterSeries
+    rejected_rows: int = 0
+    missing_values: int = 0
+    dialect: MeterDialect = field(default_factory=MeterDialect)
+    statistics: Optional[SeriesAccumulator] = None
+
+    @property
+    def rows(self) -> int:
+        """
+        Número de leituras aceitas.
+        """
+        return len(self.series)
+
+    def to_metadata(self) -> Dict[str, object]:
+        """
+        Resume a análise para ser guardada nos metadados do cálculo.
+
+        Returns:
+            Um dicionário com as contagens e o dialeto
+        """
+        return {
+            'rows': self.rows,
+            'rejected_rows': self.rejected_rows,
+            'missing_values': self.missing_values,
+            'dialect': self.dialect.to_dict()
+        }
+
+
+@dataclass
+class ParseSummary:
+    """
+    Acumula as contagens e os resumos dos canais dos ParseResult de uma análise em blocos.
+    """
+    rows: int = 0
+    rejected_rows: int = 0
+    missing_values: int = 0
+    dialect: Optional[MeterDialect] = None
+    statistics: SeriesAccumulator = field(default_factory=SeriesAccumulator)
+
+    def add(self, result: ParseResult) -> MeterSeries:
+        """
+        Soma as contagens de um bloco e combina o resumo dos seus canais.
+
+        Args:
+            result: O resultado do bloco
+
+        Returns:
+            A série do bloco, para uso em geradores
+        """
+        self.rows += result.rows
+        self.rejected_rows += result.rejected_rows
+        self.missing_values += result.missing_values
+        self.dialect = result.dialect
+        if result.statistics is not None:
+            self.statistics.merge(result.statistics)
+        else:
+            self.statistics.update(result.series)
+        return result.series
+
+    def to_metadata(self) -> Dict[str, object]:
+        """
+        Resume a análise para ser guardada nos metadados do cálculo.
+
+        Returns:
+            Um dicionário com as contagens e o dialeto
+        """
+        return {
+            'rows': self.rows,
+            'rejected_rows': self.rejected_rows,
+            'missing_values': self.missing_values,
+            'dialect': (self.dialect or MeterDialect()).to_dict()
+        }
+
+
+def days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """
+    Converte datas do calendário gregoriano em dias desde 01/01/1970, de forma vetorizada.
+
+    Args:
+        year: Anos
+        month: Meses (1 a 12)
+        day: Dias do mês
+
+    Returns:
+        Um array int64 com os dias desde a época
+    """
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+class MeterTxtParser:
+    """
+    Analisador vetorizado de arquivos TXT de medidores.
+
+    O dialeto é detectado uma vez pela primeira linha; depois disso cada bloco
+    de linhas é convertido em colunas com uma única chamada a np.loadtxt.
+    """
+
+    def sniff(self, sample: Union[str, bytes]) -> MeterDialect:
+        """
+        Detecta o separador e a presença de cabeçalho a partir do início do arquivo.
+
+        Args:
+            sample: Os primeiros bytes do arquivo (ao menos a primeira linha)
+
+        Returns:
+            O MeterDialect detectado
+        """
+        if isinstance(sample, bytes):
+            sample = sample.decode('utf-8', errors='replace')
+        first_line = next((line for line in sample.splitlines() if line.strip()), '')
+        first_line = first_line.lstrip('﻿')
+
+        separator = next((candidate for candidate in SEPARATORS if candidate in first_line), ';')
+        tokens = [token.strip() for token in first_line.split(separator) if token.strip()]
+
+        if any(token.lower() in _KNOWN_HEADERS for token in tokens):
+            return MeterDialect(separator=separator, has_header=True, columns=tuple(tokens))
+        return MeterDialect(separator=separator, has_header=False, columns=DEFAULT_COLUMNS)
+
+    def parse(self, data: Union[str, bytes], dialect: Optional[MeterDialect] = None) -> ParseResult:
+        """
+        Analisa um arquivo completo.
+
+        Args:
+            data: Conteúdo do arquivo
+            dialect: Dialeto a ser usado; detectado automaticamente se omitido
+
+        Returns:
+            O ParseResult com a série e as contagens de rejeição
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if data.startswith(_BOM):
+            data = data[len(_BOM):]
+        if dialect is None:
+            dialect = self.sniff(data[:4096])
+        if dialect.has_header:
+            data = self._strip_header(data)
+        return self.parse_block(data, dialect)
+
+    def parse_stream(self, stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     dialect: Optional[MeterDialect] = None) -> Iterator[ParseResult]:
+        """
+        Analisa um fluxo binário em blocos, produzindo um ParseResult por bloco.
+
+        Cada leitura de `chunk_size` bytes é cortada no último fim de linha; o
+        restante é levado para o bloco seguinte. O dialeto é detectado no primeiro
+        bloco completo.
+
+        Args:
+            stream: Fluxo binário com o conteúdo do arquivo
+            chunk_size: Quantidade de bytes lida por vez
+            dialect: Dialeto a ser usado; detectado automaticamente se omitido
+
+        Yields:
+            Um ParseResult para cada bloco de linhas completas
+        """
+        pending = b''
+        at_start = True
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            data = pending + chunk
+            cut = data.rfind(b'\n')
+            if cut < 0:
+                pending = data
+                continue
+            block, pending = data[:cut + 1], data[cut + 1:]
+
+            if at_start:
+                block, dialect = self._start(block, dialect)
+                at_start = False
+            yield self.parse_block(block, dialect)
+
+        if at_start and pending:
+            pending, dialect = self._start(pending, dialect)
+        if pending.strip():
+            yield self.parse_block(pending, dialect)
+
+    def _start(self, block: bytes, dialect: Optional[MeterDialect]) -> Tuple[bytes, MeterDialect]:
+        """
+        Trata o primeiro bloco do fluxo: remove o BOM, detecta o dialeto e remove o cabeçalho.
+        """
+        if block.startswith(_BOM):
+            block = block[len(_BOM):]
+        if dialect is None:
+            dialect = self.sniff(block[:4096])
+        if dialect.has_header:
+            block = self._strip_header(block)
+        return block, dialect
+
+    def parse_block(self, block: bytes, dialect: MeterDialect) -> ParseResult:
+        """
+        Analisa um bloco de linhas completas, sem cabeçalho.
+
+        Args:
+            block: Bytes contendo apenas linhas de dados
+            dialect: O dialeto do arquivo
+
+        Returns:
+            O ParseResult do bloco
+        """
+        layout = self._layout(dialect)
+        block = self._normalize(block, dialect)
+        if not block.strip():
+            return ParseResult(MeterSeries.empty(), dialect=dialect)
+
+        matrix, rejected = self._load(block, layout['width'])
+        return self._build(matrix, rejected, layout, dialect)
+
+    def _strip_header(self, data: bytes) -> bytes:
+        """
+        Remove a primeira linha não vazia (o cabeçalho).
+        """
+        data = data.lstrip(b'\r\n')
+        newline = data.find(b'\n')
+        return b'' if newline < 0 else data[newline + 1:]
+
+    def _layout(self, dialect: MeterDialect) -> Dict[str, object]:
+        """
+        Calcula a posição de cada campo depois que data e hora são quebradas em três campos.
+
+        Args:
+            dialect: O dialeto do arquivo
+
+        Returns:
+            Um dicionário com a largura da linha e as posições de data, hora e canais
+        """
+        positions: Dict[str, int] = {}
+        width = 0
+        for name in dialect.columns:
+            positions[name.lower()] = width
+            width += 3 if name.lower() in (DATE_HEADER.lower(), TIME_HEADER.lower()) else 1
+
+        if DATE_HEADER.lower() not in positions or TIME_HEADER.lower() not in positions:
+            raise ValueError('O arquivo precisa das colunas Date e Time')
+
+        return {
+            'width': width,
+            'date': positions[DATE_HEADER.lower()],
+            'time': positions[TIME_HEADER.lower()],
+            'channels': {channel.key: positions.get(channel.header.lower()) for channel in METER_CHANNELS}
+        }
+
+    def _normalize(self, block: bytes, dialect: MeterDialect) -> bytes:
+        """
+        Reescreve o bloco para que todos os campos sejam numéricos e separados por ';'.
+
+        Args:
+            block: O bloco original
+            dialect: O dialeto do arquivo
+
+        Returns:
+            O bloco normalizado
+        """
+        separator = dialect.separator.encode('ascii')
+        if dialect.separator in (' ', '\t'):
+            # Espaços em sequência contam como um único separador
+            block = re.sub(rb'[ \t]+', b';', block.replace(b'\r', b''))
+            block = block.replace(b';\n', b'\n').replace(b'\n;', b'\n').strip(b';')
+            separator = _FIELD
+        source = separator + b'/:'
+        target = _FIELD * len(source)
+        if dialect.separator != ',':
+            # Vírgula decimal, como aceito pelo navegador
+            source += b','
+            target += b'.'
+        table = bytes.maketrans(source, target)
+        block = block.translate(table, b'\r') if b'\r' in block else block.translate(table)
+
+        # Marcadores de valor ausente viram NaN
+        if b'?' in block:
+            block = block.replace(b'?', b'nan')
+        if b';;' in block:
+            block = block.replace(b';;', b';nan;').replace(b';;', b';nan;')
+        if b';\n' in block:
+            block = block.replace(b';\n', b';nan\n')
+        if block.endswith(b';'):
+            block += b'nan'
+        return block
+
+    def _load(self, block: bytes, width: int) -> Tuple[np.ndarray, int]:
+        """
+        Converte o bloco normalizado em uma matriz float64.
+
+        O caminho rápido lê o bloco inteiro de uma vez; só se houver linhas
+        malformadas o bloco é filtrado por uma expressão regular.
+
+        Args:
+            block: O bloco normalizado
+            width: Número de campos esperado por linha
+
+        Returns:
+            Uma tupla (matriz, número de linhas rejeitadas)
+        """
+        try:
+            matrix = np.loadtxt(io.BytesIO(block), delimiter=';', dtype=np.float64, ndmin=2)
+            if matrix.shape[1] == width:
+                return matrix, 0
+        except ValueError:
+            pass
+
+        row_pattern = re.compile(_NUMBER + rb'(?:;' + _NUMBER + rb'){%d}' % (width - 1))
+        lines = [line for line in block.split(b'\n') if line.strip()]
+        valid: List[bytes] = [line for line in lines if row_pattern.fullmatch(line)]
+        rejected = len(lines) - len(valid)
+        if not valid:
+            return np.empty((0, width), dtype=np.float64), rejected
+        matrix = np.loadtxt(io.BytesIO(b'\n'.join(valid)), delimiter=';', dtype=np.float64, ndmin=2)
+        return matrix, rejected
+
+    def _build(self, matrix: np.ndarray, rejected: int, layout: Dict[str, object],
+               dialect: MeterDialect) -> ParseResult:
+        """
+        Monta a MeterSeries a partir da matriz de campos.
+
+        Args:
+            matrix: Matriz (linhas x campos) lida do bloco
+            rejected: Linhas já rejeitadas na leitura
+            layout: Posições dos campos
+            dialect: O dialeto do arquivo
+
+        Returns:
+            O ParseResult com a série
+        """
+        date_at = layout['date']
+        time_at = layout['time']
+        day, month, year = (matrix[:, date_at + offset] for offset in range(3))
+        hour, minute, second = (matrix[:, time_at + offset] for offset in range(3))
+
+        # Linhas com data ou hora inválidas são rejeitadas
+        with np.errstate(invalid='ignore'):
+            valid = (
+                (day >= 1) & (day <= 31) & (month >= 1) & (month <= 12) & (year >= 1)
+                & (hour >= 0) & (hour < 24) & (minute >= 0) & (minute < 60)
+                & (second >= 0) & (second < 61)
+            )
+        if not valid.all():
+            rejected += int((~valid).sum())
+            matrix = matrix[valid]
+            day, month, year = (matrix[:, date_at + offset] for offset in range(3))
+            hour, minute, second = (matrix[:, time_at + offset] for offset in range(3))
+
+        days = days_from_civil(year.astype(np.int64), month.astype(np.int64), day.astype(np.int64))
+        timestamps = (
+            days * SECONDS_PER_DAY
+            + hour.astype(np.int64) * 3600 + minute.astype(np.int64) * 60 + second.astype(np.int64)
+        )
+
+        columns: Dict[str, np.ndarray] = {}
+        missing = 0
+        for key, position in layout['channels'].items():
+            if position is None:
+                column = np.full(matrix.shape[0], np.nan)
+            else:
+                column = np.ascontiguousarray(matrix[:, position])
+            missing += int(np.isnan(column).sum())
+            columns[key] = column
+
+        series = MeterSeries(timestamps, columns)
+        return ParseResult(series, rejected, missing, dialect, SeriesAccumulator.from_series(series))
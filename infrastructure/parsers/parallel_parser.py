@@ -0,0 +1,235 @@
+"""
+Análise paralela de arquivos TXT de medidores por faixas de bytes.
+Este arquivo implementa o ParallelMeterParser, que divide um arquivo em disco em
+faixas de bytes alinhadas a fins de linha e analisa cada faixa em um processo de
+um ProcessPoolExecutor. Os processos recebem apenas o caminho e os limites da
+faixa e leem o arquivo por mmap, de modo que nenhum texto é serializado entre
+processos; apenas as colunas resultantes voltam ao processo principal, onde são
+concatenadas em ordem cronológica. O pool é criado dentro de um servidor com
+várias threads, por isso seus processos não são criados por fork.
+"""
+
+import mmap
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+from domain.models.meter_series import MeterSeries
+from infrastructure.parsers.meter_txt_parser import MeterDialect, MeterTxtParser, ParseResult, ParseSummary
+
+
+# Tamanho mínimo de cada faixa; faixas menores não compensam o custo de um processo
+MIN_RANGE_SIZE = 8 * 1024 * 1024
+
+# Faixas por processo, para equilibrar a carga quando algumas faixas são mais lentas
+RANGES_PER_WORKER = 4
+
+# Um fork copiaria travas de outras threads do servidor; forkserver não existe no Windows
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def split_ranges(path: str, start: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    Divide um arquivo em faixas de bytes que começam e terminam em limites de linha.
+
+    Args:
+        path: Caminho do arquivo
+        start: Posição do primeiro byte de dados (após o cabeçalho)
+        parts: Número desejado de faixas
+
+    Returns:
+        Uma lista de tuplas (início, fim) cobrindo o arquivo a partir de `start`
+    """
+    size = os.path.getsize(path)
+    if size <= start:
+        return []
+    if parts <= 1:
+        return [(start, size)]
+
+    step = max(1, (size - start) // parts)
+    ranges: List[Tuple[int, int]] = []
+    with open(path, 'rb') as data_file, mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        begin = start
+        while begin < size:
+            target = begin + step
+            if target >= size:
+                end = size
+            else:
+                newline = mapped.find(b'\n', target)
+                end = size if newline < 0 else newline + 1
+            ranges.append((begin, end))
+            begin = end
+    return ranges
+
+
+def parse_range(path: str, start: int, end: int, dialect: MeterDialect) -> ParseResult:
+    """
+    Analisa uma faixa de bytes de um arquivo; executada nos processos do pool.
+
+    Args:
+        path: Caminho do arquivo
+        start: Primeiro byte da faixa
+        end: Byte seguinte ao último da faixa
+        dialect: O dialeto do arquivo
+
+    Returns:
+        O ParseResult da faixa
+    """
+    with open(path, 'rb') as data_file, mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        block = mapped[start:end]
+    return MeterTxtParser().parse_block(block, dialect)
+
+
+class ParallelMeterParser:
+    """
+    Analisador de arquivos TXT que distribui faixas do arquivo entre processos.
+
+    O pool de processos é criado na primeira utilização e reaproveitado, inclusive
+    por análises simultâneas em threads diferentes.
+    """
+
+    def __init__(self, workers: Optional[int] = None, parser: Optional[MeterTxtParser] = None,
+                 min_range_size: int = MIN_RANGE_SIZE):
+        """
+        Inicializa o analisador.
+
+        Args:
+            workers: Número de processos; usa o número de CPUs se omitido
+            parser: Analisador usado para detectar o dialeto
+            min_range_size: Tamanho mínimo de cada faixa em bytes
+        """
+        self._workers = workers or os.cpu_count() or 1
+        self._parser = parser or MeterTxtParser()
+        self._min_range_size = min_range_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        """
+        Número de processos usados na análise.
+        """
+        return self._workers
+
+    def parse_file(self, path: str, progress: Optional[Callable[[int], None]] = None,
+                   bytes_progress: Optional[Callable[[int], None]] = None) -> ParseResult:
+        """
+        Analisa um arquivo em paralelo.
+
+        Args:
+            path: Caminho do arquivo TXT (não compactado)
+            progress: Função chamada a cada faixa concluída com o total de linhas aceitas
+            bytes_progress: Função chamada a cada faixa concluída com o total de bytes analisados
+
+        Returns:
+            O ParseResult do arquivo inteiro, com as leituras em ordem cronológica
+        """
+        dialect, data_start = self._sniff(path)
+        size = os.path.getsize(path)
+        parts = min(
+            self._workers * RANGES_PER_WORKER,
+            max(1, (size - data_start) // self._min_range_size)
+        )
+        ranges = split_ranges(path, data_start, parts)
+
+        if len(ranges) <= 1 or self._workers <= 1:
+            results = [parse_range(path, start, end, dialect) for start, end in ranges]
+            if progress is not None:
+                progress(sum(result.rows for result in results))
+            if bytes_progress is not None:
+                bytes_progress(size)
+        else:
+            results = self._parse_ranges(path, ranges, dialect, progress, bytes_progress)
+
+        return self._merge(results, dialect)
+
+    def shutdown(self) -> None:
+        """
+        Encerra o pool de processos, se tiver sido criado.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _sniff(self, path: str) -> Tuple[MeterDialect, int]:
+        """
+        Detecta o dialeto e a posição onde começam os dados.
+
+        Args:
+            path: Caminho do arquivo
+
+        Returns:
+            Uma tupla (dialeto, posição do primeiro byte de dados)
+        """
+        with open(path, 'rb') as data_file:
+            head = data_file.read(64 * 1024)
+        offset = 3 if head.startswith(b'\xef\xbb\xbf') else 0
+        dialect = self._parser.sniff(head[offset:])
+        if not dialect.has_header:
+            return dialect, offset
+
+        # Pula linhas em branco iniciais e o cabeçalho
+        while offset < len(head) and head[offset:offset + 1] in (b'\r', b'\n'):
+            offset += 1
+        newline = head.find(b'\n', offset)
+        return dialect, len(head) if newline < 0 else newline + 1
+
+    def _parse_ranges(self, path: str, ranges: List[Tuple[int, int]], dialect: MeterDialect,
+                      progress: Optional[Callable[[int], None]],
+                      bytes_progress: Optional[Callable[[int], None]]) -> List[ParseResult]:
+        """
+        Analisa as faixas no pool de processos.
+
+        Returns:
+            Os resultados na ordem das faixas
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers, mp_context=multiprocessing.get_context(START_METHOD)
+                )
+            executor = self._executor
+
+        futures = {
+            executor.submit(parse_range, path, start, end, dialect): index
+            for index, (start, end) in enumerate(ranges)
+        }
+        results: List[Optional[ParseResult]] = [None] * len(ranges)
+        rows = 0
+        parsed_bytes = ranges[0][0]
+        for future in as_completed(futures):
+            index = futures[future]
+            result = future.result()
+            results[index] = result
+            rows += result.rows
+            parsed_bytes += ranges[index][1] - ranges[index][0]
+            if progress is not None:
+                progress(rows)
+            if bytes_progress is not None:
+                bytes_progress(parsed_bytes)
+        return results
+
+    def _merge(self, results: List[ParseResult], dialect: MeterDialect) -> ParseResult:
+        """
+        Junta os resultados das faixas em ordem cronológica e combina os resumos dos canais.
+
+        Args:
+            results: Resultados das faixas, na ordem do arquivo
+            dialect: O dialeto do arquivo
+
+        Returns:
+            O ParseResult combinado
+        """
+        summary = ParseSummary(dialect=dialect)
+        # Faixas sem leituras aceitas ainda contam linhas rejeitadas e valores ausentes
+        parts = [part for part in (summary.add(result) for result in results) if len(part)]
+        if parts:
+            # Faixas ordenadas pelo primeiro horário; se ainda houver sobreposição, ordena tudo
+            parts.sort(key=lambda part: int(part.timestamps[0]))
+            series = MeterSeries.concatenate(parts).sort_by_time()
+        else:
+            series = results[0].series if results else MeterSeries.empty()
+        return ParseResult(series, summary.rejected_rows, summary.missing_values, dialect, summary.statistics)
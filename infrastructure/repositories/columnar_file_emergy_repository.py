@@ -0,0 +1,694 @@
+"""
+Implementação do EmergyRepository em arquivos colunares mapeados em memória.
+Este arquivo implementa um repositório que grava cada cálculo em um diretório
+próprio, com um pequeno cabeçalho JSON e um arquivo binário de largura fixa por
+coluna (timestamps int64 e um float64 por canal). Na leitura as colunas são
+abertas com numpy.memmap, de modo que get_by_id não copia os dados: consultas
+por intervalo tocam apenas as páginas necessárias, e vários processos
+compartilham o cache de páginas do sistema operacional. As agregações
+(RollupPyramid) ficam em um subdiretório, também com um arquivo por array, exceto
+o último balde de cada array, que pode receber leituras e fica no cabeçalho, e o
+estado combinável das estatísticas em um arquivo JSON próprio, fora do
+cabeçalho lido nas listagens. O
+índice de conteúdo guarda, para cada chave de conteúdo, um pequeno arquivo com o
+ID do cálculo, de modo que a busca por conteúdo lê um único arquivo. Leituras
+anexadas a um cálculo são escritas no fim das colunas existentes, além do trecho
+visível aos leitores, com um bloqueio de arquivo entre processos, e o cabeçalho
+substituído por último passa a incluí-las.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from domain.models.emergy_model import CalculationSummary, CalculationTail, EmergyCalculation, EmergyInput, MeterInputsView
+from domain.models.meter_series import METER_CHANNELS, MeterSeries
+from domain.models.rollup import RollupPyramid
+from domain.models.streaming_statistics import SeriesAccumulator
+from domain.repositories.emergy_repository import AppendConflictError, EmergyRepository, PageCursor
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+HEADER_FILE = 'header.json'
+INPUTS_FILE = 'inputs.json'
+STATISTICS_FILE = 'statistics.json'
+TIMESTAMPS_COLUMN = 'timestamps'
+ROLLUPS_DIRECTORY = 'rollups'
+LOCK_FILE = 'append.lock'
+# Começa com ponto para não coincidir com o diretório de nenhum cálculo
+HASHES_DIRECTORY = '.hashes'
+
+# Na versão 2 o último balde de cada array das agregações fica no cabeçalho
+FORMAT_VERSION = 2
+
+_TIMESTAMP_DTYPE = '<i8'
+_VALUE_DTYPE = '<f8'
+
+
+class ColumnarFileEmergyRepository(EmergyRepository):
+    """
+    Implementação do EmergyRepository em arquivos colunares.
+
+    Cada cálculo é gravado em um diretório temporário e movido para o lugar
+    definitivo com uma renomeação atômica, para que leitores em outros
+    processos nunca vejam um cálculo pela metade.
+    """
+
+    def __init__(self, root: str):
+        """
+        Inicializa o repositório em um diretório.
+
+        Args:
+            root: Diretório onde os cálculos são gravados (criado se necessário)
+        """
+        self._root = root
+        os.makedirs(root, exist_ok=True)
+
+    def save(self, calculation: EmergyCalculation) -> None:
+        """
+        Salva um cálculo de emergy no repositório.
+
+        Args:
+            calculation: O EmergyCalculation para salvar
+        """
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self._root)
+        try:
+            header = self._header(calculation)
+            if calculation.series is not None:
+                series = calculation.series
+                header['rows'] = len(series)
+                header['sorted'] = series.is_sorted()
+                header['columns'] = {TIMESTAMPS_COLUMN: _TIMESTAMP_DTYPE}
+                series.timestamps.astype(_TIMESTAMP_DTYPE, copy=False).tofile(self._column_path(staging, TIMESTAMPS_COLUMN))
+                for channel in series.channels:
+                    header['columns'][channel.key] = _VALUE_DTYPE
+                    series.column(channel.key).astype(_VALUE_DTYPE, copy=False).tofile(
+                        self._column_path(staging, channel.key)
+                    )
+            if calculation.rollups is not None:
+                header['rollups'] = self._write_rollups(staging, calculation.rollups)
+            if calculation.series is None:
+                with open(os.path.join(staging, INPUTS_FILE), 'w', encoding='utf-8') as inputs_file:
+                    json.dump([vars(item) for item in calculation.inputs], inputs_file)
+            if calculation.statistics is not None:
+                with open(os.path.join(staging, STATISTICS_FILE), 'w', encoding='utf-8') as statistics_file:
+                    json.dump(calculation.statistics.to_state(), statistics_file)
+
+            with open(os.path.join(staging, HEADER_FILE), 'w', encoding='utf-8') as header_file:
+                json.dump(header, header_file)
+
+            target = self._directory(calculation.id)
+            if os.path.isdir(target):
+                self._unindex(target, calculation.id)
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if calculation.content_hash is not None:
+            self._index(calculation.content_hash, calculation.id)
+
+    def append(self, calculation: EmergyCalculation, readings: MeterSeries) -> None:
+        """
+        Escreve as leituras novas no fim das colunas e atualiza o cabeçalho.
+
+        Os leitores usam o número de linhas do cabeçalho, que é substituído por
+        último com uma renomeação atômica: até lá continuam vendo as leituras
+        anteriores. Dos arrays das agregações são escritos apenas os baldes
+        novos, depois do trecho mapeado pelos leitores; o último balde, que pode
+        voltar a receber leituras, vai para o cabeçalho novo. A conferência do
+        cabeçalho e as escritas são feitas com o bloqueio de escrita do cálculo.
+
+        Args:
+            calculation: O EmergyCalculation com a série completa
+            readings: As leituras anexadas, já incluídas na série do cálculo
+
+        Raises:
+            AppendConflictError: Se o cabeçalho gravado tiver outro número de leituras
+                antes do lote, por exemplo após um append de outro processo
+        """
+        directory = self._directory(calculation.id)
+        header = self._read_header(directory)
+        series = calculation.series
+        if header is None or header['columns'] is None or series is None:
+            self.save(calculation)
+            return
+        with self._locked(calculation.id, directory):
+            header = self._read_header(directory)
+            if header is None or header['rows'] + len(readings) != len(series):
+                raise AppendConflictError(f'O cálculo {calculation.id} foi alterado por outro processo')
+            self._append_columns(directory, header, readings)
+
+            layout = None
+            if calculation.rollups is not None:
+                rollups_directory = os.path.join(directory, ROLLUPS_DIRECTORY)
+                os.makedirs(rollups_directory, exist_ok=True)
+                previous = header.get('rollups') or {}
+                layout = {}
+                for name, array in calculation.rollups.to_arrays().items():
+                    entry = previous.get(name)
+                    offset = max(entry[1] - 1, 0) if entry is not None and entry[0] == array.dtype.str else 0
+                    layout[name] = self._extend_rollup(rollups_directory, name, entry, array[offset:], offset)
+
+            if calculation.statistics is not None:
+                self._replace_json(directory, STATISTICS_FILE, calculation.statistics.to_state())
+
+            self._unindex(directory, calculation.id)
+            header.update({
+                'format_version': FORMAT_VERSION,
+                'total_emergy': calculation.total_emergy,
+                'metadata': calculation.metadata,
+                'rows': len(series),
+                'sorted': series.is_sorted(),
+                'input_count': len(calculation.inputs),
+                'rollups': layout
+            })
+            self._replace_json(directory, HEADER_FILE, header)
+        if calculation.content_hash is not None:
+            self._index(calculation.content_hash, calculation.id)
+
+    def get_tail(self, calculation_id: str, start: Optional[int] = None) -> Optional[CalculationTail]:
+        """
+        Recupera a parte final de um cálculo, copiando das colunas mapeadas apenas as linhas do lote.
+
+        A posição de `start` é encontrada por busca binária na coluna de timestamps,
+        e de cada array das agregações é lido apenas o último balde.
+
+        Args:
+            calculation_id: O ID do cálculo
+            start: Primeiro timestamp do lote a anexar; None lê apenas a última leitura
+
+        Returns:
+            O CalculationTail, ou None se o cálculo não for encontrado, não tiver
+            leituras de medidor ou as leituras gravadas não estiverem ordenadas
+        """
+        directory = self._directory(calculation_id)
+        header = self._read_header(directory)
+        if header is None or header['columns'] is None or not header.get('sorted'):
+            return None
+        rows = header['rows']
+        timestamps = self._map_column(directory, TIMESTAMPS_COLUMN, header)
+        # A leitura anterior a `start` também é lida, para conhecer a última leitura gravada
+        position = rows if start is None else int(np.searchsorted(timestamps, start))
+        first = max(position - 1, 0)
+        readings = MeterSeries(
+            np.array(timestamps[first:]),
+            {channel.key: np.array(self._map_column(directory, channel.key, header)[first:]) for channel in METER_CHANNELS},
+            sorted_by_time=True
+        )
+
+        rollups = None
+        offsets = {}
+        layout = header.get('rollups')
+        if layout:
+            rollups_directory = os.path.join(directory, ROLLUPS_DIRECTORY)
+            arrays = {}
+            for name, entry in layout.items():
+                arrays[name] = self._last_bucket(rollups_directory, name, entry)
+                offsets[name.split('.', 1)[0]] = max(entry[1] - 1, 0)
+            rollups = RollupPyramid.from_arrays(arrays)
+
+        return CalculationTail(
+            id=header['id'],
+            total_emergy=header['total_emergy'],
+            created_at=datetime.fromisoformat(header['created_at']),
+            metadata=header['metadata'],
+            rows=rows,
+            readings=readings,
+            rollups=rollups,
+            rollup_offsets=offsets,
+            statistics=self._read_statistics(directory)
+        )
+
+    def append_tail(self, tail: CalculationTail, readings: MeterSeries) -> None:
+        """
+        Escreve as leituras novas de um cálculo lido com get_tail e atualiza o cabeçalho.
+
+        Como em append, as escritas são feitas com o bloqueio de escrita do
+        cálculo e o cabeçalho é substituído por último. Os baldes das agregações
+        são escritos a partir da posição do último balde lido, que só existe no
+        cabeçalho, de modo que nada do que os leitores mapeiam é alterado.
+
+        Args:
+            tail: O CalculationTail atualizado, com as leituras novas no fim de `tail.readings`
+            readings: As leituras anexadas
+
+        Raises:
+            AppendConflictError: Se o cabeçalho gravado tiver outro número de leituras
+                antes do lote, por exemplo após um append de outro processo
+        """
+        directory = self._directory(tail.id)
+        with self._locked(tail.id, directory):
+            header = self._read_header(directory)
+            if header is None or header['columns'] is None or header['rows'] + len(readings) != tail.rows:
+                raise AppendConflictError(f'O cálculo {tail.id} foi alterado por outro processo')
+            self._append_columns(directory, header, readings)
+
+            layout = header.get('rollups')
+            if tail.rollups is not None:
+                rollups_directory = os.path.join(directory, ROLLUPS_DIRECTORY)
+                previous = layout or {}
+                layout = {}
+                for name, array in tail.rollups.to_arrays().items():
+                    offset = tail.rollup_offsets[name.split('.', 1)[0]]
+                    layout[name] = self._extend_rollup(rollups_directory, name, previous.get(name), array, offset)
+
+            if tail.statistics is not None:
+                self._replace_json(directory, STATISTICS_FILE, tail.statistics.to_state())
+
+            self._unindex(directory, tail.id)
+            header.update({
+                'format_version': FORMAT_VERSION,
+                'total_emergy': tail.total_emergy,
+                'metadata': tail.metadata,
+                'rows': tail.rows,
+                'input_count': tail.input_count,
+                'rollups': layout
+            })
+            self._replace_json(directory, HEADER_FILE, header)
+
+    def get_by_id(self, calculation_id: str) -> Optional[EmergyCalculation]:
+        """
+        Recupera um cálculo de emergy pelo seu ID, com as colunas mapeadas em memória.
+
+        Args:
+            calculation_id: O ID do cálculo a ser recuperado
+
+        Returns:
+            O EmergyCalculation se encontrado, None caso contrário
+        """
+        directory = self._directory(calculation_id)
+        header = self._read_header(directory)
+        return self._load(directory, header) if header is not None else None
+
+    def get_all(self) -> List[EmergyCalculation]:
+        """
+        Recupera todos os cálculos de emergy.
+
+        Returns:
+            Uma lista de todos os objetos EmergyCalculation
+        """
+        return [self._load(directory, header) for directory, header in self._headers()]
+
+    def get_page(self, limit: int, after: Optional[PageCursor] = None) -> List[EmergyCalculation]:
+        """
+        Recupera uma página de cálculos em ordem de criação.
+
+        Apenas os cabeçalhos são lidos para ordenar; as colunas são mapeadas só
+        para os cálculos da página.
+
+        Args:
+            limit: Número máximo de cálculos na página
+            after: Cursor do último cálculo da página anterior
+
+        Returns:
+            Os cálculos da página
+        """
+        return [self._load(directory, header) for directory, header in self._header_page(limit, after)]
+
+    def get_summary(self, calculation_id: str) -> Optional[CalculationSummary]:
+        """
+        Recupera o resumo de um cálculo lendo apenas o cabeçalho.
+
+        Args:
+            calculation_id: O ID do cálculo
+
+        Returns:
+            O CalculationSummary se encontrado, None caso contrário
+        """
+        directory = self._directory(calculation_id)
+        header = self._read_header(directory)
+        return self._summary(directory, header) if header is not None else None
+
+    def get_summary_page(self, limit: int, after: Optional[PageCursor] = None) -> List[CalculationSummary]:
+        """
+        Recupera uma página de resumos de cálculos lendo apenas os cabeçalhos.
+
+        Args:
+            limit: Número máximo de resumos na página
+            after: Cursor do último cálculo da página anterior
+
+        Returns:
+            Os resumos da página
+        """
+        return [self._summary(directory, header) for directory, header in self._header_page(limit, after)]
+
+    def _summary(self, directory: str, header: Dict[str, Any]) -> CalculationSummary:
+        """
+        Cria o CalculationSummary de um cálculo a partir do cabeçalho.
+        """
+        return CalculationSummary(
+            id=header['id'],
+            total_emergy=header['total_emergy'],
+            created_at=datetime.fromisoformat(header['created_at']),
+            metadata=header['metadata'],
+            input_count=self._input_count(directory, header)
+        )
+
+    def get_by_content_hash(self, content_hash: str) -> Optional[EmergyCalculation]:
+        """
+        Recupera o cálculo criado a partir de um conteúdo, pelo arquivo de índice da chave.
+
+        Args:
+            content_hash: A chave do conteúdo ('content_hash' nos metadados)
+
+        Returns:
+            O EmergyCalculation se encontrado, None caso contrário
+        """
+        try:
+            with open(self._hash_path(content_hash), encoding='utf-8') as index_file:
+                calculation_id = index_file.read()
+        except FileNotFoundError:
+            return None
+        calculation = self.get_by_id(calculation_id)
+        # O índice pode estar desatualizado se outro processo excluiu o cálculo
+        if calculation is None or calculation.content_hash != content_hash:
+            return None
+        return calculation
+
+    def delete(self, calculation_id: str) -> bool:
+        """
+        Exclui um cálculo de emergy pelo seu ID.
+
+        Args:
+            calculation_id: O ID do cálculo a ser excluído
+
+        Returns:
+            True se o cálculo foi excluído, False caso contrário
+        """
+        directory = self._directory(calculation_id)
+        if not os.path.isfile(os.path.join(directory, HEADER_FILE)):
+            return False
+        self._unindex(directory, calculation_id)
+        shutil.rmtree(directory, ignore_errors=True)
+        return True
+
+    def _hash_path(self, content_hash: str) -> str:
+        """
+        Caminho do arquivo de índice de uma chave de conteúdo.
+        """
+        return os.path.join(self._root, HASHES_DIRECTORY, content_hash.replace(os.sep, '_').replace('/', '_'))
+
+    def _index(self, content_hash: str, calculation_id: str) -> None:
+        """
+        Aponta uma chave de conteúdo para um cálculo, com uma renomeação atômica.
+        """
+        os.makedirs(os.path.join(self._root, HASHES_DIRECTORY), exist_ok=True)
+        path = self._hash_path(content_hash)
+        staging = f'{path}.{os.getpid()}.tmp'
+        with open(staging, 'w', encoding='utf-8') as index_file:
+            index_file.write(calculation_id)
+        os.replace(staging, path)
+
+    def _unindex(self, directory: str, calculation_id: str) -> None:
+        """
+        Remove a chave de conteúdo de um cálculo gravado, se ainda apontar para ele.
+        """
+        header = self._read_header(directory)
+        content_hash = header['metadata'].get('content_hash') if header is not None else None
+        if content_hash is None:
+            return
+        path = self._hash_path(content_hash)
+        try:
+            with open(path, encoding='utf-8') as index_file:
+                if index_file.read() != calculation_id:
+                    return
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _directory(self, calculation_id: str) -> str:
+        """
+        Obtém o diretório de um cálculo, recusando IDs que escapem da raiz.
+        """
+        if not calculation_id or calculation_id.startswith('.') or os.sep in calculation_id or '/' in calculation_id:
+            return os.path.join(self._root, '.invalid')
+        return os.path.join(self._root, calculation_id)
+
+    @staticmethod
+    def _column_path(directory: str, column: str) -> str:
+        return os.path.join(directory, f'{column}.bin')
+
+    @staticmethod
+    @contextmanager
+    def _locked(calculation_id: str, directory: str) -> Iterator[None]:
+        """
+        Mantém o bloqueio de escrita de um cálculo, compartilhado entre processos, durante o bloco.
+
+        Raises:
+            AppendConflictError: Se o diretório do cálculo não existir mais
+        """
+        try:
+            lock_file = open(os.path.join(directory, LOCK_FILE), 'a+b')
+        except FileNotFoundError:
+            raise AppendConflictError(f'O cálculo {calculation_id} foi alterado por outro processo') from None
+        with lock_file:
+            lock_file.seek(0)
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:  # pragma: no cover - Windows
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:  # pragma: no cover - Windows
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _append_columns(self, directory: str, header: Dict[str, Any], readings: MeterSeries) -> None:
+        """
+        Escreve as leituras anexadas depois das linhas que o cabeçalho gravado torna visíveis.
+        """
+        for column, dtype in header['columns'].items():
+            values = readings.timestamps if column == TIMESTAMPS_COLUMN else readings.column(column)
+            self._write_from(self._column_path(directory, column), header['rows'], values.astype(dtype, copy=False))
+
+    def _extend_rollup(self, rollups_directory: str, name: str, entry: Optional[List], array: np.ndarray,
+                       offset: int) -> List:
+        """
+        Grava os baldes de um array das agregações a partir de `offset` e devolve a entrada nova do cabeçalho.
+
+        O arquivo guarda apenas os baldes anteriores ao último, e `offset` é a
+        posição do último balde gravado, que só existe no cabeçalho; a escrita
+        começa, portanto, depois do trecho mapeado pelos leitores. Arquivos de
+        cabeçalhos da versão 1, que incluem o último balde, ou de outro tipo são
+        regravados em um arquivo novo, que substitui o anterior sem alterá-lo.
+
+        Args:
+            rollups_directory: Diretório das agregações do cálculo
+            name: Nome do array
+            entry: A entrada [dtype, tamanho, último balde] gravada, se houver
+            array: Os baldes a partir de `offset`
+            offset: Posição do primeiro balde de `array`
+
+        Returns:
+            A entrada [dtype, tamanho, último balde] do array
+        """
+        path = self._column_path(rollups_directory, name)
+        if entry is not None and len(entry) > 2 and entry[0] == array.dtype.str:
+            self._write_from(path, offset, array[:-1])
+        else:
+            previous = np.fromfile(path, dtype=array.dtype, count=offset) if offset else array[:0]
+            staging = f'{path}.{os.getpid()}.tmp'
+            np.concatenate([previous, array[:-1]]).tofile(staging)
+            os.replace(staging, path)
+        return self._rollup_entry(array, offset + int(array.shape[0]))
+
+    @staticmethod
+    def _rollup_entry(array: np.ndarray, length: int) -> List:
+        """
+        Monta a entrada [dtype, tamanho, último balde] do cabeçalho para um array que termina em `array`.
+        """
+        return [array.dtype.str, length, array[-1].item() if len(array) else None]
+
+    def _last_bucket(self, rollups_directory: str, name: str, entry: List) -> np.ndarray:
+        """
+        Lê o último balde de um array das agregações, do cabeçalho ou, na versão 1, do arquivo.
+        """
+        dtype, length = np.dtype(entry[0]), entry[1]
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        if len(entry) > 2:
+            return np.array([entry[2]], dtype=dtype)
+        return np.fromfile(self._column_path(rollups_directory, name), dtype=dtype, count=1,
+                           offset=(length - 1) * dtype.itemsize)
+
+    @staticmethod
+    def _write_from(path: str, position: int, array: np.ndarray) -> None:
+        """
+        Escreve um array em um arquivo de coluna a partir de uma posição, descartando o que houver depois.
+        """
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as column_file:
+            column_file.seek(position * array.dtype.itemsize)
+            array.tofile(column_file)
+            column_file.truncate()
+
+    @staticmethod
+    def _replace_json(directory: str, filename: str, data: Any) -> None:
+        """
+        Substitui um arquivo JSON do cálculo com uma renomeação atômica.
+        """
+        staging = os.path.join(directory, f'{filename}.{os.getpid()}.tmp')
+        with open(staging, 'w', encoding='utf-8') as json_file:
+            json.dump(data, json_file)
+        os.replace(staging, os.path.join(directory, filename))
+
+    @staticmethod
+    def _header(calculation: EmergyCalculation) -> Dict[str, Any]:
+        return {
+            'format_version': FORMAT_VERSION,
+            'id': calculation.id,
+            'total_emergy': calculation.total_emergy,
+            'created_at': calculation.created_at.isoformat(),
+            'metadata': calculation.metadata,
+            'rows': 0,
+            'columns': None,
+            'input_count': len(calculation.inputs),
+            'rollups': None
+        }
+
+    @staticmethod
+    def _read_header(directory: str) -> Optional[Dict[str, Any]]:
+        """
+        Lê o cabeçalho de um cálculo, se existir.
+        """
+        try:
+            with open(os.path.join(directory, HEADER_FILE), encoding='utf-8') as header_file:
+                return json.load(header_file)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def _headers(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Lê os cabeçalhos de todos os cálculos, em ordem de criação.
+        """
+        headers = []
+        for name in os.listdir(self._root):
+            directory = os.path.join(self._root, name)
+            header = self._read_header(directory)
+            if header is not None:
+                headers.append((directory, header))
+        headers.sort(key=lambda item: (datetime.fromisoformat(item[1]['created_at']), item[1]['id']))
+        return headers
+
+    def _header_page(self, limit: int, after: Optional[PageCursor]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Seleciona os cabeçalhos de uma página.
+        """
+        headers = self._headers()
+        if after is not None:
+            headers = [
+                item for item in headers
+                if (datetime.fromisoformat(item[1]['created_at']), item[1]['id']) > after.key()
+            ]
+        return headers[:limit]
+
+    @staticmethod
+    def _input_count(directory: str, header: Dict[str, Any]) -> int:
+        """
+        Número de entradas de um cálculo; cabeçalhos antigos não têm o campo input_count.
+        """
+        if 'input_count' in header:
+            return header['input_count']
+        if header['columns'] is not None:
+            return header['rows'] * len(METER_CHANNELS)
+        with open(os.path.join(directory, INPUTS_FILE), encoding='utf-8') as inputs_file:
+            return len(json.load(inputs_file))
+
+    def _load(self, directory: str, header: Dict[str, Any]) -> EmergyCalculation:
+        """
+        Reconstrói um EmergyCalculation a partir do cabeçalho e das colunas.
+        """
+        series = None
+        if header['columns'] is not None:
+            series = MeterSeries(
+                self._map_column(directory, TIMESTAMPS_COLUMN, header),
+                {channel.key: self._map_column(directory, channel.key, header) for channel in METER_CHANNELS},
+                # Evita percorrer a coluna de timestamps para descobrir a ordem
+                sorted_by_time=header.get('sorted')
+            )
+            inputs = MeterInputsView(series)
+        else:
+            with open(os.path.join(directory, INPUTS_FILE), encoding='utf-8') as inputs_file:
+                inputs = [EmergyInput(**item) for item in json.load(inputs_file)]
+
+        return EmergyCalculation(
+            id=header['id'],
+            inputs=inputs,
+            total_emergy=header['total_emergy'],
+            created_at=datetime.fromisoformat(header['created_at']),
+            metadata=header['metadata'],
+            series=series,
+            rollups=self._map_rollups(directory, header),
+            statistics=self._read_statistics(directory)
+        )
+
+    @staticmethod
+    def _read_statistics(directory: str) -> Optional[SeriesAccumulator]:
+        """
+        Lê o estado combinável das estatísticas de um cálculo, se tiver sido gravado.
+        """
+        try:
+            with open(os.path.join(directory, STATISTICS_FILE), encoding='utf-8') as statistics_file:
+                return SeriesAccumulator.from_state(json.load(statistics_file))
+        except FileNotFoundError:
+            return None
+
+    def _write_rollups(self, directory: str, rollups: RollupPyramid) -> Dict[str, List]:
+        """
+        Grava os arrays das agregações, sem o último balde, e devolve o mapa de nome para [dtype, tamanho, último balde].
+        """
+        rollups_directory = os.path.join(directory, ROLLUPS_DIRECTORY)
+        os.makedirs(rollups_directory)
+        layout = {}
+        for name, array in rollups.to_arrays().items():
+            array[:-1].tofile(self._column_path(rollups_directory, name))
+            layout[name] = self._rollup_entry(array, int(array.shape[0]))
+        return layout
+
+    def _map_rollups(self, directory: str, header: Dict[str, Any]) -> Optional[RollupPyramid]:
+        """
+        Abre as agregações gravadas, se existirem.
+
+        Os baldes do arquivo são mapeados com numpy.memmap e completados com o
+        último balde do cabeçalho, o que copia cada array uma vez.
+        """
+        layout = header.get('rollups')
+        if not layout:
+            return None
+        rollups_directory = os.path.join(directory, ROLLUPS_DIRECTORY)
+        arrays = {}
+        for name, entry in layout.items():
+            dtype, length = entry[0], entry[1]
+            stored = length - 1 if len(entry) > 2 else length
+            if stored <= 0:
+                mapped = np.empty(0, dtype=dtype)
+            else:
+                mapped = np.memmap(self._column_path(rollups_directory, name), dtype=dtype, mode='r', shape=(stored,))
+            if len(entry) > 2:
+                mapped = np.concatenate([mapped, self._last_bucket(rollups_directory, name, entry)])
+            arrays[name] = mapped
+        return RollupPyramid.from_arrays(arrays)
+
+    def _map_column(self, directory: str, column: str, header: Dict[str, Any]) -> np.ndarray:
+        """
+        Abre uma coluna como numpy.memmap somente leitura.
+        """
+        dtype = np.dtype(header['columns'][column])
+        rows = header['rows']
+        if rows == 0:
+            # mmap não aceita arquivos vazios
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_path(directory, column), dtype=dtype, mode='r', shape=(rows,))
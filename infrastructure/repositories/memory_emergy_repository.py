@@ -4,12 +4,53 @@ Este arquivo implementa uma versão em memória do repositório de cálculos de
 que armazena os cálculos em um dicionário na memória. Em uma aplicação real,
 esta implementação seria substituída por uma implementação baseada em banco de dados.
 
+A memória usada pode ser limitada por um orçamento em bytes: ao ultrapassá-lo, os
+cálculos usados há mais tempo são removidos da memória e, se houver um repositório
+de transbordo (por exemplo um ColumnarFileEmergyRepository em disco local),
+gravados nele, de onde get_by_id os recarrega de forma transparente.
+
 Feito por André Carbonieri Silva T839FC9
 """
 
-from typing import Dict, List, Optional
-from domain.models.emergy_model import EmergyCalculation
-from domain.repositories.emergy_repository import EmergyRepository
+import bisect
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from datetime import datetime
+from domain.models.emergy_model import CalculationSummary, EmergyCalculation
+from domain.repositories.emergy_repository import EmergyRepository, PageCursor
+
+
+# Tamanho estimado, em bytes, de uma entrada sem série (objeto e strings)
+INPUT_BYTES = 512
+
+# Tamanho estimado, em bytes, de um cálculo sem contar entradas, série e metadados
+CALCULATION_BYTES = 1024
+
+
+def estimate_size(calculation: EmergyCalculation) -> int:
+    """
+    Estima a memória ocupada por um cálculo.
+    
+    Conta os bytes dos arrays da série e das agregações, um tamanho fixo por
+    entrada para cálculos sem série e o tamanho dos metadados em JSON.
+    
+    Args:
+        calculation: O EmergyCalculation
+        
+    Returns:
+        O tamanho estimado em bytes
+    """
+    size = CALCULATION_BYTES + len(json.dumps(calculation.metadata, default=str))
+    if calculation.series is not None:
+        series = calculation.series
+        size += series.timestamps.nbytes + sum(series.column(channel.key).nbytes for channel in series.channels)
+    else:
+        size += INPUT_BYTES * len(calculation.inputs)
+    if calculation.rollups is not None:
+        size += sum(array.nbytes for array in calculation.rollups.to_arrays().values())
+    return size
 
 
 class MemoryEmergyRepository(EmergyRepository):
@@ -18,13 +59,49 @@ class MemoryEmergyRepository(EmergyRepository):
     
     Esta é uma implementação simples que armazena cálculos na memória.
     Em uma aplicação real, isso seria substituído por uma implementação baseada em banco de dados.
+    
+    Com `max_bytes`, os cálculos residentes formam um cache LRU: os usados há mais
+    tempo são removidos quando o total estimado passa do orçamento. Sem repositório
+    de transbordo, um cálculo removido deixa de existir; com ele, continua listado e
+    é recarregado por get_by_id. O cálculo usado mais recentemente nunca é removido,
+    mesmo que sozinho passe do orçamento. Os contadores `hits`, `misses` e
+    `evictions` registram as consultas por ID atendidas da memória, as que não
+    estavam na memória e as remoções.
     """
     
-    def __init__(self):
+    def __init__(self, max_bytes: Optional[int] = None, spill: Optional[EmergyRepository] = None):
         """
         Inicializa o repositório com um dicionário vazio.
+        
+        Args:
+            max_bytes: Orçamento de memória dos cálculos, em bytes; sem limite se omitido
+            spill: Repositório que recebe os cálculos removidos da memória
+        """
+        self._max_bytes = max_bytes
+        self._spill = spill
+        # Cálculos residentes, do usado há mais tempo ao mais recente
+        self._calculations: 'OrderedDict[str, EmergyCalculation]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._size = 0
+        # Resumos dos cálculos que estão apenas no repositório de transbordo
+        self._spilled: Dict[str, CalculationSummary] = {}
+        # Cálculos residentes cuja cópia no transbordo está atualizada
+        self._persisted: Set[str] = set()
+        # Chaves (created_at, id) em ordem, para paginar com busca binária
+        self._order: List[Tuple[datetime, str]] = []
+        # Chave do conteúdo de origem -> ID do cálculo
+        self._by_hash: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @property
+    def size(self) -> int:
+        """
+        Memória estimada dos cálculos residentes, em bytes.
         """
-        self._calculations: Dict[str, EmergyCalculation] = {}
+        return self._size
     
     def save(self, calculation: EmergyCalculation) -> None:
         """
@@ -33,19 +110,61 @@ class MemoryEmergyRepository(EmergyRepository):
         Args:
             calculation: O EmergyCalculation para salvar
         """
-        self._calculations[calculation.id] = calculation
+        with self._lock:
+            previous = self._calculations.get(calculation.id)
+            if previous is not None:
+                self._unindex(previous)
+                self._forget(calculation.id)
+            elif calculation.id in self._spilled:
+                self._unindex(self._spilled.pop(calculation.id))
+            self._persisted.discard(calculation.id)
+            self._admit(calculation)
+            bisect.insort(self._order, PageCursor.of(calculation).key())
+            if calculation.content_hash is not None:
+                self._by_hash[calculation.content_hash] = calculation.id
+            self._evict()
+    
+    def save_many(self, calculations: Iterable[EmergyCalculation]) -> None:
+        """
+        Salva vários cálculos de uma vez; leitores concorrentes veem todos ou nenhum.
+        
+        Args:
+            calculations: Os EmergyCalculation para salvar
+        """
+        with self._lock:
+            for calculation in calculations:
+                self.save(calculation)
     
     def get_by_id(self, calculation_id: str) -> Optional[EmergyCalculation]:
         """
         Recupera um cálculo de emergy pelo seu ID.
         
+        Um cálculo transbordado é recarregado e volta a ser residente.
+        
         Args:
             calculation_id: O ID do cálculo a ser recuperado
             
         Returns:
             O EmergyCalculation se encontrado, None caso contrário
         """
-        return self._calculations.get(calculation_id)
+        with self._lock:
+            calculation = self._calculations.get(calculation_id)
+            if calculation is not None:
+                self._calculations.move_to_end(calculation_id)
+                self.hits += 1
+                return calculation
+            
+            self.misses += 1
+            if calculation_id not in self._spilled:
+                return None
+            calculation = self._spill.get_by_id(calculation_id)
+            if calculation is None:
+                return None
+            del self._spilled[calculation_id]
+            self._persisted.add(calculation_id)
+            self._admit(calculation)
+            self._evict()
+            return calculation
     
     def get_all(self) -> List[EmergyCalculation]:
         """
@@ -54,7 +173,8 @@ class MemoryEmergyRepository(EmergyRepository):
         Returns:
             Uma lista de todos os objetos EmergyCalculation
         """
-        return list(self._calculations.values())
+        with self._lock:
+            return [self._peek(key[1]) for key in self._order]
     
     def delete(self, calculation_id: str) -> bool:
         """
@@ -66,7 +186,153 @@ class MemoryEmergyRepository(EmergyRepository):
         Returns:
             True se o cálculo foi excluído, False caso contrário
         """
-        if calculation_id in self._calculations:
-            del self._calculations[calculation_id]
+        with self._lock:
+            if calculation_id in self._calculations:
+                self._unindex(self._forget(calculation_id))
+            elif calculation_id in self._spilled:
+                self._unindex(self._spilled.pop(calculation_id))
+            else:
+                return False
+            if self._spill is not None:
+                self._spill.delete(calculation_id)
+            self._persisted.discard(calculation_id)
             return True
-        return False
+    
+    def get_page(self, limit: int, after: Optional[PageCursor] = None) -> List[EmergyCalculation]:
+        """
+        Recupera uma página de cálculos em ordem de criação.
+        
+        Cálculos transbordados são lidos do transbordo sem voltar à memória, para
+        que percorrer a lista não desloque os cálculos em uso.
+        
+        Args:
+            limit: Número máximo de cálculos na página
+            after: Cursor do último cálculo da página anterior
+            
+        Returns:
+            Os cálculos da página
+        """
+        with self._lock:
+            return [self._peek(key[1]) for key in self._page_keys(limit, after)]
+    
+    def get_summary(self, calculation_id: str) -> Optional[CalculationSummary]:
+        """
+        Recupera o resumo de um cálculo, sem recarregar um cálculo transbordado.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            O CalculationSummary se encontrado, None caso contrário
+        """
+        with self._lock:
+            calculation = self._calculations.get(calculation_id)
+            if calculation is not None:
+                return CalculationSummary.from_calculation(calculation)
+            return self._spilled.get(calculation_id)
+    
+    def get_summary_page(self, limit: int, after: Optional[PageCursor] = None) -> List[CalculationSummary]:
+        """
+        Recupera uma página de resumos de cálculos (sem as entradas) em ordem de criação.
+        
+        Os resumos dos cálculos transbordados ficam na memória, então a página não
+        lê o disco.
+        
+        Args:
+            limit: Número máximo de resumos na página
+            after: Cursor do último cálculo da página anterior
+            
+        Returns:
+            Os resumos da página
+        """
+        with self._lock:
+            summaries = []
+            for _, calculation_id in self._page_keys(limit, after):
+                summary = self._spilled.get(calculation_id)
+                if summary is None:
+                    summary = CalculationSummary.from_calculation(self._calculations[calculation_id])
+                summaries.append(summary)
+            return summaries
+    
+    def get_by_content_hash(self, content_hash: str) -> Optional[EmergyCalculation]:
+        """
+        Recupera o cálculo criado a partir de um conteúdo, pelo índice de chaves.
+        
+        Args:
+            content_hash: A chave do conteúdo ('content_hash' nos metadados)
+            
+        Returns:
+            O EmergyCalculation se encontrado, None caso contrário
+        """
+        with self._lock:
+            calculation_id = self._by_hash.get(content_hash)
+            return self.get_by_id(calculation_id) if calculation_id is not None else None
+    
+    def _page_keys(self, limit: int, after: Optional[PageCursor]) -> List[Tuple[datetime, str]]:
+        """
+        Chaves de ordenação de uma página.
+        """
+        start = bisect.bisect_right(self._order, after.key()) if after is not None else 0
+        return self._order[start:start + limit]
+    
+    def _peek(self, calculation_id: str) -> EmergyCalculation:
+        """
+        Recupera um cálculo sem alterar a ordem de uso nem os contadores.
+        """
+        calculation = self._calculations.get(calculation_id)
+        if calculation is None:
+            calculation = self._spill.get_by_id(calculation_id)
+        return calculation
+    
+    def _admit(self, calculation: EmergyCalculation) -> None:
+        """
+        Torna um cálculo residente, como o usado mais recentemente.
+        """
+        size = estimate_size(calculation) if self._max_bytes is not None else 0
+        self._calculations[calculation.id] = calculation
+        self._sizes[calculation.id] = size
+        self._size += size
+    
+    def _forget(self, calculation_id: str) -> EmergyCalculation:
+        """
+        Remove um cálculo residente da memória.
+        """
+        self._size -= self._sizes.pop(calculation_id)
+        return self._calculations.pop(calculation_id)
+    
+    def _evict(self) -> None:
+        """
+        Remove os cálculos usados há mais tempo até o total caber no orçamento.
+        
+        Sem transbordo, o cálculo removido também sai da ordenação e deixa de existir.
+        """
+        if self._max_bytes is None:
+            return
+        while self._size > self._max_bytes and len(self._calculations) > 1:
+            calculation_id = next(iter(self._calculations))
+            calculation = self._forget(calculation_id)
+            self.evictions += 1
+            if self._spill is None:
+                self._unindex(calculation)
+                continue
+            if calculation_id not in self._persisted:
+                self._spill.save(calculation)
+            self._persisted.discard(calculation_id)
+            self._spilled[calculation_id] = CalculationSummary.from_calculation(calculation)
+    
+    def _unindex(self, calculation) -> None:
+        """
+        Remove a chave de ordenação e a chave de conteúdo de um cálculo ou resumo.
+        """
+        self._remove_key(PageCursor.of(calculation).key())
+        content_hash = calculation.metadata.get('content_hash')
+        if content_hash is not None and self._by_hash.get(content_hash) == calculation.id:
+            del self._by_hash[content_hash]
+    
+    def _remove_key(self, key: Tuple[datetime, str]) -> None:
+        """
+        Remove uma chave de ordenação.
+        """
+        index = bisect.bisect_left(self._order, key)
+        if index < len(self._order) and self._order[index] == key:
+            del self._order[index]
@@ -0,0 +1,656 @@
+"""
+Implementação SQLite do EmergyRepository.
+Este arquivo implementa um repositório persistente de cálculos de Emergy sobre o
+módulo sqlite3 da biblioteca padrão. O banco usa o modo WAL, para que vários
+processos (por exemplo, workers do gunicorn) leiam enquanto outro escreve, e as
+leituras dos medidores ficam em uma tabela compacta com um timestamp inteiro e
+uma coluna REAL por canal, inseridas com executemany em uma única transação.
+As agregações (RollupPyramid) são guardadas em blocos binários de tamanho fixo,
+para que anexar leituras regrave só o último bloco de cada array, o estado combinável das estatísticas fica em uma coluna própria, fora dos
+metadados devolvidos nas listagens, e cálculos criados a partir de listas de EmergyInput são guardados em uma tabela
+de entradas separada.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from domain.models.emergy_model import CalculationSummary, CalculationTail, EmergyCalculation, EmergyInput, MeterInputsView
+from domain.models.meter_series import METER_CHANNELS, MeterSeries, MeterSeriesBuilder
+from domain.models.rollup import RollupPyramid
+from domain.models.streaming_statistics import SeriesAccumulator
+from domain.repositories.emergy_repository import AppendConflictError, EmergyRepository, PageCursor
+
+
+_CHANNEL_COLUMNS = ', '.join(channel.key for channel in METER_CHANNELS)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS calculations (
+    pk INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    total_emergy REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    has_series INTEGER NOT NULL,
+    input_count INTEGER,
+    content_hash TEXT,
+    statistics TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_calculations_created_at ON calculations (created_at, id);
+
+CREATE TABLE IF NOT EXISTS readings (
+    calculation INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    {', '.join(f'{channel.key} REAL' for channel in METER_CHANNELS)}
+);
+CREATE INDEX IF NOT EXISTS idx_readings_calculation_ts ON readings (calculation, ts);
+
+CREATE TABLE IF NOT EXISTS inputs (
+    calculation INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    unit TEXT NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (calculation, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rollup_chunks (
+    calculation INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    dtype TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (calculation, name, chunk)
+) WITHOUT ROWID;
+"""
+
+# Itens por bloco dos arrays das agregações; só o último bloco de cada array pode estar incompleto
+_ROLLUP_CHUNK_ITEMS = 4096
+
+_CALCULATION_COLUMNS = 'pk, id, total_emergy, created_at, metadata, has_series, statistics'
+
+# Bancos criados antes da coluna input_count recebem-na com o valor calculado
+_MIGRATE_INPUT_COUNT = f"""
+ALTER TABLE calculations ADD COLUMN input_count INTEGER;
+UPDATE calculations SET input_count = CASE
+    WHEN has_series THEN (SELECT COUNT(*) FROM readings WHERE calculation = pk) * {len(METER_CHANNELS)}
+    ELSE (SELECT COUNT(*) FROM inputs WHERE calculation = pk)
+END;
+"""
+
+# Bancos criados antes do índice de conteúdo recebem a coluna content_hash
+_MIGRATE_CONTENT_HASH = """
+ALTER TABLE calculations ADD COLUMN content_hash TEXT;
+"""
+
+# Bancos criados antes da separação das estatísticas recebem a coluna statistics;
+# o estado combinável, antes gravado nos metadados, é movido para ela
+_MIGRATE_STATISTICS = f"""
+ALTER TABLE calculations ADD COLUMN statistics TEXT;
+UPDATE calculations SET
+    statistics = json_extract(metadata, '$.statistics'),
+    metadata = json_remove(metadata, {', '.join(
+        f"'$.statistics.{channel.key}.{name}'" for channel in METER_CHANNELS for name in ('m2', 'digest')
+    )})
+WHERE json_extract(metadata, '$.statistics.{METER_CHANNELS[0].key}.digest') IS NOT NULL;
+"""
+
+_CONTENT_HASH_INDEX = 'CREATE INDEX IF NOT EXISTS idx_calculations_content_hash ON calculations (content_hash)'
+
+
+class SqliteEmergyRepository(EmergyRepository):
+    """
+    Implementação SQLite do EmergyRepository.
+
+    Cada thread usa sua própria conexão. As leituras são inseridas e lidas em
+    lotes de `batch_size` linhas para limitar a memória intermediária.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100_000):
+        """
+        Inicializa o repositório e cria o esquema, se necessário.
+
+        Args:
+            path: Caminho do arquivo do banco de dados
+            batch_size: Número de leituras por lote de inserção ou leitura
+        """
+        if path == ':memory:':
+            raise ValueError('O SqliteEmergyRepository precisa de um arquivo; use MemoryEmergyRepository para dados em memória')
+        self._path = path
+        self._batch_size = batch_size
+        self._local = threading.local()
+        self._create_schema()
+
+    def save(self, calculation: EmergyCalculation) -> None:
+        """
+        Salva um cálculo de emergy no repositório.
+
+        Args:
+            calculation: O EmergyCalculation para salvar
+        """
+        connection = self._connection()
+        with connection:
+            self._write(connection, calculation)
+
+    def save_many(self, calculations: Iterable[EmergyCalculation]) -> None:
+        """
+        Salva vários cálculos em uma única transação.
+
+        Args:
+            calculations: Os EmergyCalculation para salvar
+        """
+        connection = self._connection()
+        with connection:
+            for calculation in calculations:
+                self._write(connection, calculation)
+
+    def append(self, calculation: EmergyCalculation, readings: MeterSeries) -> None:
+        """
+        Insere apenas as leituras novas de um cálculo e atualiza o restante, em uma transação.
+
+        As agregações são regravadas, mas têm um balde por intervalo e não uma linha
+        por leitura. A transação toma o bloqueio de escrita antes de conferir que a
+        última leitura gravada é a que precedia o lote, de modo que dois processos
+        não anexam o mesmo lote nem sobrescrevem o total um do outro.
+
+        Args:
+            calculation: O EmergyCalculation com a série completa
+            readings: As leituras anexadas, já incluídas na série do cálculo
+
+        Raises:
+            AppendConflictError: Se outro processo anexou leituras ao cálculo depois que ele foi lido
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute('SELECT pk, has_series FROM calculations WHERE id = ?', (calculation.id,)).fetchone()
+            if row is None or not row[1]:
+                self._write(connection, calculation)
+                return
+            pk = row[0]
+            previous = len(calculation.series) - len(readings)
+            expected = int(calculation.series.timestamps[previous - 1]) if previous > 0 else None
+            last = connection.execute('SELECT MAX(ts) FROM readings WHERE calculation = ?', (pk,)).fetchone()[0]
+            if last != expected:
+                raise AppendConflictError(f'O cálculo {calculation.id} foi alterado por outro processo')
+            connection.execute(
+                'UPDATE calculations SET total_emergy = ?, metadata = ?, input_count = ?, content_hash = ?, '
+                'statistics = ? WHERE pk = ?',
+                (
+                    calculation.total_emergy,
+                    json.dumps(calculation.metadata),
+                    len(calculation.inputs),
+                    calculation.content_hash,
+                    self._dump_statistics(calculation),
+                    pk
+                )
+            )
+            self._insert_readings(connection, pk, readings)
+            connection.execute('DELETE FROM rollup_chunks WHERE calculation = ?', (pk,))
+            if calculation.rollups is not None:
+                self._insert_rollups(connection, pk, calculation.rollups)
+
+    def get_tail(self, calculation_id: str, start: Optional[int] = None) -> Optional[CalculationTail]:
+        """
+        Recupera a parte final de um cálculo em uma única transação de leitura.
+
+        As leituras a partir de `start` são localizadas pelo índice (calculation, ts),
+        e de cada array das agregações é lido apenas o último item.
+
+        Args:
+            calculation_id: O ID do cálculo
+            start: Primeiro timestamp do lote a anexar; None lê apenas a última leitura
+
+        Returns:
+            O CalculationTail, ou None se o cálculo não for encontrado ou não tiver leituras de medidor
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN')
+            row = connection.execute(
+                'SELECT pk, total_emergy, created_at, metadata, has_series, input_count, statistics '
+                'FROM calculations WHERE id = ?',
+                (calculation_id,)
+            ).fetchone()
+            if row is None or not row[4]:
+                return None
+            pk, total_emergy, created_at, metadata, _, input_count, statistics = row
+            # A leitura anterior a `start` também é lida, para conhecer a última leitura gravada
+            if start is None:
+                first, parameters = '(SELECT MAX(ts) FROM readings WHERE calculation = ?)', (pk, pk)
+            else:
+                first = 'COALESCE((SELECT MAX(ts) FROM readings WHERE calculation = ? AND ts < ?), ?)'
+                parameters = (pk, pk, start, start)
+            readings = self._read_series(connection.execute(
+                f'SELECT ts, {_CHANNEL_COLUMNS} FROM readings WHERE calculation = ? AND ts >= {first} ORDER BY ts',
+                parameters
+            ))
+            rollups, offsets = self._load_rollup_tails(connection, pk)
+        return CalculationTail(
+            id=calculation_id,
+            total_emergy=total_emergy,
+            created_at=datetime.fromisoformat(created_at),
+            metadata=json.loads(metadata),
+            rows=input_count // len(METER_CHANNELS),
+            readings=readings,
+            rollups=rollups,
+            rollup_offsets=offsets,
+            statistics=SeriesAccumulator.from_state(json.loads(statistics)) if statistics is not None else None
+        )
+
+    def append_tail(self, tail: CalculationTail, readings: MeterSeries) -> None:
+        """
+        Insere as leituras novas de um cálculo lido com get_tail e atualiza o restante, em uma transação.
+
+        Como em append, a última leitura gravada é conferida com o bloqueio de
+        escrita já tomado. O último bloco de cada array das agregações é truncado
+        na posição do último balde lido e completado com os baldes do
+        CalculationTail; o que não couber nele vai para blocos novos.
+
+        Args:
+            tail: O CalculationTail atualizado, com as leituras novas no fim de `tail.readings`
+            readings: As leituras anexadas
+
+        Raises:
+            AppendConflictError: Se o cálculo foi alterado por outro processo depois que a parte final foi lida
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute('SELECT pk FROM calculations WHERE id = ? AND has_series', (tail.id,)).fetchone()
+            previous = len(tail.readings) - len(readings)
+            expected = int(tail.readings.timestamps[previous - 1]) if previous > 0 else None
+            last = None
+            if row is not None:
+                last = connection.execute('SELECT MAX(ts) FROM readings WHERE calculation = ?', row).fetchone()[0]
+            if row is None or last != expected:
+                raise AppendConflictError(f'O cálculo {tail.id} foi alterado por outro processo')
+            pk = row[0]
+            connection.execute(
+                'UPDATE calculations SET total_emergy = ?, metadata = ?, input_count = ?, content_hash = ?, '
+                'statistics = ? WHERE pk = ?',
+                (
+                    tail.total_emergy,
+                    json.dumps(tail.metadata),
+                    tail.input_count,
+                    tail.metadata.get('content_hash'),
+                    self._dump_statistics(tail),
+                    pk
+                )
+            )
+            self._insert_readings(connection, pk, readings)
+            if tail.rollups is not None:
+                for name, array in tail.rollups.to_arrays().items():
+                    offset = tail.rollup_offsets[name.split('.', 1)[0]]
+                    chunk, position = divmod(offset, _ROLLUP_CHUNK_ITEMS)
+                    head = array[:_ROLLUP_CHUNK_ITEMS - position]
+                    connection.execute(
+                        'UPDATE rollup_chunks SET data = CAST(substr(data, 1, ?) || ? AS BLOB) '
+                        'WHERE calculation = ? AND name = ? AND chunk = ?',
+                        (position * array.dtype.itemsize, np.ascontiguousarray(head).tobytes(), pk, name, chunk)
+                    )
+                    if len(array) > len(head):
+                        self._insert_rollup_chunks(connection, pk, name, array[len(head):], chunk + 1)
+
+    def get_by_id(self, calculation_id: str) -> Optional[EmergyCalculation]:
+        """
+        Recupera um cálculo de emergy pelo seu ID.
+
+        Args:
+            calculation_id: O ID do cálculo a ser recuperado
+
+        Returns:
+            O EmergyCalculation se encontrado, None caso contrário
+        """
+        row = self._connection().execute(
+            f'SELECT {_CALCULATION_COLUMNS} FROM calculations WHERE id = ?',
+            (calculation_id,)
+        ).fetchone()
+        return self._load(row) if row is not None else None
+
+    def get_all(self) -> List[EmergyCalculation]:
+        """
+        Recupera todos os cálculos de emergy.
+
+        Returns:
+            Uma lista de todos os objetos EmergyCalculation
+        """
+        rows = self._connection().execute(
+            f'SELECT {_CALCULATION_COLUMNS} FROM calculations ORDER BY created_at, id'
+        ).fetchall()
+        return [self._load(row) for row in rows]
+
+    def get_page(self, limit: int, after: Optional[PageCursor] = None) -> List[EmergyCalculation]:
+        """
+        Recupera uma página de cálculos em ordem de criação, pelo índice (created_at, id).
+
+        Args:
+            limit: Número máximo de cálculos na página
+            after: Cursor do último cálculo da página anterior
+
+        Returns:
+            Os cálculos da página
+        """
+        return [self._load(row) for row in self._page_rows(_CALCULATION_COLUMNS, limit, after)]
+
+    def get_summary(self, calculation_id: str) -> Optional[CalculationSummary]:
+        """
+        Recupera o resumo de um cálculo lendo apenas a sua linha.
+
+        Args:
+            calculation_id: O ID do cálculo
+
+        Returns:
+            O CalculationSummary se encontrado, None caso contrário
+        """
+        row = self._connection().execute(
+            'SELECT id, total_emergy, created_at, metadata, input_count FROM calculations WHERE id = ?',
+            (calculation_id,)
+        ).fetchone()
+        return self._summary(row) if row is not None else None
+
+    def get_summary_page(self, limit: int, after: Optional[PageCursor] = None) -> List[CalculationSummary]:
+        """
+        Recupera uma página de resumos de cálculos sem ler leituras nem entradas.
+
+        Args:
+            limit: Número máximo de resumos na página
+            after: Cursor do último cálculo da página anterior
+
+        Returns:
+            Os resumos da página
+        """
+        rows = self._page_rows('id, total_emergy, created_at, metadata, input_count', limit, after)
+        return [self._summary(row) for row in rows]
+
+    @staticmethod
+    def _summary(row: Tuple) -> CalculationSummary:
+        """
+        Cria um CalculationSummary a partir de uma linha (id, total_emergy, created_at, metadata, input_count).
+        """
+        calculation_id, total_emergy, created_at, metadata, input_count = row
+        return CalculationSummary(
+            id=calculation_id,
+            total_emergy=total_emergy,
+            created_at=datetime.fromisoformat(created_at),
+            metadata=json.loads(metadata),
+            input_count=input_count
+        )
+
+    def get_by_content_hash(self, content_hash: str) -> Optional[EmergyCalculation]:
+        """
+        Recupera o cálculo criado a partir de um conteúdo, pelo índice da coluna content_hash.
+
+        Args:
+            content_hash: A chave do conteúdo ('content_hash' nos metadados)
+
+        Returns:
+            O EmergyCalculation se encontrado, None caso contrário
+        """
+        row = self._connection().execute(
+            f'SELECT {_CALCULATION_COLUMNS} FROM calculations WHERE content_hash = ? ORDER BY created_at DESC LIMIT 1',
+            (content_hash,)
+        ).fetchone()
+        return self._load(row) if row is not None else None
+
+    def delete(self, calculation_id: str) -> bool:
+        """
+        Exclui um cálculo de emergy pelo seu ID.
+
+        Args:
+            calculation_id: O ID do cálculo a ser excluído
+
+        Returns:
+            True se o cálculo foi excluído, False caso contrário
+        """
+        connection = self._connection()
+        with connection:
+            row = connection.execute('SELECT pk FROM calculations WHERE id = ?', (calculation_id,)).fetchone()
+            if row is None:
+                return False
+            connection.execute('DELETE FROM readings WHERE calculation = ?', row)
+            connection.execute('DELETE FROM inputs WHERE calculation = ?', row)
+            connection.execute('DELETE FROM rollup_chunks WHERE calculation = ?', row)
+            connection.execute('DELETE FROM calculations WHERE pk = ?', row)
+        return True
+
+    def close(self) -> None:
+        """
+        Fecha a conexão da thread atual.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _create_schema(self) -> None:
+        """
+        Cria o esquema e migra bancos criados por versões anteriores.
+        """
+        connection = self._connection()
+        connection.executescript(_SCHEMA)
+        columns = {row[1] for row in connection.execute('PRAGMA table_info(calculations)')}
+        if 'input_count' not in columns:
+            with connection:
+                connection.executescript(_MIGRATE_INPUT_COUNT)
+        if 'content_hash' not in columns:
+            with connection:
+                connection.executescript(_MIGRATE_CONTENT_HASH)
+        if 'statistics' not in columns:
+            with connection:
+                connection.executescript(_MIGRATE_STATISTICS)
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'rollups' in tables:
+            # Bancos anteriores aos blocos guardavam cada array das agregações em um único BLOB
+            with connection:
+                for pk, name, dtype, data in connection.execute('SELECT calculation, name, dtype, data FROM rollups').fetchall():
+                    self._insert_rollup_chunks(connection, pk, name, np.frombuffer(data, dtype=dtype))
+                connection.execute('DROP TABLE rollups')
+        connection.execute(_CONTENT_HASH_INDEX)
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Obtém (ou abre) a conexão da thread atual.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA foreign_keys=OFF')
+            self._local.connection = connection
+        return connection
+
+    def _page_rows(self, columns: str, limit: int, after: Optional[PageCursor]) -> List[Tuple]:
+        """
+        Consulta uma página da tabela de cálculos por paginação de conjunto de chaves.
+        """
+        if after is None:
+            return self._connection().execute(
+                f'SELECT {columns} FROM calculations ORDER BY created_at, id LIMIT ?',
+                (limit,)
+            ).fetchall()
+        return self._connection().execute(
+            f'SELECT {columns} FROM calculations WHERE (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT ?',
+            (after.created_at.isoformat(), after.id, limit)
+        ).fetchall()
+
+    def _write(self, connection: sqlite3.Connection, calculation: EmergyCalculation) -> None:
+        """
+        Grava um cálculo, substituindo o anterior com o mesmo ID; deve ser chamado dentro de uma transação.
+        """
+        connection.execute('DELETE FROM readings WHERE calculation = (SELECT pk FROM calculations WHERE id = ?)', (calculation.id,))
+        connection.execute('DELETE FROM inputs WHERE calculation = (SELECT pk FROM calculations WHERE id = ?)', (calculation.id,))
+        connection.execute('DELETE FROM rollup_chunks WHERE calculation = (SELECT pk FROM calculations WHERE id = ?)', (calculation.id,))
+        connection.execute('DELETE FROM calculations WHERE id = ?', (calculation.id,))
+        cursor = connection.execute(
+            'INSERT INTO calculations (id, total_emergy, created_at, metadata, has_series, input_count, content_hash, '
+            'statistics) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                calculation.id,
+                calculation.total_emergy,
+                calculation.created_at.isoformat(),
+                json.dumps(calculation.metadata),
+                int(calculation.series is not None),
+                len(calculation.inputs),
+                calculation.content_hash,
+                self._dump_statistics(calculation)
+            )
+        )
+        pk = cursor.lastrowid
+        if calculation.rollups is not None:
+            self._insert_rollups(connection, pk, calculation.rollups)
+        if calculation.series is not None:
+            self._insert_readings(connection, pk, calculation.series)
+        else:
+            connection.executemany(
+                'INSERT INTO inputs (calculation, position, name, value, unit, category, description) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    (pk, position, item.name, item.value, item.unit, item.category, item.description)
+                    for position, item in enumerate(calculation.inputs)
+                )
+            )
+
+    def _insert_readings(self, connection: sqlite3.Connection, pk: int, series: MeterSeries) -> None:
+        """
+        Insere as leituras de uma série em lotes com executemany.
+        """
+        placeholders = ', '.join('?' * (len(METER_CHANNELS) + 2))
+        statement = f'INSERT INTO readings (calculation, ts, {_CHANNEL_COLUMNS}) VALUES ({placeholders})'
+        for start in range(0, len(series), self._batch_size):
+            batch = series.slice(start, start + self._batch_size)
+            connection.executemany(statement, self._rows(pk, batch))
+
+    def _insert_rollups(self, connection: sqlite3.Connection, pk: int, rollups: RollupPyramid) -> None:
+        """
+        Insere as agregações de um cálculo, em blocos de _ROLLUP_CHUNK_ITEMS itens por array.
+        """
+        for name, array in rollups.to_arrays().items():
+            self._insert_rollup_chunks(connection, pk, name, array)
+
+    @staticmethod
+    def _insert_rollup_chunks(connection: sqlite3.Connection, pk: int, name: str, array: np.ndarray,
+                              first: int = 0) -> None:
+        """
+        Insere um array das agregações em blocos numerados a partir de `first`; um array vazio ocupa um bloco vazio.
+        """
+        starts = range(0, max(len(array), 1), _ROLLUP_CHUNK_ITEMS)
+        connection.executemany(
+            'INSERT INTO rollup_chunks (calculation, name, chunk, dtype, data) VALUES (?, ?, ?, ?, ?)',
+            (
+                (pk, name, first + index, array.dtype.str,
+                 np.ascontiguousarray(array[start:start + _ROLLUP_CHUNK_ITEMS]).tobytes())
+                for index, start in enumerate(starts)
+            )
+        )
+
+    @staticmethod
+    def _dump_statistics(calculation: Union[EmergyCalculation, CalculationTail]) -> Optional[str]:
+        """
+        Serializa o estado combinável das estatísticas de um cálculo, se houver.
+        """
+        return json.dumps(calculation.statistics.to_state()) if calculation.statistics is not None else None
+
+    def _rows(self, pk: int, series: MeterSeries) -> Iterator[Tuple]:
+        """
+        Converte uma série em tuplas de linha para executemany.
+        """
+        columns = [series.column(channel.key).tolist() for channel in METER_CHANNELS]
+        return zip([pk] * len(series), series.timestamps.tolist(), *columns)
+
+    def _load(self, row: Tuple) -> EmergyCalculation:
+        """
+        Reconstrói um EmergyCalculation a partir da linha da tabela de cálculos.
+        """
+        pk, calculation_id, total_emergy, created_at, metadata, has_series, statistics = row
+        series = self._load_series(pk) if has_series else None
+        inputs = MeterInputsView(series) if series is not None else self._load_inputs(pk)
+        return EmergyCalculation(
+            id=calculation_id,
+            inputs=inputs,
+            total_emergy=total_emergy,
+            created_at=datetime.fromisoformat(created_at),
+            metadata=json.loads(metadata),
+            series=series,
+            rollups=self._load_rollups(pk) if has_series else None,
+            statistics=SeriesAccumulator.from_state(json.loads(statistics)) if statistics is not None else None
+        )
+
+    def _load_series(self, pk: int) -> MeterSeries:
+        """
+        Lê as leituras de um cálculo em lotes, em ordem cronológica.
+        """
+        return self._read_series(self._connection().execute(
+            f'SELECT ts, {_CHANNEL_COLUMNS} FROM readings WHERE calculation = ? ORDER BY ts',
+            (pk,)
+        ))
+
+    def _read_series(self, cursor: sqlite3.Cursor) -> MeterSeries:
+        """
+        Monta uma série com as linhas (ts, canais...) de uma consulta, em lotes.
+        """
+        builder = MeterSeriesBuilder()
+        while True:
+            rows = cursor.fetchmany(self._batch_size)
+            if not rows:
+                break
+            # Valores NULL (NaN na gravação) viram NaN novamente
+            matrix = np.array(rows, dtype=np.float64)
+            builder.append(MeterSeries(
+                matrix[:, 0].astype(np.int64),
+                {channel.key: matrix[:, index + 1] for index, channel in enumerate(METER_CHANNELS)}
+            ))
+        return builder.build()
+
+    def _load_rollups(self, pk: int) -> Optional[RollupPyramid]:
+        """
+        Lê as agregações de um cálculo, se tiverem sido gravadas.
+        """
+        rows = self._connection().execute(
+            'SELECT name, dtype, data FROM rollup_chunks WHERE calculation = ? ORDER BY name, chunk',
+            (pk,)
+        ).fetchall()
+        chunks = {}
+        for name, dtype, data in rows:
+            chunks.setdefault(name, (dtype, []))[1].append(data)
+        return RollupPyramid.from_arrays({
+            name: np.frombuffer(b''.join(parts), dtype=dtype) for name, (dtype, parts) in chunks.items()
+        })
+
+    @staticmethod
+    def _load_rollup_tails(connection: sqlite3.Connection, pk: int) -> Tuple[Optional[RollupPyramid], Dict[str, int]]:
+        """
+        Lê o último balde de cada nível das agregações e a posição dele nos arrays gravados.
+        """
+        # Os itens dos arrays das agregações têm no máximo 8 bytes
+        rows = connection.execute(
+            'SELECT name, dtype, chunk, length(data), substr(data, -8) FROM rollup_chunks AS chunks '
+            'WHERE calculation = ? AND chunk = (SELECT MAX(chunk) FROM rollup_chunks '
+            'WHERE calculation = chunks.calculation AND name = chunks.name)',
+            (pk,)
+        ).fetchall()
+        arrays = {}
+        offsets = {}
+        for name, dtype, chunk, size, last in rows:
+            dtype = np.dtype(dtype)
+            length = chunk * _ROLLUP_CHUNK_ITEMS + size // dtype.itemsize
+            arrays[name] = np.frombuffer(last[len(last) - dtype.itemsize:] if length else b'', dtype=dtype).copy()
+            offsets[name.split('.', 1)[0]] = max(length - 1, 0)
+        return RollupPyramid.from_arrays(arrays), offsets
+
+    def _load_inputs(self, pk: int) -> List[EmergyInput]:
+        """
+        Lê as entradas de um cálculo criado a partir de objetos EmergyInput.
+        """
+        rows = self._connection().execute(
+            'SELECT name, value, unit, category, description FROM inputs WHERE calculation = ? ORDER BY position',
+            (pk,)
+        ).fetchall()
+        return [EmergyInput(name, value, unit, category, description) for name, value, unit, category, description in rows]
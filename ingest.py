@@ -0,0 +1,329 @@
+"""
+Ingestão em massa de arquivos TXT de medidores, pela linha de comando.
+Este script carrega no repositório configurado (SQLite ou arquivos colunares) todos
+os arquivos TXT de um diretório ou padrão glob, sem passar pela API HTTP. Usa a
+mesma montagem de repositório e serviços de create_app. Os arquivos são analisados
+em paralelo, um por processo, e os cálculos são salvos em lotes (save_many). Cada
+lote salvo é registrado em um arquivo de checkpoint, de modo que uma execução
+interrompida pode ser retomada sem reprocessar os arquivos já carregados. A vazão
+(linhas/s e MB/s) é mostrada a cada lote.
+
+Uso:
+    python -m ingest data/historico --repository sqlite --database emergy.db --workers 8
+    python -m ingest "data/**/*.txt.gz" --repository columnar --columnar-path calculations
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from app import create_emergy_service
+from application.services.emergy_application_service import EmergyApplicationService
+from domain.models.emergy_model import EmergyCalculation
+from infrastructure.parsers.compressed_stream import is_supported_upload
+from infrastructure.repositories.memory_emergy_repository import MemoryEmergyRepository
+
+# Arquivo de checkpoint padrão, no diretório atual
+DEFAULT_CHECKPOINT = 'ingest.checkpoint'
+
+# Cálculos acumulados antes de cada gravação no repositório
+DEFAULT_BATCH_FILES = 32
+
+# Arquivos analisados ou aguardando retorno por processo; limita a memória ocupada
+# pelos cálculos ainda não salvos
+IN_FLIGHT_PER_WORKER = 2
+
+
+def find_files(sources: Sequence[str]) -> List[str]:
+    """
+    Lista os arquivos TXT aceitos em diretórios (recursivamente) ou padrões glob.
+
+    Args:
+        sources: Diretórios, arquivos ou padrões glob ('**' percorre subdiretórios)
+
+    Returns:
+        Os caminhos absolutos, sem repetições, em ordem alfabética
+    """
+    found: Set[str] = set()
+    for source in sources:
+        if os.path.isdir(source):
+            for directory, _, names in os.walk(source):
+                found.update(os.path.join(directory, name) for name in names)
+        else:
+            found.update(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+    return sorted(os.path.abspath(path) for path in found if is_supported_upload(path))
+
+
+class Checkpoint:
+    """
+    Registro dos arquivos já salvos no repositório, em um arquivo JSON por linha.
+
+    Um arquivo é identificado pelo caminho, tamanho e data de modificação; se ele
+    for alterado depois de carregado, é processado de novo. O registro só é
+    gravado depois que o lote foi salvo no repositório.
+    """
+
+    def __init__(self, path: str):
+        """
+        Abre o checkpoint, carregando as entradas de uma execução anterior.
+
+        Args:
+            path: Caminho do arquivo de checkpoint (criado se não existir)
+        """
+        self._path = path
+        self._done: Set[Tuple[str, int, int]] = set()
+        # Uma linha incompleta, deixada por uma interrupção durante a gravação, é ignorada
+        # e encerrada antes do próximo registro
+        self._truncated = False
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as checkpoint_file:
+                for line in checkpoint_file:
+                    self._truncated = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                        self._done.add((entry['path'], entry['size'], entry['mtime_ns']))
+                    except (ValueError, KeyError):
+                        continue
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def is_done(self, path: str) -> bool:
+        """
+        Verifica se o arquivo, no estado atual, já foi salvo.
+        """
+        return _identity(path) in self._done
+
+    def record(self, entries: Sequence[Tuple[str, str]]) -> None:
+        """
+        Registra arquivos salvos e força a gravação em disco.
+
+        Args:
+            entries: Pares (caminho do arquivo, ID do cálculo)
+        """
+        with open(self._path, 'a', encoding='utf-8') as checkpoint_file:
+            if self._truncated:
+                checkpoint_file.write('\n')
+                self._truncated = False
+            for path, calculation_id in entries:
+                identity = _identity(path)
+                self._done.add(identity)
+                checkpoint_file.write(json.dumps({
+                    'path': identity[0], 'size': identity[1], 'mtime_ns': identity[2],
+                    'calculation_id': calculation_id
+                }) + '\n')
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+
+
+def _identity(path: str) -> Tuple[str, int, int]:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+# Serviço de cada processo do pool, criado pelo inicializador
+_worker_service: Optional[EmergyApplicationService] = None
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """
+    Cria o serviço de análise de um processo, sem acesso ao repositório de destino.
+    """
+    global _worker_service
+    _worker_service = EmergyApplicationService(create_emergy_service(config, MemoryEmergyRepository()))
+
+
+def parse_file(path: str) -> EmergyCalculation:
+    """
+    Analisa um arquivo e monta o cálculo, sem salvá-lo; executada nos processos do pool.
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        O EmergyCalculation, com a chave do conteúdo nos metadados
+    """
+    return _worker_service.process_txt_file(
+        path, {'filename': os.path.basename(path), 'source_path': path, 'ingest': 'cli'}, save=False
+    )
+
+
+class BulkIngestion:
+    """
+    Carrega uma lista de arquivos no repositório, em paralelo e em lotes.
+    """
+
+    def __init__(self, config: Dict[str, Any], workers: int = 1, batch_files: int = DEFAULT_BATCH_FILES,
+                 checkpoint: Optional[Checkpoint] = None, out=None):
+        """
+        Inicializa a ingestão.
+
+        Args:
+            config: Configuração no formato de create_app (REPOSITORY, DATABASE_PATH,
+                COLUMNAR_PATH, TRANSFORMITY_TABLE)
+            workers: Número de processos de análise; 1 analisa no próprio processo
+            batch_files: Cálculos acumulados antes de cada gravação
+            checkpoint: Registro dos arquivos já salvos; sem ele, nada é pulado
+            out: Saída das mensagens de progresso; usa sys.stdout se omitida
+        """
+        self._config = config
+        self._service = create_emergy_service(config)
+        self._workers = workers
+        self._batch_files = batch_files
+        self._checkpoint = checkpoint
+        self._out = out
+        self.rows = 0
+        self.bytes = 0
+        self.saved = 0
+        self.deduplicated = 0
+        self.failed: List[Tuple[str, str]] = []
+        self._started = time.perf_counter()
+        self._pending: List[Tuple[str, EmergyCalculation]] = []
+        self._pending_done: List[Tuple[str, str]] = []
+
+    def run(self, paths: Sequence[str]) -> None:
+        """
+        Analisa e salva os arquivos que ainda não constam do checkpoint.
+
+        Args:
+            paths: Caminhos dos arquivos
+        """
+        todo = [path for path in paths if self._checkpoint is None or not self._checkpoint.is_done(path)]
+        self._print(f"{len(paths)} arquivos encontrados, {len(paths) - len(todo)} já carregados, "
+                    f"{len(todo)} a processar com {self._workers} processo(s)")
+        self._started = time.perf_counter()
+        for path, outcome in self._parse_all(todo):
+            if isinstance(outcome, Exception):
+                self.failed.append((path, str(outcome)))
+                self._print(f"erro em {path}: {outcome}", error=True)
+                continue
+            self._accept(path, outcome)
+            if len(self._pending) + len(self._pending_done) >= self._batch_files:
+                self._commit()
+        self._commit()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+    def _parse_all(self, paths: Sequence[str]) -> Iterator[Tuple[str, Any]]:
+        """
+        Analisa os arquivos, no próprio processo ou em um pool, devolvendo cada resultado ao ficar pronto.
+        """
+        if self._workers <= 1 or len(paths) <= 1:
+            _init_worker(self._config)
+            for path in paths:
+                try:
+                    yield path, parse_file(path)
+                except Exception as e:
+                    yield path, e
+            return
+
+        with ProcessPoolExecutor(max_workers=self._workers, initializer=_init_worker,
+                                 initargs=(self._config,)) as executor:
+            remaining = iter(paths)
+            running: Dict[Future, str] = {}
+            while True:
+                while len(running) < self._workers * IN_FLIGHT_PER_WORKER:
+                    path = next(remaining, None)
+                    if path is None:
+                        break
+                    running[executor.submit(parse_file, path)] = path
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    try:
+                        yield path, future.result()
+                    except Exception as e:
+                        yield path, e
+
+    def _accept(self, path: str, calculation: EmergyCalculation) -> None:
+        """
+        Separa um cálculo novo para o próximo lote, ou registra o já existente com o mesmo conteúdo.
+        """
+        self.bytes += os.path.getsize(path)
+        self.rows += len(calculation.series) if calculation.series is not None else len(calculation.inputs)
+        content_hash = calculation.content_hash
+        existing = None
+        if content_hash is not None:
+            existing = next((c for _, c in self._pending if c.content_hash == content_hash), None)
+            if existing is None:
+                existing = self._service.find_calculation_by_content_hash(content_hash)
+        if existing is not None:
+            self.deduplicated += 1
+            self._pending_done.append((path, existing.id))
+        else:
+            self._pending.append((path, calculation))
+
+    def _commit(self) -> None:
+        """
+        Salva o lote pendente de uma vez, registra-o no checkpoint e mostra a vazão.
+        """
+        if not self._pending and not self._pending_done:
+            return
+        self._service.save_calculations([calculation for _, calculation in self._pending])
+        entries = [(path, calculation.id) for path, calculation in self._pending] + self._pending_done
+        if self._checkpoint is not None:
+            self._checkpoint.record(entries)
+        self.saved += len(self._pending)
+        self._pending = []
+        self._pending_done = []
+
+        elapsed = self.elapsed_seconds
+        self._print(f"{self.saved + self.deduplicated} arquivos, {self.rows:,} linhas, "
+                    f"{self.bytes / 1e6:,.1f} MB em {elapsed:.1f} s: "
+                    f"{self.rows / elapsed:,.0f} linhas/s, {self.bytes / 1e6 / elapsed:,.1f} MB/s")
+
+    def _print(self, message: str, error: bool = False) -> None:
+        print(message, file=sys.stderr if error else (self._out or sys.stdout), flush=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Ponto de entrada da linha de comando.
+
+    Returns:
+        0 se todos os arquivos foram carregados, 1 se algum falhou, 2 se nenhum foi encontrado
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('sources', nargs='+', help='diretórios, arquivos ou padrões glob')
+    parser.add_argument('--repository', choices=('sqlite', 'columnar'), default='sqlite')
+    parser.add_argument('--database', default='emergy.db', help='arquivo SQLite (DATABASE_PATH)')
+    parser.add_argument('--columnar-path', default='calculations', help='diretório colunar (COLUMNAR_PATH)')
+    parser.add_argument('--transformity-table', default=None, help='arquivo JSON de transformidades')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-files', type=int, default=DEFAULT_BATCH_FILES)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    parser.add_argument('--no-resume', action='store_true', help='ignora o checkpoint e reprocessa tudo')
+    args = parser.parse_args(argv)
+
+    paths = find_files(args.sources)
+    if not paths:
+        print('nenhum arquivo TXT encontrado', file=sys.stderr)
+        return 2
+    if args.no_resume and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    config = {
+        'REPOSITORY': args.repository,
+        'DATABASE_PATH': args.database,
+        'COLUMNAR_PATH': args.columnar_path,
+        'TRANSFORMITY_TABLE': args.transformity_table,
+    }
+    ingestion = BulkIngestion(config, max(1, args.workers), max(1, args.batch_files), Checkpoint(args.checkpoint))
+    ingestion.run(paths)
+    if ingestion.failed:
+        print(f"{len(ingestion.failed)} arquivo(s) com erro; execute de novo para tentar outra vez", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Compressão das respostas da API.
+Este arquivo implementa o ResponseCompressor, registrado como `after_request` na
+aplicação Flask, que comprime com gzip ou brotli as respostas da API conforme o
+cabeçalho Accept-Encoding do cliente. Respostas em fluxo continuam em fluxo: cada
+bloco gerado passa pelo compressor antes de ser enviado. Respostas completas só
+são comprimidas a partir de um tamanho mínimo. O brotli depende do pacote
+opcional `brotli`; sem ele, apenas gzip é oferecido.
+"""
+
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+
+GZIP = 'gzip'
+BROTLI = 'br'
+
+# Tipos de conteúdo comprimidos (os formatos da API)
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'application/json',
+    'application/x-ndjson',
+    'application/vnd.emergy.columnar+json',
+    'application/msgpack',
+    'application/vnd.apache.arrow.stream',
+})
+
+# Respostas completas menores que isto não compensam a compressão
+DEFAULT_MIN_SIZE = 1024
+
+
+class _GzipCompressor:
+    """
+    Compressor gzip em fluxo.
+    """
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    """
+    Compressor brotli em fluxo.
+    """
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ResponseCompressor:
+    """
+    Comprime as respostas da API com gzip ou brotli.
+    """
+
+    def __init__(self, min_size: int = DEFAULT_MIN_SIZE, gzip_level: int = 6, brotli_quality: int = 5):
+        """
+        Inicializa o compressor.
+
+        Args:
+            min_size: Tamanho mínimo, em bytes, de uma resposta completa para ser comprimida
+            gzip_level: Nível de compressão do gzip (1 a 9)
+            brotli_quality: Qualidade do brotli (0 a 11)
+        """
+        self._min_size = min_size
+        self._gzip_level = gzip_level
+        self._brotli_quality = brotli_quality
+
+    @property
+    def encodings(self) -> List[str]:
+        """
+        Codificações oferecidas, na ordem de preferência.
+        """
+        return [BROTLI, GZIP] if brotli is not None else [GZIP]
+
+    def __call__(self, response: Response) -> Response:
+        """
+        Comprime a resposta, se o cliente aceitar e ela for de um tipo comprimível.
+
+        Args:
+            response: A resposta produzida pela rota
+
+        Returns:
+            A mesma resposta, possivelmente comprimida
+        """
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self._choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_chunks(response.response, self._compressor(encoding))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self._min_size:
+                return response
+            compressor = self._compressor(encoding)
+            response.set_data(compressor.process(data) + compressor.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        # Um ETag forte identifica os bytes enviados, portanto muda com a codificação
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+        return response
+
+    def _choose_encoding(self) -> Optional[str]:
+        """
+        Escolhe a codificação preferida entre as aceitas pelo cliente.
+        """
+        return request.accept_encodings.best_match(self.encodings)
+
+    def _compressor(self, encoding: str):
+        """
+        Cria um compressor em fluxo para a codificação.
+        """
+        if encoding == BROTLI:
+            return _BrotliCompressor(self._brotli_quality)
+        return _GzipCompressor(self._gzip_level)
+
+
+def _compress_chunks(chunks: Iterable, compressor) -> Iterator[bytes]:
+    """
+    Comprime os blocos de uma resposta em fluxo à medida que são gerados.
+    """
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        compressed = compressor.process(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.finish()
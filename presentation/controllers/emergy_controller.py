@@ -3,14 +3,72 @@ Controlador para rotas relacionadas a Emergy.
 Este arquivo implementa o controlador para as rotas relacionadas aos cálculos de Emergy,
 seguindo o padrão MVC. O controlador é responsável por lidar com as requisições HTTP
 relacionadas aos cálculos de Emergy, incluindo o upload de arquivos TXT, visualização
-de gráficos e acesso à API para obter e excluir cálculos.
+de gráficos e acesso à API para obter, complementar com novas leituras e excluir cálculos.
 
 Feito por André Carbonieri Silva T839FC9
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+import math
+import os
+import tempfile
+from datetime import datetime
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, jsonify
 from application.services.emergy_application_service import EmergyApplicationService
-from typing import Dict, Any
+from application.services.batch_ingestion_service import BatchFile, BatchIngestionService
+from application.services.ingestion_job_service import IngestionJobService, JobQueueFullError
+from domain.models.emergy_model import CalculationSummary
+from domain.models.meter_series import CHANNELS_BY_KEY, METER_CHANNELS, MeterSeries, to_timestamp
+from domain.repositories.emergy_repository import AppendConflictError, PageCursor
+from domain.services.emergy_engine import DEFAULT_PERIOD
+from domain.services.emergy_sensitivity import DEFAULT_PERCENTILES, SEED_BITS, UevDistribution
+from presentation.serializers.calculation_stream import iter_calculation_json, iter_calculation_ndjson
+from presentation.response_cache import CachedResponse, EncodedResponseCache, make_etag
+from presentation.serializers.wire_formats import (
+    ARROW, COLUMNAR, FORMATS_BY_MIMETYPE, JSON, MIMETYPES, MSGPACK, NDJSON, ColumnarTable,
+    calculation_table, downsampled_table, encode_arrow, encode_msgpack, is_available, iter_columnar_json
+)
+from infrastructure.parsers.compressed_stream import is_supported_upload
+from infrastructure.parsers.content_hash import spool
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# Tamanho padrão e máximo das páginas de GET /api/calculations
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Número máximo de arquivos em POST /api/calculations:batch
+DEFAULT_MAX_BATCH_FILES = 100
+
+# Campos que podem ser pedidos em `fields`; apenas `inputs` exige carregar as leituras
+CALCULATION_FIELDS = ('id', 'total_emergy', 'created_at', 'metadata', 'input_count', 'inputs')
+SUMMARY_FIELDS = ('id', 'total_emergy', 'created_at', 'metadata', 'input_count')
+
+# Formatos de resposta de cada endpoint, na ordem de preferência
+CALCULATION_FORMATS = (JSON, NDJSON, COLUMNAR, MSGPACK, ARROW)
+SERIES_FORMATS = (JSON, COLUMNAR, MSGPACK, ARROW)
+
+# Tempo, em segundos, que navegadores e proxies podem reutilizar a resposta de um
+# cálculo sem leituras de medidor; cálculos com leituras podem receber novas
+# leituras e são sempre revalidados
+DEFAULT_MAX_AGE = 3600
+
+# Sufixos que a compressão acrescenta ao ETag de uma resposta
+_ETAG_ENCODINGS = ('', '-gzip', '-br')
+
+# Número padrão e máximo de pontos de GET /api/calculations/<id>/series
+DEFAULT_SERIES_POINTS = 1000
+MAX_SERIES_POINTS = 10000
+
+# Faixas por eixo no histograma de dispersão
+DEFAULT_SCATTER_BINS = 50
+MAX_SCATTER_BINS = 200
+
+# Número padrão e máximo de cenários de POST /api/calculations/<id>/sensitivity
+DEFAULT_SCENARIOS = 10000
+MAX_SCENARIOS = 1000000
+
+# Número máximo de leituras por requisição de POST /api/calculations/<id>/readings
+MAX_APPEND_READINGS = 100000
 
 
 class EmergyController:
@@ -21,14 +79,32 @@ class EmergyController:
     lidar com requisições HTTP relacionadas a cálculos de emergy.
     """
     
-    def __init__(self, app_service: EmergyApplicationService):
+    def __init__(self, app_service: EmergyApplicationService,
+                 job_service: Optional[IngestionJobService] = None,
+                 response_cache: Optional[EncodedResponseCache] = None,
+                 max_age: int = DEFAULT_MAX_AGE,
+                 batch_service: Optional[BatchIngestionService] = None,
+                 max_batch_files: int = DEFAULT_MAX_BATCH_FILES):
         """
         Inicializa o controlador com um serviço de aplicação.
         
         Args:
             app_service: Uma instância de EmergyApplicationService
+            job_service: Serviço de tarefas de ingestão; se informado, os uploads
+                são processados em segundo plano
+            response_cache: Cache das respostas codificadas de GET /api/calculations/<id>;
+                cria um com o orçamento padrão se omitido
+            max_age: Valor de max-age no Cache-Control das respostas de um cálculo sem leituras de medidor
+            batch_service: Serviço de processamento em lote; cria um, sem acesso a
+                arquivos do servidor, se omitido
+            max_batch_files: Número máximo de arquivos por lote
         """
         self._app_service = app_service
+        self._job_service = job_service
+        self._responses = response_cache if response_cache is not None else EncodedResponseCache()
+        self._max_age = max_age
+        self._batch_service = batch_service if batch_service is not None else BatchIngestionService(app_service)
+        self._max_batch_files = max_batch_files
         self._blueprint = Blueprint('emergy', __name__)
         self._register_routes()
     
@@ -39,8 +115,17 @@ class EmergyController:
         self._blueprint.route('/emergy-calculator', methods=['GET', 'POST'])(self.emergy_calculator)
         self._blueprint.route('/graphics')(self.graphics)
         self._blueprint.route('/api/calculations', methods=['GET'])(self.get_calculations)
+        self._blueprint.route('/api/calculations:batch', methods=['POST'])(self.create_calculations_batch)
         self._blueprint.route('/api/calculations/<calculation_id>', methods=['GET'])(self.get_calculation)
         self._blueprint.route('/api/calculations/<calculation_id>', methods=['DELETE'])(self.delete_calculation)
+        self._blueprint.route('/api/calculations/<calculation_id>/readings', methods=['POST'])(self.append_calculation_readings)
+        self._blueprint.route('/api/calculations/<calculation_id>/series', methods=['GET'])(self.get_calculation_series)
+        self._blueprint.route('/api/calculations/<calculation_id>/rollups', methods=['GET'])(self.get_calculation_rollups)
+        self._blueprint.route('/api/calculations/<calculation_id>/emergy', methods=['GET'])(self.get_calculation_emergy)
+        self._blueprint.route('/api/calculations/<calculation_id>/sensitivity', methods=['POST'])(self.analyze_calculation_sensitivity)
+        self._blueprint.route('/api/calculations/<calculation_id>/stats', methods=['GET'])(self.get_calculation_stats)
+        self._blueprint.route('/api/calculations/<calculation_id>/correlation', methods=['GET'])(self.get_calculation_correlation)
+        self._blueprint.route('/api/calculations/<calculation_id>/scatter', methods=['GET'])(self.get_calculation_scatter)
     
     def get_blueprint(self) -> Blueprint:
         """
@@ -71,22 +156,23 @@ class EmergyController:
                 flash('Nenhum arquivo selecionado')
                 return redirect(request.url)
             
-            # Verifica se o arquivo é um TXT
-            if not file.filename.endswith('.txt'):
-                flash('Por favor, envie um arquivo TXT')
+            # Verifica se o arquivo é um TXT, possivelmente compactado
+            if not is_supported_upload(file.filename):
+                flash('Por favor, envie um arquivo TXT (.txt, .txt.gz, .zip ou .bz2)')
                 return redirect(request.url)
             
-            # Lê o conteúdo do arquivo
-            txt_data = file.read().decode('utf-8')
-            
-            # Processa os dados TXT
+            # Processa os dados TXT diretamente do fluxo do upload, em blocos,
+            # descompactando-os se necessário
             metadata: Dict[str, Any] = {
                 'filename': file.filename,
                 'user_agent': request.user_agent.string
             }
             
+            if self._job_service is not None:
+                return self._submit_job(file, metadata)
+            
             try:
-                calculation = self._app_service.process_txt_data(txt_data, metadata)
+                calculation = self._app_service.process_txt_upload(file.filename, file.stream, metadata)
                 # Armazena o ID do cálculo na sessão para uso posterior
                 # Em um aplicativo real, isso seria tratado por um gerenciador de sessão
                 # Por enquanto, vamos apenas retornar uma mensagem de sucesso
@@ -104,6 +190,109 @@ class EmergyController:
         # Requisição GET - renderiza o template
         return render_template('emergy_calculator.html')
     
+    def _submit_job(self, file, metadata: Dict[str, Any]):
+        """
+        Grava o upload em um arquivo temporário e agenda sua ingestão.
+        
+        Args:
+            file: O arquivo enviado (FileStorage)
+            metadata: Metadados adicionais para o cálculo
+            
+        Returns:
+            Resposta JSON com o ID da tarefa (202) ou um erro (503)
+        """
+        # O fluxo da requisição é fechado ao fim dela, então o upload é copiado para
+        # disco; o hash do conteúdo é calculado na mesma passada
+        path, content_hash = self._spool_upload(file.stream, 'emergy-upload-')
+        
+        try:
+            job = self._job_service.submit_upload(file.filename, path, metadata, content_hash=content_hash)
+        except JobQueueFullError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Servidor ocupado, tente novamente em instantes: {str(e)}'
+            }), 503
+        
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status_url': url_for('jobs.get_job', job_id=job.id),
+            'message': 'Arquivo TXT recebido e enfileirado para processamento'
+        }), 202
+    
+    @staticmethod
+    def _spool_upload(stream, prefix: str) -> Tuple[str, str]:
+        """
+        Copia um upload para um arquivo temporário, calculando o hash do conteúdo.
+        
+        Se a cópia falhar (por exemplo, conexão interrompida ou disco cheio), o
+        arquivo temporário é removido antes de a exceção ser propagada.
+        
+        Args:
+            stream: O fluxo do arquivo enviado
+            prefix: Prefixo do nome do arquivo temporário
+            
+        Returns:
+            Uma tupla (caminho do arquivo temporário, resumo BLAKE2b do conteúdo)
+        """
+        descriptor, path = tempfile.mkstemp(prefix=prefix)
+        try:
+            with os.fdopen(descriptor, 'wb') as spooled:
+                return path, spool(stream, spooled)
+        except BaseException:
+            os.remove(path)
+            raise
+    
+    def create_calculations_batch(self):
+        """
+        Endpoint da API para processar vários arquivos TXT em uma requisição.
+        
+        Aceita um formulário multipart com os arquivos no campo `files` e/ou
+        caminhos de arquivos do servidor, relativos ao diretório permitido, no
+        campo `paths` (um por valor); os caminhos também podem vir em um corpo
+        JSON {"paths": [...]}. Os arquivos são analisados em paralelo e os cálculos
+        novos são salvos de uma só vez; um arquivo com erro não interrompe os demais.
+        
+        Returns:
+            Resposta JSON com o resultado de cada arquivo (ID do cálculo, linhas,
+            tempo, erro) e os tempos do lote, ou um erro (400) se o lote for inválido
+        """
+        uploads = [file for file in request.files.getlist('files') if file.filename]
+        if request.is_json:
+            paths = (request.get_json(silent=True) or {}).get('paths') or []
+        else:
+            paths = request.form.getlist('paths')
+        if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+            return jsonify({
+                'success': False,
+                'message': 'O campo paths deve ser uma lista de caminhos'
+            }), 400
+        if not uploads and not paths:
+            return jsonify({
+                'success': False,
+                'message': 'Envie arquivos no campo files ou caminhos no campo paths'
+            }), 400
+        if len(uploads) + len(paths) > self._max_batch_files:
+            return jsonify({
+                'success': False,
+                'message': f'O lote pode ter no máximo {self._max_batch_files} arquivos'
+            }), 400
+        
+        # Os uploads são copiados para disco, calculando o hash do conteúdo na mesma passada
+        files = []
+        try:
+            for upload in uploads:
+                path, content_hash = self._spool_upload(upload.stream, 'emergy-batch-')
+                files.append(BatchFile(upload.filename, path, content_hash, temporary=True))
+        except BaseException:
+            for spooled in files:
+                os.remove(spooled.path)
+            raise
+        files.extend(BatchFile(path, path) for path in paths)
+        
+        result = self._batch_service.process(files, {'user_agent': request.user_agent.string})
+        return jsonify({'success': True, **result.to_dict()})
+    
     def graphics(self):
         """
         Lida com a página de gráficos.
@@ -115,26 +304,122 @@ class EmergyController:
     
     def get_calculations(self):
         """
-        Endpoint da API para obter todos os cálculos.
+        Endpoint da API para obter uma página de cálculos em ordem de criação.
+        
+        Parâmetros de consulta:
+            limit: Número de cálculos na página (padrão 50, máximo 500)
+            after: Cursor `next_cursor` devolvido pela página anterior
+            fields: Lista de campos separados por vírgula (por exemplo, `id,total_emergy`)
+            summary: Se `true`, omite as entradas (`inputs`) dos cálculos
         
         Returns:
-            Resposta JSON com todos os cálculos
+            Resposta JSON com os cálculos da página e o cursor da próxima página
         """
-        calculations = self._app_service.get_all_calculations()
+        try:
+            limit = self._parse_int(request.args.get('limit'), 'limit', DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+            after = PageCursor.decode(request.args['after']) if request.args.get('after') else None
+            fields = self._parse_fields(request.args.get('fields'), request.args.get('summary'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        # Sem `inputs` basta o resumo, que não carrega as leituras dos cálculos
+        if 'inputs' in fields:
+            page = self._app_service.get_calculations_page(limit + 1, after)
+        else:
+            page = self._app_service.get_calculation_summaries(limit + 1, after)
+        
+        has_more = len(page) > limit
+        page = page[:limit]
         return jsonify({
-            'calculations': [self._serialize_calculation(calc) for calc in calculations]
+            'calculations': [self._serialize_calculation(calc, fields) for calc in page],
+            'next_cursor': PageCursor.of(page[-1]).encode() if has_more else None
         })
     
+    @staticmethod
+    def _parse_fields(value: Optional[str], summary: Optional[str]) -> List[str]:
+        """
+        Valida os parâmetros `fields` e `summary`.
+        
+        Returns:
+            Os campos a serializar, na ordem de CALCULATION_FIELDS
+            
+        Raises:
+            ValueError: Se algum campo for desconhecido
+        """
+        if not value:
+            return list(SUMMARY_FIELDS if (summary or '').lower() in ('1', 'true', 'yes') else CALCULATION_FIELDS)
+        requested = {field.strip() for field in value.split(',') if field.strip()}
+        unknown = requested.difference(CALCULATION_FIELDS)
+        if unknown:
+            raise ValueError(f"Campos desconhecidos: {', '.join(sorted(unknown))}")
+        if (summary or '').lower() in ('1', 'true', 'yes'):
+            requested.discard('inputs')
+        return [field for field in CALCULATION_FIELDS if field in requested]
+    
     def get_calculation(self, calculation_id):
         """
         Endpoint da API para obter um cálculo específico.
         
+        O corpo é enviado em fluxo (transferência em blocos): primeiro os campos do
+        cálculo e depois as entradas, bloco a bloco. O formato é escolhido pelo
+        parâmetro `format` ou pelo cabeçalho Accept:
+        
+            json (application/json): uma entrada por objeto (padrão)
+            ndjson (application/x-ndjson): uma linha com o cabeçalho do cálculo
+                seguida de uma linha por entrada
+            columnar (application/vnd.emergy.columnar+json): uma coluna por canal
+            msgpack (application/msgpack): colunas como bytes little-endian
+            arrow (application/vnd.apache.arrow.stream): fluxo Arrow IPC
+        
+        MessagePack e Arrow exigem os pacotes opcionais `msgpack` e `pyarrow`; sem
+        eles a resposta é 406. `start` e `end` (ISO 8601 ou segundos desde a época)
+        restringem as entradas às leituras do intervalo.
+        
+        Os bytes codificados ficam em cache por (ID, formato, intervalo); antes de
+        usar uma resposta guardada, o resumo gravado do cálculo é lido para
+        conferir o ETag, pois outro processo pode ter anexado leituras ou excluído
+        o cálculo. A resposta tem um ETag forte e Cache-Control público: no-cache para cálculos
+        com leituras de medidor, que podem receber novas leituras, e max-age para os
+        demais. Uma requisição com If-None-Match igual ao ETag recebe 304 sem corpo.
+        
         Args:
             calculation_id: O ID do cálculo a ser recuperado
             
         Returns:
-            Resposta JSON com o cálculo ou um erro
+            Resposta no formato negociado com o cálculo, ou um erro
         """
+        try:
+            start = self._parse_time(request.args.get('start'), 'start')
+            end = self._parse_time(request.args.get('end'), 'end')
+            wire_format = self._negotiate_format(CALCULATION_FORMATS)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if wire_format is None:
+            return self._not_acceptable(CALCULATION_FORMATS)
+        
+        key = (calculation_id, wire_format, (start, end))
+        cached = self._responses.get(key)
+        if cached is not None:
+            summary = self._app_service.get_calculation_summary(calculation_id)
+            if summary is not None and cached.etag == self._calculation_etag(
+                    summary.id, summary.created_at, summary.input_count, wire_format, start, end):
+                not_modified = self._not_modified(cached.etag, cached.revalidate)
+                if not_modified is not None:
+                    return not_modified
+                return self._cacheable(Response(cached.body, mimetype=cached.mimetype), cached.etag, cached.revalidate)
+            # Outro processo alterou ou excluiu o cálculo
+            self._responses.invalidate(calculation_id)
+        
+        # Obtida antes de carregar o cálculo, para não guardar uma resposta de uma
+        # versão excluída ou alterada enquanto era codificada
+        generation = self._responses.generation()
         calculation = self._app_service.get_calculation(calculation_id)
         
         if calculation is None:
@@ -143,11 +428,688 @@ class EmergyController:
                 'message': f'Cálculo com ID {calculation_id} não encontrado'
             }), 404
         
+        etag = self._calculation_etag(calculation.id, calculation.created_at, len(calculation.inputs),
+                                      wire_format, start, end)
+        revalidate = calculation.series is not None
+        not_modified = self._not_modified(etag, revalidate)
+        if not_modified is not None:
+            return not_modified
+        
+        try:
+            calculation = calculation.time_range(start, end)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        mimetype = MIMETYPES[wire_format]
+        body = self._encode_calculation(calculation, wire_format)
+        if isinstance(body, bytes):
+            self._responses.put(key, CachedResponse(body, mimetype, etag, revalidate), generation)
+        else:
+            body = self._responses.caching(key, body, mimetype, etag, generation, revalidate)
+        return self._cacheable(Response(body, mimetype=mimetype), etag, revalidate)
+    
+    @staticmethod
+    def _calculation_etag(calculation_id: str, created_at: datetime, input_count: int, wire_format: str,
+                          start: Optional[int], end: Optional[int]) -> str:
+        """
+        ETag de uma resposta de cálculo; o número de entradas distingue versões do mesmo cálculo com mais leituras.
+        """
+        return make_etag(calculation_id, created_at.isoformat(), input_count, wire_format, start, end)
+    
+    def _encode_calculation(self, calculation, wire_format: str) -> Union[bytes, Iterator[str]]:
+        """
+        Codifica um cálculo no formato escolhido, em blocos ou como bytes.
+        """
+        if wire_format == JSON:
+            return iter_calculation_json(calculation)
+        if wire_format == NDJSON:
+            return iter_calculation_ndjson(calculation)
+        return self._encode_table(calculation_table(calculation), wire_format)
+    
+    def _not_modified(self, etag: str, revalidate: bool) -> Optional[Response]:
+        """
+        Devolve uma resposta 304 se o If-None-Match da requisição tiver o ETag,
+        inclusive na variante comprimida; None caso contrário.
+        """
+        matched = next((etag + suffix for suffix in _ETAG_ENCODINGS
+                        if request.if_none_match.contains(etag + suffix)), None)
+        if matched is None:
+            return None
+        return self._cacheable(Response(status=304), matched, revalidate)
+    
+    def _cacheable(self, response: Response, etag: str, revalidate: bool) -> Response:
+        """
+        Acrescenta o ETag e o Cache-Control a uma resposta de cálculo; com
+        `revalidate`, os clientes guardam a resposta mas a revalidam pelo ETag a cada uso.
+        """
+        response.set_etag(etag)
+        response.cache_control.public = True
+        if revalidate:
+            response.cache_control.no_cache = True
+        else:
+            response.cache_control.max_age = self._max_age
+        return response
+    
+    def append_calculation_readings(self, calculation_id):
+        """
+        Endpoint da API para anexar novas leituras ao fim de um cálculo.
+        
+        O corpo pode ser JSON, {"readings": [{"timestamp": "2007-01-01T00:00:00",
+        "global_active_power": 4.2, ...}, ...]}, com o timestamp em ISO 8601 ou em
+        segundos desde a época e null (ou a omissão) para canais sem leitura, ou
+        linhas no formato do arquivo TXT com Content-Type text/plain. Leituras com
+        o horário de uma leitura existente são contadas como duplicadas e as
+        anteriores à última leitura do cálculo como fora de ordem; ambas são descartadas.
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            Resposta JSON com as leituras aceitas, duplicadas e fora de ordem, e o
+            novo número de entradas e total de emergia do cálculo
+        """
+        try:
+            if request.mimetype == 'text/plain':
+                result = self._app_service.append_txt_readings(calculation_id, request.get_data())
+            else:
+                result = self._app_service.append_readings(
+                    calculation_id, self._parse_readings(request.get_json(silent=True))
+                )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        except AppendConflictError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 409
+        
+        if result is None:
+            return jsonify({
+                'success': False,
+                'message': f'Cálculo com ID {calculation_id} não encontrado'
+            }), 404
+        
+        if result.accepted:
+            self._responses.invalidate(calculation_id)
+        return jsonify({
+            'success': True,
+            'calculation_id': calculation_id,
+            'accepted': result.accepted,
+            'duplicates': result.duplicates,
+            'out_of_order': result.out_of_order,
+            'input_count': result.summary.input_count,
+            'total_emergy': result.summary.total_emergy
+        })
+    
+    @staticmethod
+    def _parse_readings(body: Optional[Dict[str, Any]]) -> MeterSeries:
+        """
+        Valida o corpo JSON de POST /api/calculations/<id>/readings.
+        
+        Returns:
+            A MeterSeries com as leituras, na ordem recebida
+        
+        Raises:
+            ValueError: Se o corpo for inválido
+        """
+        readings = body.get('readings') if isinstance(body, dict) else None
+        if not isinstance(readings, list) or not readings:
+            raise ValueError('Informe ao menos uma leitura em readings')
+        if len(readings) > MAX_APPEND_READINGS:
+            raise ValueError(f'Envie no máximo {MAX_APPEND_READINGS} leituras por requisição')
+        timestamps: List[int] = []
+        columns: Dict[str, List[float]] = {channel.key: [] for channel in METER_CHANNELS}
+        for reading in readings:
+            if not isinstance(reading, dict):
+                raise ValueError('Cada leitura deve ser um objeto JSON')
+            unknown = sorted(set(reading) - set(columns) - {'timestamp'})
+            if unknown:
+                raise ValueError(f"Canais desconhecidos: {', '.join(unknown)}")
+            timestamp = reading.get('timestamp')
+            if isinstance(timestamp, int) and not isinstance(timestamp, bool):
+                timestamps.append(timestamp)
+            elif isinstance(timestamp, str) and timestamp:
+                timestamps.append(EmergyController._parse_time(timestamp, 'timestamp'))
+            else:
+                raise ValueError('Cada leitura deve ter um timestamp')
+            for key, values in columns.items():
+                value = reading.get(key)
+                if value is None:
+                    values.append(math.nan)
+                elif isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f'Valor inválido para o canal {key}: {value}')
+                else:
+                    values.append(float(value))
+        return MeterSeries(timestamps, columns)
+    
+    def get_calculation_series(self, calculation_id):
+        """
+        Endpoint da API para obter as leituras de um cálculo reduzidas para gráficos.
+        
+        Parâmetros de consulta:
+            channels: Chaves dos canais separadas por vírgula (padrão: todos)
+            start, end: Intervalo de tempo, em ISO 8601 ou segundos desde a época
+            points: Número máximo de leituras (padrão 1000, máximo 10000)
+            method: `lttb` (padrão) ou `minmax`
+            format: `json` (padrão), `columnar`, `msgpack` ou `arrow`; também
+                pode ser pedido pelo cabeçalho Accept, como em get_calculation
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            Resposta com os timestamps e os valores de cada canal, ou um erro
+        """
+        try:
+            wire_format = self._negotiate_format(SERIES_FORMATS)
+            channels = self._parse_list(request.args.get('channels'))
+            points = self._parse_int(request.args.get('points'), 'points', DEFAULT_SERIES_POINTS, 2, MAX_SERIES_POINTS)
+            start = self._parse_time(request.args.get('start'), 'start')
+            end = self._parse_time(request.args.get('end'), 'end')
+            downsampled = self._app_service.get_calculation_series(
+                calculation_id, channels, points, start, end, request.args.get('method', 'lttb')
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if downsampled is None:
+            return jsonify({
+                'success': False,
+                'message': f'Cálculo com ID {calculation_id} não encontrado'
+            }), 404
+        
+        if wire_format is None:
+            return self._not_acceptable(SERIES_FORMATS)
+        if wire_format != JSON:
+            return Response(self._encode_table(downsampled_table(calculation_id, downsampled), wire_format),
+                            mimetype=MIMETYPES[wire_format])
+        return jsonify({
+            'success': True,
+            'calculation_id': calculation_id,
+            'method': downsampled.method,
+            'source_points': downsampled.source_points,
+            'points': len(downsampled),
+            'timestamps': downsampled.timestamps.tolist(),
+            'channels': {
+                key: {**self._describe_channel(key), 'values': self._json_values(column)}
+                for key, column in downsampled.columns.items()
+            }
+        })
+    
+    def get_calculation_rollups(self, calculation_id):
+        """
+        Endpoint da API para obter as agregações pré-calculadas de um cálculo.
+        
+        Parâmetros de consulta:
+            channels: Chaves dos canais separadas por vírgula (padrão: todos)
+            start, end: Intervalo de tempo, em ISO 8601 ou segundos desde a época
+            points: Número de pontos desejado (padrão 1000); escolhe o nível mais
+                grosso que ainda mostra esse número de baldes no intervalo
+            level: Nível explícito (`1min`, `15min`, `1h`, `1d` ou `1month`)
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            Resposta JSON com o nível, o início de cada balde e as agregações por canal
+        """
+        try:
+            rollup = self._app_service.get_calculation_rollup(
+                calculation_id,
+                self._parse_list(request.args.get('channels')),
+                self._parse_int(request.args.get('points'), 'points', DEFAULT_SERIES_POINTS, 1, MAX_SERIES_POINTS),
+                self._parse_time(request.args.get('start'), 'start'),
+                self._parse_time(request.args.get('end'), 'end'),
+                request.args.get('level') or None
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if rollup is None:
+            return jsonify({
+                'success': False,
+                'message': f'Cálculo com ID {calculation_id} não encontrado'
+            }), 404
+        
         return jsonify({
             'success': True,
-            'calculation': self._serialize_calculation(calculation)
+            'calculation_id': calculation_id,
+            'level': rollup.level.name,
+            'bucket_seconds': rollup.level.seconds,
+            'points': len(rollup),
+            'timestamps': rollup.timestamps.tolist(),
+            'channels': {
+                key: {
+                    **self._describe_channel(key),
+                    'sum': self._json_values(rollup.sums[key]),
+                    'mean': self._json_values(rollup.mean(key)),
+                    'min': self._json_values(rollup.minimums[key]),
+                    'max': self._json_values(rollup.maximums[key]),
+                    'count': rollup.counts[key].tolist()
+                }
+                for key in rollup.channels
+            }
         })
     
+    def get_calculation_emergy(self, calculation_id):
+        """
+        Endpoint da API para obter a emergia de um cálculo por canal, categoria e período.
+        
+        Parâmetros de consulta:
+            period: Nível da divisão no tempo (`1min`, `15min`, `1h`, `1d` ou `1month`; padrão `1d`)
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            Resposta JSON com o total (sej), a energia e a emergia de cada canal, a
+            emergia por categoria e, para cada período, a emergia por categoria e o total
+        """
+        try:
+            report = self._app_service.get_calculation_emergy(
+                calculation_id,
+                request.args.get('period') or DEFAULT_PERIOD
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if report is None:
+            return jsonify({
+                'success': False,
+                'message': f'Cálculo com ID {calculation_id} não encontrado'
+            }), 404
+        
+        accounting = report.accounting
+        timeline = report.timeline
+        return jsonify({
+            'success': True,
+            'calculation_id': calculation_id,
+            **accounting.to_metadata(),
+            'period': timeline.period,
+            'timeline': {
+                'timestamps': timeline.timestamps.tolist(),
+                'total': timeline.total.tolist(),
+                'by_category': {category: values.tolist() for category, values in timeline.by_category.items()}
+            }
+        })
+    
+    def analyze_calculation_sensitivity(self, calculation_id):
+        """
+        Endpoint da API para analisar a sensibilidade da emergia de um cálculo às transformidades.
+        
+        Corpo JSON:
+            transformities: Distribuição do UEV por categoria, como
+                {"Active Power": {"distribution": "lognormal", "median": 1.6e5, "gsd": 1.5}};
+                as categorias omitidas mantêm o UEV do cálculo
+            scenarios: Número de cenários (padrão 10000, máximo 1000000)
+            seed: Semente inteira, para reproduzir a análise (opcional)
+            percentiles: Percentis a informar (padrão 2.5, 5, 50, 95 e 97.5)
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            Resposta JSON com a emergia pontual, a média, o desvio padrão e os
+            percentis da emergia total e de cada categoria incerta, e a semente usada
+        """
+        try:
+            distributions, scenarios, seed, percentiles = self._parse_sensitivity(request.get_json(silent=True))
+            result = self._app_service.analyze_emergy_sensitivity(
+                calculation_id, distributions, scenarios, seed, percentiles
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if result is None:
+            return jsonify({
+                'success': False,
+                'message': f'Cálculo com ID {calculation_id} não encontrado'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'calculation_id': calculation_id,
+            'scenarios': result.scenarios,
+            'seed': result.seed,
+            'point_estimate': result.point_estimate,
+            'mean': result.mean,
+            'std': result.std,
+            'percentiles': self._json_percentiles(result.percentiles),
+            'by_category': {
+                category: self._json_percentiles(values) for category, values in result.by_category.items()
+            }
+        })
+    
+    @staticmethod
+    def _parse_sensitivity(body: Optional[Dict[str, Any]]):
+        """
+        Valida o corpo de POST /api/calculations/<id>/sensitivity.
+        
+        Returns:
+            (distribuições por categoria, cenários, semente, percentis)
+        
+        Raises:
+            ValueError: Se o corpo for inválido
+        """
+        if not isinstance(body, dict):
+            raise ValueError('O corpo da requisição deve ser um objeto JSON')
+        transformities = body.get('transformities')
+        if not isinstance(transformities, dict) or not transformities:
+            raise ValueError('Informe ao menos uma distribuição em transformities')
+        distributions = {}
+        for category, spec in transformities.items():
+            if not isinstance(spec, dict):
+                raise ValueError(f'Distribuição inválida para a categoria {category}')
+            distributions[category] = UevDistribution.from_dict(spec)
+        
+        scenarios = body.get('scenarios', DEFAULT_SCENARIOS)
+        if isinstance(scenarios, bool) or not isinstance(scenarios, int) or not 1 <= scenarios <= MAX_SCENARIOS:
+            raise ValueError(f'O parâmetro scenarios deve ser um inteiro entre 1 e {MAX_SCENARIOS}')
+        seed = body.get('seed')
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)
+                                 or not 0 <= seed < 2 ** SEED_BITS):
+            raise ValueError(f'O parâmetro seed deve ser um inteiro entre 0 e 2^{SEED_BITS} - 1')
+        percentiles = body.get('percentiles', DEFAULT_PERCENTILES)
+        if (not isinstance(percentiles, (list, tuple)) or not percentiles
+                or not all(isinstance(p, (int, float)) and not isinstance(p, bool) for p in percentiles)):
+            raise ValueError('O parâmetro percentiles deve ser uma lista de números')
+        return distributions, scenarios, seed, [float(p) for p in percentiles]
+    
+    @staticmethod
+    def _json_percentiles(values: Dict[float, float]) -> Dict[str, float]:
+        """
+        Converte um dicionário de percentis para JSON, com as chaves como texto ('2.5', '50').
+        """
+        return {f'{level:g}': value for level, value in values.items()}
+    
+    def get_calculation_stats(self, calculation_id):
+        """
+        Endpoint da API para obter as estatísticas descritivas de cada canal de um cálculo.
+        
+        Parâmetros de consulta:
+            channels: Chaves dos canais separadas por vírgula (padrão: todos)
+            exact: Se `true`, percorre todas as leituras em vez de usar os resumos
+                acumulados, cujos percentis são estimados
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            Resposta JSON com contagem, ausentes, média, desvio padrão, mínimo,
+            máximo e percentis de cada canal
+        """
+        exact = (request.args.get('exact') or '').lower() in ('1', 'true', 'yes')
+        try:
+            statistics = self._app_service.get_calculation_statistics(
+                calculation_id,
+                self._parse_list(request.args.get('channels')),
+                exact
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if statistics is None:
+            return jsonify({
+                'success': False,
+                'message': f'Cálculo com ID {calculation_id} não encontrado'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'calculation_id': calculation_id,
+            'exact': exact,
+            'channels': {
+                key: {
+                    **self._describe_channel(key),
+                    'count': channel.count,
+                    'missing': channel.missing,
+                    'mean': self._json_value(channel.mean),
+                    'std': self._json_value(channel.std),
+                    'min': self._json_value(channel.minimum),
+                    'max': self._json_value(channel.maximum),
+                    'percentiles': {
+                        f'p{percentile}': self._json_value(value)
+                        for percentile, value in channel.percentiles.items()
+                    }
+                }
+                for key, channel in statistics.items()
+            }
+        })
+    
+    def get_calculation_correlation(self, calculation_id):
+        """
+        Endpoint da API para obter a matriz de correlação de Pearson entre os canais de um cálculo.
+        
+        Parâmetros de consulta:
+            channels: Chaves dos canais separadas por vírgula (padrão: todos)
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            Resposta JSON com os canais, a matriz de correlação (null quando um canal
+            é constante) e o número de leituras usadas em cada par
+        """
+        try:
+            correlation = self._app_service.get_calculation_correlation(
+                calculation_id,
+                self._parse_list(request.args.get('channels'))
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if correlation is None:
+            return jsonify({
+                'success': False,
+                'message': f'Cálculo com ID {calculation_id} não encontrado'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'calculation_id': calculation_id,
+            'channels': correlation.channels,
+            'headers': [self._describe_channel(key)['header'] for key in correlation.channels],
+            'matrix': [self._json_values(row) for row in correlation.matrix],
+            'counts': correlation.counts.tolist()
+        })
+    
+    def get_calculation_scatter(self, calculation_id):
+        """
+        Endpoint da API para obter o histograma 2-D de dois canais e a reta de regressão.
+        
+        Parâmetros de consulta:
+            x, y: Chaves dos canais dos eixos (obrigatórios)
+            bins: Número de faixas em cada eixo (padrão 50, máximo 200)
+        
+        Args:
+            calculation_id: O ID do cálculo
+            
+        Returns:
+            Resposta JSON com os limites das faixas de cada eixo, a contagem de
+            leituras em cada célula e a inclinação, o intercepto e o R² do ajuste
+        """
+        x = request.args.get('x')
+        y = request.args.get('y')
+        try:
+            if not x or not y:
+                raise ValueError("Os parâmetros 'x' e 'y' são obrigatórios")
+            density = self._app_service.get_calculation_scatter(
+                calculation_id, x, y,
+                self._parse_int(request.args.get('bins'), 'bins', DEFAULT_SCATTER_BINS, 1, MAX_SCATTER_BINS)
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if density is None:
+            return jsonify({
+                'success': False,
+                'message': f'Cálculo com ID {calculation_id} não encontrado'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'calculation_id': calculation_id,
+            'points': density.points,
+            'x': {'key': density.x, **self._describe_channel(density.x), 'edges': density.x_edges.tolist()},
+            'y': {'key': density.y, **self._describe_channel(density.y), 'edges': density.y_edges.tolist()},
+            'counts': density.counts.tolist(),
+            'fit': {
+                'slope': self._json_value(density.fit.slope),
+                'intercept': self._json_value(density.fit.intercept),
+                'r_squared': self._json_value(density.fit.r_squared)
+            }
+        })
+    
+    @staticmethod
+    def _describe_channel(key: str) -> Dict[str, Any]:
+        """
+        Cabeçalho e unidade de um canal, para as respostas de séries.
+        """
+        channel = CHANNELS_BY_KEY.get(key)
+        return {
+            'header': channel.header if channel is not None else key,
+            'unit': channel.unit if channel is not None else None
+        }
+    
+    @staticmethod
+    def _json_values(values) -> List[Optional[float]]:
+        """
+        Converte um array em lista para JSON; valores ausentes (NaN) viram null.
+        """
+        return [None if math.isnan(value) else value for value in values.tolist()]
+    
+    @staticmethod
+    def _json_value(value: float) -> Optional[float]:
+        """
+        Converte um número para JSON; NaN vira null.
+        """
+        return None if math.isnan(value) else value
+    
+    @staticmethod
+    def _parse_list(value: Optional[str]) -> Optional[List[str]]:
+        """
+        Divide um parâmetro separado por vírgulas; None se estiver ausente.
+        """
+        if not value:
+            return None
+        return [item.strip() for item in value.split(',') if item.strip()]
+    
+    @staticmethod
+    def _parse_int(value: Optional[str], name: str, default: int, minimum: int, maximum: int) -> int:
+        """
+        Valida um parâmetro inteiro dentro de um intervalo.
+        
+        Raises:
+            ValueError: Se o valor não for um inteiro entre `minimum` e `maximum`
+        """
+        if value is None or value == '':
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError(f'Parâmetro {name} inválido: {value}')
+        if not minimum <= number <= maximum:
+            raise ValueError(f'O parâmetro {name} deve estar entre {minimum} e {maximum}')
+        return number
+    
+    @staticmethod
+    def _parse_time(value: Optional[str], name: str) -> Optional[int]:
+        """
+        Converte um limite de intervalo (ISO 8601 ou segundos desde a época) em timestamp.
+        
+        Raises:
+            ValueError: Se o valor não puder ser interpretado
+        """
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            pass
+        try:
+            return to_timestamp(datetime.fromisoformat(value))
+        except ValueError:
+            raise ValueError(f'Parâmetro {name} inválido: {value}')
+    
+    @staticmethod
+    def _negotiate_format(formats: Sequence[str]) -> Optional[str]:
+        """
+        Escolhe o formato da resposta pelo parâmetro `format` ou pelo cabeçalho Accept.
+        
+        Sem nenhum dos dois, usa o primeiro formato de `formats`.
+        
+        Args:
+            formats: Formatos do endpoint, na ordem de preferência
+            
+        Returns:
+            O formato escolhido, ou None se nenhum formato aceito pelo cliente estiver disponível
+            
+        Raises:
+            ValueError: Se o parâmetro `format` não for um formato do endpoint
+        """
+        requested = request.args.get('format')
+        if requested:
+            requested = requested.lower()
+            if requested not in formats:
+                raise ValueError(f"Formato desconhecido: {requested}")
+            return requested if is_available(requested) else None
+        
+        if not request.accept_mimetypes:
+            return formats[0]
+        offered = [mimetype for mimetype, name in FORMATS_BY_MIMETYPE.items()
+                   if name in formats and is_available(name)]
+        best = request.accept_mimetypes.best_match(offered)
+        return FORMATS_BY_MIMETYPE[best] if best is not None else None
+    
+    @staticmethod
+    def _not_acceptable(formats: Sequence[str]):
+        """
+        Resposta 406 listando os formatos disponíveis do endpoint.
+        """
+        return jsonify({
+            'success': False,
+            'message': 'Nenhum dos formatos aceitos pelo cliente está disponível',
+            'available': [MIMETYPES[name] for name in formats if is_available(name)]
+        }), 406
+    
+    @staticmethod
+    def _encode_table(table: ColumnarTable, wire_format: str) -> Union[bytes, Iterator[str]]:
+        """
+        Codifica uma tabela colunar no formato escolhido (JSON colunar em blocos).
+        """
+        if wire_format == MSGPACK:
+            return encode_msgpack(table)
+        if wire_format == ARROW:
+            return encode_arrow(table)
+        return iter_columnar_json(table)
+    
     def delete_calculation(self, calculation_id):
         """
         Endpoint da API para excluir um cálculo específico.
@@ -159,6 +1121,7 @@ class EmergyController:
             Resposta JSON indicando sucesso ou falha
         """
         success = self._app_service.delete_calculation(calculation_id)
+        self._responses.invalidate(calculation_id)
         
         if not success:
             return jsonify({
@@ -171,29 +1134,43 @@ class EmergyController:
                 'message': f'Cálculo com ID {calculation_id} excluído com sucesso'
         })
     
-    def _serialize_calculation(self, calculation):
+    def _serialize_calculation(self, calculation, fields: List[str]):
         """
         Serializa um objeto de cálculo para um dicionário.
         
         Args:
-            calculation: O EmergyCalculation para serializar
+            calculation: O EmergyCalculation (ou CalculationSummary) para serializar
+            fields: Campos a incluir
             
         Returns:
             Uma representação em dicionário do cálculo
         """
-        return {
-            'id': calculation.id,
-            'total_emergy': calculation.total_emergy,
-            'created_at': calculation.created_at.isoformat(),
-            'inputs': [
-                {
-                    'name': input_item.name,
-                    'value': input_item.value,
-                    'unit': input_item.unit,
-                    'category': input_item.category,
-                    'description': input_item.description
-                }
-                for input_item in calculation.inputs
-            ],
-            'metadata': calculation.metadata
-        }
+        serialized: Dict[str, Any] = {}
+        for field in fields:
+            if field == 'created_at':
+                serialized[field] = calculation.created_at.isoformat()
+            elif field == 'inputs':
+                serialized[field] = self._serialize_inputs(calculation.inputs)
+            elif field == 'input_count':
+                serialized[field] = (
+                    calculation.input_count if isinstance(calculation, CalculationSummary) else len(calculation.inputs)
+                )
+            else:
+                serialized[field] = getattr(calculation, field)
+        return serialized
+    
+    @staticmethod
+    def _serialize_inputs(inputs) -> List[Dict[str, Any]]:
+        """
+        Serializa as entradas de um cálculo.
+        """
+        return [
+            {
+                'name': input_item.name,
+                'value': input_item.value,
+                'unit': input_item.unit,
+                'category': input_item.category,
+                'description': input_item.description
+            }
+            for input_item in inputs
+        ]
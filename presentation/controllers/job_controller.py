@@ -0,0 +1,67 @@
+"""
+Controlador para as rotas de tarefas de ingestão.
+Este arquivo implementa o controlador que expõe o estado das tarefas assíncronas
+de ingestão de arquivos, seguindo o padrão MVC. A página da calculadora consulta
+estas rotas para acompanhar o progresso de um upload até o cálculo ser criado.
+"""
+
+from flask import Blueprint, jsonify
+from application.services.ingestion_job_service import IngestionJobService
+
+
+class JobController:
+    """
+    Controlador para lidar com rotas de tarefas de ingestão.
+    
+    Este controlador segue o padrão MVC e é responsável por
+    lidar com requisições HTTP de consulta às tarefas.
+    """
+    
+    def __init__(self, job_service: IngestionJobService):
+        """
+        Inicializa o controlador com o serviço de tarefas.
+        
+        Args:
+            job_service: Uma instância de IngestionJobService
+        """
+        self._job_service = job_service
+        self._blueprint = Blueprint('jobs', __name__)
+        self._register_routes()
+    
+    def _register_routes(self) -> None:
+        """
+        Registra rotas com o blueprint.
+        """
+        self._blueprint.route('/api/jobs/<job_id>', methods=['GET'])(self.get_job)
+    
+    def get_blueprint(self) -> Blueprint:
+        """
+        Obtém o blueprint do controlador.
+        
+        Returns:
+            O blueprint Flask para este controlador
+        """
+        return self._blueprint
+    
+    def get_job(self, job_id):
+        """
+        Endpoint da API para obter o estado de uma tarefa de ingestão.
+        
+        Args:
+            job_id: O ID da tarefa
+            
+        Returns:
+            Resposta JSON com a tarefa ou um erro
+        """
+        job = self._job_service.get_job(job_id)
+        
+        if job is None:
+            return jsonify({
+                'success': False,
+                'message': f'Tarefa com ID {job_id} não encontrada'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
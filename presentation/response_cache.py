@@ -0,0 +1,218 @@
+"""
+Cache de respostas codificadas da API.
+Este arquivo implementa o EncodedResponseCache, que guarda os bytes já codificados
+das respostas de um cálculo, identificados por (ID do cálculo, formato, projeção),
+junto com o ETag e o tipo de conteúdo. Enquanto o cálculo não muda, uma
+resposta guardada pode ser reenviada sem recarregar nem recodificar o cálculo. O
+total de bytes guardados é limitado por um orçamento, com remoção das respostas
+usadas há mais tempo, e todas as respostas de um cálculo são descartadas quando
+ele é excluído ou recebe novas leituras neste processo; alterações feitas por
+outros processos são percebidas por quem usa o cache, comparando o ETag guardado
+com o da versão gravada. Respostas em fluxo são copiadas para o cache enquanto são
+enviadas, sem atrasar o primeiro byte.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Identifica uma resposta: (ID do cálculo, formato, projeção)
+ResponseKey = Tuple[str, str, Hashable]
+
+# Orçamento padrão do cache, em bytes
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """
+    Corpo codificado de uma resposta, com o tipo de conteúdo e o ETag.
+
+    `revalidate` indica que o cálculo pode receber leituras, e que os clientes
+    devem revalidar a resposta a cada uso.
+    """
+    body: bytes
+    mimetype: str
+    etag: str
+    revalidate: bool = False
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Calcula um ETag forte (sem aspas) a partir das partes que determinam a representação.
+
+    Args:
+        *parts: Valores que identificam a representação, como o ID do cálculo,
+            o número de entradas, o formato e a projeção
+
+    Returns:
+        Um resumo hexadecimal de 32 caracteres
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class EncodedResponseCache:
+    """
+    Cache LRU de respostas codificadas, limitado pelo total de bytes e seguro entre threads.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entry_bytes: Optional[int] = None):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_bytes: Total máximo de bytes guardados
+            max_entry_bytes: Tamanho máximo de uma resposta guardada; usa um quarto
+                do orçamento se omitido
+        """
+        self._max_bytes = max_bytes
+        self._max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 4
+        self._entries: 'OrderedDict[ResponseKey, CachedResponse]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Incrementado a cada invalidação, para descartar respostas codificadas antes dela
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """
+        Total de bytes guardados.
+        """
+        return self._size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def generation(self) -> int:
+        """
+        Marca o momento atual, para guardar depois apenas respostas ainda válidas.
+
+        Deve ser obtida antes de carregar o cálculo que será codificado: se o
+        cálculo for invalidado (excluído ou alterado) depois disso, put e caching
+        descartam a resposta.
+
+        Returns:
+            O número de invalidações até agora
+        """
+        with self._lock:
+            return self._generation
+
+    def get(self, key: ResponseKey) -> Optional[CachedResponse]:
+        """
+        Recupera uma resposta guardada, marcando-a como usada recentemente.
+
+        Args:
+            key: (ID do cálculo, formato, projeção)
+
+        Returns:
+            A CachedResponse, ou None se não estiver no cache
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def put(self, key: ResponseKey, response: CachedResponse, generation: Optional[int] = None) -> bool:
+        """
+        Guarda uma resposta, removendo as menos usadas até caber no orçamento.
+
+        Args:
+            key: (ID do cálculo, formato, projeção)
+            response: A resposta codificada
+            generation: Valor de generation() obtido antes de carregar o cálculo;
+                se omitido, a resposta é considerada atual
+
+        Returns:
+            True se a resposta foi guardada, False se for maior que o limite por
+            resposta ou se houve uma invalidação desde `generation`
+        """
+        with self._lock:
+            return self._put(key, response, self._generation if generation is None else generation)
+
+    def caching(self, key: ResponseKey, chunks: Iterable[Union[str, bytes]],
+                mimetype: str, etag: str, generation: Optional[int] = None,
+                revalidate: bool = False) -> Iterator[bytes]:
+        """
+        Repassa os blocos de uma resposta em fluxo e guarda o corpo completo ao final.
+
+        A cópia é abandonada assim que passa do limite por resposta, e o corpo só é
+        guardado se o fluxo chegar ao fim e não tiver havido invalidação desde
+        `generation` (ou, se omitida, desde a chamada de caching).
+
+        Args:
+            key: (ID do cálculo, formato, projeção)
+            chunks: Blocos gerados pelo codificador
+            mimetype: Tipo de conteúdo da resposta
+            etag: ETag da resposta
+            generation: Valor de generation() obtido antes de carregar o cálculo
+            revalidate: Valor de CachedResponse.revalidate
+
+        Returns:
+            Um iterador dos blocos, em bytes
+        """
+        if generation is None:
+            generation = self.generation()
+        return self._caching(key, chunks, CachedResponse(b'', mimetype, etag, revalidate), generation)
+
+    def _caching(self, key: ResponseKey, chunks: Iterable[Union[str, bytes]],
+                 response: CachedResponse, generation: int) -> Iterator[bytes]:
+        """
+        Gerador de caching; a geração já foi fixada por quem o chama.
+        """
+        pieces: Optional[List[bytes]] = []
+        size = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if pieces is not None:
+                size += len(chunk)
+                if size <= self._max_entry_bytes:
+                    pieces.append(chunk)
+                else:
+                    pieces = None
+            yield chunk
+
+        if pieces is not None:
+            with self._lock:
+                self._put(key, replace(response, body=b''.join(pieces)), generation)
+
+    def invalidate(self, calculation_id: str) -> None:
+        """
+        Descarta todas as respostas de um cálculo.
+
+        Args:
+            calculation_id: O ID do cálculo
+        """
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key[0] == calculation_id]:
+                self._size -= len(self._entries.pop(key).body)
+
+    def _put(self, key: ResponseKey, response: CachedResponse, generation: int) -> bool:
+        """
+        Guarda uma resposta; deve ser chamado com o bloqueio adquirido.
+        """
+        if len(response.body) > self._max_entry_bytes or generation != self._generation:
+            return False
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous.body)
+        self._entries[key] = response
+        self._size += len(response.body)
+        while self._size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+        return True
@@ -0,0 +1,179 @@
+"""
+Serialização em fluxo de cálculos de Emergy.
+Este arquivo implementa codificadores baseados em geradores que produzem o JSON
+(ou NDJSON) de um cálculo aos poucos: primeiro os campos do cabeçalho e depois as
+entradas em blocos, para que a resposta comece a ser enviada antes de o
+documento inteiro existir e a memória usada não cresça com o número de entradas.
+Para cálculos com uma MeterSeries, cada entrada é montada diretamente a partir
+das colunas, sem criar objetos EmergyInput nem dicionários intermediários.
+"""
+
+import json
+import math
+from typing import Any, Dict, Iterable, Iterator, List
+
+from domain.models.emergy_model import EmergyCalculation, EmergyInput
+from domain.models.meter_series import MeterChannel, MeterSeries, split_timestamp
+
+
+# Leituras da série codificadas por bloco emitido (cada leitura gera uma entrada por canal)
+DEFAULT_CHUNK_ROWS = 2048
+
+# Entradas genéricas (EmergyInput) codificadas por bloco emitido
+DEFAULT_CHUNK_INPUTS = 8192
+
+_SEPARATORS = (',', ':')
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=_SEPARATORS, ensure_ascii=False)
+
+
+def _number(value: float) -> str:
+    """
+    Codifica um número; valores ausentes (NaN) viram null, já que NaN não é JSON válido.
+    """
+    return 'null' if math.isnan(value) else repr(value)
+
+
+def calculation_header(calculation: EmergyCalculation) -> Dict[str, Any]:
+    """
+    Campos de um cálculo que precedem as entradas.
+
+    Args:
+        calculation: O EmergyCalculation
+
+    Returns:
+        Um dicionário com id, total_emergy, created_at, metadata e input_count
+    """
+    return {
+        'id': calculation.id,
+        'total_emergy': calculation.total_emergy,
+        'created_at': calculation.created_at.isoformat(),
+        'metadata': calculation.metadata,
+        'input_count': len(calculation.inputs)
+    }
+
+
+def iter_input_chunks(calculation: EmergyCalculation, separator: str = ',',
+                      chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                      chunk_inputs: int = DEFAULT_CHUNK_INPUTS) -> Iterator[str]:
+    """
+    Codifica as entradas de um cálculo como objetos JSON, em blocos de texto.
+
+    Os objetos de um bloco são unidos por `separator`, e cada bloco após o primeiro
+    começa com `separator`, de modo que os blocos podem ser concatenados diretamente.
+
+    Args:
+        calculation: O EmergyCalculation
+        separator: Texto colocado entre duas entradas (',' para JSON, '\\n' para NDJSON)
+        chunk_rows: Leituras por bloco, para cálculos com série
+        chunk_inputs: Entradas por bloco, para os demais cálculos
+
+    Yields:
+        Blocos de texto com as entradas codificadas
+    """
+    if calculation.series is not None:
+        chunks = _series_chunks(calculation.series, chunk_rows)
+    else:
+        chunks = _input_chunks(calculation.inputs, chunk_inputs)
+
+    first = True
+    for objects in chunks:
+        if not objects:
+            continue
+        text = separator.join(objects)
+        yield text if first else separator + text
+        first = False
+
+
+def iter_calculation_json(calculation: EmergyCalculation, **chunk_options) -> Iterator[str]:
+    """
+    Codifica a resposta JSON de um cálculo em blocos.
+
+    O documento tem a mesma forma da resposta de GET /api/calculations/<id>:
+    {"success": true, "calculation": {..., "inputs": [...]}}.
+
+    Args:
+        calculation: O EmergyCalculation
+        **chunk_options: Repassados a iter_input_chunks
+
+    Yields:
+        Blocos de texto do documento JSON
+    """
+    header = _dumps({'success': True, 'calculation': calculation_header(calculation)})
+    # Reabre o objeto do cálculo (fechado por '}}') para acrescentar as entradas
+    yield header[:-2] + ',"inputs":['
+    yield from iter_input_chunks(calculation, ',', **chunk_options)
+    yield ']}}'
+
+
+def iter_calculation_ndjson(calculation: EmergyCalculation, **chunk_options) -> Iterator[str]:
+    """
+    Codifica um cálculo como NDJSON: uma linha com o cabeçalho e uma linha por entrada.
+
+    Args:
+        calculation: O EmergyCalculation
+        **chunk_options: Repassados a iter_input_chunks
+
+    Yields:
+        Blocos de linhas terminadas em '\\n'
+    """
+    yield _dumps(calculation_header(calculation)) + '\n'
+    for chunk in iter_input_chunks(calculation, '\n', **chunk_options):
+        # Cada bloco começa com o separador, exceto o primeiro
+        yield chunk.lstrip('\n') + '\n'
+
+
+def _input_chunks(inputs: Iterable[EmergyInput], chunk_inputs: int) -> Iterator[List[str]]:
+    """
+    Codifica objetos EmergyInput genéricos em blocos.
+    """
+    objects: List[str] = []
+    for input_item in inputs:
+        objects.append(_dumps({
+            'name': input_item.name,
+            'value': None if isinstance(input_item.value, float) and math.isnan(input_item.value) else input_item.value,
+            'unit': input_item.unit,
+            'category': input_item.category,
+            'description': input_item.description
+        }))
+        if len(objects) >= chunk_inputs:
+            yield objects
+            objects = []
+    yield objects
+
+
+def _series_chunks(series: MeterSeries, chunk_rows: int) -> Iterator[List[str]]:
+    """
+    Codifica as entradas de uma série em blocos, a partir das colunas.
+
+    Gera as mesmas entradas que MeterInputsView, na mesma ordem.
+    """
+    templates = [_channel_template(channel) for channel in series.channels]
+    for start in range(0, len(series), chunk_rows):
+        chunk = series.slice(start, start + chunk_rows)
+        columns = [chunk.column(channel.key).tolist() for channel in chunk.channels]
+        objects: List[str] = []
+        for row, timestamp in enumerate(chunk.timestamps.tolist()):
+            date, time = split_timestamp(timestamp)
+            for (name, description), column in zip(templates, columns):
+                objects.append(name + date + ' ' + time + '","value":' + _number(column[row]) + description
+                               + date + ', Time: ' + time + '"}')
+        yield objects
+
+
+def _channel_template(channel: MeterChannel):
+    """
+    Partes constantes do JSON de uma entrada de um canal.
+
+    Datas e horários contêm apenas dígitos, '/' e ':', portanto não precisam de escape.
+
+    Returns:
+        Uma tupla (texto até o nome, texto entre o valor e a data da descrição)
+    """
+    # Os rótulos e prefixos são codificados com json.dumps e têm as aspas finais removidas
+    name = '{"name":' + _dumps(channel.label + ' ')[:-1]
+    description = (',"unit":' + _dumps(channel.unit) + ',"category":' + _dumps(channel.category)
+                   + ',"description":' + _dumps(channel.description_prefix + 'Date: ')[:-1])
+    return name, description
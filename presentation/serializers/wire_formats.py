@@ -0,0 +1,292 @@
+"""
+Formatos colunares de resposta para cálculos e séries.
+Este arquivo implementa a representação colunar (ColumnarTable) das leituras de um
+cálculo, com uma coluna por canal em vez de um objeto por entrada, e os
+codificadores dessa tabela em JSON colunar (em fluxo), MessagePack e Arrow IPC.
+No MessagePack, as colunas numéricas são enviadas como bytes little-endian, com
+8 bytes por valor. MessagePack e Arrow dependem dos pacotes opcionais `msgpack`
+e `pyarrow`; sem eles, esses formatos ficam indisponíveis e a negociação de
+conteúdo os recusa.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from domain.models.emergy_model import EmergyCalculation
+from domain.models.meter_series import CHANNELS_BY_KEY
+from domain.services.series_downsampling import DownsampledSeries
+from presentation.serializers.calculation_stream import calculation_header
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - dependência opcional
+    pyarrow = None
+
+
+JSON = 'json'
+NDJSON = 'ndjson'
+COLUMNAR = 'columnar'
+MSGPACK = 'msgpack'
+ARROW = 'arrow'
+
+MIMETYPES = {
+    JSON: 'application/json',
+    NDJSON: 'application/x-ndjson',
+    COLUMNAR: 'application/vnd.emergy.columnar+json',
+    MSGPACK: 'application/msgpack',
+    ARROW: 'application/vnd.apache.arrow.stream',
+}
+
+# Tipos aceitos no cabeçalho Accept além dos canônicos
+MIMETYPE_ALIASES = {
+    'application/x-msgpack': MSGPACK,
+}
+
+FORMATS_BY_MIMETYPE = {**{mimetype: name for name, mimetype in MIMETYPES.items()}, **MIMETYPE_ALIASES}
+
+# Valores codificados por bloco no JSON colunar e linhas por lote no Arrow
+DEFAULT_CHUNK_VALUES = 65536
+
+_SEPARATORS = (',', ':')
+
+INT64 = 'int64'
+FLOAT64 = 'float64'
+STRING = 'string'
+
+
+def is_available(wire_format: str) -> bool:
+    """
+    Verifica se as dependências de um formato estão instaladas.
+
+    Args:
+        wire_format: O nome do formato
+
+    Returns:
+        True se o formato pode ser codificado
+    """
+    if wire_format == MSGPACK:
+        return msgpack is not None
+    if wire_format == ARROW:
+        return pyarrow is not None
+    return wire_format in MIMETYPES
+
+
+@dataclass
+class ColumnarTable:
+    """
+    Tabela colunar de uma resposta: campos de cabeçalho e colunas de mesmo tamanho.
+
+    `fields` descreve cada coluna (nome, tipo e, para canais, cabeçalho e unidade)
+    na mesma ordem de `columns`.
+    """
+    header: Dict[str, Any]
+    fields: List[Dict[str, Any]]
+    columns: List[Union[np.ndarray, List[str]]]
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+
+def calculation_table(calculation: EmergyCalculation) -> ColumnarTable:
+    """
+    Monta a tabela colunar das entradas de um cálculo.
+
+    Cálculos com série têm uma coluna `timestamp` (segundos desde a época, no
+    horário local do medidor) e uma coluna por canal; os demais têm as colunas
+    name, value, unit, category e description.
+
+    Args:
+        calculation: O EmergyCalculation
+
+    Returns:
+        A ColumnarTable do cálculo
+    """
+    header = calculation_header(calculation)
+    series = calculation.series
+    if series is not None:
+        keys = [channel.key for channel in series.channels]
+        return _channel_table(header, series.timestamps, {key: series.column(key) for key in keys})
+
+    inputs = list(calculation.inputs)
+    return ColumnarTable(
+        header,
+        [{'name': 'name', 'type': STRING}, {'name': 'value', 'type': FLOAT64},
+         {'name': 'unit', 'type': STRING}, {'name': 'category', 'type': STRING},
+         {'name': 'description', 'type': STRING}],
+        [[item.name for item in inputs],
+         np.array([item.value for item in inputs], dtype=np.float64),
+         [item.unit for item in inputs],
+         [item.category for item in inputs],
+         [item.description for item in inputs]]
+    )
+
+
+def downsampled_table(calculation_id: str, downsampled: DownsampledSeries) -> ColumnarTable:
+    """
+    Monta a tabela colunar de uma série reduzida.
+
+    Args:
+        calculation_id: O ID do cálculo
+        downsampled: O resultado de SeriesDownsampler
+
+    Returns:
+        A ColumnarTable com `timestamp` e uma coluna por canal
+    """
+    header = {
+        'calculation_id': calculation_id,
+        'method': downsampled.method,
+        'source_points': downsampled.source_points,
+        'points': len(downsampled)
+    }
+    return _channel_table(header, downsampled.timestamps, downsampled.columns)
+
+
+def iter_columnar_json(table: ColumnarTable, chunk_values: int = DEFAULT_CHUNK_VALUES) -> Iterator[str]:
+    """
+    Codifica uma tabela como JSON colunar, em blocos.
+
+    O documento tem a forma {"success": true, <cabeçalho>, "fields": [...],
+    "columns": {"<nome>": [...], ...}}; valores ausentes (NaN) viram null.
+
+    Args:
+        table: A ColumnarTable
+        chunk_values: Valores codificados por bloco
+
+    Yields:
+        Blocos de texto do documento JSON
+    """
+    head = _dumps({'success': True, **table.header, 'fields': table.fields})
+    yield head[:-1] + ',"columns":{'
+    for index, (field, column) in enumerate(zip(table.fields, table.columns)):
+        yield ('' if index == 0 else ',') + _dumps(field['name']) + ':['
+        for start in range(0, len(column), chunk_values):
+            chunk = column[start:start + chunk_values]
+            yield ('' if start == 0 else ',') + _encode_json_values(chunk, field['type'])
+        yield ']'
+    yield '}}'
+
+
+def encode_msgpack(table: ColumnarTable) -> bytes:
+    """
+    Codifica uma tabela em MessagePack.
+
+    Colunas numéricas são enviadas como bytes little-endian (`<i8` ou `<f8`, NaN
+    para valores ausentes), que o cliente pode ler diretamente em um
+    Float64Array ou BigInt64Array; colunas de texto são listas de strings.
+
+    Args:
+        table: A ColumnarTable
+
+    Returns:
+        O documento MessagePack
+
+    Raises:
+        RuntimeError: Se o pacote msgpack não estiver instalado
+    """
+    if msgpack is None:
+        raise RuntimeError('O pacote msgpack não está instalado')
+    columns = {}
+    for field, column in zip(table.fields, table.columns):
+        if field['type'] == STRING:
+            columns[field['name']] = list(column)
+        else:
+            dtype = '<i8' if field['type'] == INT64 else '<f8'
+            columns[field['name']] = np.ascontiguousarray(column, dtype=dtype).tobytes()
+    return msgpack.packb({
+        'success': True,
+        **table.header,
+        'fields': [{**field, 'dtype': _wire_dtype(field['type'])} for field in table.fields],
+        'columns': columns
+    }, use_bin_type=True)
+
+
+def encode_arrow(table: ColumnarTable, batch_rows: int = DEFAULT_CHUNK_VALUES) -> bytes:
+    """
+    Codifica uma tabela como um fluxo Arrow IPC.
+
+    O cabeçalho vai nos metadados do esquema (chave `header`, em JSON) e a coluna
+    `timestamp` usa o tipo timestamp em segundos; NaN vira nulo.
+
+    Args:
+        table: A ColumnarTable
+        batch_rows: Linhas por lote do fluxo
+
+    Returns:
+        Os bytes do fluxo Arrow IPC
+
+    Raises:
+        RuntimeError: Se o pacote pyarrow não estiver instalado
+    """
+    if pyarrow is None:
+        raise RuntimeError('O pacote pyarrow não está instalado')
+    arrays = [_arrow_array(field, column) for field, column in zip(table.fields, table.columns)]
+    schema = pyarrow.schema(
+        [pyarrow.field(field['name'], array.type) for field, array in zip(table.fields, arrays)],
+        metadata={'header': _dumps(table.header), 'fields': _dumps(table.fields)}
+    )
+    record_table = pyarrow.Table.from_arrays(arrays, schema=schema)
+
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        for batch in record_table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def _channel_table(header: Dict[str, Any], timestamps: np.ndarray,
+                   columns: Dict[str, np.ndarray]) -> ColumnarTable:
+    """
+    Monta uma tabela com a coluna de timestamps e uma coluna por canal.
+    """
+    fields: List[Dict[str, Any]] = [{'name': 'timestamp', 'type': INT64}]
+    for key in columns:
+        channel = CHANNELS_BY_KEY.get(key)
+        fields.append({
+            'name': key,
+            'type': FLOAT64,
+            'header': channel.header if channel is not None else key,
+            'unit': channel.unit if channel is not None else None
+        })
+    return ColumnarTable(header, fields, [timestamps, *columns.values()])
+
+
+def _encode_json_values(values, column_type: str) -> str:
+    """
+    Codifica valores de uma coluna como elementos de um array JSON, sem os colchetes.
+    """
+    if column_type == STRING:
+        return _dumps(list(values))[1:-1]
+    if column_type == INT64:
+        return ','.join(map(str, values.tolist()))
+    return ','.join('null' if value != value else repr(value) for value in values.tolist())
+
+
+def _wire_dtype(column_type: str) -> Optional[str]:
+    """
+    Tipo NumPy dos bytes de uma coluna numérica no MessagePack.
+    """
+    return {INT64: '<i8', FLOAT64: '<f8'}.get(column_type)
+
+
+def _arrow_array(field: Dict[str, Any], column):
+    """
+    Converte uma coluna para um array Arrow.
+    """
+    if field['type'] == STRING:
+        return pyarrow.array(list(column), type=pyarrow.string())
+    if field['name'] == 'timestamp':
+        return pyarrow.array(np.asarray(column, dtype=np.int64), type=pyarrow.timestamp('s'))
+    return pyarrow.array(np.asarray(column, dtype=np.float64), from_pandas=True)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=_SEPARATORS, ensure_ascii=False)
@@ -1,7 +1,8 @@
 /**
  * Arquivo JavaScript para a funcionalidade da Calculadora Emergy.
  * Este arquivo contém a lógica para o formulário de upload de arquivos TXT,
- * validação de arquivos e redirecionamento para a página de gráficos.
+ * validação de arquivos, envio ao servidor com acompanhamento da tarefa de
+ * ingestão e redirecionamento para a página de gráficos.
  * 
  * Feito por André Carbonieri Silva T839FC9
  */
@@ -13,6 +14,12 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeFileUploadForm();
 });
 
+// Extensões aceitas pelo servidor (arquivos compactados são processados apenas no servidor)
+const ACCEPTED_EXTENSIONS = ['.txt', '.txt.gz', '.gz', '.zip', '.bz2'];
+
+// Intervalo entre consultas ao estado da tarefa de ingestão (ms)
+const JOB_POLL_INTERVAL = 1000;
+
 /**
  * Inicializa o formulário de upload de arquivos com validação e tratamento de envio
  */
@@ -34,7 +41,8 @@ function initializeFileUploadForm() {
             const file = fileInput.files[0];
             
             // Verifica o tipo de arquivo
-            if (!file.name.endsWith('.txt')) {
+            const fileName = file.name.toLowerCase();
+            if (!ACCEPTED_EXTENSIONS.some(extension => fileName.endsWith(extension))) {
                 alert('Por favor, envie um arquivo TXT válido.');
                 return;
             }
@@ -42,6 +50,23 @@ function initializeFileUploadForm() {
             // Mostra indicador de carregamento
             uploadStatus.style.display = 'block';
             
+            // Descarta o cálculo de um envio anterior
+            sessionStorage.removeItem('calculationId');
+            
+            // Envia o arquivo ao servidor e acompanha a tarefa de ingestão;
+            // o processamento local abaixo continua alimentando a página de gráficos
+            const serverUpload = uploadToServer(file).catch(function(error) {
+                console.error('Erro no processamento do servidor:', error);
+            });
+            
+            if (!fileName.endsWith('.txt')) {
+                // Arquivos compactados não podem ser lidos pelo navegador
+                serverUpload.then(function() {
+                    window.location.href = '/graphics';
+                });
+                return;
+            }
+            
             // Lê o conteúdo do arquivo
             const reader = new FileReader();
             reader.onload = function(e) {
@@ -56,11 +81,11 @@ function initializeFileUploadForm() {
                     sessionStorage.setItem('energyData', JSON.stringify(processedData));
                     sessionStorage.setItem('energyDataFilename', file.name);
                     
-                    // Redireciona para a página de gráficos após um pequeno atraso
-                    // para permitir que o usuário veja o indicador de carregamento
-                    setTimeout(function() {
+                    // Redireciona para a página de gráficos quando o servidor terminar,
+                    // com um pequeno atraso para que o usuário veja o indicador de carregamento
+                    Promise.all([serverUpload, new Promise(resolve => setTimeout(resolve, 1000))]).then(function() {
                         window.location.href = '/graphics';
-                    }, 1000);
+                    });
                 } catch (error) {
                     console.error('Erro ao processar o arquivo:', error);
                     alert('Ocorreu um erro ao processar o arquivo: ' + error.message + '. Por favor, tente novamente com um arquivo menor ou entre em contato com o suporte.');
@@ -78,6 +103,64 @@ function initializeFileUploadForm() {
     }
 }
 
+/**
+ * Envia o arquivo ao servidor e aguarda a tarefa de ingestão terminar
+ * @param {File} file - O arquivo selecionado
+ * @returns {Promise<Object>} - O estado final da tarefa
+ */
+function uploadToServer(file) {
+    const formData = new FormData();
+    formData.append('txt_file', file);
+    
+    return fetch('/emergy-calculator', { method: 'POST', body: formData })
+        .then(response => response.json())
+        .then(function(result) {
+            if (!result.success) {
+                throw new Error(result.message);
+            }
+            return pollJob(result.status_url);
+        })
+        .then(function(job) {
+            if (job.calculation_id) {
+                sessionStorage.setItem('calculationId', job.calculation_id);
+            }
+            return job;
+        });
+}
+
+/**
+ * Consulta periodicamente o estado de uma tarefa de ingestão, atualizando o indicador de progresso
+ * @param {string} statusUrl - URL de consulta da tarefa
+ * @returns {Promise<Object>} - A tarefa, quando concluída
+ */
+function pollJob(statusUrl) {
+    const progress = document.getElementById('upload-progress');
+    
+    return new Promise(function(resolve, reject) {
+        function check() {
+            fetch(statusUrl)
+                .then(response => response.json())
+                .then(function(result) {
+                    const job = result.job;
+                    if (progress) {
+                        progress.textContent = `${job.rows_processed.toLocaleString('pt-BR')} linhas processadas ` +
+                            `(${Math.round(job.rows_per_second).toLocaleString('pt-BR')} linhas/s)`;
+                    }
+                    
+                    if (job.state === 'succeeded') {
+                        resolve(job);
+                    } else if (job.state === 'failed') {
+                        reject(new Error(job.error));
+                    } else {
+                        setTimeout(check, JOB_POLL_INTERVAL);
+                    }
+                })
+                .catch(reject);
+        }
+        check();
+    });
+}
+
 /**
  * Processa os dados do arquivo para reduzir o tamanho e evitar exceder a cota de armazenamento
  * @param {string} fileContent - O conteúdo do arquivo
@@ -17,6 +17,7 @@ let worker = null;
 const MAX_POINTS_TIME_SERIES = 1000;
 const MAX_POINTS_SCATTER = 2000;
 const MAX_POINTS_HEATMAP = 5000;
+const SCATTER_BINS = 60; // Faixas por eixo no histograma de dispersão do servidor
 
 document.addEventListener('DOMContentLoaded', function() {
     console.log('Página de gráficos inicializada');
@@ -37,6 +38,16 @@ document.addEventListener('DOMContentLoaded', function() {
 function checkForEnergyData() {
     const energyDataStr = sessionStorage.getItem('energyData');
     const filename = sessionStorage.getItem('energyDataFilename');
+    const calculationId = sessionStorage.getItem('calculationId');
+    
+    // Com um cálculo no servidor, usa a série completa reduzida pelo servidor
+    // em vez da amostra truncada guardada no sessionStorage
+    if (calculationId) {
+        sessionStorage.removeItem('energyData');
+        sessionStorage.removeItem('energyDataFilename');
+        loadServerSeries(calculationId, energyDataStr);
+        return;
+    }
     
     if (energyDataStr) {
         console.log(`Dados de energia encontrados no sessionStorage: ${filename}`);
@@ -58,6 +69,61 @@ function checkForEnergyData() {
     }
 }
 
+/**
+ * Carrega do servidor a série de um cálculo, reduzida a um número limitado de pontos
+ * @param {string} calculationId - O ID do cálculo
+ * @param {string|null} fallbackDataStr - Dados locais usados se o servidor falhar
+ */
+function loadServerSeries(calculationId, fallbackDataStr) {
+    showLoadingIndicator('Carregando dados do servidor...');
+    
+    fetch(`/api/calculations/${encodeURIComponent(calculationId)}/series?points=${MAX_POINTS_HEATMAP}`)
+        .then(response => response.json())
+        .then(function(result) {
+            if (!result.success) {
+                throw new Error(result.message);
+            }
+            hideLoadingIndicator();
+            processEnergyData({ data: seriesToRows(result), isSampled: false });
+        })
+        .catch(function(error) {
+            console.error('Erro ao carregar a série do servidor:', error);
+            hideLoadingIndicator();
+            if (fallbackDataStr) {
+                processEnergyData(JSON.parse(fallbackDataStr));
+            } else {
+                showError(document.querySelector('.graphics-container'), 'Erro ao carregar dados do servidor. Por favor, tente novamente.');
+            }
+        });
+}
+
+/**
+ * Converte a resposta de /api/calculations/<id>/series em linhas no formato da análise local
+ * @param {Object} result - A resposta da API
+ * @returns {Array} - Linhas com Date, Time, DateTime e um campo por canal
+ */
+function seriesToRows(result) {
+    const pad = value => String(value).padStart(2, '0');
+    const channels = Object.values(result.channels);
+    
+    return result.timestamps.map(function(timestamp, index) {
+        // Os timestamps representam o horário local do medidor, sem fuso horário
+        const utc = new Date(timestamp * 1000);
+        const dateTime = new Date(utc.getUTCFullYear(), utc.getUTCMonth(), utc.getUTCDate(),
+                                  utc.getUTCHours(), utc.getUTCMinutes(), utc.getUTCSeconds());
+        const row = {
+            Date: `${pad(utc.getUTCDate())}/${pad(utc.getUTCMonth() + 1)}/${utc.getUTCFullYear()}`,
+            Time: `${pad(utc.getUTCHours())}:${pad(utc.getUTCMinutes())}:${pad(utc.getUTCSeconds())}`,
+            DateTime: dateTime
+        };
+        channels.forEach(function(channel) {
+            const value = channel.values[index];
+            row[channel.header] = value === null ? 0 : value; // Mesmo padrão da análise local
+        });
+        return row;
+    });
+}
+
 /**
  * Processa os dados de energia e cria os gráficos
  * @param {Object} processedData - Os dados de energia processados
@@ -598,6 +664,21 @@ function enableControls() {
     if (dataFileInput) dataFileInput.disabled = false;
 }
 
+/**
+ * Ordena as leituras por data e hora, mantendo a ordem original das leituras sem data válida
+ * @param {Array} data - As leituras analisadas
+ * @returns {Array} - Uma cópia ordenada das leituras
+ */
+function sortChronologically(data) {
+    // DateTime pode ser um Date ou, após passar pelo sessionStorage, uma string ISO
+    const keyed = data.map((item, index) => ({ item, index, time: new Date(item.DateTime).getTime() }));
+    if (keyed.some(entry => Number.isNaN(entry.time))) {
+        return data.slice();
+    }
+    keyed.sort((a, b) => (a.time - b.time) || (a.index - b.index));
+    return keyed.map(entry => entry.item);
+}
+
 /**
  * Gets the numeric fields from a data point
  * @param {Object} dataPoint - A single data point
@@ -631,6 +712,177 @@ function sampleData(data, maxPoints) {
     return sampledData;
 }
 
+/**
+ * Carrega do servidor a matriz de correlação de um cálculo e desenha o mapa de calor.
+ * Em caso de erro, calcula a correlação no navegador a partir dos dados amostrados.
+ * @param {HTMLElement} container - O contêiner do gráfico
+ * @param {string} calculationId - O ID do cálculo
+ * @param {Array} fallbackData - Dados amostrados usados se o servidor falhar
+ */
+function loadServerCorrelation(container, calculationId, fallbackData) {
+    showLoadingIndicator('Carregando correlação do servidor...');
+    
+    fetch(`/api/calculations/${encodeURIComponent(calculationId)}/correlation`)
+        .then(response => response.json())
+        .then(function(result) {
+            if (!result.success) {
+                throw new Error(result.message);
+            }
+            hideLoadingIndicator();
+            // Canais constantes não têm correlação (null); são exibidos como 0
+            const matrix = result.matrix.map(row => row.map(value => value === null ? 0 : value));
+            createHeatmapFromMatrix(container, matrix, result.headers);
+        })
+        .catch(function(error) {
+            console.error('Erro ao carregar a correlação do servidor:', error);
+            hideLoadingIndicator();
+            createCorrelationHeatmap(container, fallbackData);
+        });
+}
+
+/**
+ * Carrega do servidor o histograma de dispersão de um cálculo e desenha o gráfico.
+ * Em caso de erro, desenha a dispersão no navegador a partir dos dados amostrados.
+ * @param {HTMLElement} container - O contêiner do gráfico
+ * @param {string} calculationId - O ID do cálculo
+ * @param {Array} fallbackData - Dados amostrados usados se o servidor falhar
+ */
+function loadServerScatter(container, calculationId, fallbackData) {
+    showLoadingIndicator('Carregando dispersão do servidor...');
+    
+    const query = `x=global_intensity&y=global_active_power&bins=${SCATTER_BINS}`;
+    fetch(`/api/calculations/${encodeURIComponent(calculationId)}/scatter?${query}`)
+        .then(response => response.json())
+        .then(function(result) {
+            if (!result.success) {
+                throw new Error(result.message);
+            }
+            hideLoadingIndicator();
+            createDensityScatterPlot(container, result);
+        })
+        .catch(function(error) {
+            console.error('Erro ao carregar a dispersão do servidor:', error);
+            hideLoadingIndicator();
+            createScatterPlot(container, fallbackData);
+        });
+}
+
+/**
+ * Desenha um histograma de dispersão: um ponto no centro de cada célula com leituras,
+ * com raio proporcional à raiz da contagem, e a reta de regressão calculada no servidor.
+ * @param {HTMLElement} container - O contêiner do gráfico
+ * @param {Object} result - Resposta de /api/calculations/<id>/scatter
+ */
+function createDensityScatterPlot(container, result) {
+    container.innerHTML = '';
+    
+    const canvas = document.createElement('canvas');
+    canvas.id = 'emergy-chart';
+    canvas.style.height = '600px';
+    container.appendChild(canvas);
+    
+    const xField = result.x.header;
+    const yField = result.y.header;
+    const xEdges = result.x.edges;
+    const yEdges = result.y.edges;
+    const maxCount = Math.max(1, ...result.counts.map(row => Math.max(...row)));
+    
+    const cells = [];
+    result.counts.forEach(function(row, i) {
+        row.forEach(function(count, j) {
+            if (count > 0) {
+                cells.push({
+                    x: (xEdges[i] + xEdges[i + 1]) / 2,
+                    y: (yEdges[j] + yEdges[j + 1]) / 2,
+                    count: count
+                });
+            }
+        });
+    });
+    
+    const datasets = [{
+        label: `${yField} vs ${xField}`,
+        data: cells,
+        backgroundColor: 'rgba(75, 192, 192, 0.6)',
+        borderColor: 'rgba(75, 192, 192, 1)',
+        borderWidth: 1,
+        pointRadius: cells.map(cell => 2 + 10 * Math.sqrt(cell.count / maxCount)),
+        pointHoverRadius: 9
+    }];
+    
+    const fit = result.fit;
+    let title = `Gráfico de Dispersão: ${yField} vs ${xField}`;
+    if (fit.slope !== null) {
+        const minX = xEdges[0];
+        const maxX = xEdges[xEdges.length - 1];
+        datasets.push({
+            label: 'Linha de Regressão',
+            data: [
+                { x: minX, y: fit.slope * minX + fit.intercept },
+                { x: maxX, y: fit.slope * maxX + fit.intercept }
+            ],
+            type: 'line',
+            borderColor: 'rgba(255, 99, 132, 1)',
+            borderWidth: 2,
+            fill: false,
+            pointRadius: 0
+        });
+        if (fit.r_squared !== null) {
+            title += ` (R² = ${fit.r_squared.toFixed(3)})`;
+        }
+    }
+    
+    const ctx = canvas.getContext('2d');
+    currentChart = new Chart(ctx, {
+        type: 'scatter',
+        data: { datasets: datasets },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                title: {
+                    display: true,
+                    text: title,
+                    font: {
+                        size: 18
+                    }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            const cell = context.raw;
+                            const label = `${xField}: ${context.parsed.x.toFixed(3)}, ${yField}: ${context.parsed.y.toFixed(3)}`;
+                            return cell.count === undefined ? label : `${label} (${cell.count} leituras)`;
+                        }
+                    }
+                }
+            },
+            scales: {
+                x: {
+                    title: {
+                        display: true,
+                        text: xField,
+                        font: {
+                            size: 14,
+                            weight: 'bold'
+                        }
+                    }
+                },
+                y: {
+                    title: {
+                        display: true,
+                        text: yField,
+                        font: {
+                            size: 14,
+                            weight: 'bold'
+                        }
+                    }
+                }
+            }
+        }
+    });
+}
+
 /**
  * Creates a heatmap from a correlation matrix
  * @param {HTMLElement} container - The container for the chart
@@ -882,12 +1134,20 @@ function updateChart(container, chartType) {
             break;
         case 'scatter':
             sampledData = sampleData(parsedData, MAX_POINTS_SCATTER);
-            createScatterPlot(container, sampledData);
+            if (sessionStorage.getItem('calculationId')) {
+                // Densidade e regressão calculadas no servidor sobre todas as leituras
+                loadServerScatter(container, sessionStorage.getItem('calculationId'), sampledData);
+            } else {
+                createScatterPlot(container, sampledData);
+            }
             break;
         case 'heatmap':
-            // For smaller datasets, process in main thread
-            if (parsedData.length <= 10000) {
-                sampledData = sampleData(parsedData, MAX_POINTS_HEATMAP);
+            sampledData = sampleData(parsedData, MAX_POINTS_HEATMAP);
+            if (sessionStorage.getItem('calculationId')) {
+                // A correlação é calculada no servidor sobre todas as leituras
+                loadServerCorrelation(container, sessionStorage.getItem('calculationId'), sampledData);
+            } else if (parsedData.length <= 10000) {
+                // For smaller datasets, process in main thread
                 createCorrelationHeatmap(container, sampledData);
             } else {
                 // For larger datasets, processing is handled by the web worker
@@ -944,8 +1204,10 @@ function createTimeSeriesChart(container, data) {
     // Enable the update button
     updateTimeRangeBtn.disabled = false;
     
-    // Get unique times from data
-    const uniqueTimes = [...new Set(data.map(item => item.Time))].sort();
+    // Ordena as leituras por data e hora uma única vez; o controle de intervalo
+    // seleciona posições nessa ordem, de modo que filtrar é apenas um recorte
+    const timeline = sortChronologically(data);
+    const uniqueTimes = timeline.map(item => item.Date ? `${item.Date} ${item.Time}` : item.Time);
     
     // Store the times for later use
     window.timeRangeData = {
@@ -1164,20 +1426,15 @@ function createTimeSeriesChart(container, data) {
     subMeteringSection.appendChild(subMeteringContainer);
     container.appendChild(chartsContainer);
     
-    // Function to filter data by time range
-    function filterDataByTimeRange(startTime, endTime) {
-        return data.filter(item => {
-            return item.Time >= startTime && item.Time <= endTime;
-        });
+    // Seleciona as leituras entre duas posições da linha do tempo (inclusive)
+    function filterDataByTimeRange(startIndex, endIndex) {
+        return timeline.slice(startIndex, endIndex + 1);
     }
     
     // Function to update charts with filtered data
     function updateCharts() {
-        const startTime = uniqueTimes[window.timeRangeData.currentMinIndex];
-        const endTime = uniqueTimes[window.timeRangeData.currentMaxIndex];
-        
         // Filter data by selected time range
-        const filteredData = filterDataByTimeRange(startTime, endTime);
+        const filteredData = filterDataByTimeRange(window.timeRangeData.currentMinIndex, window.timeRangeData.currentMaxIndex);
         
         // Update charts with filtered data
         renderCharts(filteredData);
@@ -1351,7 +1608,7 @@ function createTimeSeriesChart(container, data) {
     updateTimeRangeBtn.addEventListener('click', updateCharts);
     
     // Initial render with all data
-    renderCharts(data);
+    renderCharts(timeline);
 }
 
 /**
@@ -0,0 +1,682 @@
+"""
+Testes de integração para a API de cálculos de Emergy.
+Este arquivo contém testes que exercitam a aplicação Flask completa (create_app),
+do upload de arquivos na calculadora até a consulta dos cálculos pela API.
+"""
+
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app import create_app
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
+
+
+def sample_bytes(filename='sample_energy_data.txt'):
+    with open(os.path.join(DATA_DIR, filename), 'rb') as data_file:
+        return data_file.read()
+
+
+class EmergyApiTestCase(unittest.TestCase):
+    """
+    Base para os testes de integração, com um cliente da aplicação.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste.
+        """
+        self.app = create_app({'TESTING': True})
+        self.client = self.app.test_client()
+    
+    def upload(self, data=None, filename='dados.txt'):
+        """
+        Envia um arquivo para a calculadora e aguarda a tarefa de ingestão terminar.
+        
+        Returns:
+            O JSON final da tarefa
+        """
+        data = sample_bytes() if data is None else data
+        response = self.client.post('/emergy-calculator', data={'txt_file': (io.BytesIO(data), filename)})
+        self.assertEqual(response.status_code, 202)
+        
+        deadline = time.time() + 10
+        while True:
+            job = self.client.get(response.get_json()['status_url']).get_json()['job']
+            if job['state'] in ('succeeded', 'failed') or time.time() > deadline:
+                return job
+            time.sleep(0.01)
+
+
+class TestUploadJobs(EmergyApiTestCase):
+    """
+    Casos de teste para o upload assíncrono de arquivos.
+    """
+    
+    def test_upload_returns_job_and_creates_calculation(self):
+        """
+        Testa que o upload devolve uma tarefa que termina com um cálculo consultável.
+        """
+        # Agir
+        job = self.upload()
+        response = self.client.get(f"/api/calculations/{job['calculation_id']}")
+        
+        # Verificar
+        self.assertEqual(job['state'], 'succeeded')
+        self.assertEqual(job['rows_processed'], 15)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['calculation']['inputs']), 105)
+    
+    def test_compressed_upload(self):
+        """
+        Testa o upload de um arquivo .txt.gz.
+        """
+        job = self.upload(gzip.compress(sample_bytes()), 'dados.txt.gz')
+        
+        self.assertEqual(job['state'], 'succeeded')
+        self.assertEqual(job['rows_processed'], 15)
+    
+    def test_repeated_upload_is_deduplicated(self):
+        """
+        Testa que reenviar o mesmo arquivo devolve o cálculo existente sem criar outro.
+        """
+        # Preparar
+        first = self.upload()
+        
+        # Agir
+        second = self.upload()
+        compressed = self.upload(gzip.compress(sample_bytes()), 'dados.txt.gz')
+        
+        # Verificar
+        self.assertEqual(second['calculation_id'], first['calculation_id'])
+        self.assertTrue(second['deduplicated'])
+        self.assertFalse(first['deduplicated'])
+        self.assertNotEqual(compressed['calculation_id'], first['calculation_id'])
+        self.assertEqual(len(self.client.get('/api/calculations').get_json()['calculations']), 2)
+    
+    def test_unknown_job(self):
+        """
+        Testa a consulta de uma tarefa inexistente.
+        """
+        response = self.client.get('/api/jobs/id-inexistente')
+        
+        self.assertEqual(response.status_code, 404)
+
+
+class TestCalculationDetail(EmergyApiTestCase):
+    """
+    Casos de teste para a resposta em fluxo de um cálculo.
+    """
+    
+    def test_streams_json(self):
+        """
+        Testa que o cálculo é enviado em fluxo e continua sendo um JSON válido.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        response = self.client.get(f'/api/calculations/{calculation_id}')
+        body = response.get_json()
+        
+        # Verificar
+        self.assertTrue(body['success'])
+        self.assertEqual(body['calculation']['id'], calculation_id)
+        self.assertEqual(body['calculation']['input_count'], 105)
+        self.assertEqual(body['calculation']['inputs'][0]['name'], 'Active Power 16/12/2006 17:24:00')
+    
+    def test_time_range(self):
+        """
+        Testa restringir as entradas às leituras de um intervalo de tempo.
+        """
+        calculation_id = self.upload()['calculation_id']
+        
+        body = self.client.get(
+            f'/api/calculations/{calculation_id}?start=2006-12-16T17:30:00&end=2006-12-16T17:31:00'
+        ).get_json()
+        
+        self.assertEqual(body['calculation']['input_count'], 14)
+        self.assertEqual(body['calculation']['inputs'][0]['name'], 'Active Power 16/12/2006 17:30:00')
+    
+    def test_streams_ndjson(self):
+        """
+        Testa a variante NDJSON: uma linha de cabeçalho e uma linha por entrada.
+        """
+        calculation_id = self.upload()['calculation_id']
+        
+        response = self.client.get(f'/api/calculations/{calculation_id}', headers={'Accept': 'application/x-ndjson'})
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(lines[0]['id'], calculation_id)
+        self.assertEqual(len(lines), 106)
+        self.assertEqual(lines[1]['unit'], 'kW')
+
+
+class TestContentNegotiation(EmergyApiTestCase):
+    """
+    Casos de teste para os formatos de resposta e a compressão.
+    """
+    
+    def test_columnar_format(self):
+        """
+        Testa o JSON colunar do cálculo e da série, pedidos por parâmetro e por Accept.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        detail = self.client.get(f'/api/calculations/{calculation_id}?format=columnar')
+        series = self.client.get(f'/api/calculations/{calculation_id}/series?channels=voltage',
+                                 headers={'Accept': 'application/vnd.emergy.columnar+json'})
+        
+        # Verificar
+        self.assertEqual(detail.mimetype, 'application/vnd.emergy.columnar+json')
+        self.assertEqual(len(json.loads(detail.data)['columns']['sub_metering_3']), 15)
+        self.assertEqual(json.loads(series.data)['columns']['voltage'][0], 234.84)
+    
+    def test_unavailable_or_unknown_format(self):
+        """
+        Testa 406 para formatos aceitos que não estão disponíveis e 400 para formatos desconhecidos.
+        """
+        calculation_id = self.upload()['calculation_id']
+        
+        unknown = self.client.get(f'/api/calculations/{calculation_id}?format=xml')
+        unacceptable = self.client.get(f'/api/calculations/{calculation_id}', headers={'Accept': 'text/csv'})
+        
+        self.assertEqual(unknown.status_code, 400)
+        self.assertEqual(unacceptable.status_code, 406)
+        self.assertIn('application/json', unacceptable.get_json()['available'])
+    
+    def test_gzip_compression(self):
+        """
+        Testa a compressão gzip de uma resposta em fluxo.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        response = self.client.get(f'/api/calculations/{calculation_id}', headers={'Accept-Encoding': 'gzip'})
+        
+        # Verificar
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.data))['calculation']['input_count'], 105)
+
+
+class TestConditionalRequests(EmergyApiTestCase):
+    """
+    Casos de teste para o cache de respostas, os ETags e as respostas 304.
+    """
+    
+    def test_etag_and_not_modified(self):
+        """
+        Testa que a resposta repetida é igual, tem ETag e Cache-Control e que If-None-Match gera 304.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        url = f'/api/calculations/{calculation_id}?format=columnar'
+        first = self.client.get(url)
+        
+        # Agir
+        second = self.client.get(url)
+        not_modified = self.client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        
+        # Verificar
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        # Cálculos com leituras podem receber novas leituras e são sempre revalidados
+        self.assertIn('no-cache', first.headers['Cache-Control'])
+        self.assertNotIn('max-age', first.headers['Cache-Control'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.data, b'')
+    
+    def test_compressed_etag(self):
+        """
+        Testa que a variante comprimida tem um ETag próprio, aceito em If-None-Match.
+        """
+        calculation_id = self.upload()['calculation_id']
+        url = f'/api/calculations/{calculation_id}'
+        plain = self.client.get(url)
+        compressed = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        
+        not_modified = self.client.get(url, headers={'Accept-Encoding': 'gzip',
+                                                     'If-None-Match': compressed.headers['ETag']})
+        
+        self.assertEqual(compressed.headers['ETag'], plain.headers['ETag'][:-1] + '-gzip"')
+        self.assertEqual(not_modified.status_code, 304)
+    
+    def test_cache_is_purged_on_delete(self):
+        """
+        Testa que um cálculo excluído não é mais servido do cache.
+        """
+        calculation_id = self.upload()['calculation_id']
+        self.assertEqual(self.client.get(f'/api/calculations/{calculation_id}').status_code, 200)
+        
+        self.client.delete(f'/api/calculations/{calculation_id}')
+        
+        self.assertEqual(self.client.get(f'/api/calculations/{calculation_id}').status_code, 404)
+
+
+class TestCalculationSeries(EmergyApiTestCase):
+    """
+    Casos de teste para a série reduzida de um cálculo.
+    """
+    
+    def test_downsampled_series(self):
+        """
+        Testa a redução de um canal em um intervalo de tempo.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        body = self.client.get(
+            f'/api/calculations/{calculation_id}/series'
+            '?channels=global_active_power&start=2006-12-16T17:25:00&end=2006-12-16T17:36:00&points=5'
+        ).get_json()
+        
+        # Verificar
+        self.assertEqual(body['source_points'], 12)
+        self.assertEqual(body['points'], 5)
+        self.assertEqual(list(body['channels']), ['global_active_power'])
+        self.assertEqual(len(body['channels']['global_active_power']['values']), 5)
+    
+    def test_invalid_parameters(self):
+        """
+        Testa a resposta 400 para parâmetros inválidos e 404 para cálculos inexistentes.
+        """
+        calculation_id = self.upload()['calculation_id']
+        
+        for query in ('points=1', 'method=media', 'channels=senha', 'start=ontem'):
+            response = self.client.get(f'/api/calculations/{calculation_id}/series?{query}')
+            self.assertEqual(response.status_code, 400, query)
+        self.assertEqual(self.client.get('/api/calculations/id-inexistente/series').status_code, 404)
+
+
+class TestCalculationRollups(EmergyApiTestCase):
+    """
+    Casos de teste para as agregações de um cálculo.
+    """
+    
+    def test_rollups_by_level(self):
+        """
+        Testa a consulta das agregações de 15 minutos de um canal.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        body = self.client.get(f'/api/calculations/{calculation_id}/rollups?level=15min&channels=sub_metering_3').get_json()
+        
+        # Verificar
+        channel = body['channels']['sub_metering_3']
+        self.assertEqual(body['level'], '15min')
+        self.assertEqual(body['points'], 2)
+        self.assertEqual(sum(channel['count']), 15)
+        self.assertEqual(channel['max'][0], 17.0)
+        self.assertEqual(self.client.get(f'/api/calculations/{calculation_id}/rollups?level=2h').status_code, 400)
+
+
+class TestCalculationStatistics(EmergyApiTestCase):
+    """
+    Casos de teste para as estatísticas e a correlação de um cálculo.
+    """
+    
+    def test_stats(self):
+        """
+        Testa as estatísticas descritivas de um canal.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        body = self.client.get(f'/api/calculations/{calculation_id}/stats?channels=sub_metering_3').get_json()
+        
+        # Verificar
+        channel = body['channels']['sub_metering_3']
+        self.assertEqual(list(body['channels']), ['sub_metering_3'])
+        self.assertEqual(channel['count'], 15)
+        self.assertEqual(channel['missing'], 0)
+        self.assertEqual((channel['min'], channel['max']), (16.0, 17.0))
+        self.assertEqual(channel['percentiles']['p50'], 17.0)
+        self.assertFalse(body['exact'])
+        self.assertEqual(self.client.get(f'/api/calculations/{calculation_id}/stats?channels=x').status_code, 400)
+    
+    def test_exact_stats(self):
+        """
+        Testa que as estatísticas exatas, pedidas com `exact`, coincidem com as acumuladas na ingestão.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        accumulated = self.client.get(f'/api/calculations/{calculation_id}/stats').get_json()
+        exact = self.client.get(f'/api/calculations/{calculation_id}/stats?exact=true').get_json()
+        
+        # Verificar
+        self.assertTrue(exact['exact'])
+        for key, channel in exact['channels'].items():
+            self.assertEqual(accumulated['channels'][key]['count'], channel['count'])
+            self.assertAlmostEqual(accumulated['channels'][key]['mean'], channel['mean'])
+            self.assertEqual(accumulated['channels'][key]['max'], channel['max'])
+    
+    def test_ingest_summary_in_metadata(self):
+        """
+        Testa que o resumo dos canais calculado durante a análise é gravado nos metadados.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        body = self.client.get(f'/api/calculations/{calculation_id}').get_json()
+        
+        # Verificar
+        summary = body['calculation']['metadata']['statistics']['sub_metering_3']
+        self.assertEqual((summary['count'], summary['missing']), (15, 0))
+        self.assertEqual((summary['min'], summary['max']), (16.0, 17.0))
+        self.assertEqual(summary['p50'], 17.0)
+    
+    def test_correlation(self):
+        """
+        Testa a matriz de correlação, com null para um canal constante.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        body = self.client.get(
+            f'/api/calculations/{calculation_id}/correlation?channels=global_active_power,global_intensity,sub_metering_1'
+        ).get_json()
+        
+        # Verificar
+        matrix = body['matrix']
+        self.assertEqual(body['channels'], ['global_active_power', 'global_intensity', 'sub_metering_1'])
+        self.assertEqual(matrix[0][0], 1.0)
+        self.assertGreater(matrix[0][1], 0.99)
+        self.assertEqual(matrix[0][1], matrix[1][0])
+        self.assertIsNone(matrix[0][2])
+        self.assertEqual(body['counts'][0][1], 15)
+    
+    def test_scatter(self):
+        """
+        Testa o histograma de dispersão com a reta de regressão.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        body = self.client.get(
+            f'/api/calculations/{calculation_id}/scatter?x=global_intensity&y=global_active_power&bins=5'
+        ).get_json()
+        
+        # Verificar
+        self.assertEqual(len(body['x']['edges']), 6)
+        self.assertEqual(sum(map(sum, body['counts'])), 15)
+        self.assertGreater(body['fit']['slope'], 0)
+        self.assertGreater(body['fit']['r_squared'], 0.98)
+        for query in ('x=voltage', 'x=voltage&y=frequencia', 'x=voltage&y=voltage&bins=0'):
+            response = self.client.get(f'/api/calculations/{calculation_id}/scatter?{query}')
+            self.assertEqual(response.status_code, 400, query)
+    
+    def test_emergy_by_category_and_period(self):
+        """
+        Testa a emergia do cálculo por categoria e por hora, coerente com o total do cálculo.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        
+        # Agir
+        response = self.client.get(f'/api/calculations/{calculation_id}/emergy?period=1h')
+        invalid = self.client.get(f'/api/calculations/{calculation_id}/emergy?period=1w')
+        
+        # Verificar
+        data = response.get_json()
+        total = self.client.get(f'/api/calculations/{calculation_id}').get_json()['calculation']['total_emergy']
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(data['total_sej'], total)
+        self.assertAlmostEqual(sum(data['timeline']['total']), total)
+        self.assertIn('Sub Metering', data['by_category'])
+        self.assertFalse(data['channels']['sub_metering_1']['included'])
+        self.assertEqual(invalid.status_code, 400)
+    
+    def test_sensitivity_analysis_is_reproducible(self):
+        """
+        Testa a análise de Monte Carlo das transformidades: percentis em torno do total, mesma semente, mesmo resultado.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        body = {
+            'transformities': {'Active Power': {'distribution': 'triangular', 'low': 1.2e5, 'mode': 1.6e5, 'high': 2.0e5}},
+            'scenarios': 2000,
+            'seed': 3,
+            'percentiles': [5, 50, 95]
+        }
+        
+        # Agir
+        first = self.client.post(f'/api/calculations/{calculation_id}/sensitivity', json=body)
+        second = self.client.post(f'/api/calculations/{calculation_id}/sensitivity', json=body)
+        invalid = self.client.post(f'/api/calculations/{calculation_id}/sensitivity',
+                                   json={**body, 'transformities': {'Gas': {'distribution': 'uniform', 'low': 1, 'high': 2}}})
+        missing = self.client.post('/api/calculations/inexistente/sensitivity', json=body)
+        
+        # Verificar
+        data = first.get_json()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(data, second.get_json())
+        self.assertLess(data['percentiles']['5'], data['point_estimate'])
+        self.assertGreater(data['percentiles']['95'], data['point_estimate'])
+        self.assertIn('Active Power', data['by_category'])
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(missing.status_code, 404)
+    
+    def test_cache_is_invalidated_on_delete(self):
+        """
+        Testa que as estatísticas de um cálculo excluído não são mais servidas do cache.
+        """
+        calculation_id = self.upload()['calculation_id']
+        self.assertEqual(self.client.get(f'/api/calculations/{calculation_id}/stats').status_code, 200)
+        
+        self.client.delete(f'/api/calculations/{calculation_id}')
+        
+        self.assertEqual(self.client.get(f'/api/calculations/{calculation_id}/stats').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/calculations/{calculation_id}/correlation').status_code, 404)
+
+
+class TestAppendReadings(EmergyApiTestCase):
+    """
+    Casos de teste para POST /api/calculations/<id>/readings.
+    """
+    
+    def test_append_json_and_txt_readings(self):
+        """
+        Testa anexar leituras em JSON e em TXT, com duplicadas e fora de ordem, e a mudança do ETag.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        url = f'/api/calculations/{calculation_id}'
+        before = self.client.get(url)
+        readings = [
+            {'timestamp': '2006-12-16T17:39:00', 'global_active_power': 3.5, 'voltage': 234.1},
+            {'timestamp': '2006-12-16T17:38:00', 'global_active_power': 1.0},
+            {'timestamp': '2006-12-16T17:30:30', 'voltage': 230.0},
+            {'timestamp': '2006-12-16T17:39:00', 'global_active_power': 9.9},
+        ]
+        
+        # Agir
+        appended = self.client.post(f'{url}/readings', json={'readings': readings})
+        txt = self.client.post(f'{url}/readings', data=b'16/12/2006;17:40:00;3.1;0.4;234.0;13.0;0.0;1.0;17.0\n',
+                               content_type='text/plain')
+        after = self.client.get(url, headers={'If-None-Match': before.headers['ETag']})
+        invalid = self.client.post(f'{url}/readings', json={'readings': [{'timestamp': '2006-12-16', 'gas': 1}]})
+        missing = self.client.post('/api/calculations/inexistente/readings', json={'readings': readings})
+        
+        # Verificar
+        data = appended.get_json()
+        self.assertEqual(appended.status_code, 200)
+        self.assertEqual((data['accepted'], data['duplicates'], data['out_of_order']), (1, 2, 1))
+        self.assertEqual(data['input_count'], 105 + 7)
+        self.assertEqual(txt.get_json()['accepted'], 1)
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after.headers['ETag'], before.headers['ETag'])
+        self.assertEqual(len(after.get_json()['calculation']['inputs']), 105 + 14)
+        series = self.client.get(f'{url}/series?channels=global_active_power&start=2006-12-16T17:39:00').get_json()
+        self.assertEqual(series['source_points'], 2)
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(missing.status_code, 404)
+
+
+class TestSharedRepository(EmergyApiTestCase):
+    """
+    Casos de teste para duas aplicações (como dois workers) que compartilham um banco SQLite.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com duas aplicações sobre o mesmo banco.
+        """
+        self.root = tempfile.mkdtemp()
+        config = {'TESTING': True, 'REPOSITORY': 'sqlite', 'DATABASE_PATH': os.path.join(self.root, 'emergy.db')}
+        self.app = create_app(config)
+        self.client = self.app.test_client()
+        self.other = create_app(config).test_client()
+    
+    def tearDown(self):
+        shutil.rmtree(self.root)
+    
+    def test_cached_response_follows_other_worker(self):
+        """
+        Testa que uma resposta em cache não é servida depois que outro worker anexa leituras ou exclui o cálculo.
+        """
+        # Preparar
+        calculation_id = self.upload()['calculation_id']
+        url = f'/api/calculations/{calculation_id}'
+        before = self.other.get(url)
+        reading = {'timestamp': '2006-12-16T18:00:00', 'global_active_power': 3.5}
+        
+        # Agir
+        self.client.post(f'{url}/readings', json={'readings': [reading]})
+        appended = self.other.get(url, headers={'If-None-Match': before.headers['ETag']})
+        self.client.delete(url)
+        deleted = self.other.get(url)
+        
+        # Verificar
+        self.assertEqual(appended.status_code, 200)
+        self.assertNotEqual(appended.headers['ETag'], before.headers['ETag'])
+        self.assertEqual(len(appended.get_json()['calculation']['inputs']), 105 + 7)
+        self.assertEqual(deleted.status_code, 404)
+
+
+class TestCalculationList(EmergyApiTestCase):
+    """
+    Casos de teste para a listagem paginada de cálculos.
+    """
+    
+    def test_paginates_with_projection(self):
+        """
+        Testa percorrer a listagem com `limit`, `after` e `fields`.
+        """
+        # Preparar
+        # Conteúdos diferentes, para que os uploads não sejam deduplicados
+        ids = {self.upload(sample_bytes() + b'\n' * index)['calculation_id'] for index in range(3)}
+        
+        # Agir
+        first = self.client.get('/api/calculations?limit=2&fields=id,input_count').get_json()
+        second = self.client.get(f"/api/calculations?limit=2&fields=id,input_count&after={first['next_cursor']}").get_json()
+        
+        # Verificar
+        listed = first['calculations'] + second['calculations']
+        self.assertEqual({calc['id'] for calc in listed}, ids)
+        self.assertEqual(listed[0], {'id': listed[0]['id'], 'input_count': 105})
+        self.assertIsNone(second['next_cursor'])
+    
+    def test_summary_omits_inputs(self):
+        """
+        Testa que o modo resumo não inclui as entradas.
+        """
+        self.upload()
+        
+        calculation = self.client.get('/api/calculations?summary=true').get_json()['calculations'][0]
+        
+        self.assertNotIn('inputs', calculation)
+        self.assertEqual(calculation['input_count'], 105)
+    
+    def test_invalid_parameters(self):
+        """
+        Testa a resposta 400 para parâmetros inválidos.
+        """
+        for query in ('limit=0', 'limit=abc', 'fields=id,senha', 'after=@@@'):
+            response = self.client.get(f'/api/calculations?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+
+
+class TestCalculationBatch(EmergyApiTestCase):
+    """
+    Casos de teste para o processamento de vários arquivos em uma requisição.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com um diretório de arquivos do servidor.
+        """
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, 'servidor.txt'), 'wb') as data_file:
+            data_file.write(sample_bytes() + b'\n\n')
+        self.app = create_app({'TESTING': True, 'BATCH_ROOT': self.root})
+        self.client = self.app.test_client()
+    
+    def tearDown(self):
+        shutil.rmtree(self.root)
+    
+    def test_batch_with_uploads_and_server_paths(self):
+        """
+        Testa um lote com uploads, um arquivo repetido, um arquivo inválido e caminhos do servidor.
+        """
+        # Preparar
+        data = {
+            'files': [
+                (io.BytesIO(sample_bytes()), 'a.txt'),
+                (io.BytesIO(gzip.compress(sample_bytes())), 'b.txt.gz'),
+                (io.BytesIO(sample_bytes()), 'c.txt'),
+                (io.BytesIO(b'x'), 'd.csv'),
+            ],
+            'paths': ['servidor.txt', '../fora.txt']
+        }
+        
+        # Agir
+        response = self.client.post('/api/calculations:batch', data=data)
+        
+        # Verificar
+        body = response.get_json()
+        files = {item['name']: item for item in body['files']}
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in body['files']],
+                         ['a.txt', 'b.txt.gz', 'c.txt', 'd.csv', 'servidor.txt', '../fora.txt'])
+        self.assertEqual((body['succeeded'], body['failed']), (4, 2))
+        self.assertEqual(files['a.txt']['rows'], 15)
+        self.assertTrue(files['c.txt']['deduplicated'])
+        self.assertEqual(files['c.txt']['calculation_id'], files['a.txt']['calculation_id'])
+        self.assertFalse(files['d.csv']['success'])
+        self.assertFalse(files['../fora.txt']['success'])
+        ids = {item['calculation_id'] for item in body['files'] if item['success']}
+        self.assertEqual(len(ids), 3)
+        for calculation_id in ids:
+            self.assertEqual(self.client.get(f'/api/calculations/{calculation_id}').status_code, 200)
+    
+    def test_empty_batch(self):
+        """
+        Testa a resposta 400 para um lote sem arquivos.
+        """
+        response = self.client.post('/api/calculations:batch', data={})
+        
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Testes de integração para a ingestão em massa pela linha de comando.
+Este arquivo contém testes que executam o script ingest sobre um diretório de
+arquivos TXT e um banco SQLite temporário, verificando a gravação dos cálculos,
+a deduplicação e a retomada pelo checkpoint.
+"""
+
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from ingest import main
+from infrastructure.repositories.sqlite_emergy_repository import SqliteEmergyRepository
+from tests.integration.test_emergy_api import sample_bytes
+
+
+class TestIngestCli(unittest.TestCase):
+    """
+    Casos de teste para o script ingest.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com três arquivos distintos e uma cópia repetida.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.data = os.path.join(self.directory, 'dados')
+        os.makedirs(os.path.join(self.data, '2007'))
+        for name, content in (('a.txt', sample_bytes()), ('b.txt', sample_bytes() + b'\n'),
+                              ('2007/c.txt.gz', gzip.compress(sample_bytes())), ('copia.txt', sample_bytes()),
+                              ('leia-me.md', b'ignorado')):
+            with open(os.path.join(self.data, name), 'wb') as data_file:
+                data_file.write(content)
+        self.database = os.path.join(self.directory, 'emergy.db')
+        self.checkpoint = os.path.join(self.directory, 'ingest.checkpoint')
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def ingest(self, *extra):
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(io.StringIO()):
+            code = main([self.data, '--database', self.database, '--checkpoint', self.checkpoint,
+                         '--workers', '1', '--batch-files', '2', *extra])
+        return code, output.getvalue()
+    
+    def test_ingests_and_resumes(self):
+        """
+        Testa a carga dos arquivos em lotes e a retomada sem reprocessar os já carregados.
+        """
+        # Agir
+        first_code, first_output = self.ingest()
+        second_code, second_output = self.ingest()
+        
+        # Verificar
+        repository = SqliteEmergyRepository(self.database)
+        try:
+            calculations = repository.get_summary_page(10)
+        finally:
+            repository.close()
+        self.assertEqual((first_code, second_code), (0, 0))
+        self.assertEqual(len(calculations), 3)
+        self.assertIn('linhas/s', first_output)
+        self.assertIn('MB/s', first_output)
+        self.assertIn('4 arquivos encontrados, 4 já carregados, 0 a processar', second_output)
+    
+    def test_resumes_after_partial_checkpoint(self):
+        """
+        Testa que uma linha incompleta no checkpoint, deixada por uma interrupção, é ignorada.
+        """
+        # Preparar
+        self.ingest()
+        with open(self.checkpoint, 'a', encoding='utf-8') as checkpoint_file:
+            checkpoint_file.write('{"path": "/interrompido')
+        os.utime(os.path.join(self.data, 'b.txt'))
+        
+        # Agir
+        code, output = self.ingest()
+        
+        # Verificar
+        self.assertEqual(code, 0)
+        self.assertIn('1 a processar', output)
+        self.assertIn('4 já carregados, 0 a processar', self.ingest()[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
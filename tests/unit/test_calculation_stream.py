@@ -0,0 +1,59 @@
+"""
+Testes unitários para a serialização em fluxo de cálculos.
+Este arquivo contém testes para os codificadores de calculation_stream,
+verificando que os blocos concatenados formam o mesmo documento que a
+serialização das entradas objeto a objeto.
+"""
+
+import json
+import unittest
+import numpy as np
+from domain.models.emergy_model import EmergyCalculation, EmergyInput
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from presentation.serializers.calculation_stream import iter_calculation_json, iter_calculation_ndjson
+
+
+class TestCalculationStream(unittest.TestCase):
+    """
+    Casos de teste para iter_calculation_json e iter_calculation_ndjson.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com um cálculo baseado em série.
+        """
+        timestamps = 1166289840 + 60 * np.arange(5, dtype=np.int64)
+        columns = {key: np.arange(5, dtype=np.float64) + index for index, key in enumerate(CHANNEL_KEYS)}
+        columns['voltage'][2] = np.nan
+        self.calculation = EmergyCalculation.create_from_series(MeterSeries(timestamps, columns), {"fonte": "teste"})
+    
+    def test_series_json_matches_inputs(self):
+        """
+        Testa que o JSON em blocos reproduz as entradas da visão, com NaN como null.
+        """
+        # Agir
+        chunks = list(iter_calculation_json(self.calculation, chunk_rows=2))
+        document = json.loads(''.join(chunks))
+        
+        # Verificar
+        expected = [vars(input_item) for input_item in self.calculation.inputs]
+        expected[2 * 7 + 2]['value'] = None
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(document['calculation']['inputs'], expected)
+        self.assertEqual(document['calculation']['metadata'], {"fonte": "teste"})
+    
+    def test_inputs_ndjson(self):
+        """
+        Testa o NDJSON de um cálculo criado a partir de objetos EmergyInput.
+        """
+        inputs = [EmergyInput(f"Entrada {index}", float(index), "kg", "Material") for index in range(5)]
+        calculation = EmergyCalculation.create(inputs, {})
+        
+        lines = ''.join(iter_calculation_ndjson(calculation, chunk_inputs=2)).splitlines()
+        
+        self.assertEqual(json.loads(lines[0])['input_count'], 5)
+        self.assertEqual([json.loads(line) for line in lines[1:]], [vars(input_item) for input_item in inputs])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,282 @@
+"""
+Testes unitários para o repositório de emergy em arquivos colunares.
+Este arquivo contém testes para a classe ColumnarFileEmergyRepository, verificando
+a gravação das colunas, a leitura por mapeamento em memória e a exclusão.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+from domain.models.emergy_model import EmergyInput, EmergyCalculation
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from domain.models.rollup import RollupPyramid
+from domain.services.emergy_service import EmergyService
+from infrastructure.repositories.columnar_file_emergy_repository import (
+    HEADER_FILE, LOCK_FILE, ROLLUPS_DIRECTORY, ColumnarFileEmergyRepository
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+def make_series(rows=100):
+    timestamps = 1166289840 + 60 * np.arange(rows, dtype=np.int64)
+    columns = {key: np.linspace(0, index + 1, rows) for index, key in enumerate(CHANNEL_KEYS)}
+    columns['global_active_power'][0] = np.nan
+    return MeterSeries(timestamps, columns)
+
+
+class TestColumnarFileEmergyRepository(unittest.TestCase):
+    """
+    Casos de teste para a classe ColumnarFileEmergyRepository.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com um diretório temporário.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.repository = ColumnarFileEmergyRepository(self.directory)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_series_is_memory_mapped(self):
+        """
+        Testa que as colunas recuperadas compartilham a memória do arquivo mapeado.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(), {"fonte": "teste"})
+        
+        # Agir
+        self.repository.save(calculation)
+        retrieved = self.repository.get_by_id(calculation.id)
+        voltage = retrieved.series.column('voltage')
+        
+        # Verificar
+        self.assertIsInstance(voltage.base, np.memmap)
+        self.assertFalse(voltage.flags.writeable)
+        self.assertEqual(retrieved.metadata, calculation.metadata)
+        self.assertEqual(retrieved.total_emergy, calculation.total_emergy)
+        np.testing.assert_array_equal(retrieved.series.timestamps, calculation.series.timestamps)
+        np.testing.assert_array_equal(
+            retrieved.series.column('global_active_power'),
+            calculation.series.column('global_active_power')
+        )
+    
+    def test_rollups_round_trip(self):
+        """
+        Testa salvar e recuperar as agregações de um cálculo, inclusive de uma série vazia.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(), {})
+        calculation.rollups = RollupPyramid.build(calculation.series)
+        empty = EmergyCalculation.create_from_series(MeterSeries.empty(), {})
+        empty.rollups = RollupPyramid.build(empty.series)
+        
+        # Agir
+        self.repository.save(calculation)
+        self.repository.save(empty)
+        retrieved = self.repository.get_by_id(calculation.id).rollups
+        
+        # Verificar
+        self.assertEqual(retrieved.levels, ['15min', '1h', '1d', '1month'])
+        np.testing.assert_array_equal(retrieved.level('15min').sums['voltage'], calculation.rollups.level('15min').sums['voltage'])
+        np.testing.assert_array_equal(retrieved.level('1h').counts['global_active_power'],
+                                      calculation.rollups.level('1h').counts['global_active_power'])
+        self.assertEqual(len(self.repository.get_by_id(empty.id).rollups.level('1d')), 0)
+    
+    def test_inputs_and_empty_series(self):
+        """
+        Testa cálculos criados a partir de EmergyInput e séries vazias.
+        """
+        # Preparar
+        inputs = [EmergyInput("Entrada 1", 10.0, "kg", "Material", "Descrição 1")]
+        from_inputs = EmergyCalculation.create(inputs, {})
+        empty = EmergyCalculation.create_from_series(MeterSeries.empty(), {})
+        
+        # Agir
+        self.repository.save(from_inputs)
+        self.repository.save(empty)
+        
+        # Verificar
+        self.assertEqual(list(self.repository.get_by_id(from_inputs.id).inputs), inputs)
+        self.assertEqual(len(self.repository.get_by_id(empty.id).series), 0)
+        self.assertEqual(len(self.repository.get_all()), 2)
+    
+    def test_delete_and_invalid_ids(self):
+        """
+        Testa a exclusão e IDs que não correspondem a cálculos gravados.
+        """
+        calculation = EmergyCalculation.create_from_series(make_series(5), {})
+        self.repository.save(calculation)
+        
+        self.assertTrue(self.repository.delete(calculation.id))
+        self.assertFalse(self.repository.delete(calculation.id))
+        self.assertIsNone(self.repository.get_by_id(calculation.id))
+        self.assertIsNone(self.repository.get_by_id('../' + os.path.basename(self.directory)))
+        self.assertEqual(self.repository.get_all(), [])
+
+    
+    def test_get_by_content_hash(self):
+        """
+        Testa a busca pela chave de conteúdo, inclusive depois de excluir o cálculo.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(), {"content_hash": "blake2b-none-abc"})
+        other = EmergyCalculation.create_from_series(make_series(), {"fonte": "teste"})
+        self.repository.save(calculation)
+        self.repository.save(other)
+        
+        # Agir
+        found = self.repository.get_by_content_hash("blake2b-none-abc")
+        self.repository.delete(calculation.id)
+        
+        # Verificar
+        self.assertEqual(found.id, calculation.id)
+        self.assertIsNone(self.repository.get_by_content_hash("blake2b-none-abc"))
+        self.assertIsNone(self.repository.get_by_content_hash("blake2b-none-def"))
+    
+    def test_append_readings(self):
+        """
+        Testa anexar leituras, descartando duplicadas e fora de ordem, e reabrir o cálculo.
+        """
+        # Preparar
+        service = EmergyService(self.repository)
+        full = make_series(200)
+        calculation = service.create_calculation_from_series(full.slice(0, 100), {"content_hash": "blake2b-none-abc"})
+        stored = self.repository.get_by_id(calculation.id)
+        # A leitura 150 é repetida no lote e a 99 já existe
+        batch = MeterSeries.concatenate([full.slice(150, 200), full.slice(99, 151)])
+        gap = MeterSeries(full.timestamps[[100]] + 30, {key: [1.0] for key in CHANNEL_KEYS})
+        
+        # Agir
+        result = service.append_readings(stored, batch)
+        late = service.append_readings(result.calculation, gap)
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        # Verificar
+        expected = service.create_calculation_from_series(full, {}, save=False)
+        self.assertEqual((result.accepted, result.duplicates, result.out_of_order), (100, 2, 0))
+        self.assertEqual((late.accepted, late.duplicates, late.out_of_order), (0, 0, 1))
+        self.assertIsNone(self.repository.get_by_content_hash("blake2b-none-abc"))
+        np.testing.assert_array_equal(retrieved.series.timestamps, full.timestamps)
+        self.assertAlmostEqual(retrieved.total_emergy / expected.total_emergy, 1.0)
+        self.assertEqual(retrieved.metadata['statistics']['voltage']['count'],
+                         expected.metadata['statistics']['voltage']['count'])
+        self.assertAlmostEqual(retrieved.statistics.channels['voltage'].m2, expected.statistics.channels['voltage'].m2)
+        self.assertNotIn('digest', retrieved.metadata['statistics']['voltage'])
+        for name, array in expected.rollups.to_arrays().items():
+            np.testing.assert_allclose(retrieved.rollups.to_arrays()[name], array, err_msg=name)
+    
+    def test_append_to_calculation_from_tail(self):
+        """
+        Testa anexar lotes lendo apenas a parte final do cálculo gravado.
+        """
+        # Preparar
+        service = EmergyService(self.repository)
+        full = make_series(200)
+        calculation = service.create_calculation_from_series(full.slice(0, 100), {})
+        
+        # Agir
+        tail = self.repository.get_tail(calculation.id, int(full.timestamps[150]))
+        first = service.append_to_calculation(calculation.id, MeterSeries.concatenate([full.slice(150, 200), full.slice(99, 151)]))
+        second = service.append_to_calculation(calculation.id, full.slice(190, 200))
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        # Verificar
+        expected = service.create_calculation_from_series(full, {}, save=False)
+        self.assertEqual(len(tail.readings), 1)
+        self.assertEqual(tail.rows, 100)
+        self.assertEqual((first.accepted, first.duplicates, first.out_of_order), (100, 2, 0))
+        self.assertIsNone(first.calculation)
+        self.assertEqual((second.accepted, second.duplicates), (0, 10))
+        self.assertEqual(second.summary.input_count, len(expected.inputs))
+        np.testing.assert_array_equal(retrieved.series.timestamps, full.timestamps)
+        self.assertAlmostEqual(retrieved.total_emergy / expected.total_emergy, 1.0)
+        self.assertEqual(retrieved.statistics.channels['voltage'].count, expected.statistics.channels['voltage'].count)
+        for name, array in expected.rollups.to_arrays().items():
+            np.testing.assert_allclose(retrieved.rollups.to_arrays()[name], array, err_msg=name)
+    
+    def test_append_keeps_loaded_rollups(self):
+        """
+        Testa que um cálculo já carregado continua vendo as agregações anteriores ao append.
+        """
+        # Preparar
+        service = EmergyService(self.repository)
+        full = make_series(200)
+        calculation = service.create_calculation_from_series(full.slice(0, 105), {})
+        loaded = self.repository.get_by_id(calculation.id)
+        before = {name: np.array(array) for name, array in loaded.rollups.to_arrays().items()}
+        
+        # Agir
+        service.append_to_calculation(calculation.id, full.slice(105, 200))
+        
+        # Verificar
+        for name, array in loaded.rollups.to_arrays().items():
+            np.testing.assert_array_equal(array, before[name], err_msg=name)
+        self.assertEqual(len(self.repository.get_by_id(calculation.id).series), 200)
+    
+    def test_append_to_version_1_rollups(self):
+        """
+        Testa anexar leituras a um cálculo gravado com o último balde das agregações no arquivo.
+        """
+        # Preparar
+        service = EmergyService(self.repository)
+        full = make_series(200)
+        calculation = service.create_calculation_from_series(full.slice(0, 100), {})
+        directory = os.path.join(self.directory, calculation.id)
+        with open(os.path.join(directory, HEADER_FILE), encoding='utf-8') as header_file:
+            header = json.load(header_file)
+        for name, array in calculation.rollups.to_arrays().items():
+            array.tofile(os.path.join(directory, ROLLUPS_DIRECTORY, f'{name}.bin'))
+            header['rollups'][name] = [array.dtype.str, len(array)]
+        header['format_version'] = 1
+        with open(os.path.join(directory, HEADER_FILE), 'w', encoding='utf-8') as header_file:
+            json.dump(header, header_file)
+        
+        # Agir
+        stored = self.repository.get_by_id(calculation.id).rollups
+        service.append_to_calculation(calculation.id, full.slice(100, 200))
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        # Verificar
+        expected = RollupPyramid.build(full)
+        np.testing.assert_array_equal(stored.level('1h').timestamps, calculation.rollups.level('1h').timestamps)
+        for name, array in expected.to_arrays().items():
+            np.testing.assert_allclose(retrieved.rollups.to_arrays()[name], array, err_msg=name)
+    
+    @unittest.skipIf(fcntl is None, 'flock indisponível')
+    def test_append_waits_for_write_lock(self):
+        """
+        Testa que um append espera o bloqueio de escrita mantido por outro processo.
+        """
+        # Preparar
+        service = EmergyService(self.repository)
+        full = make_series(200)
+        calculation = service.create_calculation_from_series(full.slice(0, 100), {})
+        worker = threading.Thread(target=service.append_to_calculation, args=(calculation.id, full.slice(100, 200)))
+        
+        # Agir
+        with open(os.path.join(self.directory, calculation.id, LOCK_FILE), 'a+b') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            worker.start()
+            time.sleep(0.2)
+            rows_while_locked = len(self.repository.get_by_id(calculation.id).series)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        worker.join()
+        
+        # Verificar
+        self.assertEqual(rows_while_locked, 100)
+        self.assertEqual(len(self.repository.get_by_id(calculation.id).series), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Testes unitários para a abertura de uploads compactados.
+Este arquivo contém testes para open_upload e detect_compression, verificando
+que arquivos .txt.gz, .bz2 e .zip são descompactados em fluxo, e para o hash dos
+bytes enviados calculado durante essa leitura.
+"""
+
+import bz2
+import gzip
+import io
+import unittest
+import zipfile
+from infrastructure.parsers.compressed_stream import (
+    UnsupportedUploadError, detect_compression, is_supported_upload, open_upload
+)
+
+CONTENT = b"Date;Time;Global_active_power\n16/12/2006;17:24:00;4.216\n"
+
+
+class NonSeekableStream(io.RawIOBase):
+    """
+    Fluxo somente leitura e não pesquisável, como o corpo de uma requisição.
+    """
+    
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, target):
+        chunk = self._buffer.read(len(target))
+        target[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+class TestCompressedStream(unittest.TestCase):
+    """
+    Casos de teste para a descompactação de uploads.
+    """
+    
+    def test_detect_compression(self):
+        """
+        Testa a identificação do formato pela extensão.
+        """
+        self.assertEqual(detect_compression('dados.txt'), 'none')
+        self.assertEqual(detect_compression('dados.TXT.GZ'), 'gzip')
+        self.assertEqual(detect_compression('dados.bz2'), 'bz2')
+        self.assertEqual(detect_compression('household_power_consumption.zip'), 'zip')
+        self.assertFalse(is_supported_upload('dados.csv'))
+    
+    def test_gzip_and_bz2(self):
+        """
+        Testa a descompactação de arquivos gzip e bz2.
+        """
+        for filename, data in (('a.txt.gz', gzip.compress(CONTENT)), ('a.txt.bz2', bz2.compress(CONTENT))):
+            with open_upload(filename, io.BytesIO(data)) as stream:
+                self.assertEqual(stream.read(), CONTENT)
+    
+    def test_zip_picks_txt_member_from_non_seekable_stream(self):
+        """
+        Testa que o membro .txt de um zip é lido mesmo a partir de um fluxo não pesquisável.
+        """
+        # Preparar
+        data = make_zip({'LEIAME.md': b'ignorar', 'household_power_consumption.txt': CONTENT})
+        
+        # Agir
+        with open_upload('dados.zip', NonSeekableStream(data)) as stream:
+            content = stream.read()
+        
+        # Verificar
+        self.assertEqual(content, CONTENT)
+    
+    def test_zip_without_txt(self):
+        """
+        Testa que um zip sem arquivo de texto é rejeitado.
+        """
+        data = make_zip({'a.csv': b'1', 'b.csv': b'2'})
+        
+        with self.assertRaises(UnsupportedUploadError):
+            with open_upload('dados.zip', io.BytesIO(data)):
+                pass
+    
+    def test_unsupported_extension(self):
+        """
+        Testa que extensões não aceitas são rejeitadas.
+        """
+        with self.assertRaises(UnsupportedUploadError):
+            with open_upload('dados.xls', io.BytesIO(b'')):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Testes unitários para o serviço de aplicação de cálculos de Emergy.
+Este arquivo contém testes para EmergyApplicationService, verificando que dados
+TXT repetidos devolvem o cálculo já existente em qualquer forma de envio.
+"""
+
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from application.services.emergy_application_service import EmergyApplicationService
+from domain.services.emergy_service import EmergyService
+from infrastructure.repositories.memory_emergy_repository import MemoryEmergyRepository
+
+CONTENT = b"""Date;Time;Global_active_power;Global_reactive_power;Voltage;Global_intensity;Sub_metering_1;Sub_metering_2;Sub_metering_3
+16/12/2006;17:24:00;4.216;0.418;234.840;18.400;0.000;1.000;17.000
+16/12/2006;17:25:00;5.360;0.436;233.630;23.000;0.000;1.000;16.000
+"""
+
+
+class TestEmergyApplicationService(unittest.TestCase):
+    """
+    Casos de teste para a classe EmergyApplicationService.
+    """
+
+    def setUp(self):
+        """
+        Configura o caso de teste com um repositório em memória.
+        """
+        self.repository = MemoryEmergyRepository()
+        self.service = EmergyApplicationService(EmergyService(self.repository))
+
+    def test_repeated_content_returns_existing_calculation(self):
+        """
+        Testa que o mesmo conteúdo enviado como dados, upload ou arquivo gera um único cálculo.
+        """
+        # Preparar
+        descriptor, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(descriptor, 'wb') as data_file:
+            data_file.write(CONTENT)
+        compressed_data = gzip.compress(CONTENT)
+        parsed = []
+
+        # Agir
+        try:
+            first = self.service.process_txt_data(CONTENT.decode('utf-8'), {})
+            uploaded = self.service.process_txt_upload('dados.txt', io.BytesIO(CONTENT), {})
+            from_file = self.service.process_txt_file(path, {})
+            compressed = self.service.process_txt_upload('dados.txt.gz', io.BytesIO(compressed_data), {})
+            repeated = self.service.process_txt_upload('dados.txt.gz', io.BytesIO(compressed_data), {},
+                                                       progress=parsed.append)
+        finally:
+            os.remove(path)
+
+        # Verificar
+        self.assertTrue(first.content_hash.startswith('blake2b-none-'))
+        self.assertEqual({uploaded.id, from_file.id}, {first.id})
+        self.assertNotEqual(compressed.id, first.id)
+        self.assertEqual(repeated.id, compressed.id)
+        self.assertEqual(parsed, [])
+        self.assertEqual(len(self.repository.get_all()), 2)
+    
+    def test_file_reports_bytes_read(self):
+        """
+        Testa que a leitura de um arquivo informa os bytes já lidos junto com as linhas.
+        """
+        # Preparar
+        descriptor, path = tempfile.mkstemp(suffix='.txt.gz')
+        with os.fdopen(descriptor, 'wb') as data_file:
+            data_file.write(gzip.compress(CONTENT))
+        rows, positions = [], []
+        
+        # Agir
+        try:
+            self.service.process_txt_file(path, {}, progress=rows.append, bytes_progress=positions.append)
+            size = os.path.getsize(path)
+        finally:
+            os.remove(path)
+        
+        # Verificar
+        self.assertEqual(rows, [2])
+        self.assertEqual(positions, [size])
+
+
+if __name__ == '__main__':
+    unittest.main()
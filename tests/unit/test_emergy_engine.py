@@ -0,0 +1,145 @@
+"""
+Testes unitários para o motor de emergia.
+Este arquivo contém testes para EmergyEngine e TransformityTable: conversão de
+potência e energia para joules, exclusão dos submedidores do total, divisão por
+período e leitura da tabela de transformidades em cache.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from domain.models.rollup import RollupPyramid
+from domain.services.emergy_engine import (
+    ELECTRICITY_UEV, EmergyAccounting, EmergyEngine, Transformity, TransformityTable, load_transformity_table
+)
+
+
+def make_series(rows=120):
+    timestamps = 1166289840 - 1166289840 % 86400 + 60 * np.arange(rows, dtype=np.int64)
+    columns = {key: np.zeros(rows) for key in CHANNEL_KEYS}
+    columns['global_active_power'][:] = 1.0
+    columns['global_active_power'][5] = np.nan
+    columns['sub_metering_1'][:] = 2.0
+    columns['voltage'][:] = 230.0
+    return MeterSeries(timestamps, columns)
+
+
+class TestEmergyEngine(unittest.TestCase):
+    """
+    Casos de teste para a classe EmergyEngine.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com uma série de 2 horas a 1 kW.
+        """
+        self.series = make_series()
+        self.engine = EmergyEngine()
+    
+    def test_converts_power_and_energy_to_joules(self):
+        """
+        Testa a conversão de kW por minuto e de Wh para joules e a emergia por categoria.
+        """
+        # Agir
+        accounting = self.engine.evaluate(self.series)
+        
+        # Verificar
+        active = accounting.channels['global_active_power']
+        kitchen = accounting.channels['sub_metering_1']
+        self.assertAlmostEqual(active.energy_joules, 119 * 1000.0 * 60)
+        self.assertAlmostEqual(kitchen.energy_joules, 120 * 2.0 * 3600)
+        self.assertAlmostEqual(accounting.total, active.energy_joules * ELECTRICITY_UEV)
+        self.assertAlmostEqual(accounting.by_category['Sub Metering'], kitchen.emergy)
+        self.assertNotIn('voltage', accounting.channels)
+    
+    def test_timeline_matches_total(self):
+        """
+        Testa que a soma da divisão por hora é igual ao total, com e sem a pirâmide.
+        """
+        # Preparar
+        accounting = self.engine.evaluate(self.series)
+        
+        # Agir
+        from_rollups = self.engine.timeline(self.series, RollupPyramid.build(self.series), '1h')
+        from_series = self.engine.timeline(self.series, None, '1h')
+        
+        # Verificar
+        self.assertEqual(len(from_rollups), 2)
+        self.assertAlmostEqual(from_rollups.total.sum(), accounting.total)
+        np.testing.assert_allclose(from_rollups.by_category['Sub Metering'], from_series.by_category['Sub Metering'])
+    
+    def test_unknown_period(self):
+        """
+        Testa que um período desconhecido é rejeitado.
+        """
+        with self.assertRaises(ValueError):
+            self.engine.timeline(self.series, None, '1w')
+    
+    def test_merge_rejects_other_table_contents(self):
+        """
+        Testa que contas de tabelas com a mesma versão e transformidades diferentes não são combinadas.
+        """
+        # Preparar
+        first, second = self.series.slice(0, 60), self.series.slice(60, 120)
+        edited = EmergyEngine(TransformityTable([Transformity('Active Power', 'kW', 2.0)], 'default-1'))
+        stored = self.engine.evaluate(first).to_metadata()
+        del stored['table_digest']
+        legacy = EmergyAccounting.from_metadata(stored)
+        
+        # Agir
+        merged = self.engine.evaluate(first).merge(self.engine.evaluate(second))
+        
+        # Verificar
+        self.assertAlmostEqual(merged.total, self.engine.evaluate(self.series).total)
+        with self.assertRaises(ValueError):
+            self.engine.evaluate(first).merge(edited.evaluate(second))
+        with self.assertRaises(ValueError):
+            legacy.merge(edited.evaluate(second))
+
+
+class TestTransformityTable(unittest.TestCase):
+    """
+    Casos de teste para a tabela de transformidades.
+    """
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'transformities.json')
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_loads_json_once(self):
+        """
+        Testa que a tabela de um arquivo é lida uma vez e usada pelo motor.
+        """
+        # Preparar
+        with open(self.path, 'w', encoding='utf-8') as table_file:
+            json.dump({'version': 'teste', 'transformities': [
+                {'category': 'Active Power', 'unit': 'kW', 'uev': 2.0}
+            ]}, table_file)
+        
+        # Agir
+        table = load_transformity_table(self.path)
+        accounting = EmergyEngine(table).evaluate(make_series())
+        
+        # Verificar
+        self.assertIs(load_transformity_table(self.path), table)
+        self.assertEqual(accounting.table_version, 'teste')
+        self.assertAlmostEqual(accounting.total, 119 * 1000.0 * 60 * 2.0)
+        self.assertEqual(list(accounting.channels), ['global_active_power'])
+    
+    def test_rejects_unit_without_energy_conversion(self):
+        """
+        Testa que unidades que não são de energia ou potência são rejeitadas.
+        """
+        with self.assertRaises(ValueError):
+            TransformityTable([Transformity('Voltage', 'V', 1.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@ Feito por André Carbonieri Silva T839FC9
 import unittest
 from datetime import datetime
 from domain.models.emergy_model import EmergyInput, EmergyCalculation
+from domain.services.emergy_engine import ELECTRICITY_UEV
 
 
 class TestEmergyModel(unittest.TestCase):
@@ -44,7 +45,7 @@ class TestEmergyModel(unittest.TestCase):
         # Preparar
         inputs = [
             EmergyInput("Entrada 1", 10.0, "kg", "Material", "Descrição 1"),
-            EmergyInput("Entrada 2", 20.0, "kWh", "Energia", "Descrição 2")
+            EmergyInput("Entrada 2", 2.0, "kW", "Active Power", "Descrição 2")
         ]
         metadata = {"fonte": "teste"}
         
@@ -54,7 +55,8 @@ class TestEmergyModel(unittest.TestCase):
         # Verificar
         self.assertIsNotNone(calculation.id)
         self.assertEqual(len(calculation.inputs), 2)
-        self.assertEqual(calculation.total_emergy, 30.0)  # 10.0 + 20.0
+        # Apenas a potência tem transformidade: 2 kW durante um minuto
+        self.assertAlmostEqual(calculation.total_emergy, 2.0 * 1000.0 * 60 * ELECTRICITY_UEV)
         self.assertIsInstance(calculation.created_at, datetime)
         self.assertEqual(calculation.metadata, metadata)
     
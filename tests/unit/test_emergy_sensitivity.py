@@ -0,0 +1,132 @@
+"""
+Testes unitários para a análise de sensibilidade da emergia.
+Este arquivo contém testes para UevDistribution e MonteCarloSensitivity:
+validação das distribuições, reprodutibilidade pela semente independentemente
+do número de processos e coerência dos percentis com a emergia pontual.
+"""
+
+import unittest
+from domain.services.emergy_engine import ELECTRICITY_UEV, EmergyEngine
+from domain.services.emergy_sensitivity import MonteCarloSensitivity, UevDistribution
+from tests.unit.test_emergy_engine import make_series
+
+
+class TestUevDistribution(unittest.TestCase):
+    """
+    Casos de teste para a classe UevDistribution.
+    """
+    
+    def test_rejects_invalid_specs(self):
+        """
+        Testa a rejeição de tipos desconhecidos, parâmetros ausentes e parâmetros fora do domínio.
+        """
+        invalid = [
+            {'distribution': 'beta', 'a': 1},
+            {'distribution': 'lognormal', 'median': 1.0},
+            {'distribution': 'lognormal', 'median': 1.0, 'gsd': 0.5},
+            {'distribution': 'uniform', 'low': 2.0, 'high': 1.0},
+            {'distribution': 'normal', 'mean': 'x', 'std': 1.0},
+        ]
+        for spec in invalid:
+            with self.assertRaises(ValueError, msg=spec):
+                UevDistribution.from_dict(spec)
+
+
+class TestMonteCarloSensitivity(unittest.TestCase):
+    """
+    Casos de teste para a classe MonteCarloSensitivity.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com a contabilidade de uma série de 2 horas.
+        """
+        self.accounting = EmergyEngine().evaluate(make_series())
+        self.distributions = {
+            'Active Power': UevDistribution.from_dict(
+                {'distribution': 'lognormal', 'median': ELECTRICITY_UEV, 'gsd': 1.5}
+            )
+        }
+    
+    def test_same_seed_gives_same_result_for_any_worker_count(self):
+        """
+        Testa que a mesma semente produz os mesmos percentis em um ou dois processos.
+        """
+        # Preparar
+        serial = MonteCarloSensitivity(workers=1, chunk_scenarios=1000)
+        parallel = MonteCarloSensitivity(workers=2, chunk_scenarios=1000)
+        
+        # Agir
+        try:
+            first = serial.run(self.accounting, self.distributions, 5000, seed=42)
+            second = parallel.run(self.accounting, self.distributions, 5000, seed=42)
+        finally:
+            parallel.shutdown()
+        
+        # Verificar
+        self.assertEqual(first.percentiles, second.percentiles)
+        self.assertEqual(first.mean, second.mean)
+        self.assertEqual(first.seed, 42)
+    
+    def test_drawn_seed_fits_in_double(self):
+        """
+        Testa que a semente sorteada é exata em um double (JSON/JavaScript) e reproduz o resultado.
+        """
+        # Preparar
+        sensitivity = MonteCarloSensitivity(workers=1)
+        
+        # Agir
+        drawn = sensitivity.run(self.accounting, self.distributions, 100)
+        repeated = sensitivity.run(self.accounting, self.distributions, 100, seed=drawn.seed)
+        
+        # Verificar
+        self.assertLess(drawn.seed, 2 ** 53)
+        self.assertEqual(int(float(drawn.seed)), drawn.seed)
+        self.assertEqual(repeated.percentiles, drawn.percentiles)
+    
+    def test_percentiles_bracket_point_estimate(self):
+        """
+        Testa que a mediana fica próxima da emergia pontual e que os percentis são crescentes.
+        """
+        # Agir
+        result = MonteCarloSensitivity(workers=1).run(
+            self.accounting, self.distributions, 20000, seed=7, percentiles=[5, 50, 95]
+        )
+        
+        # Verificar
+        low, median, high = result.percentiles[5], result.percentiles[50], result.percentiles[95]
+        self.assertLess(low, median)
+        self.assertLess(median, high)
+        self.assertAlmostEqual(median / result.point_estimate, 1.0, delta=0.02)
+        # Os submedidores não entram no total e mantêm o UEV fixo
+        self.assertEqual(list(result.by_category), ['Active Power'])
+    
+    def test_fixed_transformity_gives_no_spread(self):
+        """
+        Testa que uma distribuição degenerada reproduz exatamente a emergia pontual.
+        """
+        # Preparar
+        distributions = {
+            'Sub Metering': UevDistribution.from_dict(
+                {'distribution': 'uniform', 'low': ELECTRICITY_UEV, 'high': ELECTRICITY_UEV}
+            )
+        }
+        
+        # Agir
+        result = MonteCarloSensitivity(workers=1).run(self.accounting, distributions, 100, seed=1)
+        
+        # Verificar
+        self.assertAlmostEqual(result.percentiles[50], self.accounting.total)
+        self.assertAlmostEqual(result.std, 0.0)
+        self.assertAlmostEqual(result.by_category['Sub Metering'][50], self.accounting.by_category['Sub Metering'])
+    
+    def test_unknown_category(self):
+        """
+        Testa a rejeição de uma categoria sem emergia no cálculo.
+        """
+        with self.assertRaises(ValueError):
+            MonteCarloSensitivity(workers=1).run(self.accounting, {'Gas': self.distributions['Active Power']}, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Testes unitários para o serviço de tarefas de ingestão.
+Este arquivo contém testes para a classe IngestionJobService, verificando o
+processamento em segundo plano, o relatório de progresso e o limite da fila.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from application.services.emergy_application_service import EmergyApplicationService
+from application.services.ingestion_job_service import IngestionJobService, JobQueueFullError, JobState
+from domain.services.emergy_service import EmergyService
+from infrastructure.repositories.memory_emergy_repository import MemoryEmergyRepository
+
+CONTENT = b"""Date;Time;Global_active_power;Global_reactive_power;Voltage;Global_intensity;Sub_metering_1;Sub_metering_2;Sub_metering_3
+16/12/2006;17:24:00;4.216;0.418;234.840;18.400;0.000;1.000;17.000
+16/12/2006;17:25:00;5.360;0.436;233.630;23.000;0.000;1.000;16.000
+"""
+
+
+def write_upload(content=CONTENT):
+    descriptor, path = tempfile.mkstemp()
+    with os.fdopen(descriptor, 'wb') as upload:
+        upload.write(content)
+    return path
+
+
+def wait_for(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while job.state not in JobState.FINISHED and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class BlockingAppService:
+    """
+    Serviço de aplicação falso que só termina quando liberado pelo teste.
+    """
+    
+    def __init__(self):
+        self.release = threading.Event()
+    
+    def process_txt_file(self, path, metadata, filename=None, progress=None):
+        self.release.wait(5)
+        raise ValueError('interrompido')
+
+
+class TestIngestionJobService(unittest.TestCase):
+    """
+    Casos de teste para a classe IngestionJobService.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste.
+        """
+        self.repository = MemoryEmergyRepository()
+        app_service = EmergyApplicationService(EmergyService(self.repository))
+        self.service = IngestionJobService(app_service, max_workers=1, max_queue=1)
+    
+    def tearDown(self):
+        self.service.shutdown()
+    
+    def test_job_creates_calculation(self):
+        """
+        Testa que a tarefa processa o arquivo, registra o progresso e remove o temporário.
+        """
+        # Preparar
+        path = write_upload()
+        
+        # Agir
+        job = wait_for(self.service.submit_upload('dados.txt', path, {'filename': 'dados.txt'}))
+        
+        # Verificar
+        self.assertEqual(job.state, JobState.SUCCEEDED)
+        self.assertEqual(job.rows_processed, 2)
+        self.assertEqual(job.bytes_processed, len(CONTENT))
+        self.assertIsNotNone(self.repository.get_by_id(job.calculation_id))
+        self.assertEqual(self.service.get_job(job.id).to_dict()['calculation_id'], job.calculation_id)
+        self.assertFalse(os.path.exists(path))
+    
+    def test_failed_job_reports_error(self):
+        """
+        Testa que erros de processamento marcam a tarefa como falha.
+        """
+        job = wait_for(self.service.submit_upload('dados.zip', write_upload(b'nao e um zip'), {}))
+        
+        self.assertEqual(job.state, JobState.FAILED)
+        self.assertTrue(job.error)
+    
+    def test_queue_limit(self):
+        """
+        Testa que tarefas acima do limite de execução e de fila são recusadas.
+        """
+        # Preparar
+        app_service = BlockingAppService()
+        service = IngestionJobService(app_service, max_workers=1, max_queue=1)
+        
+        try:
+            # Agir
+            service.submit_upload('a.txt', write_upload(), {})
+            service.submit_upload('b.txt', write_upload(), {})
+            path = write_upload()
+            
+            # Verificar
+            with self.assertRaises(JobQueueFullError):
+                service.submit_upload('c.txt', path, {})
+            self.assertFalse(os.path.exists(path))
+        finally:
+            app_service.release.set()
+            service.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,10 +6,17 @@ verificando a funcionalidade de salvar, recuperar e excluir cálculos de emergy.
 Feito por André Carbonieri Silva T839FC9
 """
 
+import shutil
+import tempfile
 import unittest
 from datetime import datetime
-from domain.models.emergy_model import EmergyInput, EmergyCalculation
-from infrastructure.repositories.memory_emergy_repository import MemoryEmergyRepository
+import numpy as np
+from domain.models.emergy_model import CalculationTail, EmergyInput, EmergyCalculation
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from domain.models.rollup import RollupPyramid
+from domain.repositories.emergy_repository import AppendConflictError, PageCursor
+from infrastructure.repositories.columnar_file_emergy_repository import ColumnarFileEmergyRepository
+from infrastructure.repositories.memory_emergy_repository import MemoryEmergyRepository, estimate_size
 
 
 class TestMemoryEmergyRepository(unittest.TestCase):
@@ -95,6 +102,42 @@ class TestMemoryEmergyRepository(unittest.TestCase):
         self.assertTrue(result)
         self.assertIsNone(retrieved_calculation)
     
+    def test_append_tail_loads_calculation(self):
+        """
+        Testa que a implementação padrão de append_tail completa o cálculo gravado com a parte final.
+        """
+        # Preparar
+        timestamps = 1166289840 + 60 * np.arange(40, dtype=np.int64)
+        series = MeterSeries(timestamps, {key: np.arange(40.0) for key in CHANNEL_KEYS})
+        calculation = EmergyCalculation.create_from_series(series.slice(0, 20), {})
+        calculation.rollups = RollupPyramid.build(calculation.series)
+        self.repository.save(calculation)
+        stored = calculation.rollups.to_arrays()
+        last = RollupPyramid.from_arrays({name: array[-1:] for name, array in stored.items()})
+        tail = CalculationTail(
+            id=calculation.id,
+            total_emergy=1.0,
+            created_at=calculation.created_at,
+            metadata={},
+            rows=40,
+            readings=series.slice(19, 40),
+            rollups=last.append(series.slice(20, 40)),
+            rollup_offsets={level: len(calculation.rollups.level(level)) - 1 for level in calculation.rollups.levels}
+        )
+        
+        # Agir
+        self.repository.append_tail(tail, series.slice(20, 40))
+        with self.assertRaises(AppendConflictError):
+            self.repository.append_tail(tail, series.slice(20, 40))
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        # Verificar
+        np.testing.assert_array_equal(retrieved.series.timestamps, timestamps)
+        self.assertEqual(len(retrieved.inputs), 40 * len(CHANNEL_KEYS))
+        self.assertEqual(retrieved.total_emergy, 1.0)
+        for name, array in RollupPyramid.build(series).to_arrays().items():
+            np.testing.assert_array_equal(retrieved.rollups.to_arrays()[name], array, err_msg=name)
+    
     def test_delete_nonexistent(self):
         """
         Testa excluir um cálculo inexistente.
@@ -105,6 +148,111 @@ class TestMemoryEmergyRepository(unittest.TestCase):
         # Verificar
         self.assertFalse(result)
 
+    
+    def test_get_page(self):
+        """
+        Testa percorrer os cálculos em páginas com o cursor.
+        """
+        # Preparar
+        calculations = [
+            EmergyCalculation(f"calc-{index}", [], float(index), datetime(2024, 1, 1, 0, index), {})
+            for index in (3, 0, 2, 1, 4)
+        ]
+        for calculation in calculations:
+            self.repository.save(calculation)
+        
+        # Agir
+        first_page = self.repository.get_page(2)
+        second_page = self.repository.get_page(2, PageCursor.of(first_page[-1]))
+        self.repository.delete("calc-3")
+        last_page = self.repository.get_page(2, PageCursor.decode(PageCursor.of(second_page[-1]).encode()))
+        
+        # Verificar
+        self.assertEqual([calc.id for calc in first_page], ["calc-0", "calc-1"])
+        self.assertEqual([calc.id for calc in second_page], ["calc-2", "calc-3"])
+        self.assertEqual([calc.id for calc in last_page], ["calc-4"])
+
+
+
+def make_calculation(minute, rows=1000):
+    timestamps = 1166289840 + 60 * np.arange(rows, dtype=np.int64)
+    series = MeterSeries(timestamps, {key: np.full(rows, float(minute)) for key in CHANNEL_KEYS})
+    calculation = EmergyCalculation.create_from_series(series, {"fonte": "teste"})
+    calculation.created_at = datetime(2024, 1, 1, 0, minute)
+    return calculation
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """
+    Casos de teste para o orçamento de memória do MemoryEmergyRepository.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com três cálculos e orçamento para dois.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.calculations = [make_calculation(minute) for minute in range(3)]
+        self.budget = 2 * estimate_size(self.calculations[0])
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_evicts_least_recently_used_to_spill(self):
+        """
+        Testa que o cálculo usado há mais tempo é transbordado e recarregado por get_by_id.
+        """
+        # Preparar
+        repository = MemoryEmergyRepository(self.budget, ColumnarFileEmergyRepository(self.directory))
+        first, second, third = self.calculations
+        repository.save(first)
+        repository.save(second)
+        repository.get_by_id(first.id)
+        
+        # Agir
+        repository.save(third)
+        reloaded = repository.get_by_id(second.id)
+        
+        # Verificar
+        self.assertEqual(repository.evictions, 2)
+        self.assertEqual((repository.hits, repository.misses), (1, 1))
+        self.assertLessEqual(repository.size, self.budget)
+        np.testing.assert_array_equal(reloaded.series.column('voltage'), second.series.column('voltage'))
+        self.assertEqual([summary.id for summary in repository.get_summary_page(3)],
+                         [calc.id for calc in self.calculations])
+        self.assertEqual([calc.id for calc in repository.get_all()], [calc.id for calc in self.calculations])
+    
+    def test_delete_spilled_calculation(self):
+        """
+        Testa excluir um cálculo que está apenas no transbordo.
+        """
+        # Preparar
+        spill = ColumnarFileEmergyRepository(self.directory)
+        repository = MemoryEmergyRepository(self.budget, spill)
+        for calculation in self.calculations:
+            repository.save(calculation)
+        
+        # Agir
+        result = repository.delete(self.calculations[0].id)
+        
+        # Verificar
+        self.assertTrue(result)
+        self.assertIsNone(repository.get_by_id(self.calculations[0].id))
+        self.assertIsNone(spill.get_by_id(self.calculations[0].id))
+        self.assertEqual(len(repository.get_all()), 2)
+    
+    def test_evicts_without_spill(self):
+        """
+        Testa que, sem transbordo, o cálculo removido da memória deixa de existir.
+        """
+        repository = MemoryEmergyRepository(self.budget)
+        for calculation in self.calculations:
+            repository.save(calculation)
+        
+        self.assertIsNone(repository.get_by_id(self.calculations[0].id))
+        self.assertEqual(len(repository.get_page(10)), 2)
+        self.assertEqual(repository.evictions, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,182 @@
+"""
+Testes unitários para a série colunar de leituras de medidores.
+Este arquivo contém testes para a classe MeterSeries e para a visão MeterInputsView,
+verificando o armazenamento colunar e a geração preguiçosa das entradas.
+"""
+
+import unittest
+import numpy as np
+from domain.models.emergy_model import EmergyCalculation
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries, MeterSeriesBuilder
+from domain.services.emergy_engine import EmergyEngine
+
+
+def make_series(rows=3):
+    """
+    Cria uma série de exemplo com leituras minuto a minuto a partir de 16/12/2006 17:24:00.
+    """
+    start = 1166289840  # 16/12/2006 17:24:00
+    timestamps = start + 60 * np.arange(rows, dtype=np.int64)
+    columns = {key: np.arange(rows, dtype=np.float64) + index for index, key in enumerate(CHANNEL_KEYS)}
+    return MeterSeries(timestamps, columns)
+
+
+class TestMeterSeries(unittest.TestCase):
+    """
+    Casos de teste para a classe MeterSeries.
+    """
+    
+    def test_series_is_columnar(self):
+        """
+        Testa que a série guarda uma coluna por canal sem copiar os arrays.
+        """
+        # Preparar
+        series = make_series()
+        column = np.array([1.0, 2.0, 3.0])
+        
+        # Agir
+        shared = MeterSeries(series.timestamps, dict(series.columns, voltage=column))
+        
+        # Verificar
+        self.assertEqual(len(series), 3)
+        self.assertEqual(series.input_count, 21)
+        self.assertIs(shared.column('voltage'), column)
+        self.assertEqual(series.timestamps.dtype, np.int64)
+    
+    def test_mismatched_column_length(self):
+        """
+        Testa que colunas com tamanho diferente dos timestamps são rejeitadas.
+        """
+        series = make_series()
+        columns = dict(series.columns, voltage=np.zeros(2))
+        
+        with self.assertRaises(ValueError):
+            MeterSeries(series.timestamps, columns)
+    
+    def test_concatenate_and_slice(self):
+        """
+        Testa a concatenação de séries e o fatiamento sem cópia.
+        """
+        # Preparar
+        series = make_series(4)
+        
+        # Agir
+        joined = MeterSeries.concatenate([series.slice(0, 2), series.slice(2)])
+        
+        # Verificar
+        self.assertEqual(len(joined), 4)
+        np.testing.assert_array_equal(joined.timestamps, series.timestamps)
+        self.assertTrue(np.shares_memory(series.slice(1, 3).column('voltage'), series.column('voltage')))
+
+    
+    def test_time_range_is_zero_copy_binary_search(self):
+        """
+        Testa que o recorte por intervalo de tempo é inclusivo e não copia os dados.
+        """
+        # Preparar
+        series = make_series(10)
+        start, end = int(series.timestamps[2]) - 30, int(series.timestamps[6])
+        
+        # Agir
+        selected = series.time_range(start, end)
+        
+        # Verificar
+        self.assertEqual(series.time_range_bounds(start, end), (2, 7))
+        self.assertTrue(np.shares_memory(selected.column('voltage'), series.column('voltage')))
+        self.assertEqual(selected.timestamps.tolist(), series.timestamps[2:7].tolist())
+        self.assertEqual(len(series.time_range(end + 3600)), 0)
+    
+    def test_time_range_requires_sorted_series(self):
+        """
+        Testa que o recorte por intervalo exige uma série ordenada, e que sort_by_time a ordena.
+        """
+        series = make_series(4)
+        shuffled = MeterSeries(series.timestamps[::-1], {key: column[::-1] for key, column in series.columns.items()})
+        
+        with self.assertRaises(ValueError):
+            shuffled.time_range(int(series.timestamps[1]))
+        self.assertEqual(len(shuffled.sort_by_time().time_range(int(series.timestamps[1]))), 3)
+    
+    def test_append_reuses_spare_capacity(self):
+        """
+        Testa que o append escreve na capacidade excedente sem alterar a série anterior.
+        """
+        # Preparar
+        series = make_series(4)
+        later = MeterSeries(series.timestamps + 240, series.columns)
+        
+        # Agir
+        first = series.slice(0, 2).append(series.slice(2))
+        second = first.append(later)
+        
+        # Verificar
+        self.assertEqual(len(first), 4)
+        self.assertEqual(len(second), 8)
+        self.assertTrue(second.is_sorted())
+        self.assertIs(second.column('voltage').base, first.column('voltage').base)
+        np.testing.assert_array_equal(first.timestamps, series.timestamps)
+        np.testing.assert_array_equal(second.column('voltage')[4:], series.column('voltage'))
+        self.assertFalse(first.append(series).is_sorted())
+    
+    def test_builder_accumulates_batches(self):
+        """
+        Testa que o acumulador junta lotes na ordem em que foram anexados.
+        """
+        # Preparar
+        series = make_series(3000)
+        builder = MeterSeriesBuilder()
+        
+        # Agir
+        for start in range(0, 3000, 700):
+            builder.append(series.slice(start, start + 700))
+        built = builder.build()
+        
+        # Verificar
+        self.assertEqual(len(built), 3000)
+        self.assertEqual(len(builder), 0)
+        np.testing.assert_array_equal(built.timestamps, series.timestamps)
+        np.testing.assert_array_equal(built.column('sub_metering_3'), series.column('sub_metering_3'))
+
+
+class TestMeterInputsView(unittest.TestCase):
+    """
+    Casos de teste para a visão de entradas de um cálculo baseado em série.
+    """
+    
+    def test_inputs_view_matches_legacy_format(self):
+        """
+        Testa que as entradas geradas seguem o formato das entradas por leitura.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(2), {"fonte": "teste"})
+        
+        # Agir
+        first = calculation.inputs[0]
+        kitchen = calculation.inputs[4]
+        last = calculation.inputs[-1]
+        
+        # Verificar
+        self.assertEqual(len(calculation.inputs), 14)
+        self.assertEqual(first.name, "Active Power 16/12/2006 17:24:00")
+        self.assertEqual(first.unit, "kW")
+        self.assertEqual(first.description, "Date: 16/12/2006, Time: 17:24:00")
+        self.assertEqual(kitchen.description, "Kitchen - Date: 16/12/2006, Time: 17:24:00")
+        self.assertEqual(last.name, "Sub Metering 3 16/12/2006 17:25:00")
+        self.assertEqual(list(calculation.inputs)[-1], last)
+    
+    def test_total_comes_from_engine(self):
+        """
+        Testa que o total vem do EmergyEngine, ou do valor já calculado pelo chamador.
+        """
+        series = make_series(2)
+        
+        calculation = EmergyCalculation.create_from_series(series, {})
+        given = EmergyCalculation.create_from_series(series, {}, total_emergy=5.0)
+        
+        self.assertEqual(calculation.total_emergy, EmergyEngine().evaluate(series).total)
+        self.assertEqual(given.total_emergy, 5.0)
+        self.assertIs(calculation.series, series)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Testes unitários para o analisador em lote de arquivos TXT de medidores.
+Este arquivo contém testes para a classe MeterTxtParser, verificando a detecção
+de dialeto, a conversão de valores ausentes em NaN e a rejeição de linhas malformadas.
+"""
+
+import io
+import os
+import unittest
+import numpy as np
+from infrastructure.parsers.meter_txt_parser import MeterTxtParser, days_from_civil
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
+
+HEADER = 'Date;Time;Global_active_power;Global_reactive_power;Voltage;Global_intensity;Sub_metering_1;Sub_metering_2;Sub_metering_3'
+
+
+class TestMeterTxtParser(unittest.TestCase):
+    """
+    Casos de teste para a classe MeterTxtParser.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste.
+        """
+        self.parser = MeterTxtParser()
+    
+    def _read(self, filename):
+        with open(os.path.join(DATA_DIR, filename), 'rb') as data_file:
+            return data_file.read()
+    
+    def test_sample_dialects_produce_same_readings(self):
+        """
+        Testa que os arquivos de exemplo com ';', com espaço e sem cabeçalho são lidos igualmente.
+        """
+        # Agir
+        semicolon = self.parser.parse(self._read('sample_energy_data.txt'))
+        space = self.parser.parse(self._read('sample_energy_data_space.txt'))
+        no_header = self.parser.parse(self._read('sample_energy_data_no_header.txt'))
+        
+        # Verificar
+        self.assertEqual(space.dialect.separator, ' ')
+        self.assertFalse(no_header.dialect.has_header)
+        self.assertEqual(semicolon.rows, 15)
+        for result in (space, no_header):
+            rows = result.rows
+            np.testing.assert_array_equal(result.series.timestamps, semicolon.series.timestamps[:rows])
+            np.testing.assert_allclose(result.series.column('voltage'), semicolon.series.column('voltage')[:rows])
+    
+    def test_timestamps_are_epoch_seconds(self):
+        """
+        Testa a conversão de data e hora para segundos desde a época.
+        """
+        result = self.parser.parse(f"{HEADER}\n1/3/2008;23:59:30;1;1;1;1;1;1;1\n")
+        
+        self.assertEqual(int(result.series.timestamps[0]), 1204415970)  # 2008-03-01T23:59:30
+    
+    def test_missing_markers_become_nan(self):
+        """
+        Testa que '?' e campos vazios são guardados como NaN sem rejeitar a linha.
+        """
+        # Preparar
+        data = f"{HEADER}\r\n16/12/2006;17:24:00;4.216;0.418;234.840;18.400;0.000;1.000;17.000\r\n21/12/2006;11:23:00;?;?;?;?;?;?;\r\n"
+        
+        # Agir
+        result = self.parser.parse(data)
+        
+        # Verificar
+        self.assertEqual(result.rows, 2)
+        self.assertEqual(result.rejected_rows, 0)
+        self.assertEqual(result.missing_values, 7)
+        self.assertTrue(np.isnan(result.series.column('sub_metering_3')[1]))
+    
+    def test_malformed_rows_are_counted(self):
+        """
+        Testa que linhas malformadas ou com datas inválidas são descartadas e contadas.
+        """
+        # Preparar
+        data = "\n".join([
+            HEADER,
+            "16/12/2006;17:24:00;4.216;0.418;234.840;18.400;0.000;1.000;17.000",
+            "linha;quebrada",
+            "16/12/2006;17:25:00;abc;0.418;234.840;18.400;0.000;1.000;17.000",
+            "32/12/2006;17:26:00;4.216;0.418;234.840;18.400;0.000;1.000;17.000",
+        ])
+        
+        # Agir
+        result = self.parser.parse(data)
+        
+        # Verificar
+        self.assertEqual(result.rows, 1)
+        self.assertEqual(result.rejected_rows, 3)
+    
+    def test_empty_input(self):
+        """
+        Testa a análise de um arquivo apenas com cabeçalho.
+        """
+        result = self.parser.parse(HEADER + "\n")
+        
+        self.assertEqual(result.rows, 0)
+        self.assertEqual(result.rejected_rows, 0)
+    
+    def test_stream_matches_full_parse(self):
+        """
+        Testa que a análise em blocos pequenos produz as mesmas leituras da análise completa.
+        """
+        # Preparar
+        data = self._read('sample_energy_data.txt') + b"21/12/2006;11:23:00;?;?;?;?;?;?;\nlinha;quebrada"
+        expected = self.parser.parse(data)
+        
+        # Agir
+        results = list(self.parser.parse_stream(io.BytesIO(data), chunk_size=50))
+        timestamps = np.concatenate([result.series.timestamps for result in results])
+        
+        # Verificar
+        self.assertGreater(len(results), 1)
+        np.testing.assert_array_equal(timestamps, expected.series.timestamps)
+        self.assertEqual(sum(result.rejected_rows for result in results), expected.rejected_rows)
+        self.assertEqual(sum(result.missing_values for result in results), 7)
+    
+    def test_stream_without_trailing_newline(self):
+        """
+        Testa um fluxo cuja única linha de dados não termina com quebra de linha.
+        """
+        data = b"16/12/2006;17:24:00;4.216;0.418;234.840;18.400;0.000;1.000;17.000"
+        
+        results = list(self.parser.parse_stream(io.BytesIO(data), chunk_size=8))
+        
+        self.assertEqual(sum(result.rows for result in results), 1)
+    
+    def test_days_from_civil(self):
+        """
+        Testa a conversão vetorizada de datas para dias desde a época.
+        """
+        days = days_from_civil(np.array([1970, 2000, 2006]), np.array([1, 3, 12]), np.array([1, 1, 16]))
+        
+        np.testing.assert_array_equal(days, [0, 11017, 13498])
+
+
+if __name__ == '__main__':
+    unittest.main()
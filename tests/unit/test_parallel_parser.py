@@ -0,0 +1,101 @@
+"""
+Testes unitários para a análise paralela por faixas de bytes.
+Este arquivo contém testes para split_ranges e ParallelMeterParser, verificando
+que as faixas respeitam os limites de linha e que o resultado paralelo é igual
+ao da análise sequencial.
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from infrastructure.parsers.meter_txt_parser import MeterTxtParser
+from infrastructure.parsers.parallel_parser import ParallelMeterParser, split_ranges
+
+HEADER = b'Date;Time;Global_active_power;Global_reactive_power;Voltage;Global_intensity;Sub_metering_1;Sub_metering_2;Sub_metering_3\n'
+
+
+def make_content(rows=500):
+    lines = [HEADER]
+    for index in range(rows):
+        hour, minute = divmod(index, 60)
+        value = '?' if index % 97 == 0 else f'{index / 100:.3f}'
+        lines.append(f'16/12/2006;{hour % 24:02d}:{minute:02d}:00;{value};0.4;234.0;18.4;0.0;1.0;17.0\n'.encode())
+    return b''.join(lines)
+
+
+class TestParallelMeterParser(unittest.TestCase):
+    """
+    Casos de teste para a classe ParallelMeterParser.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com um arquivo temporário.
+        """
+        self.content = make_content()
+        descriptor, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(descriptor, 'wb') as data_file:
+            data_file.write(self.content)
+    
+    def tearDown(self):
+        os.remove(self.path)
+    
+    def test_ranges_end_at_line_boundaries(self):
+        """
+        Testa que as faixas cobrem o arquivo inteiro e terminam em fins de linha.
+        """
+        # Agir
+        ranges = split_ranges(self.path, len(HEADER), 7)
+        
+        # Verificar
+        self.assertEqual(ranges[0][0], len(HEADER))
+        self.assertEqual(ranges[-1][1], len(self.content))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(self.content[end - 1:end], b'\n')
+    
+    def test_parallel_matches_sequential(self):
+        """
+        Testa que a análise em vários processos produz o mesmo resultado da sequencial.
+        """
+        # Preparar
+        expected = MeterTxtParser().parse(self.content)
+        parser = ParallelMeterParser(workers=2, min_range_size=1024)
+        progress = []
+        
+        # Agir
+        try:
+            result = parser.parse_file(self.path, progress=progress.append)
+        finally:
+            parser.shutdown()
+        
+        # Verificar
+        self.assertEqual(result.rows, 500)
+        self.assertEqual(result.missing_values, expected.missing_values)
+        np.testing.assert_array_equal(result.series.timestamps, np.sort(expected.series.timestamps))
+        self.assertTrue(result.series.is_sorted())
+        self.assertEqual(progress[-1], 500)
+    
+    def test_ranges_without_readings_keep_their_counts(self):
+        """
+        Testa que faixas só com linhas rejeitadas entram nas contagens, como na análise sequencial.
+        """
+        # Preparar
+        content = self.content + b'16/12/2006;xx:00:00;1.0;0.4;234.0;18.4;0.0;1.0;17.0\n' * 200
+        with open(self.path, 'wb') as data_file:
+            data_file.write(content)
+        expected = MeterTxtParser().parse(content)
+        
+        # Agir
+        result = ParallelMeterParser(workers=1, min_range_size=1024).parse_file(self.path)
+        
+        # Verificar
+        self.assertEqual(result.rows, 500)
+        self.assertEqual(result.rejected_rows, expected.rejected_rows)
+        self.assertEqual(result.rejected_rows, 200)
+        self.assertEqual(result.statistics.to_metadata()['voltage']['count'], 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
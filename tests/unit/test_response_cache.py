@@ -0,0 +1,94 @@
+"""
+Testes unitários para o cache de respostas codificadas.
+Este arquivo contém testes para EncodedResponseCache: orçamento de bytes com
+remoção das respostas menos usadas, cópia de respostas em fluxo e invalidação.
+"""
+
+import unittest
+from presentation.response_cache import CachedResponse, EncodedResponseCache, make_etag
+
+
+def response(size):
+    return CachedResponse(b'x' * size, 'application/json', make_etag(size))
+
+
+class TestEncodedResponseCache(unittest.TestCase):
+    """
+    Casos de teste para a classe EncodedResponseCache.
+    """
+    
+    def test_evicts_least_recently_used_within_budget(self):
+        """
+        Testa que o cache remove as respostas usadas há mais tempo ao passar do orçamento.
+        """
+        # Preparar
+        cache = EncodedResponseCache(max_bytes=250, max_entry_bytes=100)
+        cache.put(('a', 'json', None), response(100))
+        cache.put(('b', 'json', None), response(100))
+        cache.get(('a', 'json', None))
+        
+        # Agir
+        cache.put(('c', 'json', None), response(100))
+        stored = cache.put(('d', 'json', None), response(101))
+        
+        # Verificar
+        self.assertFalse(stored)
+        self.assertIsNone(cache.get(('b', 'json', None)))
+        self.assertIsNotNone(cache.get(('a', 'json', None)))
+        self.assertEqual(cache.size, 200)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+    
+    def test_caching_stream_and_invalidate(self):
+        """
+        Testa que uma resposta em fluxo é guardada ao final e descartada na invalidação.
+        """
+        # Preparar
+        cache = EncodedResponseCache()
+        key = ('a', 'ndjson', (None, None))
+        
+        # Agir
+        chunks = list(cache.caching(key, ['{"a":', b'1}'], 'application/x-ndjson', 'etag', revalidate=True))
+        cached = cache.get(key)
+        cache.invalidate('a')
+        
+        # Verificar
+        self.assertEqual(b''.join(chunks), b'{"a":1}')
+        self.assertEqual(cached.body, b'{"a":1}')
+        self.assertTrue(cached.revalidate)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.size, 0)
+    
+    def test_invalidation_during_stream_is_not_cached(self):
+        """
+        Testa que uma resposta codificada antes da invalidação não é guardada.
+        """
+        cache = EncodedResponseCache()
+        stream = cache.caching(('a', 'json', None), ['{}'], 'application/json', 'etag')
+        next(stream)
+        
+        cache.invalidate('a')
+        list(stream)
+        
+        self.assertEqual(len(cache), 0)
+    
+    def test_invalidation_before_encoding_is_not_cached(self):
+        """
+        Testa que respostas de um cálculo carregado antes de uma invalidação não são guardadas.
+        """
+        # Preparar
+        cache = EncodedResponseCache()
+        generation = cache.generation()
+        stream = cache.caching(('a', 'json', None), ['{}'], 'application/json', 'etag')
+        
+        # Agir
+        cache.invalidate('a')
+        list(stream)
+        stored = cache.put(('a', 'columnar', None), CachedResponse(b'{}', 'application/json', 'etag'), generation)
+        
+        # Verificar
+        self.assertFalse(stored)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Testes unitários para a pirâmide de agregações.
+Este arquivo contém testes para as classes Rollup e RollupPyramid, verificando as
+agregações em cascata, os baldes mensais, a escolha do nível e a consulta por intervalo.
+"""
+
+import unittest
+from datetime import datetime
+import numpy as np
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries, to_timestamp
+from domain.models.rollup import RollupPyramid
+
+
+def make_series(start=datetime(2007, 1, 30), days=4):
+    rows = days * 1440
+    timestamps = to_timestamp(start) + 60 * np.arange(rows, dtype=np.int64)
+    columns = {key: np.arange(rows, dtype=np.float64) * (index + 1) for index, key in enumerate(CHANNEL_KEYS)}
+    columns['voltage'][:30] = np.nan
+    return MeterSeries(timestamps, columns)
+
+
+class TestRollupPyramid(unittest.TestCase):
+    """
+    Casos de teste para a classe RollupPyramid.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com quatro dias de leituras de 1 minuto.
+        """
+        self.series = make_series()
+        self.pyramid = RollupPyramid.build(self.series)
+    
+    def test_cascaded_levels_match_raw_data(self):
+        """
+        Testa que as agregações horárias, calculadas a partir de 15 minutos, batem com os dados brutos.
+        """
+        # Agir
+        hourly = self.pyramid.level('1h')
+        
+        # Verificar
+        raw = self.series.column('voltage').reshape(-1, 60)
+        self.assertEqual(len(hourly), 96)
+        self.assertEqual(hourly.counts['voltage'][0], 30)
+        np.testing.assert_allclose(hourly.sums['voltage'], np.nansum(raw, axis=1))
+        np.testing.assert_allclose(hourly.minimums['voltage'], np.nanmin(raw, axis=1))
+        np.testing.assert_allclose(hourly.mean('voltage')[1:], np.mean(raw[1:], axis=1))
+    
+    def test_monthly_buckets_follow_calendar(self):
+        """
+        Testa que os baldes mensais começam no primeiro dia de cada mês.
+        """
+        monthly = self.pyramid.level('1month')
+        
+        self.assertEqual(monthly.timestamps.tolist(), [to_timestamp(datetime(2007, 1, 1)), to_timestamp(datetime(2007, 2, 1))])
+        self.assertEqual(monthly.counts['global_active_power'].tolist(), [2 * 1440, 2 * 1440])
+    
+    def test_query_picks_coarsest_adequate_level(self):
+        """
+        Testa a escolha do nível pelo intervalo e pelo número de pontos.
+        """
+        # Preparar
+        start = to_timestamp(datetime(2007, 1, 31, 10))
+        end = to_timestamp(datetime(2007, 1, 31, 20))
+        
+        # Agir
+        hourly = self.pyramid.query(self.series, start, end, points=10)
+        raw = self.pyramid.query(self.series, start, end, points=1000)
+        
+        # Verificar
+        self.assertEqual(hourly.level.name, '1h')
+        self.assertEqual(len(hourly), 11)
+        self.assertEqual(int(hourly.timestamps[0]), start)
+        self.assertEqual(raw.level.name, '1min')
+        self.assertEqual(len(raw), 601)
+    
+    def test_append_matches_rebuild(self):
+        """
+        Testa que anexar lotes, inclusive no meio de um balde, produz a mesma pirâmide que recalculá-la.
+        """
+        # Agir
+        pyramid = RollupPyramid.build(self.series.slice(0, 1000))
+        for start, stop in ((1000, 1007), (1007, 3000), (3000, len(self.series))):
+            pyramid = pyramid.append(self.series.slice(start, stop))
+        
+        # Verificar
+        expected = self.pyramid.to_arrays()
+        for name, array in pyramid.to_arrays().items():
+            np.testing.assert_allclose(array, expected[name], err_msg=name)
+    
+    def test_append_reuses_buffers(self):
+        """
+        Testa que anexar um lote no meio de um balde escreve no buffer existente, sem copiar os baldes anteriores.
+        """
+        # Preparar
+        first = RollupPyramid.build(self.series.slice(0, 1000)).append(self.series.slice(1000, 1007))
+        before = {name: array.copy() for name, array in first.to_arrays().items()}
+        
+        # Agir
+        second = first.append(self.series.slice(1007, 1010))
+        
+        # Verificar
+        for name, array in first.to_arrays().items():
+            self.assertEqual(len(array), len(before[name]))
+            np.testing.assert_array_equal(array[:-1], before[name][:-1], err_msg=name)
+        counts = second.level('15min').counts['voltage']
+        self.assertTrue(np.shares_memory(counts, first.level('15min').counts['voltage']))
+        self.assertEqual(counts[-1], before['15min.count.voltage'][-1] + 3)
+    
+    def test_arrays_round_trip(self):
+        """
+        Testa converter a pirâmide em arrays nomeados e reconstruí-la.
+        """
+        restored = RollupPyramid.from_arrays(self.pyramid.to_arrays())
+        
+        self.assertEqual(restored.levels, self.pyramid.levels)
+        np.testing.assert_array_equal(restored.level('1d').maximums['voltage'], self.pyramid.level('1d').maximums['voltage'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Testes unitários para a redução de séries temporais.
+Este arquivo contém testes para lttb_indices, min_max_indices e SeriesDownsampler,
+verificando o número de pontos, a preservação de picos e o filtro por intervalo.
+"""
+
+import unittest
+import numpy as np
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from domain.services.series_downsampling import MIN_MAX, SeriesDownsampler, lttb_indices, min_max_indices
+
+
+def make_series(rows=10000):
+    timestamps = 1166289840 + 60 * np.arange(rows, dtype=np.int64)
+    columns = {key: np.sin(np.arange(rows) / 50.0) + index for index, key in enumerate(CHANNEL_KEYS)}
+    return MeterSeries(timestamps, columns)
+
+
+class TestDownsamplingAlgorithms(unittest.TestCase):
+    """
+    Casos de teste para os algoritmos de redução.
+    """
+    
+    def test_lttb_keeps_ends_and_peak(self):
+        """
+        Testa que o LTTB mantém o primeiro e o último ponto e um pico isolado.
+        """
+        # Preparar
+        x = np.arange(1000, dtype=np.float64)
+        y = np.zeros(1000)
+        y[537] = 100.0
+        
+        # Agir
+        indices = lttb_indices(x, y, 20)
+        
+        # Verificar
+        self.assertEqual(len(indices), 20)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertIn(537, indices)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+    
+    def test_min_max_keeps_extremes(self):
+        """
+        Testa que o mínimo/máximo por balde mantém o vale e o pico globais.
+        """
+        y = np.random.default_rng(1).normal(size=5000)
+        
+        indices = min_max_indices(y, 100)
+        
+        self.assertLessEqual(len(indices), 100)
+        self.assertIn(int(np.argmin(y)), indices)
+        self.assertIn(int(np.argmax(y)), indices)
+
+
+class TestSeriesDownsampler(unittest.TestCase):
+    """
+    Casos de teste para a classe SeriesDownsampler.
+    """
+    
+    def test_downsample_range(self):
+        """
+        Testa a redução de dois canais dentro de um intervalo de tempo.
+        """
+        # Preparar
+        series = make_series()
+        start, end = int(series.timestamps[1000]), int(series.timestamps[5999])
+        
+        # Agir
+        result = SeriesDownsampler().downsample(series, ['voltage', 'sub_metering_1'], 200, start, end, MIN_MAX)
+        
+        # Verificar
+        self.assertEqual(result.source_points, 5000)
+        self.assertLessEqual(len(result), 200)
+        self.assertGreaterEqual(int(result.timestamps[0]), start)
+        self.assertLessEqual(int(result.timestamps[-1]), end)
+        self.assertEqual(sorted(result.columns), ['sub_metering_1', 'voltage'])
+    
+    def test_unknown_channel(self):
+        """
+        Testa que um canal desconhecido é rejeitado.
+        """
+        with self.assertRaises(ValueError):
+            SeriesDownsampler().downsample(make_series(10), ['inexistente'], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Testes unitários para as estatísticas das leituras de medidores.
+Este arquivo contém testes para SeriesStatistics, comparando as estatísticas e a
+matriz de correlação com o cálculo direto do NumPy, inclusive com valores ausentes,
+e as estatísticas montadas a partir dos resumos acumulados.
+"""
+
+import unittest
+import numpy as np
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from domain.models.streaming_statistics import SeriesAccumulator
+from domain.services.series_statistics import SeriesStatistics
+
+
+def make_series(rows=1000):
+    rng = np.random.default_rng(42)
+    base = rng.normal(size=rows)
+    timestamps = 1166289840 + 60 * np.arange(rows, dtype=np.int64)
+    columns = {key: 230 + base * (index + 1) + rng.normal(size=rows) for index, key in enumerate(CHANNEL_KEYS)}
+    columns['voltage'][::7] = np.nan
+    columns['sub_metering_1'][:] = 0.0
+    return MeterSeries(timestamps, columns)
+
+
+class TestSeriesStatistics(unittest.TestCase):
+    """
+    Casos de teste para a classe SeriesStatistics.
+    """
+
+    def setUp(self):
+        """
+        Configura o caso de teste com uma série com valores ausentes.
+        """
+        self.series = make_series()
+        self.statistics = SeriesStatistics()
+
+    def test_describe_ignores_missing_values(self):
+        """
+        Testa as estatísticas de um canal com valores ausentes.
+        """
+        # Preparar
+        voltage = self.series.column('voltage')
+        present = voltage[~np.isnan(voltage)]
+
+        # Agir
+        result = self.statistics.describe(self.series, ['voltage'])['voltage']
+
+        # Verificar
+        self.assertEqual(result.count, len(present))
+        self.assertEqual(result.missing, len(voltage) - len(present))
+        self.assertAlmostEqual(result.mean, present.mean())
+        self.assertAlmostEqual(result.std, present.std(ddof=1))
+        self.assertEqual(result.maximum, present.max())
+        self.assertAlmostEqual(result.percentiles[50], np.median(present))
+
+    def test_summarize_matches_describe(self):
+        """
+        Testa que as estatísticas dos resumos acumulados coincidem com as calculadas sobre a série.
+        """
+        # Preparar
+        accumulator = SeriesAccumulator.from_series(self.series)
+
+        # Agir
+        summarized = self.statistics.summarize(accumulator, ['voltage', 'sub_metering_1'])
+        described = self.statistics.describe(self.series, ['voltage', 'sub_metering_1'])
+
+        # Verificar
+        self.assertEqual(list(summarized), ['voltage', 'sub_metering_1'])
+        for key, expected in described.items():
+            result = summarized[key]
+            self.assertEqual((result.count, result.missing), (expected.count, expected.missing))
+            self.assertAlmostEqual(result.mean, expected.mean)
+            self.assertAlmostEqual(result.std, expected.std)
+            self.assertEqual((result.minimum, result.maximum), (expected.minimum, expected.maximum))
+            for percentile, value in expected.percentiles.items():
+                self.assertAlmostEqual(result.percentiles[percentile], value, delta=0.05 * (expected.std + 1))
+        with self.assertRaises(ValueError):
+            self.statistics.summarize(accumulator, ['x'])
+
+    def test_correlation_matches_pairwise_numpy(self):
+        """
+        Testa a correlação em blocos contra np.corrcoef sobre as leituras completas de cada par.
+        """
+        # Preparar
+        self.statistics.CHUNK_ROWS = 128
+        voltage = self.series.column('voltage')
+        intensity = self.series.column('global_intensity')
+        present = ~np.isnan(voltage)
+
+        # Agir
+        result = self.statistics.correlation(self.series)
+        pair = result.select(['voltage', 'global_intensity'])
+
+        # Verificar
+        expected = np.corrcoef(voltage[present], intensity[present])[0, 1]
+        self.assertAlmostEqual(pair.matrix[0, 1], expected)
+        self.assertEqual(pair.counts[0, 1], present.sum())
+        np.testing.assert_allclose(result.matrix, result.matrix.T, equal_nan=True)
+
+    def test_constant_channel_has_no_correlation(self):
+        """
+        Testa que um canal constante tem correlação NaN, inclusive consigo mesmo.
+        """
+        result = self.statistics.correlation(self.series, ['sub_metering_1', 'voltage'])
+
+        self.assertTrue(np.isnan(result.matrix[0]).all())
+        self.assertEqual(result.matrix[1, 1], 1.0)
+
+    def test_scatter_matches_histogram2d_and_polyfit(self):
+        """
+        Testa o histograma 2-D e o ajuste linear contra np.histogram2d e np.polyfit.
+        """
+        # Preparar
+        x = self.series.column('voltage')
+        y = self.series.column('global_intensity')
+        present = ~np.isnan(x)
+
+        # Agir
+        density = self.statistics.scatter(self.series, 'voltage', 'global_intensity', 20)
+
+        # Verificar
+        expected, _, _ = np.histogram2d(x[present], y[present], bins=[density.x_edges, density.y_edges])
+        slope, intercept = np.polyfit(x[present], y[present], 1)
+        np.testing.assert_array_equal(density.counts, expected)
+        self.assertEqual(density.counts.shape, (20, 20))
+        self.assertEqual(density.points, present.sum())
+        self.assertAlmostEqual(density.fit.slope, slope)
+        self.assertAlmostEqual(density.fit.intercept, intercept)
+        self.assertAlmostEqual(density.fit.r_squared, np.corrcoef(x[present], y[present])[0, 1] ** 2)
+
+    def test_scatter_with_constant_channel(self):
+        """
+        Testa que um eixo constante ocupa uma faixa e não produz ajuste.
+        """
+        density = self.statistics.scatter(self.series, 'sub_metering_1', 'voltage', 4)
+
+        self.assertEqual(np.count_nonzero(density.counts.sum(axis=1)), 1)
+        self.assertEqual(density.counts.sum(), density.points)
+        self.assertTrue(np.isnan(density.fit.slope))
+
+    def test_unknown_channel(self):
+        """
+        Testa que canais desconhecidos são rejeitados.
+        """
+        with self.assertRaises(ValueError):
+            self.statistics.describe(self.series, ['frequencia'])
+        with self.assertRaises(ValueError):
+            self.statistics.correlation(self.series).select(['frequencia'])
+
+
+if __name__ == '__main__':
+    unittest.main()
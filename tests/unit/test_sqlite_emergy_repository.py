@@ -0,0 +1,341 @@
+"""
+Testes unitários para o repositório de emergy em SQLite.
+Este arquivo contém testes para a classe SqliteEmergyRepository, verificando a
+persistência de cálculos baseados em séries e em listas de EmergyInput.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+import numpy as np
+from domain.models.emergy_model import EmergyInput, EmergyCalculation
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from domain.models.rollup import RollupPyramid
+from domain.models.streaming_statistics import SeriesAccumulator
+from domain.repositories.emergy_repository import AppendConflictError, PageCursor
+from domain.services.emergy_service import EmergyService
+from infrastructure.repositories.sqlite_emergy_repository import SqliteEmergyRepository
+
+
+def make_series(rows=250):
+    timestamps = 1166289840 + 60 * np.arange(rows, dtype=np.int64)
+    columns = {key: np.linspace(0, index + 1, rows) for index, key in enumerate(CHANNEL_KEYS)}
+    columns['voltage'][3] = np.nan
+    return MeterSeries(timestamps, columns)
+
+
+class TestSqliteEmergyRepository(unittest.TestCase):
+    """
+    Casos de teste para a classe SqliteEmergyRepository.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com um banco temporário.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'emergy.db')
+        self.repository = SqliteEmergyRepository(self.path, batch_size=100)
+    
+    def tearDown(self):
+        self.repository.close()
+        shutil.rmtree(self.directory)
+    
+    def test_series_round_trip(self):
+        """
+        Testa salvar e recuperar um cálculo baseado em série, inclusive valores ausentes.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(), {"fonte": "teste", "parse": {"rows": 250}})
+        
+        # Agir
+        self.repository.save(calculation)
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        # Verificar
+        self.assertEqual(retrieved.total_emergy, calculation.total_emergy)
+        self.assertEqual(retrieved.metadata, calculation.metadata)
+        self.assertEqual(retrieved.created_at, calculation.created_at)
+        np.testing.assert_array_equal(retrieved.series.timestamps, calculation.series.timestamps)
+        for key in CHANNEL_KEYS:
+            np.testing.assert_array_equal(retrieved.series.column(key), calculation.series.column(key))
+        # As entradas de um cálculo com série são geradas a partir das leituras, não gravadas
+        with closing(sqlite3.connect(self.path)) as connection:
+            self.assertEqual(connection.execute('SELECT COUNT(*) FROM inputs').fetchone()[0], 0)
+        self.assertEqual(retrieved.inputs[7], calculation.inputs[7])
+    
+    def test_rollups_round_trip(self):
+        """
+        Testa salvar e recuperar as agregações de um cálculo, inclusive de uma série vazia.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(), {})
+        calculation.rollups = RollupPyramid.build(calculation.series)
+        empty = EmergyCalculation.create_from_series(MeterSeries.empty(), {})
+        empty.rollups = RollupPyramid.build(empty.series)
+        
+        # Agir
+        self.repository.save(calculation)
+        self.repository.save(empty)
+        retrieved = self.repository.get_by_id(calculation.id).rollups
+        
+        # Verificar
+        self.assertEqual(retrieved.levels, ['15min', '1h', '1d', '1month'])
+        np.testing.assert_array_equal(retrieved.level('15min').sums['voltage'], calculation.rollups.level('15min').sums['voltage'])
+        np.testing.assert_array_equal(retrieved.level('1h').counts['global_active_power'],
+                                      calculation.rollups.level('1h').counts['global_active_power'])
+        self.assertEqual(len(self.repository.get_by_id(empty.id).rollups.level('1d')), 0)
+    
+    def test_statistics_stay_out_of_metadata(self):
+        """
+        Testa que o estado das estatísticas é gravado à parte e que bancos antigos são migrados.
+        """
+        # Preparar
+        statistics = SeriesAccumulator.from_series(make_series())
+        calculation = EmergyCalculation.create_from_series(make_series(), {'statistics': statistics.to_metadata()})
+        calculation.statistics = statistics
+        old = EmergyCalculation.create_from_series(make_series(10), {'statistics': statistics.to_state()})
+        self.repository.save(calculation)
+        self.repository.save(old)
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute('ALTER TABLE calculations DROP COLUMN statistics')
+        
+        # Agir
+        migrated = SqliteEmergyRepository(self.path)
+        try:
+            retrieved = migrated.get_by_id(calculation.id)
+            upgraded = migrated.get_by_id(old.id)
+            summaries = migrated.get_summary_page(10)
+        finally:
+            migrated.close()
+        
+        # Verificar
+        self.assertIsNone(retrieved.statistics)
+        self.assertEqual(retrieved.metadata, calculation.metadata)
+        self.assertEqual(upgraded.statistics.channels['voltage'].count, statistics.channels['voltage'].count)
+        self.assertEqual(len(upgraded.statistics.channels['voltage'].digest), len(statistics.channels['voltage'].digest))
+        self.assertEqual(upgraded.metadata['statistics'], statistics.to_metadata())
+        self.assertTrue(all('digest' not in summary.metadata['statistics']['voltage'] for summary in summaries))
+    
+    def test_statistics_round_trip(self):
+        """
+        Testa que o estado combinável das estatísticas é recuperado com o cálculo.
+        """
+        calculation = EmergyCalculation.create_from_series(make_series(), {})
+        calculation.statistics = SeriesAccumulator.from_series(calculation.series)
+        
+        self.repository.save(calculation)
+        retrieved = self.repository.get_by_id(calculation.id).statistics
+        
+        self.assertEqual(retrieved.channels['voltage'].count, 249)
+        self.assertAlmostEqual(retrieved.channels['voltage'].m2, calculation.statistics.channels['voltage'].m2)
+    
+    def test_append_conflict_between_processes(self):
+        """
+        Testa que um append feito a partir de uma versão já complementada por outro processo é recusado.
+        """
+        # Preparar
+        other = SqliteEmergyRepository(self.path)
+        service, other_service = EmergyService(self.repository), EmergyService(other)
+        full = make_series(200)
+        calculation = service.create_calculation_from_series(full.slice(0, 100), {})
+        stale = other.get_by_id(calculation.id)
+        
+        # Agir
+        service.append_readings(self.repository.get_by_id(calculation.id), full.slice(100, 150))
+        try:
+            with self.assertRaises(AppendConflictError):
+                other_service.append_readings(stale, full.slice(100, 150))
+            retried = other_service.append_readings(other.get_by_id(calculation.id), full.slice(100, 200))
+        finally:
+            other.close()
+        
+        # Verificar
+        self.assertEqual((retried.accepted, retried.duplicates), (50, 50))
+        np.testing.assert_array_equal(self.repository.get_by_id(calculation.id).series.timestamps, full.timestamps)
+    
+    def test_append_to_calculation_from_tail(self):
+        """
+        Testa anexar lotes lendo apenas a parte final do cálculo e recusar uma parte final desatualizada.
+        """
+        # Preparar
+        service = EmergyService(self.repository)
+        full = make_series(200)
+        calculation = service.create_calculation_from_series(full.slice(0, 100), {"content_hash": "blake2b-none-abc"})
+        stale = self.repository.get_tail(calculation.id)
+        
+        # Agir
+        result = service.append_to_calculation(calculation.id, MeterSeries.concatenate([full.slice(150, 200), full.slice(98, 151)]))
+        service.append_to_calculation(calculation.id, full.slice(150, 200))
+        with self.assertRaises(AppendConflictError):
+            self.repository.append_tail(stale, full.slice(100, 101))
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        # Verificar
+        expected = service.create_calculation_from_series(full, {}, save=False)
+        self.assertEqual((stale.rows, len(stale.readings)), (100, 1))
+        self.assertEqual((result.accepted, result.duplicates, result.out_of_order), (100, 3, 0))
+        self.assertIsNone(result.calculation)
+        self.assertEqual(result.summary.input_count, len(expected.inputs))
+        self.assertIsNone(self.repository.get_by_content_hash("blake2b-none-abc"))
+        np.testing.assert_array_equal(retrieved.series.timestamps, full.timestamps)
+        self.assertAlmostEqual(retrieved.total_emergy / expected.total_emergy, 1.0)
+        self.assertAlmostEqual(retrieved.statistics.channels['voltage'].m2, expected.statistics.channels['voltage'].m2)
+        for name, array in expected.rollups.to_arrays().items():
+            np.testing.assert_allclose(retrieved.rollups.to_arrays()[name], array, err_msg=name)
+    
+    def test_append_across_rollup_chunks(self):
+        """
+        Testa que baldes anexados além do fim do último bloco das agregações vão para blocos novos.
+        """
+        # Preparar
+        service = EmergyService(self.repository)
+        full = make_series(61500)
+        calculation = service.create_calculation_from_series(full.slice(0, 61400), {})
+        
+        # Agir
+        service.append_to_calculation(calculation.id, full.slice(61400, 61500))
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        # Verificar
+        expected = RollupPyramid.build(full)
+        self.assertEqual(len(retrieved.rollups.level('15min')), 4101)
+        for name, array in expected.to_arrays().items():
+            np.testing.assert_allclose(retrieved.rollups.to_arrays()[name], array, err_msg=name)
+    
+    def test_migrates_single_blob_rollups(self):
+        """
+        Testa que agregações gravadas em um único BLOB por array são divididas em blocos ao abrir o banco.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(10), {})
+        calculation.rollups = RollupPyramid.build(calculation.series)
+        self.repository.save(calculation)
+        self.repository.close()
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.executescript(
+                'CREATE TABLE rollups (calculation INTEGER NOT NULL, name TEXT NOT NULL, dtype TEXT NOT NULL, '
+                'data BLOB NOT NULL, PRIMARY KEY (calculation, name)) WITHOUT ROWID;'
+                'INSERT INTO rollups SELECT calculation, name, dtype, data FROM rollup_chunks;'
+                'DELETE FROM rollup_chunks;'
+            )
+        
+        # Agir
+        self.repository = SqliteEmergyRepository(self.path)
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        # Verificar
+        for name, array in calculation.rollups.to_arrays().items():
+            np.testing.assert_array_equal(retrieved.rollups.to_arrays()[name], array, err_msg=name)
+    
+    def test_inputs_round_trip(self):
+        """
+        Testa salvar e recuperar um cálculo criado a partir de objetos EmergyInput.
+        """
+        inputs = [
+            EmergyInput("Entrada 1", 10.0, "kg", "Material", "Descrição 1"),
+            EmergyInput("Entrada 2", 20.0, "kWh", "Energia", None)
+        ]
+        calculation = EmergyCalculation.create(inputs, {"fonte": "teste"})
+        
+        self.repository.save(calculation)
+        retrieved = self.repository.get_by_id(calculation.id)
+        
+        self.assertIsNone(retrieved.series)
+        self.assertEqual(list(retrieved.inputs), inputs)
+    
+    def test_persists_across_instances(self):
+        """
+        Testa que os cálculos continuam disponíveis para outra instância do repositório.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(10), {})
+        self.repository.save(calculation)
+        
+        # Agir
+        other = SqliteEmergyRepository(self.path)
+        try:
+            retrieved = other.get_by_id(calculation.id)
+            all_calculations = other.get_all()
+        finally:
+            other.close()
+        
+        # Verificar
+        self.assertEqual(len(retrieved.series), 10)
+        self.assertEqual([calc.id for calc in all_calculations], [calculation.id])
+    
+    def test_summary_page(self):
+        """
+        Testa a paginação de resumos, que não lê as leituras.
+        """
+        # Preparar
+        calculations = [EmergyCalculation.create_from_series(make_series(rows), {}) for rows in (5, 10, 15)]
+        for calculation in calculations:
+            self.repository.save(calculation)
+        ordered = sorted(calculations, key=lambda calc: (calc.created_at, calc.id))
+        
+        # Agir
+        first_page = self.repository.get_summary_page(2)
+        second_page = self.repository.get_summary_page(2, PageCursor.of(first_page[-1]))
+        
+        # Verificar
+        self.assertEqual([summary.id for summary in first_page + second_page], [calc.id for calc in ordered])
+        self.assertEqual(second_page[0].input_count, len(ordered[2].inputs))
+        self.assertEqual(first_page[0].created_at, ordered[0].created_at)
+    
+    def test_delete(self):
+        """
+        Testa excluir um cálculo e suas leituras.
+        """
+        calculation = EmergyCalculation.create_from_series(make_series(10), {})
+        self.repository.save(calculation)
+        
+        self.assertTrue(self.repository.delete(calculation.id))
+        self.assertFalse(self.repository.delete(calculation.id))
+        self.assertIsNone(self.repository.get_by_id(calculation.id))
+    
+    def test_get_by_id_nonexistent(self):
+        """
+        Testa recuperar um cálculo inexistente pelo ID.
+        """
+        self.assertIsNone(self.repository.get_by_id("id-inexistente"))
+
+    
+    def test_get_by_content_hash(self):
+        """
+        Testa a busca pela chave de conteúdo, inclusive depois de excluir o cálculo.
+        """
+        # Preparar
+        calculation = EmergyCalculation.create_from_series(make_series(), {"content_hash": "blake2b-none-abc"})
+        other = EmergyCalculation.create_from_series(make_series(), {"fonte": "teste"})
+        self.repository.save(calculation)
+        self.repository.save(other)
+        
+        # Agir
+        found = self.repository.get_by_content_hash("blake2b-none-abc")
+        self.repository.delete(calculation.id)
+        
+        # Verificar
+        self.assertEqual(found.id, calculation.id)
+        self.assertIsNone(self.repository.get_by_content_hash("blake2b-none-abc"))
+        self.assertIsNone(self.repository.get_by_content_hash("blake2b-none-def"))
+    
+    def test_save_many(self):
+        """
+        Testa salvar vários cálculos em uma única transação.
+        """
+        # Preparar
+        calculations = [EmergyCalculation.create_from_series(make_series(10 + index), {}) for index in range(3)]
+        
+        # Agir
+        self.repository.save_many(calculations)
+        
+        # Verificar
+        for calculation in calculations:
+            self.assertEqual(len(self.repository.get_by_id(calculation.id).series), len(calculation.series))
+
+if __name__ == '__main__':
+    unittest.main()
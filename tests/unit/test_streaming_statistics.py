@@ -0,0 +1,146 @@
+"""
+Testes unitários para as estatísticas acumuladas em fluxo.
+Este arquivo contém testes para TDigest, ChannelAccumulator e SeriesAccumulator,
+verificando a precisão contra o NumPy, a combinação de blocos e a serialização.
+"""
+
+import json
+import unittest
+import numpy as np
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from domain.models.streaming_statistics import ChannelAccumulator, SeriesAccumulator
+
+
+class TestChannelAccumulator(unittest.TestCase):
+    """
+    Casos de teste para a classe ChannelAccumulator.
+    """
+
+    def setUp(self):
+        """
+        Configura o caso de teste com valores assimétricos e alguns ausentes.
+        """
+        self.values = np.random.default_rng(7).lognormal(size=200000)
+        self.values[::100] = np.nan
+        self.present = self.values[~np.isnan(self.values)]
+
+    def test_blocks_match_numpy(self):
+        """
+        Testa que o resumo acumulado em blocos coincide com o cálculo direto.
+        """
+        # Preparar
+        accumulator = ChannelAccumulator()
+
+        # Agir
+        for start in range(0, len(self.values), 7000):
+            accumulator.update(self.values[start:start + 7000])
+
+        # Verificar
+        self.assertEqual(accumulator.count, len(self.present))
+        self.assertEqual(accumulator.missing, 2000)
+        self.assertAlmostEqual(accumulator.mean, self.present.mean())
+        self.assertAlmostEqual(accumulator.variance, self.present.var(ddof=1))
+        self.assertEqual(accumulator.maximum, self.present.max())
+        for percentile in (50, 95, 99):
+            expected = np.percentile(self.present, percentile)
+            self.assertAlmostEqual(accumulator.percentile(percentile), expected, delta=expected * 0.01)
+        self.assertLessEqual(len(accumulator.digest), 101)
+
+    def test_merge_matches_single_pass(self):
+        """
+        Testa que combinar os resumos de duas partes equivale a resumir tudo de uma vez.
+        """
+        # Preparar
+        whole = ChannelAccumulator()
+        whole.update(self.values)
+        first, second = ChannelAccumulator(), ChannelAccumulator()
+        first.update(self.values[:50000])
+        second.update(self.values[50000:])
+
+        # Agir
+        first.merge(second)
+
+        # Verificar
+        self.assertEqual((first.count, first.missing), (whole.count, whole.missing))
+        self.assertAlmostEqual(first.mean, whole.mean)
+        self.assertAlmostEqual(first.variance, whole.variance)
+        self.assertAlmostEqual(first.percentile(95), whole.percentile(95), delta=whole.percentile(95) * 0.01)
+
+    def test_round_trip_through_json(self):
+        """
+        Testa que o resumo serializado pode ser reconstruído e continua combinável.
+        """
+        # Preparar
+        accumulator = ChannelAccumulator()
+        accumulator.update(self.values)
+
+        # Agir
+        restored = ChannelAccumulator.from_dict(json.loads(json.dumps(accumulator.to_dict())))
+        restored.merge(accumulator)
+
+        # Verificar
+        self.assertEqual(restored.count, 2 * accumulator.count)
+        self.assertAlmostEqual(restored.mean, accumulator.mean)
+        self.assertAlmostEqual(restored.percentile(50), accumulator.percentile(50), places=2)
+
+    def test_empty_channel(self):
+        """
+        Testa o resumo de um canal sem leituras.
+        """
+        accumulator = ChannelAccumulator()
+        accumulator.update(np.full(3, np.nan))
+
+        summary = accumulator.to_dict()
+
+        self.assertEqual((summary['count'], summary['missing']), (0, 3))
+        self.assertIsNone(summary['mean'])
+        self.assertIsNone(summary['p99'])
+
+
+class TestSeriesAccumulator(unittest.TestCase):
+    """
+    Casos de teste para a classe SeriesAccumulator.
+    """
+
+    def test_combine_calculations(self):
+        """
+        Testa combinar os resumos gravados de dois cálculos.
+        """
+        # Preparar
+        timestamps = 1166289840 + 60 * np.arange(10, dtype=np.int64)
+        first = MeterSeries(timestamps, {key: np.arange(10.0) for key in CHANNEL_KEYS})
+        second = MeterSeries(timestamps + 600, {key: np.arange(10.0, 20.0) for key in CHANNEL_KEYS})
+        stored = [SeriesAccumulator.from_series(series).to_state() for series in (first, second)]
+
+        # Agir
+        combined = SeriesAccumulator.combine(SeriesAccumulator.from_state(data) for data in stored)
+
+        # Verificar
+        voltage = combined.channels['voltage']
+        self.assertEqual(list(combined.channels), list(CHANNEL_KEYS))
+        self.assertEqual(voltage.count, 20)
+        self.assertAlmostEqual(voltage.mean, 9.5)
+        self.assertAlmostEqual(voltage.variance, np.arange(20.0).var(ddof=1))
+        self.assertEqual((voltage.minimum, voltage.maximum), (0.0, 19.0))
+
+    def test_metadata_has_only_the_summary(self):
+        """
+        Testa que os metadados recebem apenas o resumo público, sem o estado combinável.
+        """
+        # Preparar
+        timestamps = 1166289840 + 60 * np.arange(10, dtype=np.int64)
+        accumulator = SeriesAccumulator.from_series(MeterSeries(timestamps, {key: np.arange(10.0) for key in CHANNEL_KEYS}))
+
+        # Agir
+        metadata = accumulator.to_metadata()
+        copied = accumulator.copy()
+        copied.update(MeterSeries(timestamps + 600, {key: np.arange(10.0) for key in CHANNEL_KEYS}))
+
+        # Verificar
+        self.assertEqual(set(metadata['voltage']), {'count', 'missing', 'mean', 'std', 'min', 'max', 'p50', 'p95', 'p99'})
+        self.assertEqual(accumulator.channels['voltage'].count, 10)
+        self.assertEqual(copied.channels['voltage'].count, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Testes unitários para os formatos colunares de resposta.
+Este arquivo contém testes para calculation_table e os codificadores de
+wire_formats, verificando o JSON colunar e, quando os pacotes opcionais estão
+instalados, o MessagePack e o Arrow IPC.
+"""
+
+import json
+import unittest
+import numpy as np
+from domain.models.emergy_model import EmergyCalculation, EmergyInput
+from domain.models.meter_series import CHANNEL_KEYS, MeterSeries
+from presentation.serializers import wire_formats
+from presentation.serializers.wire_formats import calculation_table, encode_arrow, encode_msgpack, iter_columnar_json
+
+
+class TestWireFormats(unittest.TestCase):
+    """
+    Casos de teste para as tabelas colunares e seus codificadores.
+    """
+    
+    def setUp(self):
+        """
+        Configura o caso de teste com um cálculo baseado em série.
+        """
+        timestamps = 1166289840 + 60 * np.arange(5, dtype=np.int64)
+        columns = {key: np.arange(5, dtype=np.float64) + index for index, key in enumerate(CHANNEL_KEYS)}
+        columns['voltage'][2] = np.nan
+        self.calculation = EmergyCalculation.create_from_series(MeterSeries(timestamps, columns), {"fonte": "teste"})
+    
+    def test_columnar_json(self):
+        """
+        Testa que o JSON colunar em blocos tem uma coluna por canal, com NaN como null.
+        """
+        # Agir
+        chunks = list(iter_columnar_json(calculation_table(self.calculation), chunk_values=2))
+        document = json.loads(''.join(chunks))
+        
+        # Verificar
+        self.assertEqual(document['id'], self.calculation.id)
+        self.assertEqual(document['input_count'], 35)
+        self.assertEqual(list(document['columns']), ['timestamp', *CHANNEL_KEYS])
+        self.assertEqual(document['columns']['timestamp'], self.calculation.series.timestamps.tolist())
+        self.assertEqual(document['columns']['voltage'], [2.0, 3.0, None, 5.0, 6.0])
+        self.assertEqual(document['fields'][1]['header'], 'Global_active_power')
+    
+    def test_columnar_json_for_inputs(self):
+        """
+        Testa a tabela de um cálculo criado a partir de EmergyInput.
+        """
+        inputs = [EmergyInput("Entrada 1", 10.0, "kg", "Material", "Descrição 1")]
+        calculation = EmergyCalculation.create(inputs, {})
+        
+        document = json.loads(''.join(iter_columnar_json(calculation_table(calculation))))
+        
+        self.assertEqual(document['columns']['name'], ['Entrada 1'])
+        self.assertEqual(document['columns']['value'], [10.0])
+    
+    @unittest.skipIf(wire_formats.msgpack is None, 'msgpack não instalado')
+    def test_msgpack_columns_are_raw_bytes(self):
+        """
+        Testa que as colunas numéricas do MessagePack são os bytes little-endian dos valores.
+        """
+        document = wire_formats.msgpack.unpackb(encode_msgpack(calculation_table(self.calculation)))
+        
+        voltage = np.frombuffer(document['columns']['voltage'], dtype='<f8')
+        np.testing.assert_array_equal(voltage, self.calculation.series.column('voltage'))
+    
+    @unittest.skipIf(wire_formats.pyarrow is None, 'pyarrow não instalado')
+    def test_arrow_stream(self):
+        """
+        Testa que o fluxo Arrow IPC pode ser lido de volta, com NaN como nulo.
+        """
+        table = wire_formats.pyarrow.ipc.open_stream(encode_arrow(calculation_table(self.calculation))).read_all()
+        
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.column('voltage').null_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()